@@ -0,0 +1,42 @@
+"""Add login_failures table
+
+Revision ID: 3c1f0a7d52b4
+Revises: fad9de0e649e
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "3c1f0a7d52b4"
+down_revision: Union[str, Sequence[str], None] = "fad9de0e649e"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "login_failures",
+        sa.Column("login", sa.String(length=128), nullable=False),
+        sa.Column("failures", sa.Integer(), nullable=False),
+        sa.Column("lockouts", sa.SmallInteger(), nullable=False),
+        sa.Column("last_failure_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("locked_until", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("login", name=op.f("pk_login_failures")),
+    )
+    op.create_index(
+        op.f("ix_login_failures_last_failure_at"),
+        "login_failures",
+        ["last_failure_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_login_failures_last_failure_at"), table_name="login_failures")
+    op.drop_table("login_failures")
@@ -0,0 +1,41 @@
+"""Add rate_limit_buckets table
+
+Revision ID: 8e5b2d9c41f7
+Revises: 3c1f0a7d52b4
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "8e5b2d9c41f7"
+down_revision: Union[str, Sequence[str], None] = "3c1f0a7d52b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "rate_limit_buckets",
+        sa.Column("key", sa.String(length=256), nullable=False),
+        sa.Column("tokens", sa.Float(), nullable=False),
+        sa.Column("allowed", sa.Boolean(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("key", name=op.f("pk_rate_limit_buckets")),
+    )
+    op.create_index(
+        op.f("ix_rate_limit_buckets_updated_at"),
+        "rate_limit_buckets",
+        ["updated_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_rate_limit_buckets_updated_at"), table_name="rate_limit_buckets")
+    op.drop_table("rate_limit_buckets")
@@ -0,0 +1,43 @@
+"""Add customer_segment_cache table
+
+Revision ID: 5a7c3e91d2b6
+Revises: 8e5b2d9c41f7
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "5a7c3e91d2b6"
+down_revision: Union[str, Sequence[str], None] = "8e5b2d9c41f7"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "customer_segment_cache",
+        sa.Column("name_key", sa.String(length=512), nullable=False),
+        sa.Column("model", sa.String(length=128), nullable=False),
+        sa.Column("version", sa.String(length=64), nullable=False),
+        sa.Column("segment", sa.String(length=256), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("name_key", "model", "version", name=op.f("pk_customer_segment_cache")),
+    )
+    op.create_index(
+        op.f("ix_customer_segment_cache_expires_at"),
+        "customer_segment_cache",
+        ["expires_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_customer_segment_cache_expires_at"), table_name="customer_segment_cache")
+    op.drop_table("customer_segment_cache")
@@ -0,0 +1,53 @@
+"""Add covering sort indexes for the user listing
+
+Revision ID: b7d4e2a91c3f
+Revises: 5a7c3e91d2b6
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "b7d4e2a91c3f"
+down_revision: Union[str, Sequence[str], None] = "5a7c3e91d2b6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+NAME_SORT_KEY = sa.text("(lower(coalesce(full_name, '')) COLLATE \"C\")")
+LISTING_INCLUDE = ["ad_login", "full_name", "email", "department", "title", "role", "is_active", "last_login_at"]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # CONCURRENTLY keeps the users table writable (logins update it) while the indexes build.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_name_sort",
+            "users",
+            [NAME_SORT_KEY, "id"],
+            postgresql_include=LISTING_INCLUDE,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_users_login_sort",
+            "users",
+            [sa.text('(ad_login COLLATE "C")')],
+            postgresql_include=[column for column in LISTING_INCLUDE if column != "ad_login"],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_users_department_name_sort",
+            "users",
+            ["department", NAME_SORT_KEY, "id"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name in ("ix_users_department_name_sort", "ix_users_login_sort", "ix_users_name_sort"):
+            op.drop_index(name, table_name="users", postgresql_concurrently=True)
@@ -0,0 +1,44 @@
+"""Add pg_trgm index for the people search
+
+Revision ID: c3e8f1a52d70
+Revises: b7d4e2a91c3f
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "c3e8f1a52d70"
+down_revision: Union[str, Sequence[str], None] = "b7d4e2a91c3f"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must stay identical to USER_SEARCH_DOCUMENT in db/models/user/user.py.
+SEARCH_DOCUMENT = (
+    "replace(lower((((((coalesce(full_name, '') || ' ') || ad_login) || ' ') || coalesce(email, '')) || ' ') "
+    "|| coalesce(department, '')), 'ё', 'е') gin_trgm_ops"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # CONCURRENTLY keeps the users table writable (logins update it) while the index builds.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_search_trgm",
+            "users",
+            [sa.text(SEARCH_DOCUMENT)],
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # pg_trgm is left installed: other objects may depend on it.
+    with op.get_context().autocommit_block():
+        op.drop_index("ix_users_search_trgm", table_name="users", postgresql_concurrently=True)
@@ -0,0 +1,83 @@
+"""Add org_closure table
+
+Revision ID: d9a4b6e2c815
+Revises: c3e8f1a52d70
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "d9a4b6e2c815"
+down_revision: Union[str, Sequence[str], None] = "c3e8f1a52d70"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Direct reports recorded in users.subordinates, one manager per report (the most
+# recently synced one), expanded to every depth.  A report whose chain of managers
+# leads back to itself (A lists B and B lists A) is in a cycle: the edges of such
+# cycles are skipped, their members start as roots and logins re-attach them.
+# Logins keep the table current from here.
+BACKFILL = """
+INSERT INTO org_closure (ancestor_id, descendant_id, depth)
+WITH RECURSIVE edges AS (
+    SELECT DISTINCT ON (report.id) manager.id AS manager_id, report.id AS report_id
+    FROM users AS manager
+    CROSS JOIN LATERAL unnest(manager.subordinates) AS listed(report_id)
+    JOIN users AS report ON report.id = listed.report_id AND report.id <> manager.id
+    ORDER BY report.id, manager.updated_at DESC
+), up AS (
+    SELECT report_id AS start_id, manager_id AS node_id, ARRAY[report_id] AS path FROM edges
+    UNION ALL
+    SELECT up.start_id, edges.manager_id, up.path || up.node_id
+    FROM up JOIN edges ON edges.report_id = up.node_id
+    WHERE NOT up.node_id = ANY(up.path)
+), acyclic AS (
+    SELECT manager_id, report_id FROM edges
+    WHERE report_id NOT IN (SELECT start_id FROM up WHERE node_id = start_id)
+), tree AS (
+    SELECT manager_id AS ancestor_id, report_id AS descendant_id, 1 AS depth FROM acyclic
+    UNION ALL
+    SELECT acyclic.manager_id, tree.descendant_id, tree.depth + 1
+    FROM tree JOIN acyclic ON acyclic.report_id = tree.ancestor_id
+)
+SELECT ancestor_id, descendant_id, depth FROM tree
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "org_closure",
+        sa.Column("ancestor_id", sa.Integer(), nullable=False),
+        sa.Column("descendant_id", sa.Integer(), nullable=False),
+        sa.Column("depth", sa.SmallInteger(), nullable=False),
+        sa.CheckConstraint("depth > 0", name=op.f("ck_org_closure_depth_positive")),
+        sa.ForeignKeyConstraint(
+            ["ancestor_id"], ["users.id"], name=op.f("fk_org_closure_ancestor_id_users"), ondelete="CASCADE"
+        ),
+        sa.ForeignKeyConstraint(
+            ["descendant_id"], ["users.id"], name=op.f("fk_org_closure_descendant_id_users"), ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("ancestor_id", "descendant_id", name=op.f("pk_org_closure")),
+    )
+    op.create_index(
+        "ix_org_closure_ancestor_id_depth", "org_closure", ["ancestor_id", "depth", "descendant_id"], unique=False
+    )
+    op.create_index(
+        "ix_org_closure_descendant_id_depth", "org_closure", ["descendant_id", "depth", "ancestor_id"], unique=False
+    )
+    # Logins resolve the manager named in AD by users.full_name.
+    op.create_index(op.f("ix_users_full_name"), "users", ["full_name"], unique=False)
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_users_full_name"), table_name="users")
+    op.drop_index("ix_org_closure_descendant_id_depth", table_name="org_closure")
+    op.drop_index("ix_org_closure_ancestor_id_depth", table_name="org_closure")
+    op.drop_table("org_closure")
@@ -0,0 +1,33 @@
+"""Add kb_dataset_generations table
+
+Revision ID: e2f7a9c4b158
+Revises: d9a4b6e2c815
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+revision: str = "e2f7a9c4b158"
+down_revision: Union[str, Sequence[str], None] = "d9a4b6e2c815"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "kb_dataset_generations",
+        sa.Column("dataset_id", sa.String(length=64), nullable=False),
+        sa.Column("generation", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("dataset_id", name=op.f("pk_kb_dataset_generations")),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("kb_dataset_generations")
@@ -0,0 +1,25 @@
+"""Admission control rules wiring for the API process."""
+
+from __future__ import annotations
+
+from config import settings
+from core.admission import AdmissionLimiter
+
+
+def create_admission_rules() -> list[tuple[str, AdmissionLimiter | None]]:
+    """(absolute path pattern, limiter or None for exempt) pairs, exempt paths first."""
+    prefix = settings.api.prefix.rstrip("/")
+    config = settings.admission
+    rules: list[tuple[str, AdmissionLimiter | None]] = [(prefix + path, None) for path in config.exempt_paths]
+    for route_class in config.classes:
+        limiter = AdmissionLimiter(
+            route_class.name,
+            max_in_flight=route_class.max_in_flight,
+            queue_size=route_class.queue_size,
+            queue_timeout=route_class.queue_timeout_sec,
+        )
+        rules.extend((prefix + path, limiter) for path in route_class.paths)
+    return rules
+
+
+__all__ = ["create_admission_rules"]
@@ -1,11 +1,60 @@
 """FastAPI application factory."""
 
+import asyncio
+import contextlib
+from collections.abc import AsyncIterator
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
+from api.admission import create_admission_rules
 from api.errors import install_error_handlers
+from api.health import health_monitor
+from api.middleware import (
+    AdmissionMiddleware,
+    DeadlineMiddleware,
+    MetricsMiddleware,
+    RateLimitMiddleware,
+    RequestContextMiddleware,
+)
+from api.openapi import install_openapi
+from api.rate_limit import create_rate_limit_rules
 from api.routers.v1 import router as v1_router
+from auth.ldap_client import close_service_connections
 from config.settings import settings
+from core.logging_sampling import run_summary_flusher, summary_flush_interval
+from core.metrics import metrics
+from core.metrics_multiprocess import run_flusher
+from db.engine import db
+from integrations.dify import dify_client
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_app: FastAPI) -> AsyncIterator[None]:
+    """Start background workers and release resources on shutdown."""
+    tasks: list[asyncio.Task[None]] = []
+    if settings.metrics.enabled and settings.metrics.multiprocess_dir:
+        tasks.append(
+            asyncio.create_task(
+                run_flusher(metrics, settings.metrics.multiprocess_dir, settings.metrics.flush_interval_sec)
+            )
+        )
+    if (interval := summary_flush_interval()) is not None:
+        tasks.append(asyncio.create_task(run_summary_flusher(interval)))
+    health_monitor.start()
+    try:
+        yield
+    finally:
+        await health_monitor.stop()
+        for task in tasks:
+            task.cancel()
+        for task in tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        await asyncio.to_thread(close_service_connections)
+        await dify_client.aclose()
+        await db.dispose()
 
 
 def create_app() -> FastAPI:
@@ -15,8 +64,38 @@ def create_app() -> FastAPI:
         version="0.1.0",
         docs_url=f"{settings.api.prefix}/docs",
         openapi_url=f"{settings.api.prefix}/openapi.json",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
     )
 
+    # The last middleware added runs first.
+    if settings.admission.enabled:
+        fastapi_app.add_middleware(
+            AdmissionMiddleware,
+            rules=create_admission_rules(),
+            retry_after=settings.admission.retry_after_sec,
+        )
+    # Outside admission control: over-limit requests never take a slot or a queue place.
+    if settings.rate_limit.enabled and settings.rate_limit.rules:
+        fastapi_app.add_middleware(
+            RateLimitMiddleware,
+            rules=create_rate_limit_rules(),
+            trust_forwarded_for=settings.rate_limit.trust_forwarded_for,
+            trusted_hops=settings.rate_limit.trusted_proxy_hops,
+        )
+    if settings.deadline.enabled:
+        # Outside admission control: time spent queued counts against the budget.
+        fastapi_app.add_middleware(
+            DeadlineMiddleware,
+            default_timeout=settings.deadline.default_timeout_sec,
+            max_timeout=settings.deadline.max_timeout_sec,
+            header=settings.deadline.header,
+            cancel_on_disconnect=settings.deadline.cancel_on_disconnect,
+        )
+    if settings.metrics.enabled:
+        fastapi_app.add_middleware(MetricsMiddleware)
+    fastapi_app.add_middleware(RequestContextMiddleware, log_access=settings.log.access_log)
+    # Outermost, so that responses of the other middlewares (429, 503, 504) carry CORS headers too.
     if getattr(settings, "cors", None) and settings.cors.enabled:
         fastapi_app.add_middleware(
             CORSMiddleware,
@@ -29,6 +108,7 @@ def create_app() -> FastAPI:
     install_error_handlers(fastapi_app)
 
     fastapi_app.include_router(v1_router, prefix=settings.api.prefix)
+    install_openapi(fastapi_app, settings.api.openapi_artifact)
 
     return fastapi_app
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+from collections.abc import Awaitable, Callable, Iterable
 from dataclasses import dataclass
 from typing import cast
 from uuid import UUID
@@ -11,6 +12,7 @@ from api.errors.exceptions import AppError
 from auth.domain import RoleLiteral
 from auth.exceptions import TokenError
 from auth.jwt_utils import decode_token
+from auth.permissions import permission_engine, permission_mask, role_mask
 
 
 @dataclass(slots=True)
@@ -69,4 +71,21 @@ async def get_current_user(
     )
 
 
-__all__ = ["TokenUser", "get_current_user"]
+def require_access(*permissions: str, roles: Iterable[RoleLiteral] = ()) -> Callable[[TokenUser], Awaitable[TokenUser]]:
+    """Dependency returning the current user if their role is one of ``roles`` (any, if empty)
+    and grants every permission; 403 FORBIDDEN otherwise.
+
+    The masks are computed here, once per route; unknown names fail at import time.
+    """
+    required_roles = role_mask(roles)
+    required_permissions = permission_mask(permissions)
+
+    async def dependency(user: TokenUser = Depends(get_current_user)) -> TokenUser:  # noqa: B008
+        if not permission_engine.allows(user.role, roles=required_roles, permissions=required_permissions):
+            raise AppError("FORBIDDEN", "Insufficient permissions", status=403)
+        return user
+
+    return dependency
+
+
+__all__ = ["TokenUser", "get_current_user", "require_access"]
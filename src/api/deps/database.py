@@ -18,4 +18,4 @@ async def get_session() -> AsyncGenerator[AsyncSession]:
         yield session
 
 
-__all__ = ["get_transaction"]
+__all__ = ["get_session", "get_transaction"]
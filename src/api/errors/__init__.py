@@ -8,6 +8,7 @@ from starlette.exceptions import HTTPException as StarletteHTTPException
 from .exceptions import AppError
 from .handlers import (
     app_error_handler,
+    error_response,
     http_exception_handler,
     integrity_error_handler,
     unhandled_exception_handler,
@@ -22,3 +23,6 @@ def install_error_handlers(app: FastAPI) -> None:
     app.add_exception_handler(RequestValidationError, validation_exception_handler)
     app.add_exception_handler(IntegrityError, integrity_error_handler)
     app.add_exception_handler(Exception, unhandled_exception_handler)
+
+
+__all__ = ["AppError", "error_response", "install_error_handlers"]
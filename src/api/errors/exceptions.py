@@ -6,9 +6,18 @@ from typing import Any
 class AppError(Exception):
     """Application error with explicit HTTP status and code."""
 
-    def __init__(self, code: str, message: str, *, status: int = 400, details: Any | None = None) -> None:
+    def __init__(
+        self,
+        code: str,
+        message: str,
+        *,
+        status: int = 400,
+        details: Any | None = None,
+        headers: dict[str, str] | None = None,
+    ) -> None:
         super().__init__(message)
         self.code = code
         self.message = message
         self.status = status
         self.details = details
+        self.headers = headers
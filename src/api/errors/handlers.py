@@ -3,16 +3,24 @@
 import logging
 from typing import Any, cast
 
+import orjson
 from fastapi import Request
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import IntegrityError  # type: ignore
 from starlette.exceptions import HTTPException as StarletteHTTPException
-from starlette.responses import JSONResponse, Response
+from starlette.responses import Response
+
+from core.metrics import metrics
+from core.request_context import route_template
 
 from .exceptions import AppError
 
 log = logging.getLogger(__name__)
 
+error_responses_total = metrics.counter(
+    "http_error_responses_total", "Error responses by status and code", ("status", "code")
+)
+
 
 def _get_request_id(request: Request) -> str | None:
     """Extract request id from state or header."""
@@ -20,41 +28,101 @@ def _get_request_id(request: Request) -> str | None:
     return rid or request.headers.get("X-Request-ID")
 
 
+def _log_extra(request: Request, rid: str | None, status: int) -> dict[str, Any]:
+    """Structured fields attached to error log records."""
+    return {"request_id": rid, "route": route_template(request.scope), "status": status}
+
+
+def _log(
+    level: int, request: Request, rid: str | None, status: int, msg: str, *args: Any, exc_info: bool = False
+) -> None:
+    """Log with the structured fields, built only when the record would be emitted."""
+    if log.isEnabledFor(level):
+        log.log(level, msg, *args, extra=_log_extra(request, rid, status), exc_info=exc_info)
+
+
+_CODE_BY_STATUS = {
+    400: "BAD_REQUEST",
+    401: "UNAUTHORIZED",
+    403: "FORBIDDEN",
+    404: "NOT_FOUND",
+    409: "CONFLICT",
+    422: "VALIDATION_ERROR",
+    423: "LOCKED",
+    429: "TOO_MANY_REQUESTS",
+}
+
+
 def _code_by_status(status: int) -> str:
     """Map HTTP status to error code."""
-    mapping = {
-        400: "BAD_REQUEST",
-        401: "UNAUTHORIZED",
-        403: "FORBIDDEN",
-        404: "NOT_FOUND",
-        409: "CONFLICT",
-        422: "VALIDATION_ERROR",
-        429: "TOO_MANY_REQUESTS",
-    }
     if status >= 500:
         return "INTERNAL_ERROR"
-    return mapping.get(status, "HTTP_ERROR")
+    return _CODE_BY_STATUS.get(status, "HTTP_ERROR")
+
+
+# Encoded envelopes of errors without details, split around the request id:
+# (code, message) -> (b'{"error":{"code":..,"message":..,"requestId":', b'}}').
+# Bounded so that messages with interpolated values cannot grow it without limit.
+_STATIC_BODIES_MAX = 256
+_static_bodies: dict[tuple[str, str], tuple[bytes, bytes]] = {}
+_NO_DETAILS: tuple[Any, ...] = ([], {})
+
+
+def _encode_error(code: str, message: str, request_id: str | None, details: Any) -> bytes:
+    """Error envelope as JSON; static ones are encoded once and only the request id is spliced in."""
+    if details is not None and details not in _NO_DETAILS:
+        return orjson.dumps({"error": {"code": code, "message": message, "requestId": request_id, "details": details}})
+    parts = _static_bodies.get((code, message))
+    if parts is None:
+        encoded = orjson.dumps({"error": {"code": code, "message": message, "requestId": None}})
+        parts = (encoded[: -len(b"null}}")], b"}}")
+        if len(_static_bodies) < _STATIC_BODIES_MAX:
+            _static_bodies[(code, message)] = parts
+    return parts[0] + orjson.dumps(request_id) + parts[1]
 
 
 def _make_error_response(
-    code: str, message: str, status: int, request_id: str | None, details: Any = None
-) -> JSONResponse:
+    code: str,
+    message: str,
+    status: int,
+    request_id: str | None,
+    details: Any = None,
+    headers: dict[str, str] | None = None,
+) -> Response:
     """Build JSON error response payload."""
-    payload: dict[str, Any] = {"error": {"code": code, "message": message, "requestId": request_id}}
-    if details not in (None, [], {}):
-        payload["error"]["details"] = details
-    return JSONResponse(payload, status_code=status)
+    error_responses_total.inc(str(status), code)
+    return Response(
+        _encode_error(code, message, request_id, details),
+        status_code=status,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+def error_response(
+    status: int,
+    message: str,
+    *,
+    code: str | None = None,
+    request_id: str | None = None,
+    details: Any = None,
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """Error envelope response for code outside the exception handlers, e.g. middleware.
+
+    ``code`` defaults to the one the handlers use for ``status``.
+    """
+    return _make_error_response(code or _code_by_status(status), message, status, request_id, details, headers)
 
 
 async def app_error_handler(request: Request, exc: Exception) -> Response:
     """Handle application-level errors."""
     err = cast(AppError, exc)
     rid = _get_request_id(request)
-    if err.status >= 500:
-        log.exception("AppError %s: %s", err.code, err.message, extra={"request_id": rid})
-    else:
-        log.warning("AppError %s: %s", err.code, err.message, extra={"request_id": rid})
-    return _make_error_response(err.code, err.message, err.status, rid, err.details)
+    server_error = err.status >= 500
+    level = logging.ERROR if server_error else logging.WARNING
+    _log(level, request, rid, err.status, "AppError %s: %s", err.code, err.message, exc_info=server_error)
+    return _make_error_response(err.code, err.message, err.status, rid, err.details, err.headers)
 
 
 async def http_exception_handler(request: Request, exc: Exception) -> Response:
@@ -64,10 +132,8 @@ async def http_exception_handler(request: Request, exc: Exception) -> Response:
     status = http_exc.status_code
     code = _code_by_status(status)
     msg = http_exc.detail if isinstance(http_exc.detail, str) else str(http_exc.detail)
-    if status >= 500:
-        log.error("HTTPException %s: %s", status, msg, extra={"request_id": rid})
-    else:
-        log.info("HTTPException %s: %s", status, msg, extra={"request_id": rid})
+    level = logging.ERROR if status >= 500 else logging.INFO
+    _log(level, request, rid, status, "HTTPException %s: %s", status, msg)
     return _make_error_response(code, msg, status, rid)
 
 
@@ -76,7 +142,7 @@ async def validation_exception_handler(request: Request, exc: Exception) -> Resp
     val_exc = cast(RequestValidationError, exc)
     rid = _get_request_id(request)
     details = val_exc.errors()
-    log.info("ValidationError: %s", details, extra={"request_id": rid})
+    _log(logging.INFO, request, rid, 422, "ValidationError: %s", details)
     return _make_error_response("VALIDATION_ERROR", "Validation failed.", 422, rid, details)
 
 
@@ -84,12 +150,12 @@ async def integrity_error_handler(request: Request, exc: Exception) -> Response:
     """Handle database integrity errors."""
     integ_exc = cast(IntegrityError, exc)
     rid = _get_request_id(request)
-    log.warning("IntegrityError: %s", str(integ_exc), extra={"request_id": rid})
+    log.warning("IntegrityError: %s", str(integ_exc), extra=_log_extra(request, rid, 409))
     return _make_error_response("CONFLICT", "Integrity constraint violated.", 409, rid)
 
 
 async def unhandled_exception_handler(request: Request, exc: Exception) -> Response:
     """Handle unhandled exceptions."""
     rid = _get_request_id(request)
-    log.exception("Unhandled exception: %s", str(exc), extra={"request_id": rid})
+    log.exception("Unhandled exception: %s", str(exc), extra=_log_extra(request, rid, 500))
     return _make_error_response("INTERNAL_ERROR", "Internal server error.", 500, rid)
@@ -29,6 +29,8 @@ _ERROR_DESCRIPTIONS: dict[int, str] = {
     404: "Not Found",
     409: "Conflict",
     423: "Locked",
+    502: "Bad Gateway",
+    503: "Service Unavailable",
 }
 
 
@@ -0,0 +1,38 @@
+"""Readiness checks wiring for the API process."""
+
+from __future__ import annotations
+
+from auth.ldap_client import ldap_breaker, ldap_probe
+from config import settings
+from core.health import HealthMonitor
+from db.engine import db
+
+
+def _db_pool_gate() -> str | None:
+    if db.pool_exhausted():
+        return "connection pool exhausted"
+    return None
+
+
+def _ldap_circuit_gate() -> str | None:
+    if ldap_breaker.state == "open":
+        return "circuit open"
+    return None
+
+
+def create_health_monitor() -> HealthMonitor:
+    """Build the monitor with database and LDAP probes."""
+    monitor = HealthMonitor(interval=settings.health.interval_sec, timeout=settings.health.probe_timeout_sec)
+    monitor.add_probe("database", db.ping)
+    monitor.add_gate("database_pool", _db_pool_gate)
+    # The LDAP probe also keeps the DC pool's health marks current, so it runs even when not reported.
+    monitor.add_probe("ldap", ldap_probe, readiness=settings.health.check_ldap)
+    if settings.health.check_ldap:
+        monitor.add_gate("ldap_circuit", _ldap_circuit_gate)
+    return monitor
+
+
+health_monitor = create_health_monitor()
+
+
+__all__ = ["health_monitor", "create_health_monitor"]
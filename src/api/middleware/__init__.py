@@ -0,0 +1,15 @@
+"""ASGI middleware."""
+
+from .admission import AdmissionMiddleware
+from .deadline import DeadlineMiddleware
+from .metrics import MetricsMiddleware
+from .rate_limit import RateLimitMiddleware
+from .request_context import RequestContextMiddleware
+
+__all__ = [
+    "RequestContextMiddleware",
+    "MetricsMiddleware",
+    "RateLimitMiddleware",
+    "AdmissionMiddleware",
+    "DeadlineMiddleware",
+]
@@ -0,0 +1,61 @@
+"""Admission control: bounded in-flight requests per route class with fast 503 shedding."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from api.errors import error_response
+from api.middleware.paths import PathRules
+from core.admission import AdmissionLimiter, AdmissionRejectedError
+
+OVERLOADED_CODE = "OVERLOADED"
+
+
+class AdmissionMiddleware:
+    """Hold an admission slot of the request's route class for the whole request.
+
+    ``rules`` map path patterns to a limiter, or to ``None`` for exempt paths
+    (health probes, metrics).  When the class is saturated and its queue is full or
+    the queue wait times out, the request gets 503 with ``Retry-After`` at once.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        rules: Sequence[tuple[str, AdmissionLimiter | None]],
+        retry_after: int = 1,
+    ) -> None:
+        self.app = app
+        self.retry_after = retry_after
+        self._rules = PathRules(rules)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        rule = self._rules.match(scope["path"]) if scope["type"] == "http" else None
+        limiter = rule[1] if rule is not None else None
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.acquire()
+        except AdmissionRejectedError as exc:
+            response = error_response(
+                503,
+                "Server is overloaded, retry later.",
+                code=OVERLOADED_CODE,
+                request_id=scope.get("state", {}).get("request_id"),
+                details={"retryAfter": self.retry_after, "reason": exc.reason},
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
+
+
+__all__ = ["AdmissionMiddleware", "OVERLOADED_CODE"]
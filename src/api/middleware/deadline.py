@@ -0,0 +1,164 @@
+"""Request deadlines: a time budget per request and cancellation once nobody waits."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Callable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from api.errors import error_response
+from core.deadline import DeadlineExceededError, bind_deadline, deadline_expired
+from core.metrics import metrics
+from core.request_context import route_template
+
+log = logging.getLogger(__name__)
+
+DEADLINE_HEADER = "X-Request-Timeout"
+DEADLINE_CODE = "DEADLINE_EXCEEDED"
+
+requests_abandoned_total = metrics.counter(
+    "http_requests_abandoned_total", "Requests cancelled before completion", ("route", "reason")
+)
+
+
+class DeadlineMiddleware:
+    """Run each request under a deadline and cancel it when the budget or the client is gone.
+
+    The budget is the ``header`` request header in seconds, capped at ``max_timeout``,
+    or ``default_timeout`` when the caller does not send a valid one.
+    It is bound to :mod:`core.deadline` for LDAP, database and HTTP calls, and the
+    handler is cancelled when it runs out: the client gets 504 ``DEADLINE_EXCEEDED``.
+
+    With ``cancel_on_disconnect`` a watcher task reads the request stream and cancels
+    the handler as soon as the server reports ``http.disconnect`` before the
+    response is complete.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        default_timeout: float,
+        max_timeout: float,
+        header: str = DEADLINE_HEADER,
+        cancel_on_disconnect: bool = True,
+    ) -> None:
+        self.app = app
+        self.default_timeout = default_timeout
+        self.max_timeout = max_timeout
+        self.cancel_on_disconnect = cancel_on_disconnect
+        self._header = header.lower().encode("latin-1")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        budget = self._budget(scope)
+        response = _ResponseProgress(send)
+        window = asyncio.timeout(budget)
+
+        def cancel() -> None:
+            if not response.finished:
+                window.reschedule(asyncio.get_running_loop().time())
+
+        watcher = _DisconnectWatcher(receive, cancel) if self.cancel_on_disconnect else None
+        with bind_deadline(budget):
+            try:
+                try:
+                    async with window:
+                        await self.app(scope, watcher.receive if watcher else receive, response.send)
+                finally:
+                    if watcher is not None:
+                        await watcher.stop()
+            except Exception as exc:
+                if not (window.expired() or isinstance(exc, DeadlineExceededError) or deadline_expired()):
+                    raise
+                disconnected = watcher is not None and watcher.disconnected
+                if not disconnected and response.started:
+                    raise
+                await self._abandon(scope, receive, send, budget, disconnected=disconnected)
+
+    async def _abandon(self, scope: Scope, receive: Receive, send: Send, budget: float, *, disconnected: bool) -> None:
+        route = route_template(scope)
+        requests_abandoned_total.inc(route, "disconnect" if disconnected else "deadline")
+        if disconnected:
+            log.info("Client disconnected, cancelled %s %s", scope.get("method"), route)
+            return
+        log.warning("Deadline of %.3fs exceeded for %s %s", budget, scope.get("method"), route)
+        response = error_response(
+            504,
+            "Request deadline exceeded.",
+            code=DEADLINE_CODE,
+            request_id=scope.get("state", {}).get("request_id"),
+            details={"timeout": budget},
+        )
+        await response(scope, receive, send)
+
+    def _budget(self, scope: Scope) -> float:
+        for name, value in scope.get("headers", ()):
+            if name == self._header:
+                with contextlib.suppress(ValueError):
+                    requested = float(value)
+                    if requested > 0:
+                        return min(requested, self.max_timeout)
+                break
+        return self.default_timeout
+
+
+class _ResponseProgress:
+    """Wraps ``send`` to tell whether the response has started or finished."""
+
+    def __init__(self, send: Send) -> None:
+        self.started = False
+        self.finished = False
+        self._send = send
+
+    async def send(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.started = True
+        elif message["type"] == "http.response.body" and not message.get("more_body", False):
+            self.finished = True
+        await self._send(message)
+
+
+class _DisconnectWatcher:
+    """Reads the request stream one message ahead of the app to notice ``http.disconnect``.
+
+    The one-slot queue keeps the server's flow control: a large body is still read
+    only as fast as the app consumes it.
+    """
+
+    def __init__(self, receive: Receive, on_disconnect: Callable[[], None]) -> None:
+        self.disconnected = False
+        self._receive = receive
+        self._on_disconnect = on_disconnect
+        self._messages: asyncio.Queue[Message] = asyncio.Queue(maxsize=1)
+        self._task = asyncio.create_task(self._watch())
+
+    async def receive(self) -> Message:
+        if self.disconnected and self._messages.empty():
+            return {"type": "http.disconnect"}
+        return await self._messages.get()
+
+    async def stop(self) -> None:
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+
+    async def _watch(self) -> None:
+        while True:
+            message = await self._receive()
+            if message["type"] == "http.disconnect":
+                self.disconnected = True
+                if not self._messages.full():
+                    self._messages.put_nowait(message)
+                self._on_disconnect()
+                return
+            await self._messages.put(message)
+
+
+__all__ = ["DEADLINE_CODE", "DEADLINE_HEADER", "DeadlineMiddleware"]
@@ -0,0 +1,38 @@
+"""Path pattern matching shared by the routing-independent middleware."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+
+class PathRules(Generic[T]):
+    """Map request paths to values by exact path or ``prefix*`` pattern.
+
+    Exact patterns are a dict lookup; prefix patterns are tried in the given order,
+    so list specific prefixes before broad ones.
+    """
+
+    def __init__(self, rules: Sequence[tuple[str, T]]) -> None:
+        self._exact: dict[str, tuple[str, T]] = {}
+        self._prefixes: list[tuple[str, str, T]] = []
+        for pattern, value in rules:
+            if pattern.endswith("*"):
+                self._prefixes.append((pattern[:-1], pattern, value))
+            else:
+                self._exact.setdefault(pattern, (pattern, value))
+
+    def match(self, path: str) -> tuple[str, T] | None:
+        """Return ``(pattern, value)`` of the first matching rule."""
+        rule = self._exact.get(path)
+        if rule is not None:
+            return rule
+        for prefix, pattern, value in self._prefixes:
+            if path.startswith(prefix):
+                return pattern, value
+        return None
+
+
+__all__ = ["PathRules"]
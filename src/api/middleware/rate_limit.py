@@ -0,0 +1,86 @@
+"""Per-client token-bucket rate limiting for selected routes."""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Sequence
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from api.errors import error_response
+from api.middleware.paths import PathRules
+from core.metrics import metrics
+from core.rate_limit import RateLimiter
+
+rate_limited_total = metrics.counter("http_rate_limited_total", "Requests rejected by the rate limiter", ("route",))
+
+
+def client_ip(scope: Scope, *, trust_forwarded_for: bool = False, trusted_hops: int = 1) -> str:
+    """Client address; with a trusted proxy, the X-Forwarded-For entry ``trusted_hops`` from the right.
+
+    Each proxy appends the address it received the request from, so only the
+    entries added by our own ``trusted_hops`` proxies can be believed; anything
+    to their left was sent by the client.
+    """
+    if trust_forwarded_for:
+        hops = [
+            hop.strip()
+            for name, value in scope.get("headers", ())
+            if name == b"x-forwarded-for"
+            for hop in value.decode("latin-1").split(",")
+        ]
+        hops = [hop for hop in hops if hop]
+        if hops:
+            return hops[-min(trusted_hops, len(hops))]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+class RateLimitMiddleware:
+    """Reject requests over the per-IP budget with 429 before they reach routing.
+
+    ``rules`` are ``(pattern, limiter)`` pairs matched against the request path in
+    order: an exact path, or a prefix when the pattern ends with ``*``.  Paths that
+    match no rule pass through untouched.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        rules: Sequence[tuple[str, RateLimiter]],
+        trust_forwarded_for: bool = False,
+        trusted_hops: int = 1,
+    ) -> None:
+        self.app = app
+        self.trust_forwarded_for = trust_forwarded_for
+        self.trusted_hops = trusted_hops
+        self._rules = PathRules(rules)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or (rule := self._rules.match(scope["path"])) is None:
+            await self.app(scope, receive, send)
+            return
+
+        pattern, limiter = rule
+        retry_after = await limiter.acquire(
+            client_ip(scope, trust_forwarded_for=self.trust_forwarded_for, trusted_hops=self.trusted_hops)
+        )
+        if retry_after <= 0:
+            await self.app(scope, receive, send)
+            return
+
+        rate_limited_total.inc(pattern)
+        seconds = max(1, math.ceil(retry_after))
+        request_id = scope.get("state", {}).get("request_id")
+        response = error_response(
+            429,
+            "Too many requests, slow down.",
+            request_id=request_id,
+            details={"retryAfter": seconds},
+            headers={"Retry-After": str(seconds)},
+        )
+        await response(scope, receive, send)
+
+
+__all__ = ["RateLimitMiddleware", "client_ip"]
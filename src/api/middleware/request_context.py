@@ -0,0 +1,82 @@
+"""Request id propagation and access logging middleware."""
+
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.request_context import request_id_var, route_template
+
+access_log = logging.getLogger("api.access")
+
+REQUEST_ID_HEADER = "X-Request-ID"
+_REQUEST_ID_HEADER_RAW = REQUEST_ID_HEADER.lower().encode("latin-1")
+_MAX_REQUEST_ID_LEN = 128
+
+
+class RequestContextMiddleware:
+    """Bind request id to the context, echo it back and log one access record per request.
+
+    The id is taken from ``X-Request-ID`` when the client sends one, otherwise generated.
+    It is stored in ``request.state.request_id`` (read by the error handlers) and in
+    ``core.request_context.request_id_var`` (read by the logging filter).
+    """
+
+    def __init__(self, app: ASGIApp, *, log_access: bool = True) -> None:
+        self.app = app
+        self.log_access = log_access
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        rid = _incoming_request_id(scope) or uuid.uuid4().hex
+        scope.setdefault("state", {})["request_id"] = rid
+        rid_token = request_id_var.set(rid)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((_REQUEST_ID_HEADER_RAW, rid.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if self.log_access and access_log.isEnabledFor(logging.INFO):
+                route = route_template(scope)
+                access_log.info(
+                    "%s %s %d",
+                    scope.get("method", "-"),
+                    route,
+                    status,
+                    extra={
+                        "route": route,
+                        "method": scope.get("method"),
+                        "status": status,
+                        "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                    },
+                )
+            request_id_var.reset(rid_token)
+
+
+def _incoming_request_id(scope: Scope) -> str | None:
+    for name, value in scope.get("headers", []):
+        if name == _REQUEST_ID_HEADER_RAW:
+            rid = value.decode("latin-1").strip()
+            if rid and len(rid) <= _MAX_REQUEST_ID_LEN:
+                return rid
+            return None
+    return None
+
+
+__all__ = ["RequestContextMiddleware", "REQUEST_ID_HEADER", "route_template"]
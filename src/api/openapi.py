@@ -0,0 +1,181 @@
+"""OpenAPI schema served from memory as prebuilt bytes.
+
+FastAPI builds the schema on the first request in every worker and serialises
+the dict again for every request.  Here it is rendered once: either read from
+an artifact produced at build time (``python -m cli openapi``), or generated in
+the ``cli serve`` parent before fork, or, failing both, on the first request.
+Responses carry an ETag (``If-None-Match`` gives 304) and a pre-compressed
+gzip copy is sent to clients that accept it.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+import orjson
+from fastapi import FastAPI
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class OpenApiDocument:
+    """Schema bytes, their gzip copy and the ETags of both representations."""
+
+    body: bytes
+    gzipped: bytes
+    etag: str
+    etag_gzip: str
+
+    @classmethod
+    def from_bytes(cls, body: bytes, gzipped: bytes | None = None) -> OpenApiDocument:
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        return cls(
+            body=body,
+            gzipped=compress(body) if gzipped is None else gzipped,
+            etag=f'"{digest}"',
+            etag_gzip=f'"{digest}-gzip"',
+        )
+
+
+def compress(body: bytes) -> bytes:
+    # mtime=0 keeps the output identical between builds of the same schema.
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def render_schema(app: FastAPI) -> bytes:
+    """Serialise the app's schema; the cached dict is dropped, only the bytes are kept."""
+    body = orjson.dumps(app.openapi())
+    app.openapi_schema = None
+    return body
+
+
+def gzip_path(path: Path) -> Path:
+    return path.with_name(path.name + ".gz")
+
+
+def write_artifact(app: FastAPI, path: Path) -> OpenApiDocument:
+    """Write the schema to ``path`` and its gzip copy next to it (``<path>.gz``)."""
+    document = OpenApiDocument.from_bytes(render_schema(app))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(document.body)
+    gzip_path(path).write_bytes(document.gzipped)
+    return document
+
+
+def load_artifact(path: Path) -> OpenApiDocument | None:
+    """The prebuilt schema at ``path``, or ``None`` when there is none."""
+    try:
+        body = path.read_bytes()
+    except FileNotFoundError:
+        return None
+    try:
+        gzipped: bytes | None = gzip_path(path).read_bytes()
+    except FileNotFoundError:
+        gzipped = None
+    return OpenApiDocument.from_bytes(body, gzipped)
+
+
+class OpenApiEndpoint:
+    """Serves one :class:`OpenApiDocument`, loaded or generated on first use."""
+
+    def __init__(self, app: FastAPI, artifact: Path | None = None) -> None:
+        self._app = app
+        self._artifact = artifact
+        self._document: OpenApiDocument | None = None
+
+    @property
+    def document(self) -> OpenApiDocument:
+        if self._document is None:
+            self._document = self._load()
+        return self._document
+
+    def warm(self) -> OpenApiDocument:
+        """Load or generate the document now rather than on the first request."""
+        return self.document
+
+    async def handle(self, request: Request) -> Response:
+        document = self.document
+        use_gzip = accepts_gzip(request.headers.get("accept-encoding", ""))
+        etag = document.etag_gzip if use_gzip else document.etag
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if etag_matches(request.headers.get("if-none-match"), (document.etag, document.etag_gzip)):
+            return Response(status_code=304, headers=headers)
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+        body = document.gzipped if use_gzip else document.body
+        return Response(body, media_type="application/json", headers=headers)
+
+    def _load(self) -> OpenApiDocument:
+        if self._artifact is not None:
+            document = load_artifact(self._artifact)
+            if document is not None:
+                log.info("OpenAPI schema loaded from %s", self._artifact)
+                return document
+            log.warning("OpenAPI artifact %s not found, generating the schema", self._artifact)
+        return OpenApiDocument.from_bytes(render_schema(self._app))
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        if coding.strip().lower() not in ("gzip", "*"):
+            continue
+        quality = params.strip().removeprefix("q=")
+        return not quality or _quality(quality) > 0
+    return False
+
+
+def etag_matches(if_none_match: str | None, etags: tuple[str, ...]) -> bool:
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip().removeprefix("W/")
+        if candidate == "*" or candidate in etags:
+            return True
+    return False
+
+
+def _quality(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
+
+
+def install_openapi(app: FastAPI, artifact: Path | None = None) -> OpenApiEndpoint:
+    """Replace FastAPI's schema route; docs pages keep pointing at the same URL."""
+    if app.openapi_url is None:
+        raise ValueError("the app has no openapi_url")
+    endpoint = OpenApiEndpoint(app, artifact)
+    url = app.openapi_url
+    app.router.routes[:] = [route for route in app.router.routes if getattr(route, "path", None) != url]
+    app.router.routes.append(Route(url, endpoint.handle, methods=["GET", "HEAD"], include_in_schema=False))
+    app.state.openapi = endpoint
+    return endpoint
+
+
+def warm_openapi(app: FastAPI) -> None:
+    endpoint = getattr(app.state, "openapi", None)
+    if isinstance(endpoint, OpenApiEndpoint):
+        endpoint.warm()
+
+
+__all__ = [
+    "OpenApiDocument",
+    "OpenApiEndpoint",
+    "accepts_gzip",
+    "etag_matches",
+    "install_openapi",
+    "load_artifact",
+    "render_schema",
+    "warm_openapi",
+    "write_artifact",
+]
@@ -0,0 +1,65 @@
+"""Rate limit rules wiring for the API process."""
+
+from __future__ import annotations
+
+import logging
+import time
+from datetime import UTC, datetime
+
+from config import settings
+from config.settings import RateLimitRule
+from core.rate_limit import MemoryRateLimiter, RateLimiter, TokenBuckets
+from db.engine import db
+from db.repositories.app.system import purge_rate_limit_buckets, take_rate_limit_token
+
+log = logging.getLogger(__name__)
+
+
+class PostgresRateLimiter:
+    """Buckets in ``rate_limit_buckets`` so that all workers share one budget per client.
+
+    Refill and take happen in one upsert.  If the database is unavailable the
+    request is let through: rate limiting must not turn a DB outage into a login
+    outage.  Idle buckets are purged at most once per ``idle_ttl`` seconds.
+    """
+
+    def __init__(self, name: str, *, rate: float, burst: int, idle_ttl: float) -> None:
+        self.name = name
+        self.rate = rate
+        self.burst = float(burst)
+        self.idle_ttl = max(idle_ttl, self.burst / rate)
+        self._purged_at = time.monotonic()
+
+    async def acquire(self, key: str) -> float:
+        try:
+            async with db.transaction() as session:
+                allowed, tokens = await take_rate_limit_token(
+                    session, f"{self.name}|{key}", rate=self.rate, burst=self.burst
+                )
+                if time.monotonic() - self._purged_at >= self.idle_ttl:
+                    self._purged_at = time.monotonic()
+                    idle_before = datetime.fromtimestamp(time.time() - self.idle_ttl, tz=UTC)
+                    await purge_rate_limit_buckets(session, idle_before=idle_before)
+        except Exception as exc:  # any database failure: fail open
+            log.warning("Shared rate limiter unavailable, allowing request: %s", exc)
+            return 0.0
+        return 0.0 if allowed else (1 - tokens) / self.rate
+
+
+def _limiter(rule: RateLimitRule) -> RateLimiter:
+    config = settings.rate_limit
+    rate = rule.per_minute / 60.0
+    if config.backend == "postgres":
+        return PostgresRateLimiter(rule.path, rate=rate, burst=rule.burst, idle_ttl=config.idle_ttl_sec)
+    return MemoryRateLimiter(
+        TokenBuckets(rate=rate, burst=rule.burst, shards=config.shards, sweep_interval=config.idle_ttl_sec)
+    )
+
+
+def create_rate_limit_rules() -> list[tuple[str, RateLimiter]]:
+    """(absolute path pattern, limiter) pairs for the middleware."""
+    prefix = settings.api.prefix.rstrip("/")
+    return [(prefix + rule.path, _limiter(rule)) for rule in settings.rate_limit.rules]
+
+
+__all__ = ["PostgresRateLimiter", "create_rate_limit_rules"]
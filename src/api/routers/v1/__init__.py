@@ -4,9 +4,19 @@ from fastapi import APIRouter
 
 from api.routers.v1.auth import router as auth
 from api.routers.v1.example import router as example
+from api.routers.v1.knowledge import router as knowledge
+from api.routers.v1.org import router as org
+from api.routers.v1.segments import router as segments
+from api.routers.v1.system import router as system
+from api.routers.v1.users import router as users
 
 router = APIRouter()
 router.include_router(auth)
 router.include_router(example)
+router.include_router(knowledge)
+router.include_router(org)
+router.include_router(segments)
+router.include_router(system)
+router.include_router(users)
 
 __all__ = ["router"]
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import math
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, Request, Response
@@ -11,7 +12,8 @@ from api.deps.database import get_transaction
 from api.errors.exceptions import AppError
 from api.errors.schema import error_responses
 from api.schemas.auth import LoginRequest, LoginResponse
-from auth.exceptions import AuthError
+from auth.domain import LoginResult
+from auth.exceptions import AccountLockedError, AuthError
 from auth.service import AuthService, auth_service
 
 from .cookie import clear_refresh_cookie, read_refresh_cookie, set_refresh_cookie
@@ -32,23 +34,21 @@ AuthServiceDep = Annotated[AuthService, Depends(get_auth_service)]
     "/login",
     response_model=LoginResponse,
     responses={
-        **error_responses(400, 401, 403),
+        **error_responses(400, 401, 403, 423),
         422: {"description": "Validation Error"},
     },
 )
 async def login(
     payload: LoginRequest,
-    response: Response,
     session: AuthSession,
     service: AuthServiceDep,
-) -> LoginResponse:
+) -> Response:
     """Authenticate a user and return tokens."""
     try:
         result = await service.login(session, login=payload.login, password=payload.password)
     except AuthError as exc:
         raise _app_error(exc) from exc
-    set_refresh_cookie(response, result.refresh_token)
-    return LoginResponse.from_result(result)
+    return _login_response(result)
 
 
 @router.post(
@@ -64,7 +64,7 @@ async def refresh(
     response: Response,
     session: AuthSession,
     service: AuthServiceDep,
-) -> LoginResponse:
+) -> Response:
     """Refresh access token using refresh cookie."""
     token = read_refresh_cookie(request)
     try:
@@ -72,12 +72,32 @@ async def refresh(
     except AuthError as exc:
         clear_refresh_cookie(response)
         raise _app_error(exc) from exc
+    return _login_response(result)
+
+
+def _login_response(result: LoginResult) -> Response:
+    """Serialise the payload once; FastAPI's response_model validate-and-encode pass is skipped.
+
+    ``response_model`` stays on the route for the schema.  A returned ``Response``
+    does not pick up headers set on the injected one, so the cookie goes here.
+    """
+    body = LoginResponse.from_result(result).model_dump_json(by_alias=True)
+    response = Response(body, media_type="application/json")
     set_refresh_cookie(response, result.refresh_token)
-    return LoginResponse.from_result(result)
+    return response
 
 
 def _app_error(exc: AuthError) -> AppError:
     """Map domain auth errors to API errors."""
+    if isinstance(exc, AccountLockedError):
+        retry_after = max(1, math.ceil(exc.retry_after))
+        return AppError(
+            exc.code,
+            exc.message,
+            status=exc.status,
+            details={"retryAfter": retry_after},
+            headers={"Retry-After": str(retry_after)},
+        )
     return AppError(exc.code, exc.message, status=exc.status)
 
 
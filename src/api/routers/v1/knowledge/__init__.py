@@ -0,0 +1,10 @@
+"""Knowledge base router package."""
+
+from fastapi import APIRouter
+
+from . import routes
+
+router = APIRouter(prefix="/knowledge", tags=["knowledge"])
+router.include_router(routes.router)
+
+__all__ = ["router"]
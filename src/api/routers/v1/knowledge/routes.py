@@ -0,0 +1,54 @@
+"""Knowledge base retrieval routes."""
+
+from __future__ import annotations
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from api.deps.auth import TokenUser, require_access
+from api.errors.exceptions import AppError
+from api.errors.schema import error_responses
+from api.schemas.knowledge import RetrieveRequest, RetrieveResponse
+from config import settings
+from integrations.dify import DifyError, DifyUnavailableError
+from knowledge import RetrievalService, knowledge_retrieval
+
+router = APIRouter()
+
+
+def get_retrieval_service() -> RetrievalService:
+    """Provide knowledge retrieval service dependency."""
+    return knowledge_retrieval
+
+
+CurrentUser = Annotated[TokenUser, Depends(require_access("knowledge:read"))]
+RetrievalServiceDep = Annotated[RetrievalService, Depends(get_retrieval_service)]
+
+
+@router.post(
+    "/retrieve",
+    response_model=RetrieveResponse,
+    responses={**error_responses(400, 401, 403, 404, 502, 503), 422: {"description": "Validation Error"}},
+)
+async def retrieve(payload: RetrieveRequest, _user: CurrentUser, service: RetrievalServiceDep) -> RetrieveResponse:
+    """Knowledge base fragments relevant to the query; repeated queries are answered from the cache."""
+    dataset_id = payload.dataset_id or settings.knowledge.dataset_id
+    if not dataset_id:
+        raise AppError("DATASET_REQUIRED", "datasetId is required: no default dataset is configured")
+    try:
+        result = await service.retrieve(dataset_id, payload.query, top_k=payload.top_k or settings.knowledge.top_k)
+    except DifyError as exc:
+        raise _app_error(exc) from exc
+    return RetrieveResponse.from_result(result)
+
+
+def _app_error(exc: DifyError) -> AppError:
+    if isinstance(exc, DifyUnavailableError):
+        return AppError("KNOWLEDGE_UNAVAILABLE", "Knowledge base is unavailable", status=503)
+    if exc.status == 404:
+        return AppError("DATASET_NOT_FOUND", "Knowledge base dataset not found", status=404)
+    return AppError("KNOWLEDGE_FAILED", "Knowledge base search failed", status=502)
+
+
+__all__ = ["router"]
@@ -0,0 +1,10 @@
+"""Org structure router package."""
+
+from fastapi import APIRouter
+
+from . import routes
+
+router = APIRouter(prefix="/org", tags=["org"])
+router.include_router(routes.router)
+
+__all__ = ["router"]
@@ -0,0 +1,82 @@
+"""Reporting tree routes."""
+
+from __future__ import annotations
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Path, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.deps.auth import TokenUser, require_access
+from api.deps.database import get_session
+from api.errors.exceptions import AppError
+from api.errors.schema import error_responses
+from api.schemas.org import OrgChain, OrgMember, OrgRelation, OrgSubtree
+from config import settings
+from orgchart import OrgChart, org_chart
+
+router = APIRouter()
+
+
+def get_org_chart() -> OrgChart:
+    """Provide org chart dependency."""
+    return org_chart
+
+
+CurrentUser = Annotated[TokenUser, Depends(require_access("users:read"))]
+OrgChartDep = Annotated[OrgChart, Depends(get_org_chart)]
+SessionDep = Annotated[AsyncSession, Depends(get_session)]
+
+
+async def visible_user_id(
+    user_id: Annotated[int, Path(alias="userId", ge=1)],
+    user: CurrentUser,
+    org: OrgChartDep,
+    session: SessionDep,
+) -> int:
+    """``userId`` if the caller may see that part of the tree; 403 FORBIDDEN otherwise."""
+    if not await org.can_view(session, viewer_id=user.user_id, viewer_role=user.role, user_id=user_id):
+        raise AppError("FORBIDDEN", "User is outside your reporting chain", status=403)
+    return user_id
+
+
+VisibleUserId = Annotated[int, Depends(visible_user_id)]
+
+_RESPONSES = {**error_responses(401, 403), 422: {"description": "Validation Error"}}
+
+
+@router.get("/{userId}/subtree", response_model=OrgSubtree, responses=_RESPONSES)
+async def get_subtree(
+    user_id: VisibleUserId,
+    org: OrgChartDep,
+    session: SessionDep,
+    max_depth: Annotated[int | None, Query(alias="maxDepth", ge=1, description="Глубина; 1 — прямые")] = None,
+    limit: Annotated[int, Query(ge=1, le=settings.api.max_limit)] = settings.api.max_limit,
+) -> OrgSubtree:
+    """Everyone reporting to the user, directly or not; the caller must be the user, above them or have org:read."""
+    rows = await org.subtree(session, user_id, max_depth=max_depth, limit=limit + 1)
+    return OrgSubtree.model_construct(
+        items=[OrgMember.from_row(row) for row in rows[:limit]], truncated=len(rows) > limit
+    )
+
+
+@router.get("/{userId}/chain", response_model=OrgChain, responses=_RESPONSES)
+async def get_chain(user_id: VisibleUserId, org: OrgChartDep, session: SessionDep) -> OrgChain:
+    """Managers of the user from the direct one up."""
+    rows = await org.chain(session, user_id)
+    return OrgChain.model_construct(items=[OrgMember.from_row(row) for row in rows])
+
+
+@router.get("/{userId}/reports/{reportId}", response_model=OrgRelation, responses=_RESPONSES)
+async def get_relation(
+    user_id: VisibleUserId,
+    report_id: Annotated[int, Path(alias="reportId", ge=1)],
+    org: OrgChartDep,
+    session: SessionDep,
+) -> OrgRelation:
+    """Whether ``reportId`` is in the chain under ``userId``: one indexed probe at any depth."""
+    depth = await org.depth_below(session, manager_id=user_id, user_id=report_id)
+    return OrgRelation.model_construct(manager_id=user_id, user_id=report_id, depth=depth)
+
+
+__all__ = ["get_org_chart", "router", "visible_user_id"]
@@ -0,0 +1,10 @@
+"""Customer segment router package."""
+
+from fastapi import APIRouter
+
+from . import routes
+
+router = APIRouter(prefix="/customer-segments", tags=["segments"])
+router.include_router(routes.router)
+
+__all__ = ["router"]
@@ -0,0 +1,61 @@
+"""Customer segment classification routes."""
+
+from __future__ import annotations
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends
+
+from api.deps.auth import TokenUser, require_access
+from api.errors.exceptions import AppError
+from api.errors.schema import error_responses
+from api.schemas.segments import SegmentBatchRequest, SegmentBatchResponse, SegmentItem, SegmentRequest
+from integrations.dify import DifyError, DifyUnavailableError
+from segments import SegmentService, segment_service
+
+router = APIRouter()
+
+
+def get_segment_service() -> SegmentService:
+    """Provide segment service dependency."""
+    return segment_service
+
+
+CurrentUser = Annotated[TokenUser, Depends(require_access("segments:classify"))]
+SegmentServiceDep = Annotated[SegmentService, Depends(get_segment_service)]
+
+
+@router.post(
+    "/classify",
+    response_model=SegmentItem,
+    responses={**error_responses(401, 403, 502, 503), 422: {"description": "Validation Error"}},
+)
+async def classify(payload: SegmentRequest, _user: CurrentUser, service: SegmentServiceDep) -> SegmentItem:
+    """Segment of one customer: from the cache when known, otherwise from Dify."""
+    try:
+        result = await service.classify(payload.name)
+    except DifyError as exc:
+        raise _app_error(exc) from exc
+    return SegmentItem.from_result(result)
+
+
+@router.post(
+    "/classify/batch",
+    response_model=SegmentBatchResponse,
+    responses={**error_responses(401, 403), 422: {"description": "Validation Error"}},
+)
+async def classify_batch(
+    payload: SegmentBatchRequest, _user: CurrentUser, service: SegmentServiceDep
+) -> SegmentBatchResponse:
+    """Segments of several customers in request order; failures are reported per item."""
+    results = await service.classify_many(payload.names)
+    return SegmentBatchResponse.model_construct(items=[SegmentItem.from_result(result) for result in results])
+
+
+def _app_error(exc: DifyError) -> AppError:
+    if isinstance(exc, DifyUnavailableError):
+        return AppError("SEGMENT_UNAVAILABLE", "Customer segment classifier is unavailable", status=503)
+    return AppError("SEGMENT_FAILED", "Customer segment classifier failed", status=502)
+
+
+__all__ = ["router"]
@@ -0,0 +1,14 @@
+"""Service endpoints: health probes and metrics."""
+
+from fastapi import APIRouter
+
+from config import settings
+
+from . import health, metrics
+
+router = APIRouter(tags=["system"])
+router.include_router(health.router)
+if settings.metrics.enabled:
+    router.include_router(metrics.router)
+
+__all__ = ["router"]
@@ -0,0 +1,31 @@
+"""Liveness and readiness endpoints."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+
+from api.health import health_monitor
+from api.schemas.system import CheckStatus, LivenessResponse, ReadinessResponse
+
+router = APIRouter(prefix="/health")
+
+
+@router.get("/live", response_model=LivenessResponse)
+async def live() -> ORJSONResponse:
+    """Process is up and the event loop responds; no I/O."""
+    return ORJSONResponse({"status": "ok"})
+
+
+@router.get("/ready", response_model=ReadinessResponse, responses={503: {"model": ReadinessResponse}})
+async def ready() -> ORJSONResponse:
+    """Dependencies are reachable according to the last background probe run."""
+    ok, results = health_monitor.is_ready()
+    payload = ReadinessResponse(
+        status="ready" if ok else "not_ready",
+        checks=[CheckStatus.model_validate(result) for result in results],
+    )
+    return ORJSONResponse(payload.model_dump(mode="json", by_alias=True), status_code=200 if ok else 503)
+
+
+__all__ = ["router"]
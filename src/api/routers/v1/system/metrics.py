@@ -0,0 +1,27 @@
+"""Prometheus metrics endpoint."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from config import settings
+from core.metrics import metrics, render_snapshot
+from core.metrics_multiprocess import collect
+
+router = APIRouter()
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+@router.get(settings.metrics.path, include_in_schema=False)
+def metrics_endpoint() -> PlainTextResponse:
+    """Expose metrics of this worker, or of all workers in multiprocess mode."""
+    if settings.metrics.multiprocess_dir:
+        body = render_snapshot(collect(metrics, settings.metrics.multiprocess_dir))
+    else:
+        body = metrics.render()
+    return PlainTextResponse(body, media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+__all__ = ["router"]
@@ -0,0 +1,11 @@
+"""User directory router package."""
+
+from fastapi import APIRouter
+
+from . import routes
+
+router = APIRouter(tags=["users"])
+# The listing lives at the bare collection path, which FastAPI only accepts with a non-empty include prefix.
+router.include_router(routes.router, prefix="/users")
+
+__all__ = ["router"]
@@ -0,0 +1,113 @@
+"""User directory routes."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator, AsyncIterator, Callable
+from typing import Annotated, Any, Literal
+
+import orjson
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row
+
+from api.deps.auth import TokenUser, require_access
+from api.errors.exceptions import AppError
+from api.errors.schema import error_responses
+from api.schemas.users import UserListItem, UserPage, UserSearchResponse
+from config import settings
+from core.cursors import InvalidCursorError
+from users import PeopleSearch, UserFilters, UserListing, people_search, user_listing
+
+router = APIRouter()
+
+
+def get_user_listing() -> UserListing:
+    """Provide user listing dependency."""
+    return user_listing
+
+
+def get_people_search() -> PeopleSearch:
+    """Provide people search dependency."""
+    return people_search
+
+
+CurrentUser = Annotated[TokenUser, Depends(require_access("users:read"))]
+UserListingDep = Annotated[UserListing, Depends(get_user_listing)]
+PeopleSearchDep = Annotated[PeopleSearch, Depends(get_people_search)]
+
+
+@router.get(
+    "",
+    response_model=UserPage,
+    responses={**error_responses(400, 401, 403), 422: {"description": "Validation Error"}},
+)
+async def list_users(
+    _user: CurrentUser,
+    listing: UserListingDep,
+    department: Annotated[str | None, Query(max_length=256, description="Отдел, точное совпадение")] = None,
+    role: Annotated[Literal["admin", "editor", "viewer"] | None, Query(description="Роль")] = None,
+    is_active: Annotated[bool | None, Query(alias="isActive", description="Только активные/неактивные")] = None,
+    q: Annotated[str | None, Query(min_length=1, max_length=128, description="Начало ФИО или логина")] = None,
+    sort: Annotated[Literal["name", "login", "id"], Query(description="Порядок: ФИО, логин или id")] = "name",
+    limit: Annotated[int, Query(ge=1, le=settings.api.max_limit)] = settings.api.default_limit,
+    cursor: Annotated[str | None, Query(max_length=1024, description="nextCursor предыдущей страницы")] = None,
+) -> StreamingResponse:
+    """Users page by page in a stable order; pass ``nextCursor`` back with the same filters for the next page."""
+    filters = UserFilters(department=department, role=role, is_active=is_active, prefix=q)
+    try:
+        after = listing.keyset(cursor, sort, filters) if cursor else None
+    except InvalidCursorError as exc:
+        raise AppError("INVALID_CURSOR", str(exc), status=400) from exc
+    rows = listing.rows(sort=sort, filters=filters, after=after, limit=limit + 1)
+    first = await anext(rows, None)  # database errors surface here, before the 200 is sent
+    return StreamingResponse(
+        _page_body(first, rows, limit, lambda row: listing.cursor_for(sort, filters, row)),
+        media_type="application/json",
+    )
+
+
+@router.get(
+    "/search",
+    response_model=UserSearchResponse,
+    responses={**error_responses(401, 403), 422: {"description": "Validation Error"}},
+)
+async def search_users(
+    _user: CurrentUser,
+    search: PeopleSearchDep,
+    response: Response,
+    q: Annotated[str, Query(max_length=128, description="ФИО, логин, e-mail или отдел; части — через пробел")],
+    limit: Annotated[int, Query(ge=1, le=settings.user_search.max_limit)] = settings.user_search.default_limit,
+    include_inactive: Annotated[bool, Query(alias="includeInactive", description="Искать и неактивных")] = False,
+) -> UserSearchResponse:
+    """Typeahead over the directory; queries shorter than the minimum length return no items."""
+    result = await search.search(q, limit=limit, include_inactive=include_inactive)
+    # Lets the browser answer repeated keystrokes (backspace, retyping) itself.
+    response.headers["Cache-Control"] = f"private, max-age={int(settings.user_search.cache_ttl_sec)}"
+    return UserSearchResponse.from_result(result)
+
+
+async def _page_body(
+    first: Row[Any] | None,
+    rows: AsyncGenerator[Row[Any]],
+    limit: int,
+    cursor_for: Callable[[Row[Any]], str],
+) -> AsyncIterator[bytes]:
+    """``UserPage`` JSON written item by item; a ``limit + 1``-th row only signals that a next page exists."""
+    yield b'{"items":['
+    next_cursor: str | None = None
+    row, count = first, 0
+    try:
+        while row is not None:
+            yield (b"," if count else b"") + UserListItem.from_row(row).model_dump_json(by_alias=True).encode()
+            count += 1
+            following = await anext(rows, None)
+            if count == limit:
+                next_cursor = cursor_for(row) if following is not None else None
+                break
+            row = following
+    finally:
+        await rows.aclose()
+    yield b'],"nextCursor":' + orjson.dumps(next_cursor) + b"}"
+
+
+__all__ = ["get_people_search", "get_user_listing", "router"]
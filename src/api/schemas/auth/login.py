@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-from dataclasses import asdict
 from datetime import datetime
 from uuid import UUID
 
@@ -15,7 +14,10 @@ from auth.domain import LoginResult, UserProfile
 class LoginRequest(ApiInputModel):
     """Login request payload."""
 
-    login: str = Field(min_length=1, description="Логин пользователя (sAMAccountName или DOMAIN\\login)")
+    # As wide as users.ad_login and login_failures.login.
+    login: str = Field(
+        min_length=1, max_length=128, description="Логин пользователя (sAMAccountName или DOMAIN\\login)"
+    )
     password: str = Field(min_length=1, description="Пароль пользователя")
 
 
@@ -34,7 +36,18 @@ class AuthUser(ApiBaseModel):
 
     @classmethod
     def from_profile(cls, profile: UserProfile) -> AuthUser:
-        return cls.model_validate(asdict(profile))
+        # The profile is already typed domain data: no dict copy, no second validation.
+        return cls.model_construct(
+            id=profile.id,
+            ad_login=profile.ad_login,
+            ad_guid=profile.ad_guid,
+            full_name=profile.full_name,
+            email=profile.email,
+            department=profile.department,
+            title=profile.title,
+            role=profile.role,
+            last_login_at=profile.last_login_at,
+        )
 
 
 class LoginResponse(ApiBaseModel):
@@ -45,7 +58,7 @@ class LoginResponse(ApiBaseModel):
 
     @classmethod
     def from_result(cls, result: LoginResult) -> LoginResponse:
-        return cls(access_token=result.access_token, user=AuthUser.from_profile(result.user))
+        return cls.model_construct(access_token=result.access_token, user=AuthUser.from_profile(result.user))
 
 
 __all__ = ["LoginRequest", "LoginResponse", "AuthUser"]
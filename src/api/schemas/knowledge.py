@@ -0,0 +1,56 @@
+"""Knowledge base retrieval schemas."""
+
+from __future__ import annotations
+
+from typing import Literal
+
+from pydantic import Field
+
+from api.schemas.base import ApiBaseModel, ApiInputModel
+from knowledge import KbRecord, RetrievalResult
+
+
+class RetrieveRequest(ApiInputModel):
+    """Search the knowledge base."""
+
+    query: str = Field(min_length=1, max_length=2000, description="Текст запроса")
+    dataset_id: str | None = Field(
+        default=None, min_length=1, description="Датасет Dify; по умолчанию APP_CONFIG__KNOWLEDGE__DATASET_ID"
+    )
+    top_k: int | None = Field(default=None, ge=1, le=50, description="Сколько фрагментов вернуть")
+
+
+class KbRecordItem(ApiBaseModel):
+    """A knowledge base fragment."""
+
+    document_id: str
+    document_name: str
+    segment_id: str
+    content: str
+    score: float | None = None
+
+    @classmethod
+    def from_record(cls, record: KbRecord) -> KbRecordItem:
+        return cls.model_construct(
+            document_id=record.document_id,
+            document_name=record.document_name,
+            segment_id=record.segment_id,
+            content=record.content,
+            score=record.score,
+        )
+
+
+class RetrieveResponse(ApiBaseModel):
+    """Fragments ordered by relevance."""
+
+    records: list[KbRecordItem]
+    source: Literal["cache", "dify"] = Field(description="Ответ из кэша воркера или из Dify")
+
+    @classmethod
+    def from_result(cls, result: RetrievalResult) -> RetrieveResponse:
+        return cls.model_construct(
+            records=[KbRecordItem.from_record(record) for record in result.records], source=result.source
+        )
+
+
+__all__ = ["KbRecordItem", "RetrieveRequest", "RetrieveResponse"]
@@ -0,0 +1,45 @@
+"""Org structure schemas."""
+
+from __future__ import annotations
+
+from typing import Any
+
+from pydantic import Field
+from sqlalchemy import Row
+
+from api.schemas.base import ApiBaseModel
+from api.schemas.users import UserListItem
+
+
+class OrgMember(UserListItem):
+    """A user of the reporting tree."""
+
+    depth: int = Field(description="Уровней от запрошенного пользователя: 1 — прямое подчинение")
+
+    @classmethod
+    def from_row(cls, row: Row[Any]) -> OrgMember:
+        return cls.model_construct(**UserListItem.row_fields(row), depth=row.depth)
+
+
+class OrgSubtree(ApiBaseModel):
+    """Users under a manager, nearest levels first."""
+
+    items: list[OrgMember]
+    truncated: bool = Field(description="В поддереве больше пользователей, чем limit")
+
+
+class OrgChain(ApiBaseModel):
+    """Managers of a user from the direct one up."""
+
+    items: list[OrgMember]
+
+
+class OrgRelation(ApiBaseModel):
+    """Whether a user is in a manager's chain."""
+
+    manager_id: int
+    user_id: int
+    depth: int | None = Field(description="Уровней между ними (0 — тот же пользователь); null — не подчинён")
+
+
+__all__ = ["OrgChain", "OrgMember", "OrgRelation", "OrgSubtree"]
@@ -0,0 +1,49 @@
+"""Customer segment classification schemas."""
+
+from __future__ import annotations
+
+from typing import Annotated, Literal
+
+from pydantic import Field
+
+from api.schemas.base import ApiBaseModel, ApiInputModel
+from config import settings
+from segments import SegmentResult
+
+
+class SegmentRequest(ApiInputModel):
+    """Classify one customer."""
+
+    name: str = Field(min_length=1, max_length=512, description="Название клиента в любом написании")
+
+
+class SegmentBatchRequest(ApiInputModel):
+    """Classify several customers."""
+
+    names: list[Annotated[str, Field(min_length=1, max_length=512)]] = Field(
+        min_length=1,
+        max_length=settings.segments.batch_max_names,
+        description="Названия клиентов; повторы и разные написания одного клиента классифицируются один раз",
+    )
+
+
+class SegmentItem(ApiBaseModel):
+    """Classification of one customer."""
+
+    name: str = Field(description="Название как в запросе")
+    segment: str | None = Field(description="Сегмент; null, если классификация не удалась")
+    source: Literal["memory", "database", "dify", "error"] = Field(description="Слой, который дал ответ")
+    error: str | None = Field(default=None, description="Причина ошибки для source=error")
+
+    @classmethod
+    def from_result(cls, result: SegmentResult) -> SegmentItem:
+        return cls.model_construct(name=result.name, segment=result.segment, source=result.source, error=result.error)
+
+
+class SegmentBatchResponse(ApiBaseModel):
+    """Classifications in request order."""
+
+    items: list[SegmentItem]
+
+
+__all__ = ["SegmentBatchRequest", "SegmentBatchResponse", "SegmentItem", "SegmentRequest"]
@@ -0,0 +1,33 @@
+"""Service endpoint schemas."""
+
+from __future__ import annotations
+
+from typing import Literal
+
+from api.schemas.base import ApiBaseModel
+
+
+class CheckStatus(ApiBaseModel):
+    """Result of a single readiness check."""
+
+    name: str
+    ok: bool
+    error: str | None = None
+    latency_ms: float | None = None
+    checked_at: float | None = None
+
+
+class LivenessResponse(ApiBaseModel):
+    """Liveness probe payload."""
+
+    status: Literal["ok"] = "ok"
+
+
+class ReadinessResponse(ApiBaseModel):
+    """Readiness probe payload."""
+
+    status: Literal["ready", "not_ready"]
+    checks: list[CheckStatus]
+
+
+__all__ = ["CheckStatus", "LivenessResponse", "ReadinessResponse"]
@@ -0,0 +1,71 @@
+"""User listing schemas."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any, Literal
+
+from pydantic import Field
+from sqlalchemy import Row
+
+from api.schemas.base import ApiBaseModel
+from users import SearchResult
+
+
+class UserListItem(ApiBaseModel):
+    """One user of the directory."""
+
+    id: int
+    ad_login: str
+    full_name: str | None = None
+    email: str | None = None
+    department: str | None = None
+    title: str | None = None
+    role: str | None = None
+    is_active: bool
+    last_login_at: datetime | None = None
+
+    @classmethod
+    def from_row(cls, row: Row[Any]) -> UserListItem:
+        return cls.model_construct(**UserListItem.row_fields(row))
+
+    @staticmethod
+    def row_fields(row: Row[Any]) -> dict[str, Any]:
+        """Values of the ``UserListItem`` fields in a row selected with ``LISTING_COLUMNS``."""
+        return {name: getattr(row, name) for name in _LIST_FIELDS}
+
+
+_LIST_FIELDS = tuple(UserListItem.model_fields)
+
+
+class UserPage(ApiBaseModel):
+    """A page of users in the requested order."""
+
+    items: list[UserListItem]
+    next_cursor: str | None = Field(description="Курсор следующей страницы; null на последней")
+
+
+class UserSearchItem(UserListItem):
+    """A user found by the people search."""
+
+    score: float = Field(description="Сходство с запросом (word_similarity), 0..1")
+
+    @classmethod
+    def from_row(cls, row: Row[Any]) -> UserSearchItem:
+        return cls.model_construct(**UserListItem.row_fields(row), score=row.score)
+
+
+class UserSearchResponse(ApiBaseModel):
+    """Users matching the query, best match first."""
+
+    items: list[UserSearchItem]
+    source: Literal["cache", "database", "skipped"] = Field(
+        description="Ответ из кэша воркера, из БД или пустой без запроса (запрос короче минимума)"
+    )
+
+    @classmethod
+    def from_result(cls, result: SearchResult) -> UserSearchResponse:
+        return cls.model_construct(items=[UserSearchItem.from_row(row) for row in result.rows], source=result.source)
+
+
+__all__ = ["UserListItem", "UserPage", "UserSearchItem", "UserSearchResponse"]
@@ -33,4 +33,19 @@ class DirectoryUnavailableError(AuthError):
         super().__init__(code, message, status=status)
 
 
-__all__ = ["AuthError", "TokenError", "DirectoryUnavailableError"]
+class AccountLockedError(AuthError):
+    """Too many failed logins; the account is temporarily locked."""
+
+    def __init__(
+        self,
+        retry_after: float,
+        message: str = "Too many failed login attempts, try again later",
+        *,
+        code: str = "account_locked",
+        status: int = 423,
+    ) -> None:
+        super().__init__(code, message, status=status)
+        self.retry_after = retry_after
+
+
+__all__ = ["AuthError", "TokenError", "DirectoryUnavailableError", "AccountLockedError"]
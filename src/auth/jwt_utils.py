@@ -9,6 +9,9 @@ import jwt
 
 from auth.exceptions import TokenError
 from config import settings
+from core.metrics import metrics
+
+jwt_verify_total = metrics.counter("jwt_verify_total", "JWT verifications by result", ("result",))
 
 
 def _now() -> datetime:
@@ -46,6 +49,16 @@ def create_refresh_token(payload: dict[str, Any], *, expires_in_days: int | None
 
 def decode_token(token: str) -> dict[str, Any]:
     """Decode and validate a JWT."""
+    try:
+        payload = _decode(token)
+    except TokenError as exc:
+        jwt_verify_total.inc(exc.code)
+        raise
+    jwt_verify_total.inc("ok")
+    return payload
+
+
+def _decode(token: str) -> dict[str, Any]:
     secret = settings.jwt.secret.get_secret_value()
     options = {"require": ["exp", "iat"], "verify_aud": bool(settings.jwt.audience)}
     decode_kwargs: dict[str, Any] = {
@@ -1,22 +1,57 @@
-"""LDAP client helpers."""
+"""LDAP client helpers.
+
+ldap3 is imported inside the functions that talk to a DC, not at module level:
+it is a noticeable share of the API's import time and nothing needs it before
+the first login.  :func:`preload` imports it ahead of time where that is wanted.
+"""
 
 from __future__ import annotations
 
+import contextlib
+import copy
+import importlib
 import logging
+import time
 import uuid
+from typing import TYPE_CHECKING
 from uuid import UUID
 
-from ldap3 import ALL, Connection, Server
-from ldap3.abstract.entry import Entry
-from ldap3.core.exceptions import LDAPException, LDAPSocketOpenError
-from ldap3.utils.conv import escape_filter_chars
-
 from auth.domain import LdapUserInfo
 from auth.exceptions import DirectoryUnavailableError
+from auth.ldap_pool import IdleConnections, LdapOperation, LdapServerPool, ServerSlot
 from config import settings
+from core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from core.deadline import DeadlineExceededError, cap_timeout, deadline_expired
+from core.metrics import metrics
+
+if TYPE_CHECKING:
+    from ldap3 import Connection, Server
+    from ldap3.abstract.entry import Entry
+    from ldap3.core.exceptions import LDAPCommunicationError
 
 log = logging.getLogger(__name__)
 
+ldap_operation_duration = metrics.histogram(
+    "ldap_operation_duration_seconds", "LDAP bind and search latency", ("operation", "result")
+)
+
+
+def _communication_errors() -> tuple[type[BaseException], ...]:
+    from ldap3.core.exceptions import LDAPCommunicationError
+
+    return (LDAPCommunicationError,)
+
+
+# Socket-level errors mean the DC did not answer; they trip the breaker.
+# Everything else (bad credentials, search errors) proves the DC is alive.
+ldap_breaker = CircuitBreaker(
+    "ldap",
+    failure_threshold=settings.ldap.breaker_failure_threshold,
+    reset_timeout=settings.ldap.breaker_reset_timeout_sec,
+    half_open_max_calls=settings.ldap.breaker_half_open_probes,
+    failure_types=_communication_errors,
+)
+
 _LDAP_ATTRIBUTES = [
     "sAMAccountName",
     "displayName",
@@ -47,21 +82,28 @@ def ldap_fetch_user_by_login(login: str) -> LdapUserInfo | None:
     return _query_user(settings.ldap.service_user, service_password, sam_login=_extract_sam_login(login))
 
 
+def preload() -> None:
+    """Import ldap3 now, e.g. in the parent process before forking workers."""
+    importlib.import_module("ldap3")
+    importlib.import_module("auth.ldap_tls")
+
+
+async def ldap_probe() -> None:
+    """Re-admit recovered DCs and fail when none accepts TCP connections (no bind)."""
+    await ldap_pool.probe(timeout=settings.ldap.connect_timeout)
+
+
 def _query_user(bind_login: str, password: str, *, sam_login: str) -> LdapUserInfo | None:
-    """Run LDAP query for a single user."""
-    server = _build_server()
+    """Run LDAP query for a single user, failing over between DCs."""
+    from ldap3.core.exceptions import LDAPCommunicationError, LDAPException
+
     try:
-        with Connection(
-            server,
-            user=bind_login,
-            password=password,
-            auto_bind=True,
-        ) as conn:
-            entry = _search_user(conn, sam_login)
-            if not entry:
-                return None
-            return _entry_to_user_info(entry)
-    except LDAPSocketOpenError as exc:
+        with ldap_breaker.attempt():
+            return _query_pool(bind_login, password, sam_login=sam_login)
+    except CircuitOpenError as exc:
+        log.debug("LDAP circuit open, rejecting %s", sam_login)
+        raise DirectoryUnavailableError() from exc
+    except LDAPCommunicationError as exc:
         log.error("LDAP connection failed for %s: %s", sam_login, exc)
         raise DirectoryUnavailableError() from exc
     except LDAPException as exc:
@@ -69,15 +111,215 @@ def _query_user(bind_login: str, password: str, *, sam_login: str) -> LdapUserIn
         return None
 
 
-def _build_server() -> Server:
+def _query_pool(bind_login: str, password: str, *, sam_login: str) -> LdapUserInfo | None:
+    """Try DCs fastest first; socket errors take a DC out of rotation and move on."""
+    from ldap3.core.exceptions import LDAPCommunicationError
+
+    last_error: LDAPCommunicationError | None = None
+    for slot in ldap_pool.candidates():
+        try:
+            return _query_server(slot, bind_login, password, sam_login=sam_login)
+        except LDAPCommunicationError as exc:
+            if deadline_expired():
+                # Our own budget cut the call short; that says nothing about the DC.
+                raise DeadlineExceededError() from exc
+            ldap_pool.mark_failed(slot, exc)
+            last_error = exc
+    assert last_error is not None
+    raise last_error
+
+
+def _query_server(slot: ServerSlot, bind_login: str, password: str, *, sam_login: str) -> LdapUserInfo | None:
+    """Bind and search on one DC; service-account connections stay open between calls."""
+    from ldap3.core.exceptions import LDAPCommunicationError, LDAPException
+
+    if bind_login != settings.ldap.service_user or not settings.ldap.service_pool_size:
+        conn = _connect(slot, bind_login, password)
+        try:
+            entry = _timed_search(slot, conn, sam_login)
+        finally:
+            _close(conn)
+        return _entry_to_user_info(entry) if entry else None
+    conn = service_connections.acquire(slot.uri)
+    if conn is not None:
+        try:
+            entry = _timed_search(slot, conn, sam_login)
+        except LDAPCommunicationError as exc:
+            _close(conn)
+            if deadline_expired():
+                raise DeadlineExceededError() from exc
+            # The DC (or a firewall) dropped an idle session; so did the others.
+            dropped = service_connections.clear(slot.uri)
+            log.info("Discarded %d stale LDAP service connections to %s: %s", dropped + 1, slot.uri, exc)
+        except LDAPException:
+            _close(conn)
+            raise
+        except DeadlineExceededError:
+            service_connections.release(slot.uri, conn)
+            raise
+        else:
+            service_connections.release(slot.uri, conn)
+            return _entry_to_user_info(entry) if entry else None
+    conn = _connect(slot, bind_login, password)
+    try:
+        entry = _timed_search(slot, conn, sam_login)
+    except LDAPException:
+        _close(conn)
+        raise
+    finally:
+        # Released on success and when the budget ran out before the search was sent.
+        if not conn.closed:
+            service_connections.release(slot.uri, conn)
+    return _entry_to_user_info(entry) if entry else None
+
+
+def _connect(slot: ServerSlot, bind_login: str, password: str) -> Connection:
+    """Open a connection to one DC, negotiate TLS and bind."""
+    from ldap3 import Connection
+    from ldap3.core.exceptions import (
+        LDAPBindError,
+        LDAPCommunicationError,
+        LDAPException,
+        LDAPSocketOpenError,
+        LDAPStartTLSError,
+    )
+
+    from auth.ldap_tls import ResumableTls
+
+    timeout = _ldap_timeout()
+    server = _capped_server(slot.server)
+    conn = Connection(server, user=bind_login, password=password)
+    started = time.perf_counter()
+    try:
+        conn.open(read_server_info=False)
+        _set_socket_timeout(conn, timeout)
+        if settings.ldap.tls_mode == "starttls" and not server.ssl and not conn.start_tls(read_server_info=False):
+            raise LDAPStartTLSError(conn.last_error or "unable to start TLS")
+        # DSE and schema are read once per Server object, not on every bind.
+        if not conn.bind(read_server_info=server.info is None):
+            raise LDAPBindError(conn.last_error or "unable to bind")
+    except (LDAPCommunicationError, LDAPStartTLSError) as exc:
+        _observe(slot, "bind", started, "unavailable")
+        _close(conn)
+        if isinstance(exc, LDAPCommunicationError):
+            raise
+        # A DC that cannot negotiate TLS is as unusable as one that does not answer.
+        raise LDAPSocketOpenError(str(exc)) from exc
+    except LDAPException:
+        _observe(slot, "bind", started, "error")
+        _close(conn)
+        raise
+    _observe(slot, "bind", started, "ok")
+    if isinstance(server.tls, ResumableTls):
+        server.tls.remember_session(conn)
+    return conn
+
+
+def _timed_search(slot: ServerSlot, conn: Connection, sam_login: str) -> Entry | None:
+    from ldap3.core.exceptions import LDAPCommunicationError, LDAPException
+
+    timeout = _ldap_timeout()
+    _set_socket_timeout(conn, timeout)
+    started = time.perf_counter()
+    try:
+        entry = _search_user(conn, sam_login, time_limit=timeout)
+    except LDAPCommunicationError:
+        _observe(slot, "search", started, "unavailable")
+        raise
+    except LDAPException:
+        _observe(slot, "search", started, "error")
+        raise
+    _observe(slot, "search", started, "ok")
+    return entry
+
+
+def _capped_server(server: Server) -> Server:
+    """``server`` with its connect timeout cut to the request deadline.
+
+    The shared ``Server`` object is not modified: a shallow copy keeps its TLS
+    context (and so the resumable session) while other threads connect with
+    their own budget.
+    """
+    timeout = cap_timeout(settings.ldap.connect_timeout)
+    if timeout >= settings.ldap.connect_timeout:
+        return server
+    capped = copy.copy(server)
+    capped.connect_timeout = timeout
+    return capped
+
+
+def _ldap_timeout() -> float:
+    """Socket timeout of the next LDAP round trip: the search timeout cut to the request deadline."""
+    return cap_timeout(settings.ldap.search_timeout)
+
+
+def _set_socket_timeout(conn: Connection, timeout: float) -> None:
+    """Bound the reads of an open (possibly pooled) connection.
+
+    Set on the socket directly: ldap3's own ``receive_timeout`` only takes whole seconds.
+    """
+    # A dead socket is reported as a communication error by the next operation.
+    if conn.socket is not None:
+        with contextlib.suppress(OSError):
+            conn.socket.settimeout(timeout)
+
+
+def _close(conn: Connection) -> None:
+    from ldap3.core.exceptions import LDAPException
+
+    with contextlib.suppress(LDAPException, OSError):
+        conn.unbind()
+
+
+def _observe(slot: ServerSlot, operation: LdapOperation, started: float, result: str) -> None:
+    elapsed = time.perf_counter() - started
+    ldap_operation_duration.observe(elapsed, operation, result)
+    if result == "ok":
+        ldap_pool.record(slot, operation, elapsed)
+
+
+def _build_server(uri: str) -> Server:
     """Build LDAP server configuration."""
+    from ldap3 import ALL, Server
+
+    from auth.ldap_tls import ResumableTls
+
+    ldap = settings.ldap
+    if ldap.tls_mode == "ldaps" and uri.lower().startswith("ldap://"):
+        # ldap3 takes the scheme from the URI and ignores use_ssl for ldap://.
+        uri = "ldaps://" + uri[len("ldap://") :]
+    tls = None
+    if ldap.tls_mode != "none" or uri.lower().startswith("ldaps://"):
+        tls = ResumableTls(
+            ca_file=str(ldap.tls_ca_file) if ldap.tls_ca_file else None,
+            validate=ldap.tls_validate,
+            session_reuse=ldap.tls_session_reuse,
+        )
     return Server(
-        settings.ldap.server_uri,
+        uri,
         get_info=ALL,
-        connect_timeout=settings.ldap.connect_timeout,
+        tls=tls,
+        connect_timeout=ldap.connect_timeout,
     )
 
 
+def close_service_connections() -> int:
+    """Unbind idle service-account connections (on shutdown or config change)."""
+    return service_connections.clear()
+
+
+ldap_pool = LdapServerPool(
+    settings.ldap.server_uris,
+    server_factory=_build_server,
+    alpha=settings.ldap.latency_ewma_alpha,
+)
+service_connections: IdleConnections[Connection] = IdleConnections(
+    max_size=settings.ldap.service_pool_size,
+    idle_timeout=settings.ldap.service_idle_timeout_sec,
+    close=_close,
+)
+
+
 def _normalize_bind_login(login: str) -> str:
     """Build LDAP bind login."""
     raw = login.strip()
@@ -94,8 +336,10 @@ def _extract_sam_login(login: str) -> str:
     return login.strip().lower()
 
 
-def _search_user(conn: Connection, sam_login: str) -> Entry | None:
+def _search_user(conn: Connection, sam_login: str, *, time_limit: float | None = None) -> Entry | None:
     """Search LDAP for user entry."""
+    from ldap3.utils.conv import escape_filter_chars
+
     safe_login = escape_filter_chars(sam_login)
     flt = f"(&(objectClass=person)(sAMAccountName={safe_login}))"
     found = conn.search(
@@ -103,7 +347,7 @@ def _search_user(conn: Connection, sam_login: str) -> Entry | None:
         search_filter=flt,
         attributes=_LDAP_ATTRIBUTES,
         size_limit=1,
-        time_limit=int(settings.ldap.search_timeout),
+        time_limit=max(1, int(time_limit or settings.ldap.search_timeout)),
     )
     if not found or not conn.entries:
         return None
@@ -197,4 +441,4 @@ def _extract_suplier(users: list[str]) -> list[str]:
     return extracted_user
 
 
-__all__ = ["ldap_authenticate", "ldap_fetch_user_by_login"]
+__all__ = ["close_service_connections", "ldap_authenticate", "ldap_fetch_user_by_login", "ldap_probe"]
@@ -0,0 +1,244 @@
+"""Pool of domain controllers with latency-aware selection and failover."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Generic, Literal, TypeVar
+from urllib.parse import urlsplit
+
+from core.metrics import LabelValues, metrics
+
+log = logging.getLogger(__name__)
+
+LdapOperation = Literal["bind", "search"]
+
+C = TypeVar("C")
+
+ldap_server_up = metrics.gauge(
+    "ldap_server_up", "Domain controller admitted to the pool (1) or not (0)", ("server",), aggregate="min"
+)
+ldap_server_latency = metrics.gauge(
+    "ldap_server_latency_ewma_seconds",
+    "Moving average of LDAP operation latency per DC",
+    ("server", "operation"),
+    aggregate="max",
+)
+
+
+@dataclass(slots=True)
+class ServerSlot:
+    """A domain controller and its health/latency bookkeeping."""
+
+    uri: str
+    factory: Callable[[str], Any] = field(repr=False)
+    healthy: bool = True
+    latency: dict[str, float] = field(default_factory=dict)
+    requests: int = 0
+    failures: int = 0
+    last_error: str | None = None
+    failed_at: float | None = None
+    _server: Any = field(default=None, repr=False)
+
+    @property
+    def server(self) -> Any:
+        """Client-side server object, built on first use so the LDAP library loads lazily."""
+        if self._server is None:
+            self._server = self.factory(self.uri)
+        return self._server
+
+    @property
+    def score(self) -> float:
+        """Expected cost of a login (bind + search); unknown latency counts as zero."""
+        return self.latency.get("bind", 0.0) + self.latency.get("search", 0.0)
+
+
+def server_address(uri: str) -> tuple[str, int]:
+    """Split ``ldap[s]://host[:port]`` into host and port."""
+    parts = urlsplit(uri if "://" in uri else f"ldap://{uri}")
+    default_port = 636 if parts.scheme == "ldaps" else 389
+    return parts.hostname or "localhost", parts.port or default_port
+
+
+class LdapServerPool:
+    """Order DCs by moving-average latency and take failed ones out of rotation.
+
+    ``candidates()`` returns healthy DCs fastest first; when none is healthy it
+    returns all of them so a request can still try (the circuit breaker bounds the
+    cost of a full outage).  A DC that raised a socket error is marked unhealthy.
+    ``probe()`` — run in the background by the health monitor — TCP-checks every
+    DC, so one that dies while idle is taken out too, and re-admits a DC once it
+    accepts connections again.
+    """
+
+    def __init__(
+        self,
+        uris: Sequence[str],
+        *,
+        server_factory: Callable[[str], Any],
+        alpha: float = 0.3,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not uris:
+            raise ValueError("At least one LDAP server is required")
+        self._alpha = alpha
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._slots = [ServerSlot(uri=uri, factory=server_factory) for uri in uris]
+        ldap_server_up.set_function(self._up_samples)
+        ldap_server_latency.set_function(self._latency_samples)
+
+    @property
+    def slots(self) -> tuple[ServerSlot, ...]:
+        return tuple(self._slots)
+
+    def candidates(self) -> list[ServerSlot]:
+        with self._lock:
+            healthy = [slot for slot in self._slots if slot.healthy]
+            if not healthy:
+                return sorted(self._slots, key=lambda s: s.failed_at or 0.0)
+            return sorted(healthy, key=lambda s: s.score)
+
+    def record(self, slot: ServerSlot, operation: LdapOperation, seconds: float) -> None:
+        with self._lock:
+            previous = slot.latency.get(operation)
+            slot.latency[operation] = seconds if previous is None else previous + self._alpha * (seconds - previous)
+            if operation == "bind":
+                slot.requests += 1
+
+    def mark_failed(self, slot: ServerSlot, error: BaseException) -> None:
+        with self._lock:
+            slot.failures += 1
+            slot.last_error = f"{type(error).__name__}: {error}"
+            slot.failed_at = self._clock()
+            was_healthy, slot.healthy = slot.healthy, False
+        if was_healthy:
+            log.warning("LDAP server %s taken out of rotation: %s", slot.uri, error)
+
+    def mark_healthy(self, slot: ServerSlot) -> None:
+        with self._lock:
+            was_healthy, slot.healthy = slot.healthy, True
+        if not was_healthy:
+            log.info("LDAP server %s re-admitted", slot.uri)
+
+    async def probe(self, timeout: float) -> None:
+        """TCP-check every DC: take out those that stopped answering, re-admit those that answer again.
+
+        Raises ``ConnectionError`` when no DC is healthy afterwards.
+        """
+        slots = list(self._slots)
+        errors = await asyncio.gather(*(self._tcp_check(slot, timeout) for slot in slots))
+        for slot, error in zip(slots, errors, strict=True):
+            if error is None:
+                self.mark_healthy(slot)
+            elif slot.healthy:
+                self.mark_failed(slot, error)
+        if not any(slot.healthy for slot in self._slots):
+            raise ConnectionError("no LDAP server is reachable")
+
+    @staticmethod
+    async def _tcp_check(slot: ServerSlot, timeout: float) -> BaseException | None:
+        host, port = server_address(slot.uri)
+        try:
+            _reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        except (OSError, TimeoutError) as exc:
+            return exc
+        writer.close()
+        await writer.wait_closed()
+        return None
+
+    def stats(self) -> list[dict[str, Any]]:
+        """Per-server snapshot for diagnostics."""
+        with self._lock:
+            return [
+                {
+                    "uri": slot.uri,
+                    "healthy": slot.healthy,
+                    "bind_ewma_ms": _ms(slot.latency.get("bind")),
+                    "search_ewma_ms": _ms(slot.latency.get("search")),
+                    "requests": slot.requests,
+                    "failures": slot.failures,
+                    "last_error": slot.last_error,
+                }
+                for slot in self._slots
+            ]
+
+    def _up_samples(self) -> list[tuple[LabelValues, float]]:
+        return [((slot.uri,), 1.0 if slot.healthy else 0.0) for slot in self._slots]
+
+    def _latency_samples(self) -> list[tuple[LabelValues, float]]:
+        return [((slot.uri, op), value) for slot in self._slots for op, value in slot.latency.items()]
+
+
+class IdleConnections(Generic[C]):
+    """Per-DC LIFO stacks of idle bound connections.
+
+    LIFO keeps the few most recently used connections warm and lets the rest age
+    out: a connection idle longer than ``idle_timeout`` is closed on the next
+    ``acquire``/``release`` rather than handed out, so it is never reused after the
+    DC dropped it (AD closes idle LDAP sessions after ``MaxConnIdleTime``).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int,
+        idle_timeout: float,
+        close: Callable[[C], object],
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self._close = close
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._idle: dict[str, list[tuple[float, C]]] = {}
+
+    def acquire(self, key: str) -> C | None:
+        """Take the most recently released live connection, if any."""
+        with self._lock:
+            stack = self._idle.get(key)
+            if not stack:
+                return None
+            released_at, conn = stack.pop()
+            if self._clock() - released_at <= self.idle_timeout:
+                return conn
+            # The top of the stack is the newest entry: everything below is older still.
+            expired = [conn, *(c for _, c in stack)]
+            stack.clear()
+        for conn in expired:
+            self._close(conn)
+        return None
+
+    def release(self, key: str, conn: C) -> None:
+        """Return a healthy connection; closes it when the stack is full."""
+        with self._lock:
+            stack = self._idle.setdefault(key, [])
+            if len(stack) < self.max_size:
+                stack.append((self._clock(), conn))
+                return
+        self._close(conn)
+
+    def clear(self, key: str | None = None) -> int:
+        """Close idle connections of one DC (or all); returns how many were closed."""
+        with self._lock:
+            keys = [key] if key is not None else list(self._idle)
+            dropped = [conn for k in keys for _, conn in self._idle.pop(k, [])]
+        for conn in dropped:
+            self._close(conn)
+        return len(dropped)
+
+    def size(self, key: str) -> int:
+        with self._lock:
+            return len(self._idle.get(key, []))
+
+
+def _ms(seconds: float | None) -> float | None:
+    return None if seconds is None else round(seconds * 1000, 3)
+
+
+__all__ = ["IdleConnections", "LdapOperation", "LdapServerPool", "ServerSlot", "server_address"]
@@ -0,0 +1,85 @@
+"""TLS for LDAP connections with session resumption."""
+
+from __future__ import annotations
+
+import logging
+import ssl
+import threading
+from typing import Any, Literal
+
+from ldap3 import Tls
+
+from core.metrics import metrics
+
+log = logging.getLogger(__name__)
+
+TlsValidate = Literal["required", "optional", "none"]
+
+_VERIFY_MODES: dict[TlsValidate, ssl.VerifyMode] = {
+    "required": ssl.CERT_REQUIRED,
+    "optional": ssl.CERT_OPTIONAL,
+    "none": ssl.CERT_NONE,
+}
+
+ldap_tls_handshakes_total = metrics.counter(
+    "ldap_tls_handshakes_total", "TLS handshakes with domain controllers", ("resumed",)
+)
+
+
+class ResumableTls(Tls):
+    """``ldap3.Tls`` that keeps one ``SSLContext`` and resumes the last session.
+
+    Stock ``Tls`` builds a new context for every socket, so each connection pays a
+    full handshake (certificate chain, key exchange).  One instance is created per
+    DC: the context is built once and the session negotiated by the last successful
+    bind is offered on the next connect, turning the handshake into an abbreviated
+    one.  TLS 1.3 delivers session tickets after the handshake, which is why the
+    session is captured by :meth:`remember_session` after bind, not on wrap.
+    """
+
+    def __init__(
+        self,
+        *,
+        ca_file: str | None = None,
+        validate: TlsValidate = "required",
+        session_reuse: bool = True,
+    ) -> None:
+        super().__init__(validate=_VERIFY_MODES[validate], ca_certs_file=ca_file)
+        self.session_reuse = session_reuse
+        self._session: ssl.SSLSession | None = None
+        self._lock = threading.Lock()
+        self._context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH, cafile=ca_file)
+        self._context.check_hostname = validate == "required"
+        self._context.verify_mode = _VERIFY_MODES[validate]
+
+    def wrap_socket(self, connection: Any, do_handshake: bool = False) -> None:
+        with self._lock:
+            session = self._session if self.session_reuse else None
+        wrapped = self._context.wrap_socket(
+            connection.socket,
+            server_side=False,
+            do_handshake_on_connect=do_handshake,
+            server_hostname=connection.server.host,
+            session=session,
+        )
+        if do_handshake:
+            ldap_tls_handshakes_total.inc("true" if wrapped.session_reused else "false")
+        connection.socket = wrapped
+
+    def remember_session(self, connection: Any) -> None:
+        """Keep the session of an established connection for the next handshake."""
+        sock = connection.socket
+        if not self.session_reuse or not isinstance(sock, ssl.SSLSocket):
+            return
+        session = sock.session
+        # A TLS 1.3 session is only resumable once the server has sent a ticket.
+        if session is not None and (session.has_ticket or sock.version() != "TLSv1.3"):
+            with self._lock:
+                self._session = session
+
+    def forget_session(self) -> None:
+        with self._lock:
+            self._session = None
+
+
+__all__ = ["ResumableTls", "TlsValidate", "ldap_tls_handshakes_total"]
@@ -0,0 +1,240 @@
+"""Per-login failed-attempt tracking with exponential lockout."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from typing import NamedTuple, Protocol
+
+from config import settings
+from core.metrics import metrics
+from db.engine import db
+from db.repositories.app.auth import (
+    delete_login_failure,
+    get_login_failure,
+    lock_login_failure,
+    purge_login_failures,
+)
+
+log = logging.getLogger(__name__)
+
+auth_lockouts_total = metrics.counter("auth_lockouts_total", "Logins locked after repeated failures")
+
+
+class FailureState(NamedTuple):
+    """Failure bookkeeping of one login; a plain tuple keeps the in-memory table small."""
+
+    failures: int
+    lockouts: int
+    last_failure: float
+    locked_until: float
+
+
+@dataclass(frozen=True, slots=True)
+class LockoutPolicy:
+    """``threshold`` failures within ``window`` lock the login for ``lockout`` seconds.
+
+    Every further failure while the counter is alive locks again for twice as long,
+    up to ``max_lockout``.  The counter expires ``window`` seconds after the last
+    failure once the lock is over.
+    """
+
+    threshold: int
+    window: float
+    lockout: float
+    max_lockout: float
+
+    def expired(self, state: FailureState, now: float) -> bool:
+        return now >= state.locked_until and now - state.last_failure >= self.window
+
+    def retry_after(self, state: FailureState | None, now: float) -> float:
+        return max(0.0, state.locked_until - now) if state is not None else 0.0
+
+    def on_failure(self, state: FailureState | None, now: float) -> FailureState:
+        failures, lockouts = (0, 0) if state is None or self.expired(state, now) else state[:2]
+        failures += 1
+        locked_until = 0.0
+        if failures >= self.threshold:
+            locked_until = now + min(self.lockout * 2**lockouts, self.max_lockout)
+            lockouts += 1
+        return FailureState(failures, lockouts, now, locked_until)
+
+
+class LockoutStore(Protocol):
+    """Storage of failure states keyed by normalized login."""
+
+    async def get(self, key: str) -> FailureState | None: ...
+
+    async def update(self, key: str, apply: Callable[[FailureState | None], FailureState]) -> FailureState:
+        """Atomically replace the state of ``key`` with ``apply(current)``."""
+        ...
+
+    async def delete(self, key: str) -> None: ...
+
+
+class MemoryLockoutStore:
+    """Process-local store; evicts expired entries, then the oldest, beyond ``max_entries``."""
+
+    def __init__(self, policy: LockoutPolicy, *, max_entries: int, clock: Callable[[], float] = time.time) -> None:
+        self._policy = policy
+        self._max_entries = max_entries
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._states: dict[str, FailureState] = {}
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    async def get(self, key: str) -> FailureState | None:
+        with self._lock:
+            state = self._states.get(key)
+            if state is not None and self._policy.expired(state, self._clock()):
+                del self._states[key]
+                return None
+            return state
+
+    async def update(self, key: str, apply: Callable[[FailureState | None], FailureState]) -> FailureState:
+        with self._lock:
+            state = self._states[key] = apply(self._states.pop(key, None))
+            if len(self._states) > self._max_entries:
+                self._evict()
+            return state
+
+    async def delete(self, key: str) -> None:
+        with self._lock:
+            self._states.pop(key, None)
+
+    def _evict(self) -> None:
+        now = self._clock()
+        for key in [k for k, s in self._states.items() if self._policy.expired(s, now)]:
+            del self._states[key]
+        # Updated keys are re-inserted, so iteration order is least recently failed first.
+        excess = len(self._states) - self._max_entries
+        for key in list(self._states)[: max(excess, 0)]:
+            del self._states[key]
+
+
+class PostgresLockoutStore:
+    """Store shared by all workers in the ``login_failures`` table.
+
+    Each change runs in its own transaction so it survives the rollback of the
+    failed login's request transaction.  Expired rows are purged every
+    ``purge_every`` updates.
+    """
+
+    def __init__(self, policy: LockoutPolicy, *, purge_every: int = 100) -> None:
+        self._policy = policy
+        self._purge_every = purge_every
+        self._updates = 0
+
+    async def get(self, key: str) -> FailureState | None:
+        async with db.session() as session:
+            row = await get_login_failure(session, key)
+        if row is None:
+            return None
+        state = _row_state(row.failures, row.lockouts, row.last_failure_at, row.locked_until)
+        return None if self._policy.expired(state, time.time()) else state
+
+    async def update(self, key: str, apply: Callable[[FailureState | None], FailureState]) -> FailureState:
+        now = datetime.now(tz=UTC)
+        async with db.transaction() as session:
+            row = await lock_login_failure(session, key, now=now)
+            current = _row_state(row.failures, row.lockouts, row.last_failure_at, row.locked_until)
+            state = apply(current if row.failures else None)
+            row.failures = state.failures
+            row.lockouts = state.lockouts
+            row.last_failure_at = datetime.fromtimestamp(state.last_failure, tz=UTC)
+            row.locked_until = datetime.fromtimestamp(state.locked_until, tz=UTC) if state.locked_until else None
+            self._updates += 1
+            if self._updates % self._purge_every == 0:
+                idle_before = datetime.fromtimestamp(time.time() - self._policy.window, tz=UTC)
+                purged = await purge_login_failures(session, idle_before=idle_before, now=now)
+                log.debug("Purged %d expired login failure rows", purged)
+        return state
+
+    async def delete(self, key: str) -> None:
+        async with db.transaction() as session:
+            await delete_login_failure(session, key)
+
+
+def _row_state(failures: int, lockouts: int, last_failure_at: datetime, locked_until: datetime | None) -> FailureState:
+    return FailureState(
+        failures,
+        lockouts,
+        last_failure_at.timestamp(),
+        locked_until.timestamp() if locked_until else 0.0,
+    )
+
+
+class LoginLockout:
+    """Check, count and reset failed logins."""
+
+    def __init__(self, policy: LockoutPolicy, store: LockoutStore, *, clock: Callable[[], float] = time.time) -> None:
+        self.policy = policy
+        self._store = store
+        self._clock = clock
+
+    @staticmethod
+    def key(login: str) -> str:
+        return login.strip().casefold()
+
+    async def status(self, login: str) -> FailureState | None:
+        return await self._store.get(self.key(login))
+
+    def retry_after(self, state: FailureState | None) -> float:
+        """Seconds until ``state`` allows another attempt (0 when not locked)."""
+        return self.policy.retry_after(state, self._clock())
+
+    async def register_failure(self, login: str) -> FailureState:
+        now = self._clock()
+        state = await self._store.update(self.key(login), lambda current: self.policy.on_failure(current, now))
+        if state.locked_until:
+            auth_lockouts_total.inc()
+            log.warning(
+                "Login %s locked for %.0fs after %d failed attempts",
+                self.key(login),
+                state.locked_until - now,
+                state.failures,
+            )
+        return state
+
+    async def reset(self, login: str) -> None:
+        await self._store.delete(self.key(login))
+
+
+def create_login_lockout() -> LoginLockout | None:
+    """Build the lockout from settings (None when disabled)."""
+    config = settings.lockout
+    if not config.enabled:
+        return None
+    policy = LockoutPolicy(
+        threshold=config.threshold,
+        window=config.window_sec,
+        lockout=config.lockout_sec,
+        max_lockout=config.max_lockout_sec,
+    )
+    store: LockoutStore
+    if config.backend == "postgres":
+        store = PostgresLockoutStore(policy)
+    else:
+        store = MemoryLockoutStore(policy, max_entries=config.max_entries)
+    return LoginLockout(policy, store)
+
+
+login_lockout = create_login_lockout()
+
+
+__all__ = [
+    "FailureState",
+    "LockoutPolicy",
+    "LockoutStore",
+    "LoginLockout",
+    "MemoryLockoutStore",
+    "PostgresLockoutStore",
+    "create_login_lockout",
+    "login_lockout",
+]
@@ -0,0 +1,204 @@
+"""Role resolution from LDAP groups and permission checks, compiled once from settings.
+
+Configured groups (DNs or bare CNs) are normalized into hash keys when the
+engine is built.  A user's ``memberOf`` DN is split into the same keys — the
+whole normalized DN and ``cn=<its CN>`` — once per distinct DN; the verdict for
+that DN (grants a role, denies, or irrelevant) is cached, so a login costs one
+dict lookup per group instead of a substring scan per role.
+Matching is exact: ``APP_TENDER_VIEW`` no longer matches ``APP_TENDER_VIEWERS``.
+
+Roles and permissions are bits: a route declares the roles or permissions it
+needs as masks once, and a request is checked with two ``&`` operations.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterable, Mapping
+
+from auth.domain import RoleLiteral
+from config import Settings, settings
+
+log = logging.getLogger(__name__)
+
+ROLES: tuple[RoleLiteral, ...] = ("admin", "editor", "viewer")
+PERMISSIONS: tuple[str, ...] = ("knowledge:read", "org:read", "segments:classify", "users:read")
+ALL_PERMISSIONS = "*"
+
+# Priority of the roles configured through ``ldap.groups``.
+LEGACY_PRIORITY: dict[RoleLiteral, int] = {"admin": 30, "editor": 20, "viewer": 10}
+
+# Distinct group DNs whose verdict an engine remembers; the cache is dropped when full.
+VERDICT_CACHE_MAX = 16384
+
+_DENY: tuple[int, RoleLiteral | None] = (0, None)
+
+_ROLE_BITS: dict[str, int] = {role: 1 << index for index, role in enumerate(ROLES)}
+_PERMISSION_BITS = {permission: 1 << index for index, permission in enumerate(PERMISSIONS)}
+
+
+def role_mask(roles: Iterable[str]) -> int:
+    """Bits of ``roles``; :class:`ValueError` for an unknown role."""
+    return _mask(roles, _ROLE_BITS, "role")
+
+
+def permission_mask(permissions: Iterable[str]) -> int:
+    """Bits of ``permissions``, ``*`` meaning all; :class:`ValueError` for an unknown one."""
+    permissions = list(permissions)
+    if ALL_PERMISSIONS in permissions:
+        return (1 << len(PERMISSIONS)) - 1
+    return _mask(permissions, _PERMISSION_BITS, "permission")
+
+
+def _mask(names: Iterable[str], bits: Mapping[str, int], kind: str) -> int:
+    mask = 0
+    for name in names:
+        bit = bits.get(name)
+        if bit is None:
+            raise ValueError(f"unknown {kind}: {name!r}")
+        mask |= bit
+    return mask
+
+
+def normalize_dn(dn: str) -> str:
+    """``attr=value`` components, casefolded and stripped, joined by ``,``; a bare name is taken as a CN."""
+    if "=" not in dn:
+        return f"cn={dn.strip().casefold()}"
+    rdns = []
+    for rdn in _split_dn(dn):
+        attr, _, value = rdn.partition("=")
+        rdns.append(f"{attr.strip().casefold()}={value.strip().casefold()}")
+    return ",".join(rdns)
+
+
+def group_keys(dn: str) -> tuple[str, ...]:
+    """Keys a group DN matches under: its normalized DN and, if different, its leading ``cn=``."""
+    normalized = normalize_dn(dn)
+    first = _split_dn(normalized)[0]
+    if first == normalized or not first.startswith("cn="):
+        return (normalized,)
+    return (normalized, first)
+
+
+def _split_dn(dn: str) -> list[str]:
+    """Components of ``dn`` split on commas that are not escaped with a backslash."""
+    if "\\" not in dn:
+        return dn.split(",")
+    parts: list[str] = []
+    current: list[str] = []
+    escaped = False
+    for char in dn:
+        if escaped:
+            current.append(char)
+            escaped = False
+        elif char == "\\":
+            current.append(char)
+            escaped = True
+        elif char == ",":
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    parts.append("".join(current))
+    return parts
+
+
+class PermissionEngine:
+    """Resolves a role from group membership and checks role and permission masks."""
+
+    __slots__ = ("_deny", "_grants", "_permissions", "_verdicts")
+
+    def __init__(
+        self,
+        rules: Iterable[tuple[RoleLiteral, Iterable[str], int]],
+        *,
+        deny_groups: Iterable[str] = (),
+        role_permissions: Mapping[RoleLiteral, Iterable[str]] | None = None,
+    ) -> None:
+        self._grants: dict[str, tuple[int, RoleLiteral]] = {}
+        for role, groups, priority in rules:
+            role_mask((role,))
+            for group in groups:
+                key = normalize_dn(group)
+                current = self._grants.get(key)
+                if current is None or priority > current[0]:
+                    self._grants[key] = (priority, role)
+        self._deny = frozenset(normalize_dn(group) for group in deny_groups)
+        self._permissions: dict[str, int] = {
+            role: permission_mask(permissions) for role, permissions in (role_permissions or {}).items()
+        }
+        self._verdicts: dict[str, tuple[int, RoleLiteral | None] | None] = {}
+
+    def resolve(self, groups: Iterable[str]) -> RoleLiteral | None:
+        """The highest-priority role granted by ``groups``; None when none is or a deny group matches."""
+        verdicts = self._verdicts
+        best: tuple[int, RoleLiteral | None] | None = None
+        for group in groups:
+            try:
+                verdict = verdicts[group]
+            except KeyError:
+                verdict = self._judge(group)
+            if verdict is None:
+                continue
+            if verdict is _DENY:
+                return None
+            if best is None or verdict[0] > best[0]:
+                best = verdict
+        return best[1] if best else None
+
+    def _judge(self, group: str) -> tuple[int, RoleLiteral | None] | None:
+        """``_DENY``, the best grant among the keys of ``group``, or None; remembered per DN."""
+        verdict: tuple[int, RoleLiteral | None] | None = None
+        for key in group_keys(group):
+            if key in self._deny:
+                verdict = _DENY
+                break
+            grant = self._grants.get(key)
+            if grant is not None and (verdict is None or grant[0] > verdict[0]):
+                verdict = grant
+        if len(self._verdicts) >= VERDICT_CACHE_MAX:
+            self._verdicts.clear()
+        self._verdicts[group] = verdict
+        return verdict
+
+    def permissions_of(self, role: str) -> int:
+        return self._permissions.get(role, 0)
+
+    def allows(self, role: str, *, roles: int = 0, permissions: int = 0) -> bool:
+        """Whether ``role`` is one of ``roles`` (any, if 0) and has every bit of ``permissions``."""
+        if roles and not roles & _ROLE_BITS.get(role, 0):
+            return False
+        return self.permissions_of(role) & permissions == permissions
+
+
+def create_permission_engine(config: Settings) -> PermissionEngine:
+    """Rules of ``ldap.groups`` (at :data:`LEGACY_PRIORITY`) followed by ``permissions.rules``."""
+    rules: list[tuple[RoleLiteral, Iterable[str], int]] = []
+    for role, priority in LEGACY_PRIORITY.items():
+        dn = getattr(config.ldap.groups, role)
+        if dn:
+            rules.append((role, [dn], priority))
+    permissions = config.permissions
+    rules.extend((rule.role, rule.groups, rule.priority) for rule in permissions.rules)
+    if not rules:
+        log.warning("No LDAP groups grant a role: every login will be refused")
+    return PermissionEngine(rules, deny_groups=permissions.deny_groups, role_permissions=permissions.role_permissions)
+
+
+permission_engine = create_permission_engine(settings)
+
+
+__all__ = [
+    "ALL_PERMISSIONS",
+    "LEGACY_PRIORITY",
+    "PERMISSIONS",
+    "ROLES",
+    "VERDICT_CACHE_MAX",
+    "PermissionEngine",
+    "create_permission_engine",
+    "group_keys",
+    "normalize_dn",
+    "permission_mask",
+    "permission_engine",
+    "role_mask",
+]
@@ -4,61 +4,105 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from typing import Any, cast
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import Any
 from uuid import UUID
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from auth.domain import LdapUserInfo, LoginResult, RoleLiteral, UserProfile
-from auth.exceptions import AuthError, TokenError
+from auth.exceptions import AccountLockedError, AuthError, TokenError
 from auth.jwt_utils import create_access_token, create_refresh_token, decode_token
 from auth.ldap_client import ldap_authenticate, ldap_fetch_user_by_login
+from auth.lockout import FailureState, LoginLockout, login_lockout
+from auth.permissions import PermissionEngine, permission_engine
 from config import settings
+from core.metrics import metrics
 from db.engine import db
 from db.models.user.user import User
 from db.repositories.app.auth import deactivate_user_by_guid, sync_user_from_directory
 
 log = logging.getLogger(__name__)
 
+auth_attempts_total = metrics.counter(
+    "auth_attempts_total", "Login and refresh attempts by outcome", ("operation", "outcome")
+)
+
+
+@contextmanager
+def _track_outcome(operation: str) -> Iterator[None]:
+    """Count the outcome of an auth operation: ``success``, the AuthError code or ``error``."""
+    try:
+        yield
+    except AuthError as exc:
+        auth_attempts_total.inc(operation, exc.code)
+        raise
+    except Exception:
+        auth_attempts_total.inc(operation, "error")
+        raise
+    auth_attempts_total.inc(operation, "success")
+
 
 class AuthService:
     """Authenticate users and issue tokens."""
 
-    def __init__(self) -> None:
-        role_pairs = []
-        for role, dn in (
-            ("admin", settings.ldap.groups.admin),
-            ("editor", settings.ldap.groups.editor),
-            ("viewer", settings.ldap.groups.viewer),
-        ):
-            if not dn:
-                continue
-            role_pairs.append((cast(RoleLiteral, role), dn))
-        self._role_priority: tuple[tuple[RoleLiteral, str], ...] = tuple(role_pairs)
+    def __init__(
+        self,
+        *,
+        lockout: LoginLockout | None = login_lockout,
+        permissions: PermissionEngine = permission_engine,
+        reporting_lines: bool = settings.org.maintain_closure,
+    ) -> None:
+        self._lockout = lockout
+        self._permissions = permissions
+        self._reporting_lines = reporting_lines
 
     async def login(self, session: AsyncSession, *, login: str, password: str) -> LoginResult:
-        normalized_login = login.strip()
-        if not normalized_login or not password:
-            raise AuthError("invalid_credentials", "Login or password is empty", status=401)
+        with _track_outcome("login"):
+            normalized_login = login.strip()
+            if not normalized_login or not password:
+                raise AuthError("invalid_credentials", "Login or password is empty", status=401)
 
-        info = await asyncio.to_thread(ldap_authenticate, normalized_login, password)
-        return await self._complete_auth(session, info, update_last_login=True)
+            failures = await self._check_lockout(normalized_login)
+            info = await asyncio.to_thread(ldap_authenticate, normalized_login, password)
+            await self._record_attempt(normalized_login, succeeded=info is not None, had_failures=failures is not None)
+            return await self._complete_auth(session, info, update_last_login=True)
 
     async def refresh(self, session: AsyncSession, *, refresh_token: str) -> LoginResult:
-        if not refresh_token:
-            raise AuthError("missing_refresh", "Refresh token is required", status=401)
-
-        payload = decode_token(refresh_token)
-        if payload.get("typ") != "refresh":
-            raise TokenError("Token is not a refresh token", code="invalid_token_type", status=401)
-
-        ad_login = payload.get("ad_login")
-        if not isinstance(ad_login, str):
-            raise TokenError("Refresh token payload is missing login", code="invalid_token_payload", status=401)
-
-        info = await asyncio.to_thread(ldap_fetch_user_by_login, ad_login)
-        return await self._complete_auth(session, info, update_last_login=False)
+        with _track_outcome("refresh"):
+            if not refresh_token:
+                raise AuthError("missing_refresh", "Refresh token is required", status=401)
+
+            payload = decode_token(refresh_token)
+            if payload.get("typ") != "refresh":
+                raise TokenError("Token is not a refresh token", code="invalid_token_type", status=401)
+
+            ad_login = payload.get("ad_login")
+            if not isinstance(ad_login, str):
+                raise TokenError("Refresh token payload is missing login", code="invalid_token_payload", status=401)
+
+            info = await asyncio.to_thread(ldap_fetch_user_by_login, ad_login)
+            return await self._complete_auth(session, info, update_last_login=False)
+
+    async def _check_lockout(self, login: str) -> FailureState | None:
+        """Reject a locked login before the DC sees (and counts) another bad bind."""
+        if self._lockout is None:
+            return None
+        state = await self._lockout.status(login)
+        retry_after = self._lockout.retry_after(state)
+        if retry_after:
+            raise AccountLockedError(retry_after)
+        return state
+
+    async def _record_attempt(self, login: str, *, succeeded: bool, had_failures: bool) -> None:
+        if self._lockout is None:
+            return
+        if not succeeded:
+            await self._lockout.register_failure(login)
+        elif had_failures:
+            await self._lockout.reset(login)
 
     async def _complete_auth(
         self,
@@ -70,7 +114,7 @@ class AuthService:
         if not info:
             raise AuthError("invalid_credentials", "Invalid login or password", status=401)
 
-        role = self._resolve_role(info)
+        role = self._permissions.resolve(info.groups)
         if not role:
             await self._deactivate_user(info.ad_guid)
             raise AuthError("forbidden", "User does not have required group", status=403)
@@ -81,14 +125,6 @@ class AuthService:
         log.info("User %s authenticated", user.ad_login)
         return LoginResult(access_token=access_token, refresh_token=refresh_token, user=profile)
 
-    def _resolve_role(self, info: LdapUserInfo) -> RoleLiteral | None:
-        groups_cf = [group.casefold() for group in info.groups]
-        for role, target_dn in self._role_priority:
-            target_cf = target_dn.casefold()
-            if any(target_cf in group for group in groups_cf):
-                return role
-        return None
-
     async def _sync_user(
         self, session: AsyncSession, info: LdapUserInfo, *, update_last_login: bool, role: str
     ) -> User:
@@ -110,6 +146,7 @@ class AuthService:
             supervisor=info.supervisor if info.supervisor else "",
             subordinates=user_ids,
             role=role,
+            reporting_lines=self._reporting_lines,
         )
 
     def _issue_tokens(self, user: User, role: RoleLiteral) -> tuple[str, str]:
@@ -0,0 +1,5 @@
+"""Command line interface: ``python -m cli --help``."""
+
+from .main import app, main
+
+__all__ = ["app", "main"]
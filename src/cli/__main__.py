@@ -0,0 +1,5 @@
+"""Entry point for ``python -m cli``."""
+
+from cli.main import main
+
+main()
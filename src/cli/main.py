@@ -0,0 +1,375 @@
+"""Typer application with the operational commands."""
+
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Annotated, Any, TypeVar
+
+import typer
+
+C = TypeVar("C", bound=str)
+
+app = typer.Typer(no_args_is_help=True, add_completion=False)
+
+
+@app.callback()
+def cli() -> None:
+    """EMK Tender API management commands."""
+
+
+@app.command()
+def serve(
+    host: Annotated[str | None, typer.Option(help="Адрес (по умолчанию run.host)")] = None,
+    port: Annotated[int | None, typer.Option(help="Порт (по умолчанию run.port)")] = None,
+    workers: Annotated[int | None, typer.Option(min=0, help="Число воркеров, 0 — по числу ядер")] = None,
+    backlog: Annotated[int | None, typer.Option(min=1, help="Очередь listen()")] = None,
+    keep_alive: Annotated[int | None, typer.Option(min=1, help="Keep-alive, сек")] = None,
+    loop: Annotated[str | None, typer.Option(help="uvloop или asyncio")] = None,
+    http: Annotated[str | None, typer.Option(help="httptools или h11")] = None,
+    gc_freeze: Annotated[bool | None, typer.Option(help="gc.freeze() перед fork")] = None,
+) -> None:
+    """Run the API with the app preloaded and pre-forked uvicorn workers."""
+    from cli.serve import ServeOptions, available_cpus, serve as run_server
+    from config import settings
+
+    run = settings.run
+    worker_count = run.workers if workers is None else workers
+    options = ServeOptions(
+        host=host or run.host,
+        port=port or run.port,
+        workers=worker_count or available_cpus(),
+        backlog=backlog or run.backlog,
+        keep_alive=keep_alive or run.keep_alive_sec,
+        loop=_choice(loop, run.loop, ("uvloop", "asyncio")),
+        http=_choice(http, run.http, ("httptools", "h11")),
+        gc_freeze=run.gc_freeze if gc_freeze is None else gc_freeze,
+    )
+    raise typer.Exit(run_server(options))
+
+
+@app.command("startup-report")
+def startup_report(
+    module: Annotated[str, typer.Option(help="Модуль, время импорта которого измеряется")] = "api.app",
+    top: Annotated[int, typer.Option(min=1, help="Сколько строк показывать в каждой таблице")] = 15,
+    budget: Annotated[float | None, typer.Option(help="Завершиться с кодом 1, если импорт дольше, сек")] = None,
+) -> None:
+    """Show where the import time of the app goes (python -X importtime)."""
+    from cli.startup import profile_imports, render_report
+
+    profile = profile_imports(module)
+    typer.echo(render_report(profile, top=top))
+    if budget is not None and profile.total_sec > budget:
+        typer.echo(f"import {module} took {profile.total_sec:.2f}s, budget is {budget:.2f}s", err=True)
+        raise typer.Exit(1)
+
+
+@app.command()
+def openapi(
+    output: Annotated[Path | None, typer.Option(help="Куда записать схему (по умолчанию api.openapi_artifact)")] = None,
+) -> None:
+    """Build the OpenAPI schema artifact (<output> and <output>.gz) served by the workers."""
+    from config import settings
+
+    path = output or settings.api.openapi_artifact
+    if path is None:
+        raise typer.BadParameter("pass --output or set APP_CONFIG__API__OPENAPI_ARTIFACT", param_hint="--output")
+
+    from api.app import app as api_app
+    from api.openapi import write_artifact
+
+    document = write_artifact(api_app, path)
+    typer.echo(f"{path}: {len(document.body)} bytes, gzip {len(document.gzipped)} bytes, ETag {document.etag}")
+
+
+@app.command("kb-ingest")
+def kb_ingest(
+    source: Annotated[Path, typer.Argument(exists=True, file_okay=False, help="Каталог с документами")],
+    dataset: Annotated[str | None, typer.Option(help="Датасет Dify (по умолчанию knowledge.dataset_id)")] = None,
+    pattern: Annotated[list[str] | None, typer.Option(help="Маски файлов, по умолчанию *.md и *.txt")] = None,
+    progress: Annotated[
+        Path | None, typer.Option(help="Файл прогресса для продолжения (по умолчанию <source>/.kb-ingest.jsonl)")
+    ] = None,
+    concurrency: Annotated[int | None, typer.Option(min=1, help="Одновременных загрузок")] = None,
+) -> None:
+    """Upload the documents of a directory to a Dify knowledge base; reruns skip uploaded files."""
+    import asyncio
+
+    from config import settings
+
+    dataset_id = dataset or settings.knowledge.dataset_id
+    if not dataset_id:
+        raise typer.BadParameter("pass --dataset or set APP_CONFIG__KNOWLEDGE__DATASET_ID", param_hint="--dataset")
+
+    from db.engine import db
+    from integrations.dify import DifyError, dify_client
+    from knowledge import DocumentIngestion, IngestProgress, documents_from_directory, invalidate_dataset
+
+    log_file = IngestProgress(progress or source / ".kb-ingest.jsonl")
+    ingestion = DocumentIngestion(
+        dify_client,
+        settings.dify.kb_api_key,
+        dataset_id,
+        concurrency=concurrency or settings.knowledge.ingest_concurrency,
+        progress=log_file,
+        on_uploaded=invalidate_dataset,
+    )
+
+    async def run() -> None:
+        try:
+            await ingestion.run(documents_from_directory(source, pattern or ("*.md", "*.txt")))
+        finally:
+            log_file.close()
+            await dify_client.aclose()
+            await db.dispose()
+
+    try:
+        asyncio.run(run())
+    except DifyError as exc:
+        typer.echo(f"ingestion stopped: {exc}", err=True)
+        raise typer.Exit(1) from exc
+    report = ingestion.report
+    typer.echo(f"uploaded {report.uploaded}, skipped {report.skipped}, failed {len(report.failed)}")
+    for name, error in report.failed.items():
+        typer.echo(f"  {name}: {error}", err=True)
+    if report.failed:
+        raise typer.Exit(1)
+
+
+@app.command("kb-invalidate")
+def kb_invalidate(
+    dataset: Annotated[str | None, typer.Option(help="Датасет Dify (по умолчанию knowledge.dataset_id)")] = None,
+) -> None:
+    """Drop cached searches of a dataset in every API worker, e.g. after editing documents in the Dify UI."""
+    import asyncio
+
+    from config import settings
+
+    dataset_id = dataset or settings.knowledge.dataset_id
+    if not dataset_id:
+        raise typer.BadParameter("pass --dataset or set APP_CONFIG__KNOWLEDGE__DATASET_ID", param_hint="--dataset")
+
+    from db.engine import db
+    from knowledge import invalidate_dataset
+
+    async def run() -> int:
+        try:
+            return await invalidate_dataset(dataset_id)
+        finally:
+            await db.dispose()
+
+    typer.echo(f"dataset {dataset_id} is at generation {asyncio.run(run())}")
+
+
+@app.command("stand-ins")
+def stand_ins(
+    users: Annotated[int, typer.Option(min=1, help="Пользователей в каталоге")] = 5000,
+    groups: Annotated[int, typer.Option(min=0, help="Групп в каталоге")] = 200,
+    ldap_port: Annotated[int, typer.Option(help="Порт LDAP")] = 3389,
+    dify_port: Annotated[int, typer.Option(help="Порт Dify API")] = 5001,
+    ldap_latency: Annotated[float, typer.Option(min=0, help="Задержка bind/search, сек")] = 0.0,
+    ldap_failure_rate: Annotated[float, typer.Option(min=0, max=1, help="Доля bind/search с ошибкой busy")] = 0.0,
+    ldap_disconnect_rate: Annotated[float, typer.Option(min=0, max=1, help="Доля операций с обрывом")] = 0.0,
+    dify_latency: Annotated[float, typer.Option(min=0, help="Задержка ответа Dify, сек")] = 0.0,
+    dify_stream_delay: Annotated[float, typer.Option(min=0, help="Пауза между SSE-событиями, сек")] = 0.0,
+    dify_failure_rate: Annotated[float, typer.Option(min=0, max=1, help="Доля ответов Dify с 503")] = 0.0,
+    jitter: Annotated[float, typer.Option(min=0, help="Случайная добавка к задержкам, сек")] = 0.0,
+) -> None:
+    """Serve a seeded LDAP directory and a fake Dify API locally and print the settings that use them."""
+    from testing.standins import StandInOptions, run
+
+    options = StandInOptions(
+        ldap_port=ldap_port,
+        dify_port=dify_port,
+        users=users,
+        groups=groups,
+        ldap_latency=ldap_latency,
+        ldap_jitter=jitter,
+        ldap_failure_rate=ldap_failure_rate,
+        ldap_disconnect_rate=ldap_disconnect_rate,
+        dify_latency=dify_latency,
+        dify_jitter=jitter,
+        dify_stream_delay=dify_stream_delay,
+        dify_failure_rate=dify_failure_rate,
+    )
+    raise typer.Exit(run(options))
+
+
+@app.command()
+def bench(
+    mode: Annotated[str, typer.Option(help="inprocess (ASGITransport) или subprocess (uvicorn по TCP)")] = "inprocess",
+    scenario: Annotated[list[str] | None, typer.Option(help="login, refresh, protected (по умолчанию все)")] = None,
+    requests: Annotated[int, typer.Option(min=1, help="Запросов на сценарий")] = 2000,
+    concurrency: Annotated[int, typer.Option(min=1, help="Одновременных запросов")] = 32,
+    warmup: Annotated[int, typer.Option(min=0, help="Прогревочных запросов на сценарий")] = 50,
+    users: Annotated[int, typer.Option(min=1, help="Пользователей в заглушке LDAP")] = 1000,
+    db: Annotated[str, typer.Option(help="memory (заглушка) или postgres (db.url из настроек)")] = "memory",
+    db_latency: Annotated[float, typer.Option(min=0, help="Задержка запроса к заглушке БД, сек")] = 0.0,
+    ldap_latency: Annotated[float, typer.Option(min=0, help="Задержка bind/search заглушки LDAP, сек")] = 0.0,
+    workers: Annotated[int, typer.Option(min=1, help="Воркеры uvicorn в режиме subprocess")] = 1,
+    port: Annotated[int, typer.Option(help="Порт uvicorn в режиме subprocess")] = 8765,
+    output: Annotated[Path | None, typer.Option(help="Куда записать результаты (JSON)")] = None,
+    baseline: Annotated[Path | None, typer.Option(help="JSON с прошлым прогоном для сравнения")] = None,
+    threshold: Annotated[float, typer.Option(min=0, help="Допустимое ухудшение, доля (0.1 = 10%)")] = 0.1,
+) -> None:
+    """Benchmark login, refresh and the protected route against local LDAP and database stand-ins."""
+    from cli.bench import (
+        BENCH_DATABASES,
+        BENCH_MODES,
+        SCENARIOS,
+        BenchOptions,
+        compare,
+        read_report,
+        render,
+        run_bench,
+        write_report,
+    )
+
+    scenarios = tuple(scenario or SCENARIOS)
+    for name in scenarios:
+        _choice(name, name, SCENARIOS)
+    options = BenchOptions(
+        mode=_choice(mode, "inprocess", BENCH_MODES),
+        scenarios=scenarios,
+        requests=requests,
+        concurrency=concurrency,
+        warmup=warmup,
+        users=users,
+        db=_choice(db, "memory", BENCH_DATABASES),
+        db_latency=db_latency,
+        ldap_latency=ldap_latency,
+        workers=workers,
+        port=port,
+    )
+    report = run_bench(options)
+    regressions = compare(report, read_report(baseline), threshold) if baseline else []
+    typer.echo(render(report["results"], regressions))
+    if output is not None:
+        write_report(report, output)
+    if regressions:
+        raise typer.Exit(1)
+
+
+@app.command()
+def microbench(
+    case: Annotated[list[str] | None, typer.Option(help="Имя замера (по умолчанию все)")] = None,
+    repeat: Annotated[int, typer.Option(min=1, help="Повторов замера, берётся лучший")] = 5,
+    min_time: Annotated[float, typer.Option(min=0.01, help="Минимальная длительность одного повтора, сек")] = 0.2,
+    groups: Annotated[int, typer.Option(min=1, help="Групп в memberOf")] = 200,
+    reports: Annotated[int, typer.Option(min=0, help="Записей в directReports")] = 500,
+    results_dir: Annotated[Path | None, typer.Option(help="Каталог результатов: сохранить как <коммит>.json")] = None,
+    baseline: Annotated[str | None, typer.Option(help="JSON с прошлым прогоном или git ref из --results-dir")] = None,
+    threshold: Annotated[float, typer.Option(min=0, help="Допустимое замедление, доля (0.2 = 20%)")] = 0.2,
+) -> None:
+    """Time the per-request auth functions and compare them with a stored run."""
+    from cli.microbench import (
+        MicroOptions,
+        compare_micro,
+        load_baseline,
+        render_micro,
+        resolve_baseline,
+        run_microbench,
+        save_results,
+    )
+
+    options = MicroOptions(cases=tuple(case or ()), repeat=repeat, min_time=min_time, groups=groups, reports=reports)
+    try:
+        report = run_microbench(options)
+        previous = load_baseline(resolve_baseline(baseline, results_dir)) if baseline else None
+    except (ValueError, FileNotFoundError) as exc:
+        raise typer.BadParameter(str(exc)) from exc
+    regressions = compare_micro(report, previous, threshold) if previous else []
+    typer.echo(render_micro(report["results"], regressions))
+    if results_dir is not None:
+        typer.echo(f"saved {save_results(report, results_dir)}")
+    if regressions:
+        raise typer.Exit(1)
+
+
+@app.command("seed-users")
+def seed_users(
+    count: Annotated[int, typer.Option(min=1, help="Сколько пользователей добавить")] = 100_000,
+    batch: Annotated[int, typer.Option(min=1, max=4000, help="Строк в одном INSERT")] = 2000,
+    seed: Annotated[int, typer.Option(help="Зерно генератора; тот же seed — те же пользователи")] = 0,
+) -> None:
+    """Fill the users table (db.url) with synthetic people for the search benchmark; existing logins are skipped."""
+    import asyncio
+
+    from db.engine import db
+    from testing.people import seed_users as insert_users
+
+    async def run() -> int:
+        try:
+            async with db.transaction() as session:
+                return await insert_users(session, count, batch=batch, seed=seed)
+        finally:
+            await db.dispose()
+
+    typer.echo(f"inserted {asyncio.run(run())} of {count} users")
+
+
+@app.command("search-bench")
+def search_bench(
+    scenario: Annotated[list[str] | None, typer.Option(help="search, search-cached (по умолчанию оба)")] = None,
+    requests: Annotated[int, typer.Option(min=1, help="Запросов на сценарий")] = 2000,
+    concurrency: Annotated[int, typer.Option(min=1, help="Одновременных запросов")] = 8,
+    warmup: Annotated[int, typer.Option(min=0, help="Прогревочных запросов на сценарий")] = 100,
+    limit: Annotated[int, typer.Option(min=1, help="Результатов на запрос")] = 10,
+    target_p99_ms: Annotated[float, typer.Option(min=0, help="Порог p99 сценария search, мс")] = 20.0,
+    explain: Annotated[str | None, typer.Option(help="Показать EXPLAIN ANALYZE поиска по этой строке")] = None,
+    output: Annotated[Path | None, typer.Option(help="Куда записать результаты (JSON)")] = None,
+    baseline: Annotated[Path | None, typer.Option(help="JSON с прошлым прогоном для сравнения")] = None,
+    threshold: Annotated[float, typer.Option(min=0, help="Допустимое ухудшение, доля (0.1 = 10%)")] = 0.1,
+) -> None:
+    """Measure people search latency against the configured database (fill it with `seed-users` first)."""
+    import asyncio
+
+    from cli.bench import compare, make_report, read_report, render, write_report
+    from cli.search_bench import SEARCH_SCENARIOS, SearchBenchOptions, explain_search, run_search_bench
+    from db.engine import db
+
+    scenarios = tuple(scenario or SEARCH_SCENARIOS)
+    for name in scenarios:
+        _choice(name, name, SEARCH_SCENARIOS)
+    options = SearchBenchOptions(
+        scenarios=scenarios, requests=requests, concurrency=concurrency, warmup=warmup, limit=limit
+    )
+
+    async def run() -> tuple[list[Any], str | None]:
+        try:
+            plan = None
+            if explain:
+                async with db.session() as session:
+                    plan = await explain_search(session, explain, limit=limit)
+            return await run_search_bench(options, db.session), plan
+        finally:
+            await db.dispose()
+
+    results, plan = asyncio.run(run())
+    if plan:
+        typer.echo(plan + "\n")
+    report = make_report(options, results)
+    regressions = compare(report, read_report(baseline), threshold) if baseline else []
+    typer.echo(render(report["results"], regressions))
+    if output is not None:
+        write_report(report, output)
+    slow = [result for result in results if result.name == "search" and result.p99_ms > target_p99_ms]
+    for result in slow:
+        typer.echo(f"SLOW {result.name} p99 {result.p99_ms:.2f} ms > {target_p99_ms:g} ms")
+    if regressions or slow:
+        raise typer.Exit(1)
+
+
+def _choice(value: str | None, default: C, allowed: tuple[C, ...]) -> C:
+    if value is None:
+        return default
+    for option in allowed:
+        if option == value:
+            return option
+    raise typer.BadParameter(f"expected one of {', '.join(allowed)}")
+
+
+def main() -> None:
+    app()
+
+
+__all__ = ["app", "main"]
@@ -0,0 +1,260 @@
+"""Microbenchmarks of the per-request auth code, stored per commit.
+
+``python -m cli microbench`` times each case with :mod:`timeit` (``autorange``
+picks the loop count, the best of ``repeat`` runs is reported) on synthetic but
+realistically sized inputs: a 200-group ``memberOf``, a manager with hundreds
+of ``directReports``.  Nothing touches the network or the database.
+
+The report has the same layout as ``cli bench`` (:func:`cli.bench.make_report`)
+and is saved as ``<results-dir>/<commit>.json``, so a baseline can be named by a
+git ref.  A case slower than the baseline by more than the threshold is a
+regression.
+"""
+
+from __future__ import annotations
+
+import statistics
+import subprocess
+import timeit
+import uuid
+from collections.abc import Callable, Coroutine
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from pathlib import Path
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+
+from cli.bench import SRC_ROOT, Regression, make_report, read_report, write_report
+
+if TYPE_CHECKING:
+    from auth.domain import RoleLiteral
+
+BASE_DN = "DC=emk,DC=loc"
+ROLE_GROUPS: dict[RoleLiteral, str] = {
+    "admin": f"CN=APP_TENDER_ADMIN,OU=APP_TENDER,OU=SERVERS,{BASE_DN}",
+    "editor": f"CN=APP_TENDER_EDITOR,OU=APP_TENDER,OU=SERVERS,{BASE_DN}",
+    "viewer": f"CN=APP_TENDER_VIEWER,OU=APP_TENDER,OU=SERVERS,{BASE_DN}",
+}
+
+
+@dataclass(slots=True)
+class MicroOptions:
+    cases: tuple[str, ...] = ()
+    repeat: int = 5
+    min_time: float = 0.2
+    groups: int = 200
+    reports: int = 500
+
+
+@dataclass(slots=True)
+class CaseResult:
+    name: str
+    loops: int
+    ns_per_op: float
+    median_ns: float
+
+
+def build_cases(options: MicroOptions) -> dict[str, Callable[[], object]]:
+    """Zero-argument callables by case name, with their inputs prepared up front."""
+    from fastapi.security import HTTPAuthorizationCredentials
+
+    from api.deps.auth import get_current_user
+    from api.errors.handlers import _make_error_response
+    from api.schemas.auth.login import LoginResponse
+    from auth.domain import LdapUserInfo, LoginResult, UserProfile
+    from auth.jwt_utils import create_access_token, decode_token
+    from auth.ldap_client import _entry_to_user_info, _extract_suplier
+    from auth.permissions import LEGACY_PRIORITY, PermissionEngine
+
+    guid = uuid.uuid4()
+    payload: dict[str, Any] = {
+        "sub": str(guid),
+        "user_id": 42,
+        "ad_login": "ivanov",
+        "role": "viewer",
+        "full_name": "Иванов Иван Иванович",
+        "department": "Отдел закупок",
+        "email": "ivanov@emk.ru",
+        "subordinates": list(range(1000, 1000 + min(options.reports, 50))),
+    }
+    token = create_access_token(payload)
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    groups = [f"CN=GRP_{index:04d},OU=Groups,OU=EMK,{BASE_DN}" for index in range(options.groups - 1)]
+    groups.append(ROLE_GROUPS["viewer"])  # the lowest role, found after scanning for the others
+    reports = [_report_dn(index) for index in range(options.reports)]
+    info = LdapUserInfo(
+        ad_login="ivanov",
+        ad_guid=guid,
+        supervisor="",
+        full_name=payload["full_name"],
+        email=payload["email"],
+        department=payload["department"],
+        title="Начальник отдела",
+        groups=groups,
+        subordinates=[],
+    )
+    engine = PermissionEngine([(role, [dn], LEGACY_PRIORITY[role]) for role, dn in ROLE_GROUPS.items()])
+    entry = _fake_entry(guid, groups, reports)
+
+    profile = UserProfile(
+        id=42,
+        ad_login="ivanov",
+        ad_guid=guid,
+        full_name=info.full_name,
+        email=info.email,
+        department=info.department,
+        title=info.title,
+        role="viewer",
+        last_login_at=datetime.now(tz=UTC),
+    )
+    result = LoginResult(access_token=token, refresh_token=token, user=profile)
+
+    return {
+        "create_access_token": lambda: create_access_token(payload),
+        "decode_token": lambda: decode_token(token),
+        "get_current_user": lambda: _run_sync(get_current_user(credentials)),
+        "resolve_role": lambda: engine.resolve(info.groups),
+        "entry_to_user_info": lambda: _entry_to_user_info(entry),  # type: ignore[arg-type]
+        "extract_suplier": lambda: _extract_suplier(reports),
+        "login_response_from_result": lambda: LoginResponse.from_result(result),
+        "make_error_response": lambda: _make_error_response("UNAUTHORIZED", "Token expired", 401, "rid-1"),
+    }
+
+
+def measure(name: str, func: Callable[[], object], *, repeat: int, min_time: float) -> CaseResult:
+    timer = timeit.Timer(func)
+    loops, _ = timer.autorange()
+    loops = max(1, int(loops * min_time / 0.2))
+    per_op = [seconds / loops * 1e9 for seconds in timer.repeat(repeat=repeat, number=loops)]
+    return CaseResult(name, loops, round(min(per_op), 1), round(statistics.median(per_op), 1))
+
+
+def run_microbench(options: MicroOptions) -> dict[str, Any]:
+    """Time the selected cases (all by default); returns the JSON-ready report."""
+    cases = build_cases(options)
+    selected = options.cases or tuple(cases)
+    unknown = set(selected) - set(cases)
+    if unknown:
+        raise ValueError(f"unknown cases: {', '.join(sorted(unknown))}")
+    results = [measure(name, cases[name], repeat=options.repeat, min_time=options.min_time) for name in selected]
+    return make_report(options, results)
+
+
+def compare_micro(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[Regression]:
+    """Cases whose best time per call grew by more than ``threshold`` relative to ``baseline``."""
+    before = {result["name"]: result for result in baseline.get("results", [])}
+    regressions = []
+    for result in current.get("results", []):
+        base = before.get(result["name"])
+        if not base or not base["ns_per_op"]:
+            continue
+        regression = Regression(result["name"], "ns_per_op", float(base["ns_per_op"]), float(result["ns_per_op"]))
+        if regression.change > threshold:
+            regressions.append(regression)
+    return regressions
+
+
+def render_micro(results: list[dict[str, Any]], regressions: list[Regression]) -> str:
+    lines = [f"{'case':<28} {'loops':>9} {'ns/op':>11} {'median ns':>11} {'ops/s':>11}"]
+    for result in results:
+        ops = 1e9 / result["ns_per_op"] if result["ns_per_op"] else 0.0
+        lines.append(
+            f"{result['name']:<28} {result['loops']:>9} {result['ns_per_op']:>11.1f} "
+            f"{result['median_ns']:>11.1f} {ops:>11.0f}"
+        )
+    for regression in regressions:
+        lines.append(
+            f"REGRESSION {regression.scenario}: {regression.baseline:g} -> {regression.current:g} ns "
+            f"({regression.change:.1%} worse)"
+        )
+    return "\n".join(lines)
+
+
+def result_path(results_dir: Path, commit: str | None) -> Path:
+    return results_dir / f"{commit or 'uncommitted'}.json"
+
+
+def save_results(report: dict[str, Any], results_dir: Path) -> Path:
+    """Write ``report`` as the results of its commit; cases it did not run keep their stored results."""
+    path = result_path(results_dir, report["meta"]["commit"])
+    if path.is_file():
+        ran = {result["name"] for result in report["results"]}
+        kept = [result for result in read_report(path).get("results", []) if result["name"] not in ran]
+        report = {**report, "results": kept + report["results"]}
+    write_report(report, path)
+    return path
+
+
+def resolve_baseline(value: str, results_dir: Path | None) -> Path:
+    """``value`` as a report file, or else as a git ref whose report is in ``results_dir``."""
+    path = Path(value)
+    if path.is_file() or results_dir is None:
+        return path
+    try:
+        completed = subprocess.run(
+            ["git", "rev-parse", "--verify", f"{value}^{{commit}}"],
+            cwd=SRC_ROOT,
+            capture_output=True,
+            text=True,
+            timeout=5,
+            check=True,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return path
+    return result_path(results_dir, completed.stdout.strip())
+
+
+def load_baseline(path: Path) -> dict[str, Any]:
+    if not path.is_file():
+        raise FileNotFoundError(f"no microbenchmark results at {path}")
+    return read_report(path)
+
+
+def _run_sync(coroutine: Coroutine[Any, Any, Any]) -> Any:
+    """Result of a coroutine that never suspends, without an event loop."""
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coroutine.close()
+    raise RuntimeError("coroutine suspended")
+
+
+def _report_dn(index: int) -> str:
+    ou = "OU=DISABLED" if index % 25 == 0 else "OU=Users"
+    return f"CN=Сотрудник {index:04d} Отдела,{ou},OU=EMK,{BASE_DN}"
+
+
+def _fake_entry(guid: uuid.UUID, groups: list[str], reports: list[str]) -> SimpleNamespace:
+    """Duck-typed ``ldap3.Entry`` with the attributes ``_entry_to_user_info`` reads."""
+
+    def attribute(*values: Any) -> SimpleNamespace:
+        return SimpleNamespace(value=values[0] if len(values) == 1 else list(values), values=list(values))
+
+    return SimpleNamespace(
+        objectGUID=SimpleNamespace(raw_values=[guid.bytes_le]),
+        sAMAccountName=attribute("Ivanov"),
+        displayName=attribute("Иванов Иван Иванович"),
+        mail=attribute("Ivanov@emk.ru"),
+        department=attribute("Отдел закупок"),
+        title=attribute("Начальник отдела"),
+        manager=attribute(f"CN=Петров Пётр Петрович,OU=Users,OU=EMK,{BASE_DN}"),
+        memberOf=attribute(*groups),
+        directReports=attribute(*reports),
+    )
+
+
+__all__ = [
+    "CaseResult",
+    "MicroOptions",
+    "build_cases",
+    "compare_micro",
+    "load_baseline",
+    "measure",
+    "render_micro",
+    "resolve_baseline",
+    "result_path",
+    "run_microbench",
+    "save_results",
+]
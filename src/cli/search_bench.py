@@ -0,0 +1,97 @@
+"""Latency benchmark of the people search against the configured PostgreSQL.
+
+``python -m cli seed-users`` fills ``users`` with synthetic people
+(``testing/people.py``); ``python -m cli search-bench`` then replays sampled
+typeahead queries through :class:`users.PeopleSearch` with ``--concurrency``
+callers.  The ``search`` scenario has the result cache turned off, so every
+query reaches the database; ``search-cached`` uses the configured cache and
+shows what repeated prefixes cost.  Results use the ``cli bench`` report
+format, so ``--baseline`` comparison works the same way.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from cli.bench import ScenarioResult, summarize
+from config import settings
+from core.cache import TTLCache
+from db.repositories.app.users import user_search_query
+from testing.people import sample_queries
+from users import PeopleSearch, normalize_search
+from users.listing import SessionFactory
+
+SEARCH_SCENARIOS = ("search", "search-cached")
+
+
+@dataclass(slots=True)
+class SearchBenchOptions:
+    scenarios: tuple[str, ...] = SEARCH_SCENARIOS
+    requests: int = 2000
+    concurrency: int = 8
+    warmup: int = 100
+    limit: int = 10
+    seed: int = 0
+
+
+def people_search_for(scenario: str, session_factory: SessionFactory) -> PeopleSearch:
+    # ttl=0 expires entries as they are stored: every lookup is a miss.
+    ttl = settings.user_search.cache_ttl_sec if scenario == "search-cached" else 0.0
+    cache: TTLCache[Any, Any] = TTLCache(f"bench_{scenario}", max_size=settings.user_search.cache_max_entries, ttl=ttl)
+    return PeopleSearch(cache=cache, min_length=settings.user_search.min_length, session_factory=session_factory)
+
+
+async def run_search_bench(options: SearchBenchOptions, session_factory: SessionFactory) -> list[ScenarioResult]:
+    unknown = set(options.scenarios) - set(SEARCH_SCENARIOS)
+    if unknown:
+        raise ValueError(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    queries = sample_queries(options.warmup + options.requests, seed=options.seed)
+    results = []
+    for scenario in options.scenarios:
+        search = people_search_for(scenario, session_factory)
+        for query in queries[: options.warmup]:
+            await search.search(query, limit=options.limit)
+        results.append(await _drive(scenario, search, queries[options.warmup :], options))
+    return results
+
+
+async def _drive(
+    scenario: str, search: PeopleSearch, queries: list[str], options: SearchBenchOptions
+) -> ScenarioResult:
+    latencies: list[float] = []
+    statuses: Counter[str] = Counter()
+    pending = iter(queries)
+
+    async def worker() -> None:
+        for query in pending:
+            started = time.perf_counter()
+            try:
+                result = await search.search(query, limit=options.limit)
+            except Exception as exc:  # counted as an error; the run goes on
+                statuses[type(exc).__name__] += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            statuses[f"200 {result.source}"] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(options.concurrency)))
+    return summarize(scenario, latencies, statuses, time.perf_counter() - started)
+
+
+async def explain_search(session: AsyncSession, query: str, *, limit: int) -> str:
+    """``EXPLAIN (ANALYZE, BUFFERS)`` of the search for ``query``: shows whether the trigram index is used."""
+    text = normalize_search(query)
+    stmt = user_search_query(text, text.split(), limit=limit)
+    connection = await session.connection()
+    sql = stmt.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    result = await connection.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")
+    return "\n".join(row[0] for row in result)
+
+
+__all__ = ["SEARCH_SCENARIOS", "SearchBenchOptions", "explain_search", "people_search_for", "run_search_bench"]
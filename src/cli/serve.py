@@ -0,0 +1,278 @@
+"""Pre-forking production server: the app is imported once, then N uvicorn workers share one socket.
+
+The parent imports the application, binds the listening socket and freezes the
+garbage collector before forking, so the pages of the preloaded modules stay
+shared copy-on-write between workers instead of being touched (and copied) by
+every collection.  It then only supervises: respawns workers that die, forwards
+SIGTERM/SIGINT, and logs when each worker is ready with its startup time and
+memory (RSS, and PSS/shared from ``/proc`` on Linux) for sizing pods.  Only the
+parent rotates the log file; workers append to it and follow the rotation.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import gc
+import logging
+import os
+import resource
+import select
+import signal
+import socket
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from types import FrameType
+
+import orjson
+import uvicorn
+
+log = logging.getLogger(__name__)
+
+# A worker that dies this soon after its start is failing to boot, not crashing under load.
+_MIN_WORKER_LIFETIME_SEC = 5.0
+
+
+@dataclass(slots=True)
+class ServeOptions:
+    host: str
+    port: int
+    workers: int
+    backlog: int
+    keep_alive: int
+    loop: str
+    http: str
+    gc_freeze: bool
+
+
+@dataclass(slots=True)
+class WorkerMemory:
+    """Memory of one process in KiB; PSS and shared are Linux-only."""
+
+    rss_kib: int
+    pss_kib: int | None = None
+    shared_kib: int | None = None
+
+    def describe(self) -> str:
+        text = f"RSS {self.rss_kib / 1024:.1f} MiB"
+        if self.pss_kib is not None and self.shared_kib is not None:
+            text += f", PSS {self.pss_kib / 1024:.1f} MiB, shared {self.shared_kib / 1024:.1f} MiB"
+        return text
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (affinity-aware where supported)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def process_memory(pid: int, fallback_rss_kib: int = 0) -> WorkerMemory:
+    """RSS/PSS/shared of ``pid`` from ``/proc/<pid>/smaps_rollup``, or the fallback RSS."""
+    fields: dict[str, int] = {}
+    with contextlib.suppress(OSError):
+        for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+            name, _, rest = line.partition(":")
+            value = rest.split()
+            if value and value[0].isdigit():
+                fields[name] = int(value[0])
+    if "Rss" not in fields:
+        return WorkerMemory(rss_kib=fallback_rss_kib)
+    shared = fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+    return WorkerMemory(rss_kib=fields["Rss"], pss_kib=fields.get("Pss"), shared_kib=shared)
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """Listening socket inherited by every worker."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class _ReportingServer(uvicorn.Server):
+    """Writes one JSON line to the supervisor once the worker accepts requests."""
+
+    def __init__(self, config: uvicorn.Config, *, report_fd: int, forked_at: float) -> None:
+        super().__init__(config)
+        self._report_fd = report_fd
+        self._forked_at = forked_at
+
+    async def startup(self, sockets: list[socket.socket] | None = None) -> None:
+        await super().startup(sockets)
+        if self.should_exit:
+            return
+        report = {
+            "pid": os.getpid(),
+            "startup_sec": time.perf_counter() - self._forked_at,
+            "maxrss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        }
+        # One short write is atomic on a pipe, so reports of workers never interleave.
+        os.write(self._report_fd, orjson.dumps(report) + b"\n")
+
+
+class Supervisor:
+    """Fork, watch and respawn workers until told to stop."""
+
+    def __init__(self, config: uvicorn.Config, sock: socket.socket, *, workers: int) -> None:
+        self.config = config
+        self.sock = sock
+        self.workers = workers
+        self._children: dict[int, float] = {}  # pid -> spawned at
+        self._stopping = False
+        self._failed = False
+        self._ready: set[int] = set()
+        self._report_r, self._report_w = os.pipe()
+        self._buffer = b""
+
+    def run(self) -> int:
+        from core.logging_setup import rotate_log_files
+
+        started = time.perf_counter()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self._on_signal)
+        for _ in range(self.workers):
+            self._spawn()
+        all_ready = False
+        while self._children:
+            readable, _, _ = select.select([self._report_r], [], [], 0.5)
+            if readable:
+                self._read_reports()
+            if not all_ready and len(self._ready) >= self.workers:
+                all_ready = True
+                log.info("%d workers ready in %.2fs", self.workers, time.perf_counter() - started)
+            self._reap()
+            rotate_log_files()
+        self.sock.close()
+        return 1 if self._failed else 0
+
+    def _spawn(self) -> None:
+        forked_at = time.perf_counter()
+        pid = os.fork()
+        if pid == 0:
+            os._exit(self._worker(forked_at))
+        self._children[pid] = time.monotonic()
+
+    def _worker(self, forked_at: float) -> int:
+        code = 1
+        try:
+            os.close(self._report_r)
+            for sig in (signal.SIGTERM, signal.SIGINT):
+                signal.signal(sig, signal.SIG_DFL)
+            from core.logging_setup import use_worker_file_handlers
+
+            use_worker_file_handlers()
+            gc.enable()
+            server = _ReportingServer(self.config, report_fd=self._report_w, forked_at=forked_at)
+            server.run(sockets=[self.sock])
+            code = 0 if server.started else 3
+        except BaseException:
+            log.exception("Worker %d crashed", os.getpid())
+        finally:
+            logging.shutdown()
+        return code
+
+    def _read_reports(self) -> None:
+        self._buffer += os.read(self._report_r, 65536)
+        *lines, self._buffer = self._buffer.split(b"\n")
+        for line in lines:
+            report = orjson.loads(line)
+            pid = report["pid"]
+            self._ready.add(pid)
+            memory = process_memory(pid, fallback_rss_kib=report["maxrss_kib"])
+            log.info("Worker %d ready in %.0f ms (%s)", pid, report["startup_sec"] * 1000, memory.describe())
+
+    def _reap(self) -> None:
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self._children.clear()
+                return
+            if pid == 0:
+                return
+            spawned_at = self._children.pop(pid, None)
+            if spawned_at is None or self._stopping:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if pid not in self._ready or time.monotonic() - spawned_at < _MIN_WORKER_LIFETIME_SEC:
+                log.error("Worker %d failed to start (exit code %d), shutting down", pid, code)
+                self._failed = True
+                self._stop()
+                continue
+            log.warning("Worker %d exited with code %d, starting a new one", pid, code)
+            self._ready.discard(pid)
+            self._spawn()
+
+    def _on_signal(self, signum: int, _frame: FrameType | None) -> None:
+        log.info("Received %s, stopping %d workers", signal.Signals(signum).name, len(self._children))
+        self._stop()
+
+    def _stop(self) -> None:
+        self._stopping = True
+        for pid in self._children:
+            with contextlib.suppress(ProcessLookupError):
+                os.kill(pid, signal.SIGTERM)
+
+
+def serve(options: ServeOptions) -> int:
+    """Preload the app, bind and run ``options.workers`` workers; returns the exit code."""
+    from config import settings
+    from core.logging_setup import setup_logging
+
+    setup_logging()
+    started = time.perf_counter()
+    if options.gc_freeze:
+        # No collections while the app is imported: objects stay where the import put them.
+        gc.disable()
+
+    from api.app import app
+    from api.openapi import warm_openapi
+    from auth.ldap_client import preload as preload_ldap
+    from integrations.dify.client import preload as preload_dify
+
+    # Loaded lazily by the app itself; here they should be shared by all workers.
+    preload_ldap()
+    preload_dify()
+    warm_openapi(app)
+
+    config = uvicorn.Config(
+        app,
+        loop=options.loop,
+        http=options.http,
+        backlog=options.backlog,
+        timeout_keep_alive=options.keep_alive,
+        lifespan="on",
+        access_log=False,
+        log_config=None,
+        server_header=False,
+    )
+    config.load()
+    log.info(
+        "Application preloaded in %.2fs (%s)",
+        time.perf_counter() - started,
+        process_memory(os.getpid()).describe(),
+    )
+
+    multiprocess_dir = settings.metrics.multiprocess_dir
+    if settings.metrics.enabled and multiprocess_dir:
+        from core.metrics_multiprocess import clear_snapshots
+
+        log.info("Removed %d metric snapshots of the previous run", clear_snapshots(multiprocess_dir))
+
+    sock = bind_socket(options.host, options.port, options.backlog)
+    log.info("Listening on %s:%d with %d workers", options.host, options.port, options.workers)
+    if options.gc_freeze:
+        # No collect() first: freed objects leave holes that the workers' allocations fill, copying shared pages.
+        gc.freeze()
+    if options.workers == 1:
+        gc.enable()
+        uvicorn.Server(config).run(sockets=[sock])
+        return 0
+    return Supervisor(config, sock, workers=options.workers).run()
+
+
+__all__ = ["ServeOptions", "Supervisor", "WorkerMemory", "available_cpus", "bind_socket", "process_memory", "serve"]
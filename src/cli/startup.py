@@ -0,0 +1,112 @@
+"""Startup profiling: where the import time of a module (``api.app`` by default) goes.
+
+The module is imported in a fresh interpreter under ``python -X importtime``; the
+per-module lines it writes to stderr are parsed and summarised by top-level
+package (self time) and by module (cumulative time).
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+
+@dataclass(slots=True)
+class ImportRecord:
+    """One ``-X importtime`` line; times in microseconds."""
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+    @property
+    def package(self) -> str:
+        return self.module.partition(".")[0]
+
+
+@dataclass(slots=True)
+class ImportProfile:
+    module: str
+    records: list[ImportRecord]
+
+    @property
+    def total_sec(self) -> float:
+        """Cumulative import time of the profiled module itself."""
+        for record in reversed(self.records):
+            if record.module == self.module and record.depth == 0:
+                return record.cumulative_us / 1e6
+        return sum(record.self_us for record in self.records) / 1e6
+
+    @property
+    def modules(self) -> set[str]:
+        return {record.module for record in self.records}
+
+    def by_package(self) -> list[tuple[str, int]]:
+        """Self time summed per top-level package, slowest first."""
+        totals: dict[str, int] = defaultdict(int)
+        for record in self.records:
+            totals[record.package] += record.self_us
+        return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+    def slowest(self, count: int) -> list[ImportRecord]:
+        return sorted(self.records, key=lambda record: record.cumulative_us, reverse=True)[:count]
+
+
+def parse_importtime(stderr: str) -> list[ImportRecord]:
+    """Parse ``import time: self | cumulative | name`` lines; anything else is ignored."""
+    records: list[ImportRecord] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        records.append(
+            ImportRecord(
+                module=stripped,
+                self_us=int(fields[0]),
+                cumulative_us=int(fields[1]),
+                depth=(len(name) - len(stripped) - 1) // 2,
+            )
+        )
+    return records
+
+
+def profile_imports(module: str = "api.app", *, python: str = sys.executable) -> ImportProfile:
+    """Import ``module`` in a new interpreter and collect its import times."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(SRC_DIR), env.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    return ImportProfile(module=module, records=parse_importtime(result.stderr))
+
+
+def render_report(profile: ImportProfile, *, top: int = 15) -> str:
+    lines = [f"import {profile.module}: {profile.total_sec * 1000:.0f} ms, {len(profile.records)} modules", ""]
+    lines.append(f"{'self ms':>9}  package")
+    for package, self_us in profile.by_package()[:top]:
+        lines.append(f"{self_us / 1000:>9.1f}  {package}")
+    lines.append("")
+    lines.append(f"{'cumul ms':>9}  module")
+    for record in profile.slowest(top):
+        lines.append(f"{record.cumulative_us / 1000:>9.1f}  {'  ' * record.depth}{record.module}")
+    return "\n".join(lines)
+
+
+__all__ = ["ImportProfile", "ImportRecord", "parse_importtime", "profile_imports", "render_report"]
@@ -1,8 +1,9 @@
 """Application configuration models."""
 
 from pathlib import Path
+from typing import Literal, Self
 
-from pydantic import BaseModel, Field, PositiveInt, PostgresDsn, SecretStr
+from pydantic import BaseModel, Field, PositiveInt, PostgresDsn, SecretStr, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -14,6 +15,33 @@ class RunConfig(BaseModel):
 
     host: str = Field(default="0.0.0.0")
     port: int = Field(default=8000)
+    workers: int = Field(default=0, ge=0, description="Число воркеров `cli serve` (0 — по числу доступных ядер)")
+    backlog: PositiveInt = Field(default=2048, description="Длина очереди входящих соединений listen()")
+    keep_alive_sec: PositiveInt = Field(
+        default=75, description="Keep-alive соединений, сек (больше idle-таймаута балансировщика)"
+    )
+    loop: Literal["uvloop", "asyncio"] = Field(default="uvloop", description="Реализация event loop воркеров")
+    http: Literal["httptools", "h11"] = Field(default="httptools", description="HTTP-парсер воркеров")
+    gc_freeze: bool = Field(
+        default=True, description="gc.freeze() перед fork, чтобы страницы предзагруженного приложения оставались общими"
+    )
+
+
+class LoggerConfig(BaseModel):
+    """Per-logger level, sampling and duplicate suppression settings."""
+
+    level: str | None = Field(default=None, description="Уровень логгера (по умолчанию наследуется)")
+    sample_rate: float = Field(default=1.0, ge=0.0, le=1.0, description="Доля записей ниже WARNING, которые пишутся")
+    rate_limit: int | None = Field(
+        default=None,
+        ge=1,
+        description="Максимум одинаковых записей за окно, остальные сворачиваются в 'N suppressed'",
+    )
+    rate_window_sec: float = Field(default=60.0, gt=0, description="Окно подавления дубликатов, сек")
+
+
+def _default_loggers() -> dict[str, LoggerConfig]:
+    return {"api.errors.handlers": LoggerConfig(rate_limit=20, rate_window_sec=60.0)}
 
 
 class LoggingConfig(BaseModel):
@@ -23,6 +51,12 @@ class LoggingConfig(BaseModel):
     file: str | None = None
     retention_days: int = 30
     sa_level: str = "WARNING"
+    format: Literal["text", "json"] = Field(default="text", description="Формат записей: text или json (orjson)")
+    access_log: bool = Field(default=True, description="Писать запись о каждом запросе (route, status, duration)")
+    loggers: dict[str, LoggerConfig] = Field(
+        default_factory=_default_loggers,
+        description="Настройки отдельных логгеров по имени, например api.errors.handlers",
+    )
 
 
 class ApiConfig(BaseModel):
@@ -31,6 +65,114 @@ class ApiConfig(BaseModel):
     prefix: str = Field(default="/api/v1", description="Базовый префикс API (c версией)")
     default_limit: int = Field(default=20, ge=1, description="Дефолтный размер страницы для списков")
     max_limit: int = Field(default=200, ge=1, description="Жёсткий верхний предел размера страницы")
+    cursor_secret: SecretStr | None = Field(
+        default=None, description="Ключ подписи курсоров пагинации (по умолчанию выводится из jwt.secret)"
+    )
+    openapi_artifact: Path | None = Field(
+        default=None,
+        description="Готовая схема OpenAPI (`python -m cli openapi`); если файл есть, воркеры её не генерируют",
+    )
+
+
+class MetricsConfig(BaseModel):
+    """Metrics endpoint configuration."""
+
+    enabled: bool = Field(default=True, description="Включить сбор метрик и эндпоинт")
+    path: str = Field(default="/metrics", description="Путь эндпоинта относительно api.prefix")
+    multiprocess_dir: str | None = Field(
+        default=None,
+        description="Каталог для агрегации метрик нескольких воркеров (очищается при старте сервера)",
+    )
+    flush_interval_sec: float = Field(default=5.0, gt=0, description="Период сброса снапшота воркера на диск, сек")
+
+
+class HealthConfig(BaseModel):
+    """Liveness/readiness probe configuration."""
+
+    interval_sec: float = Field(default=10.0, gt=0, description="Период фоновой проверки зависимостей, сек")
+    probe_timeout_sec: float = Field(default=2.0, gt=0, description="Таймаут одной проверки, сек")
+    check_ldap: bool = Field(default=True, description="Учитывать доступность LDAP в readiness")
+
+
+class RateLimitRule(BaseModel):
+    """Token bucket applied to one route."""
+
+    path: str = Field(description="Путь относительно api.prefix; '*' в конце — префикс, например /auth/*")
+    per_minute: float = Field(gt=0, description="Скорость пополнения, запросов в минуту с одного IP")
+    burst: PositiveInt = Field(description="Сколько запросов подряд разрешено с одного IP")
+
+
+def _default_rate_limit_rules() -> list[RateLimitRule]:
+    return [
+        RateLimitRule(path="/auth/login", per_minute=10, burst=5),
+        RateLimitRule(path="/auth/refresh", per_minute=30, burst=10),
+    ]
+
+
+class RateLimitConfig(BaseModel):
+    """Per-client-IP rate limiting configuration."""
+
+    enabled: bool = Field(default=True, description="Включить ограничение частоты запросов")
+    backend: Literal["memory", "postgres"] = Field(
+        default="memory", description="memory — корзины в процессе; postgres — общие для всех воркеров"
+    )
+    rules: list[RateLimitRule] = Field(default_factory=_default_rate_limit_rules, description="Правила по роутам")
+    trust_forwarded_for: bool = Field(
+        default=False, description="Брать IP клиента из X-Forwarded-For (только за доверенным прокси)"
+    )
+    trusted_proxy_hops: PositiveInt = Field(
+        default=1,
+        description="Сколько доверенных прокси дописывают X-Forwarded-For; IP берётся на столько записей справа",
+    )
+    shards: PositiveInt = Field(default=16, description="Число независимо блокируемых частей in-memory таблицы")
+    idle_ttl_sec: float = Field(default=600.0, gt=0, description="Как часто удалять корзины неактивных клиентов, сек")
+
+
+class AdmissionClass(BaseModel):
+    """Concurrency budget of a group of routes."""
+
+    name: str = Field(description="Имя класса роутов (метка в метриках)")
+    paths: list[str] = Field(description="Пути относительно api.prefix; '*' в конце — префикс")
+    max_in_flight: PositiveInt = Field(description="Максимум одновременно обрабатываемых запросов на воркер")
+    queue_size: int = Field(default=0, ge=0, description="Сколько запросов может ждать свободного слота")
+    queue_timeout_sec: float = Field(default=0.5, gt=0, description="Сколько запрос ждёт в очереди до 503, сек")
+
+
+def _default_admission_classes() -> list[AdmissionClass]:
+    return [
+        AdmissionClass(name="auth", paths=["/auth/*"], max_in_flight=32, queue_size=64, queue_timeout_sec=0.5),
+        AdmissionClass(name="api", paths=["/*"], max_in_flight=256, queue_size=256, queue_timeout_sec=1.0),
+    ]
+
+
+class AdmissionConfig(BaseModel):
+    """Admission control (load shedding) configuration."""
+
+    enabled: bool = Field(default=True, description="Ограничивать число одновременных запросов")
+    classes: list[AdmissionClass] = Field(
+        default_factory=_default_admission_classes,
+        description="Классы роутов; запрос относится к первому подходящему",
+    )
+    exempt_paths: list[str] = Field(
+        default_factory=lambda: ["/health/*", "/metrics"],
+        description="Пути без ограничений (пробы, метрики)",
+    )
+    retry_after_sec: PositiveInt = Field(default=1, description="Значение Retry-After в ответе 503")
+
+
+class DeadlineConfig(BaseModel):
+    """Per-request deadline configuration."""
+
+    enabled: bool = Field(default=True, description="Ограничивать время обработки запроса")
+    default_timeout_sec: float = Field(default=30.0, gt=0, description="Бюджет запроса по умолчанию, сек")
+    max_timeout_sec: float = Field(
+        default=60.0, gt=0, description="Максимальный бюджет, который может запросить клиент"
+    )
+    header: str = Field(default="X-Request-Timeout", description="Заголовок с бюджетом запроса в секундах")
+    cancel_on_disconnect: bool = Field(default=True, description="Отменять обработку, если клиент отключился")
+    db_statement_timeout: bool = Field(
+        default=True, description="Передавать остаток бюджета в PostgreSQL как statement_timeout (SET LOCAL)"
+    )
 
 
 class CorsConfig(BaseModel):
@@ -61,18 +203,117 @@ class LdapGroupsConfig(BaseModel):
     viewer: str | None = Field(default=None, description="DN группы с правами просмотра")
 
 
+class RoleRule(BaseModel):
+    """Groups that grant a role."""
+
+    role: Literal["admin", "editor", "viewer"] = Field(description="Выдаваемая роль")
+    groups: list[str] = Field(
+        min_length=1, description="DN групп или только их CN; сравнение точное, без учёта регистра и пробелов"
+    )
+    priority: int = Field(default=0, description="Из нескольких подходящих ролей выбирается с наибольшим приоритетом")
+
+
+def _default_role_permissions() -> dict[Literal["admin", "editor", "viewer"], list[str]]:
+    return {
+        "admin": ["*"],
+        "editor": ["knowledge:read", "org:read", "segments:classify", "users:read"],
+        "viewer": ["knowledge:read", "segments:classify", "users:read"],
+    }
+
+
+class PermissionsConfig(BaseModel):
+    """Role resolution from LDAP groups and permissions of roles."""
+
+    rules: list[RoleRule] = Field(
+        default_factory=list,
+        description="Правила в дополнение к ldap.groups (admin — приоритет 30, editor — 20, viewer — 10)",
+    )
+    deny_groups: list[str] = Field(
+        default_factory=list, description="DN или CN групп, членство в которых запрещает вход при любой роли"
+    )
+    role_permissions: dict[Literal["admin", "editor", "viewer"], list[str]] = Field(
+        default_factory=_default_role_permissions, description="Права ролей; '*' — все права"
+    )
+
+
 class LdapConfig(BaseModel):
     """LDAP connection configuration."""
 
-    server_uri: str = Field(description="URI контроллера домена, например ldap://dc01:389")
+    server_uri: str = Field(default="", description="URI контроллера домена, например ldap://dc01:389")
+    servers: list[str] = Field(
+        default_factory=list,
+        description="Список URI контроллеров домена; если задан, используется вместо server_uri",
+    )
+    latency_ewma_alpha: float = Field(
+        default=0.3, gt=0, le=1, description="Вес нового замера в скользящем среднем латентности DC"
+    )
     base_dn: str = Field(description="Базовый DN для запросов (DC=example,DC=loc)")
     domain: str = Field(description="Короткое имя домена (EXAMPLE)")
     service_user: str = Field(description="Логин сервисного пользователя (DOMAIN\\\\account)")
     service_pass: SecretStr = Field(description="Пароль сервисного пользователя")
     connect_timeout: float = Field(default=5.0, description="Таймаут установления соединения, сек")
     search_timeout: float = Field(default=5.0, description="Таймаут поиска, сек")
+    tls_mode: Literal["none", "ldaps", "starttls"] = Field(
+        default="none",
+        description="Шифрование: none, ldaps (TLS с момента подключения) или starttls; URI ldaps:// всегда LDAPS",
+    )
+    tls_ca_file: Path | None = Field(default=None, description="PEM-бандл CA для проверки сертификата DC")
+    tls_validate: Literal["required", "optional", "none"] = Field(
+        default="required", description="Проверка сертификата DC: required (с проверкой имени), optional, none"
+    )
+    tls_session_reuse: bool = Field(
+        default=True, description="Возобновлять TLS-сессию с DC вместо полного рукопожатия на каждое подключение"
+    )
+    service_pool_size: int = Field(
+        default=4,
+        ge=0,
+        description="Сколько соединений сервисной учётки держать открытыми на каждый DC (0 — не держать)",
+    )
+    service_idle_timeout_sec: float = Field(
+        default=300.0, gt=0, description="Через сколько секунд простоя сервисное соединение закрывается"
+    )
+    breaker_failure_threshold: PositiveInt = Field(
+        default=5, description="Сколько подряд сетевых ошибок размыкают circuit breaker"
+    )
+    breaker_reset_timeout_sec: float = Field(
+        default=30.0, gt=0, description="Сколько секунд breaker разомкнут до пробных запросов"
+    )
+    breaker_half_open_probes: PositiveInt = Field(
+        default=1, description="Число одновременных пробных запросов в полуоткрытом состоянии"
+    )
     groups: LdapGroupsConfig = Field(default_factory=LdapGroupsConfig)
 
+    @model_validator(mode="after")
+    def _require_server(self) -> Self:
+        if not self.server_uris:
+            raise ValueError("Either server_uri or servers must be set")
+        return self
+
+    @property
+    def server_uris(self) -> list[str]:
+        """Configured DCs in priority order."""
+        return [uri for uri in self.servers if uri] or ([self.server_uri] if self.server_uri else [])
+
+
+class LockoutConfig(BaseModel):
+    """Failed-login lockout configuration."""
+
+    enabled: bool = Field(default=True, description="Блокировать вход после серии неудачных попыток")
+    backend: Literal["memory", "postgres"] = Field(
+        default="memory", description="Где хранить счётчики: memory (в процессе) или postgres (общие для воркеров)"
+    )
+    threshold: PositiveInt = Field(default=5, description="Сколько неудачных попыток подряд блокируют логин")
+    window_sec: float = Field(
+        default=900.0, gt=0, description="Через сколько секунд без ошибок счётчик логина сбрасывается"
+    )
+    lockout_sec: float = Field(
+        default=30.0, gt=0, description="Длительность первой блокировки, сек (далее удваивается)"
+    )
+    max_lockout_sec: float = Field(default=900.0, gt=0, description="Максимальная длительность блокировки, сек")
+    max_entries: PositiveInt = Field(
+        default=100_000, description="Сколько логинов держать в памяти (старые записи вытесняются)"
+    )
+
 
 class JwtConfig(BaseModel):
     """JWT configuration."""
@@ -105,6 +346,69 @@ class DifyConfig(BaseModel):
         default=30,
         description="HTTP timeout for Dify requests in seconds",
     )
+    connect_timeout_sec: float = Field(default=5.0, gt=0, description="Таймаут установки соединения с Dify, сек")
+    max_connections: PositiveInt = Field(default=50, description="Максимум соединений в пуле HTTP-клиента")
+    max_keepalive_connections: PositiveInt = Field(default=20, description="Сколько простаивающих соединений держать")
+    keepalive_expiry_sec: float = Field(default=30.0, gt=0, description="Время жизни простаивающего соединения, сек")
+    http2: bool = Field(default=True, description="HTTP/2, если установлен пакет h2")
+    max_concurrency: PositiveInt = Field(default=16, description="Одновременных запросов на один эндпоинт Dify")
+    endpoint_concurrency: dict[str, PositiveInt] = Field(
+        default_factory=dict,
+        description='Лимиты для отдельных эндпоинтов, например {"chat-messages": 8}',
+    )
+    max_retries: int = Field(default=2, ge=0, description="Повторы при 429/5xx и ошибках соединения")
+    retry_backoff_sec: float = Field(default=0.2, gt=0, description="Базовая задержка повтора (экспонента с джиттером)")
+    retry_backoff_max_sec: float = Field(default=5.0, gt=0, description="Потолок задержки повтора и Retry-After, сек")
+
+
+class SegmentConfig(BaseModel):
+    """Customer segment classification (Dify chat) and its caches."""
+
+    model: str = Field(default="customer-segment", description="Модель/приложение Dify — часть ключа кэша")
+    version: str = Field(default="1", description="Версия промпта; смена версии делает старые записи кэша промахами")
+    memory_max_entries: PositiveInt = Field(default=10_000, description="Размер LRU-кэша в памяти воркера")
+    memory_ttl_sec: float = Field(default=3600.0, gt=0, description="Время жизни записи в памяти, сек")
+    ttl_days: PositiveInt = Field(default=30, description="Время жизни записи в таблице customer_segment_cache, дни")
+    purge_interval_sec: float = Field(default=3600.0, gt=0, description="Как часто удалять просроченные записи, сек")
+    batch_max_names: PositiveInt = Field(default=500, description="Максимум названий в одном batch-запросе")
+    batch_concurrency: PositiveInt = Field(default=8, description="Одновременных вызовов Dify на batch-запрос")
+
+
+class KnowledgeConfig(BaseModel):
+    """Dify knowledge base retrieval cache and document ingestion."""
+
+    dataset_id: str = Field(default="", description="Датасет Dify по умолчанию для поиска и загрузки документов")
+    top_k: PositiveInt = Field(default=4, le=50, description="Сколько фрагментов возвращать по умолчанию")
+    cache_max_entries: PositiveInt = Field(default=2000, description="Размер LRU-кэша результатов поиска в воркере")
+    cache_ttl_sec: float = Field(default=300.0, gt=0, description="Время жизни результата поиска, сек")
+    generation_ttl_sec: float = Field(
+        default=5.0,
+        gt=0,
+        description="Как часто воркер перечитывает поколение датасета из БД, сек; задержка сброса кэша после загрузки",
+    )
+    ingest_concurrency: PositiveInt = Field(default=4, description="Одновременных загрузок документов в Dify")
+
+
+class OrgConfig(BaseModel):
+    """Reporting tree (org_closure) maintenance."""
+
+    maintain_closure: bool = Field(
+        default=True, description="Обновлять org_closure при синхронизации пользователя из AD (manager/directReports)"
+    )
+
+
+class UserSearchConfig(BaseModel):
+    """People search (pg_trgm) and its result cache."""
+
+    min_length: int = Field(
+        default=3, ge=3, description="Минимальная длина запроса; короче — пустой ответ без обращения к БД"
+    )
+    default_limit: PositiveInt = Field(default=10, description="Сколько пользователей возвращать по умолчанию")
+    max_limit: PositiveInt = Field(default=50, description="Жёсткий верхний предел числа результатов")
+    cache_max_entries: PositiveInt = Field(default=5000, description="Размер LRU-кэша результатов в воркере")
+    cache_ttl_sec: float = Field(
+        default=30.0, gt=0, description="Время жизни результата, сек; ограничивает устаревание справочника"
+    )
 
 
 class Settings(BaseSettings):
@@ -121,10 +425,21 @@ class Settings(BaseSettings):
     log: LoggingConfig = LoggingConfig()
     api: ApiConfig = ApiConfig()
     cors: CorsConfig = CorsConfig()
+    metrics: MetricsConfig = MetricsConfig()
+    health: HealthConfig = HealthConfig()
     db: DatabaseConfig
     ldap: LdapConfig
     jwt: JwtConfig
+    lockout: LockoutConfig = LockoutConfig()
+    permissions: PermissionsConfig = PermissionsConfig()
+    rate_limit: RateLimitConfig = RateLimitConfig()
+    admission: AdmissionConfig = AdmissionConfig()
+    deadline: DeadlineConfig = DeadlineConfig()
     dify: DifyConfig = DifyConfig()
+    segments: SegmentConfig = SegmentConfig()
+    knowledge: KnowledgeConfig = KnowledgeConfig()
+    user_search: UserSearchConfig = UserSearchConfig()
+    org: OrgConfig = OrgConfig()
 
 
 settings = Settings()  # type: ignore[call-arg]
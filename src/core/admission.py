@@ -0,0 +1,123 @@
+"""Concurrency limits with a short bounded wait queue (load shedding)."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Literal
+
+from core.metrics import metrics
+
+RejectReason = Literal["queue_full", "queue_timeout"]
+
+admission_in_flight = metrics.gauge("admission_in_flight", "Requests holding an admission slot", ("route_class",))
+admission_queued = metrics.gauge("admission_queued", "Requests waiting for an admission slot", ("route_class",))
+admission_queue_wait = metrics.histogram(
+    "admission_queue_wait_seconds", "Time admitted requests waited for a slot", ("route_class",)
+)
+admission_rejected_total = metrics.counter(
+    "admission_rejected_total", "Requests shed by admission control", ("route_class", "reason")
+)
+
+_limiters: dict[str, AdmissionLimiter] = {}
+
+
+class AdmissionRejectedError(Exception):
+    """No slot became available; the caller should answer 503 right away."""
+
+    def __init__(self, name: str, reason: RejectReason) -> None:
+        super().__init__(f"Admission for {name} rejected: {reason}")
+        self.name = name
+        self.reason = reason
+
+
+class AdmissionLimiter:
+    """At most ``max_in_flight`` holders; up to ``queue_size`` waiters for ``queue_timeout`` s.
+
+    Slots are handed to waiters in FIFO order on release, so a queued request
+    cannot be overtaken by a newcomer.  Everything beyond the queue is rejected
+    immediately: under overload it is better to fail a few requests fast than to
+    let every request wait until its client gives up.  Event-loop local, no locks.
+    """
+
+    def __init__(self, name: str, *, max_in_flight: int, queue_size: int, queue_timeout: float) -> None:
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.name = name
+        self.max_in_flight = max_in_flight
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        _limiters[name] = self
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> float:
+        """Take a slot; returns the seconds spent queued."""
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            admission_queue_wait.observe(0.0, self.name)
+            return 0.0
+        if self.queued >= self.queue_size:
+            self._reject("queue_full")
+        started = time.perf_counter()
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await waiter
+        except TimeoutError:
+            if not self._granted(waiter):
+                self._reject("queue_timeout")
+        except asyncio.CancelledError:
+            # A slot handed over while we were being cancelled must be passed on.
+            if self._granted(waiter):
+                self.release()
+            raise
+        waited = time.perf_counter() - started
+        admission_queue_wait.observe(waited, self.name)
+        return waited
+
+    def release(self) -> None:
+        """Hand the slot to the oldest live waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():  # skip waiters cancelled but not yet unqueued
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[float]:
+        waited = await self.acquire()
+        try:
+            yield waited
+        finally:
+            self.release()
+
+    def _granted(self, waiter: asyncio.Future[None]) -> bool:
+        """True if the slot was handed over; otherwise leave the queue."""
+        if waiter.done() and not waiter.cancelled():
+            return True
+        waiter.cancel()
+        with contextlib.suppress(ValueError):
+            self._waiters.remove(waiter)
+        return False
+
+    def _reject(self, reason: RejectReason) -> None:
+        admission_rejected_total.inc(self.name, reason)
+        raise AdmissionRejectedError(self.name, reason)
+
+
+admission_in_flight.set_function(lambda: [((name,), float(lim.in_flight)) for name, lim in _limiters.items()])
+admission_queued.set_function(lambda: [((name,), float(lim.queued)) for name, lim in _limiters.items()])
+
+
+__all__ = ["AdmissionLimiter", "AdmissionRejectedError", "RejectReason"]
@@ -0,0 +1,120 @@
+"""In-process caching: a TTL-bounded LRU and coalescing of concurrent identical loads."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Coroutine, Hashable
+from typing import Any, Generic, TypeVar
+
+from core.metrics import metrics
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+cache_lookups_total = metrics.counter("cache_lookups_total", "In-process cache lookups", ("cache", "result"))
+cache_entries = metrics.gauge("cache_entries", "Entries held by in-process caches", ("cache",))
+cache_coalesced_total = metrics.counter(
+    "cache_coalesced_total", "Loads that joined an identical load already in flight", ("cache",)
+)
+
+_caches: dict[str, TTLCache[object, object]] = {}
+
+
+class TTLCache(Generic[K, V]):
+    """Least-recently-used map of at most ``max_size`` entries, each valid for ``ttl`` seconds.
+
+    Expired entries are dropped when they are read or reach the LRU end.  Plain
+    dict operations only: safe within one event loop, not across threads.
+    """
+
+    def __init__(self, name: str, *, max_size: int, ttl: float, clock: Callable[[], float] = time.monotonic) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        _caches[name] = self  # type: ignore[assignment]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: K) -> bool:
+        return self.peek(key) is not None
+
+    def peek(self, key: K) -> V | None:
+        """The live value without touching its LRU position or the metrics."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= self._clock():
+            return None
+        return entry[1]
+
+    def get(self, key: K) -> V | None:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > self._clock():
+            self._entries.move_to_end(key)
+            cache_lookups_total.inc(self.name, "hit")
+            return entry[1]
+        if entry is not None:
+            del self._entries[key]
+        cache_lookups_total.inc(self.name, "miss")
+        return None
+
+    def set(self, key: K, value: V, *, ttl: float | None = None) -> None:
+        self._entries[key] = (self._clock() + (self.ttl if ttl is None else ttl), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def invalidate_where(self, predicate: Callable[[K], bool]) -> int:
+        """Drop every entry whose key matches; returns how many were dropped."""
+        keys = [key for key in self._entries if predicate(key)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class Coalescer(Generic[K, V]):
+    """Runs one load per key at a time; concurrent callers for that key share its result.
+
+    The load runs as its own task, so a caller that is cancelled (client gone,
+    deadline hit) does not cancel it for the others.  It inherits the context,
+    and thus the deadline, of the caller that started it.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._inflight: dict[K, asyncio.Task[V]] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def run(self, key: K, load: Callable[[], Coroutine[Any, Any, V]]) -> V:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(load())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            cache_coalesced_total.inc(self.name)
+        return await asyncio.shield(task)
+
+    def _finished(self, key: K, task: asyncio.Task[V]) -> None:
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every caller has gone away
+
+
+cache_entries.set_function(lambda: [((name,), float(len(cache))) for name, cache in _caches.items()])
+
+
+__all__ = ["Coalescer", "TTLCache"]
@@ -0,0 +1,171 @@
+"""Thread-safe circuit breaker for calls to remote dependencies."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Literal
+
+from core.deadline import DeadlineExceededError
+from core.metrics import metrics
+
+log = logging.getLogger(__name__)
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+ExceptionTypes = tuple[type[BaseException], ...]
+
+# The caller gave up: the dependency's health is unknown, so no state changes.
+_NEUTRAL_TYPES: ExceptionTypes = (DeadlineExceededError, asyncio.CancelledError)
+
+_STATE_VALUE: dict[CircuitState, float] = {"closed": 0.0, "half_open": 1.0, "open": 2.0}
+
+circuit_state = metrics.gauge(
+    "circuit_breaker_state", "Circuit state (0 closed, 1 half-open, 2 open)", ("name",), aggregate="max"
+)
+circuit_transitions_total = metrics.counter(
+    "circuit_breaker_transitions_total", "Circuit state transitions", ("name", "state")
+)
+circuit_rejected_total = metrics.counter(
+    "circuit_breaker_rejected_total", "Calls rejected by an open circuit", ("name",)
+)
+
+_breakers: dict[str, CircuitBreaker] = {}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the dependency while the circuit is open."""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"Circuit {name} is open")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Closed -> open after N consecutive failures -> half-open after a cool-down.
+
+    While open, ``attempt()`` raises :class:`CircuitOpenError` without touching the
+    dependency.  After ``reset_timeout`` seconds up to ``half_open_max_calls`` probe
+    calls are let through; one success closes the circuit, one failure re-opens it.
+    Only exceptions listed in ``failure_types`` count as failures: any other error
+    means the dependency answered (e.g. a rejected bind) and counts as success,
+    except deadline and cancellation errors, which release a probe slot and
+    change nothing else.
+    ``failure_types`` may also be a function returning them, called on first use,
+    so that the client library defining them does not have to be imported eagerly.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int,
+        reset_timeout: float,
+        half_open_max_calls: int = 1,
+        failure_types: ExceptionTypes | Callable[[], ExceptionTypes] = (Exception,),
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._failure_types = failure_types
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state: CircuitState = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        _breakers[name] = self
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            if self._state == "open" and self._clock() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return self._state
+
+    @property
+    def failure_types(self) -> ExceptionTypes:
+        if callable(self._failure_types):
+            self._failure_types = self._failure_types()
+        return self._failure_types
+
+    @contextmanager
+    def attempt(self) -> Iterator[None]:
+        """Guard one call to the dependency."""
+        probe = self._acquire()
+        try:
+            yield
+        except _NEUTRAL_TYPES:
+            self._release(probe)
+            raise
+        except self.failure_types:
+            self._on_failure(probe)
+            raise
+        except BaseException:
+            self._on_success(probe)
+            raise
+        self._on_success(probe)
+
+    def _acquire(self) -> bool:
+        with self._lock:
+            if self._state == "closed":
+                return False
+            now = self._clock()
+            if self._state == "open":
+                remaining = self.reset_timeout - (now - self._opened_at)
+                if remaining > 0:
+                    circuit_rejected_total.inc(self.name)
+                    raise CircuitOpenError(self.name, remaining)
+                self._transition("half_open")
+            if self._half_open_in_flight >= self.half_open_max_calls:
+                circuit_rejected_total.inc(self.name)
+                raise CircuitOpenError(self.name, self.reset_timeout)
+            self._half_open_in_flight += 1
+            return True
+
+    def _release(self, probe: bool) -> None:
+        if probe:
+            with self._lock:
+                self._half_open_in_flight -= 1
+
+    def _on_success(self, probe: bool) -> None:
+        with self._lock:
+            if probe:
+                self._half_open_in_flight -= 1
+            self._failures = 0
+            if self._state != "closed":
+                self._transition("closed")
+
+    def _on_failure(self, probe: bool) -> None:
+        with self._lock:
+            if probe:
+                self._half_open_in_flight -= 1
+            self._failures += 1
+            if self._state == "half_open" or (self._state == "closed" and self._failures >= self.failure_threshold):
+                self._opened_at = self._clock()
+                self._transition("open")
+
+    def _transition(self, state: CircuitState) -> None:
+        previous, self._state = self._state, state
+        circuit_transitions_total.inc(self.name, state)
+        if state == "open":
+            log.error("Circuit %s opened after %d consecutive failures (was %s)", self.name, self._failures, previous)
+        else:
+            log.warning("Circuit %s: %s -> %s", self.name, previous, state)
+
+
+def _state_samples() -> list[tuple[tuple[str, ...], float]]:
+    return [((name,), _STATE_VALUE[breaker.state]) for name, breaker in _breakers.items()]
+
+
+circuit_state.set_function(_state_samples)
+
+
+__all__ = ["CircuitBreaker", "CircuitOpenError", "CircuitState"]
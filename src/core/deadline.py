@@ -0,0 +1,62 @@
+"""Per-request deadline shared with everything the request calls into."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Absolute ``time.monotonic()`` after which nobody waits for the result.
+# ``asyncio.to_thread`` and SQLAlchemy's greenlets copy the context, so blocking
+# LDAP calls and session events see the deadline of the request they serve.
+deadline_var: ContextVar[float | None] = ContextVar("deadline", default=None)
+
+
+class DeadlineExceededError(Exception):
+    """The request's time budget ran out; further work would be wasted."""
+
+    def __init__(self, message: str = "Request deadline exceeded") -> None:
+        super().__init__(message)
+
+
+def remaining() -> float | None:
+    """Seconds left before the current deadline, ``None`` when there is none."""
+    expires = deadline_var.get()
+    return None if expires is None else expires - time.monotonic()
+
+
+def deadline_expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def cap_timeout(default: float) -> float:
+    """Timeout for the next blocking call: ``default`` cut to the remaining budget.
+
+    Raises :class:`DeadlineExceededError` when the budget is already spent, so that
+    no new network call starts on behalf of a caller that has given up.
+    """
+    left = remaining()
+    if left is None:
+        return default
+    if left <= 0:
+        raise DeadlineExceededError()
+    return min(default, left)
+
+
+@contextmanager
+def bind_deadline(seconds: float) -> Iterator[float]:
+    """Set a deadline ``seconds`` from now for the block; an enclosing one is never extended."""
+    expires = time.monotonic() + seconds
+    outer = deadline_var.get()
+    if outer is not None:
+        expires = min(expires, outer)
+    token = deadline_var.set(expires)
+    try:
+        yield expires
+    finally:
+        deadline_var.reset(token)
+
+
+__all__ = ["DeadlineExceededError", "bind_deadline", "cap_timeout", "deadline_var", "deadline_expired", "remaining"]
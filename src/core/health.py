@@ -0,0 +1,143 @@
+"""Background dependency probes with cached results for health endpoints."""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from core.metrics import metrics
+
+log = logging.getLogger(__name__)
+
+Probe = Callable[[], Awaitable[object]]
+Gate = Callable[[], str | None]
+
+health_check_up = metrics.gauge(
+    "health_check_up", "Last result of a readiness check (1 = ok)", ("check",), aggregate="min"
+)
+
+
+@dataclass(slots=True)
+class CheckResult:
+    """Cached outcome of a single check."""
+
+    name: str
+    ok: bool
+    error: str | None = None
+    latency_ms: float | None = None
+    checked_at: float | None = None
+
+
+class HealthMonitor:
+    """Run probes on an interval in the background and serve cached results.
+
+    *Probes* do I/O (``SELECT 1``, TCP connect to a DC) and only ever run in the
+    background task, each bounded by ``timeout``.  *Gates* are cheap in-memory checks
+    (pool exhaustion, open circuit) evaluated on every readiness request.  Probe
+    traffic therefore never opens connections or waits on a slow dependency.
+    """
+
+    def __init__(self, *, interval: float, timeout: float, stale_after: float | None = None) -> None:
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after if stale_after is not None else interval * 3 + timeout
+        self._probes: dict[str, Probe] = {}
+        self._gates: dict[str, Gate] = {}
+        self._results: dict[str, CheckResult] = {}
+        self._background: set[str] = set()
+        self._task: asyncio.Task[None] | None = None
+        health_check_up.set_function(lambda: [((r.name,), 1.0 if r.ok else 0.0) for r in self.results()])
+
+    def add_probe(self, name: str, probe: Probe, *, readiness: bool = True) -> None:
+        """Run ``probe`` every interval; with ``readiness=False`` only for its side effects, not reported."""
+        self._probes[name] = probe
+        if readiness:
+            self._results[name] = CheckResult(name=name, ok=False, error="pending")
+        else:
+            self._background.add(name)
+
+    def add_gate(self, name: str, gate: Gate) -> None:
+        self._gates[name] = gate
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="health-monitor")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    async def run_once(self) -> None:
+        """Run all probes concurrently and store their results."""
+        await asyncio.gather(*(self._check(name, probe) for name, probe in self._probes.items()))
+
+    async def _run(self) -> None:
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+    async def _check(self, name: str, probe: Probe) -> None:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(probe(), timeout=self.timeout)
+        except TimeoutError:
+            error: str | None = f"timed out after {self.timeout:g}s"
+        except Exception as exc:  # any failure means "not ready"
+            error = f"{type(exc).__name__}: {exc}"
+        else:
+            error = None
+        if name in self._background:
+            if error is not None:
+                log.debug("Background probe %s failed: %s", name, error)
+            return
+        previous = self._results.get(name)
+        result = CheckResult(
+            name=name,
+            ok=error is None,
+            error=error,
+            latency_ms=round((time.perf_counter() - started) * 1000, 3),
+            checked_at=time.time(),
+        )
+        self._results[name] = result
+        if previous is not None and previous.ok != result.ok:
+            if result.ok:
+                log.info("Health check %s recovered", name)
+            else:
+                log.warning("Health check %s failing: %s", name, error)
+
+    def results(self) -> list[CheckResult]:
+        """Cached probe results plus freshly evaluated gates."""
+        now = time.time()
+        results: list[CheckResult] = []
+        for result in self._results.values():
+            if result.checked_at is not None and now - result.checked_at > self.stale_after:
+                result = CheckResult(
+                    name=result.name,
+                    ok=False,
+                    error="stale result",
+                    latency_ms=result.latency_ms,
+                    checked_at=result.checked_at,
+                )
+            results.append(result)
+        for name, gate in self._gates.items():
+            try:
+                gate_error = gate()
+            except Exception as exc:  # a broken gate reports its error instead of failing the whole check
+                gate_error = f"{type(exc).__name__}: {exc}"
+            results.append(CheckResult(name=name, ok=gate_error is None, error=gate_error, checked_at=now))
+        return results
+
+    def is_ready(self) -> tuple[bool, list[CheckResult]]:
+        results = self.results()
+        return all(r.ok for r in results), results
+
+
+__all__ = ["CheckResult", "HealthMonitor", "Probe", "Gate"]
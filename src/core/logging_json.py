@@ -0,0 +1,69 @@
+"""JSON log formatter built on orjson."""
+
+from __future__ import annotations
+
+import logging
+from datetime import UTC, datetime
+from typing import Any
+
+import orjson
+
+# Attributes every LogRecord carries; anything else was passed via ``extra``.
+_RESERVED_ATTRS = frozenset(
+    {
+        "args",
+        "asctime",
+        "created",
+        "exc_info",
+        "exc_text",
+        "filename",
+        "funcName",
+        "levelname",
+        "levelno",
+        "lineno",
+        "message",
+        "module",
+        "msecs",
+        "msg",
+        "name",
+        "pathname",
+        "process",
+        "processName",
+        "relativeCreated",
+        "stack_info",
+        "taskName",
+        "thread",
+        "threadName",
+        "request_id",
+    }
+)
+
+
+class JsonFormatter(logging.Formatter):
+    """Render records as single-line JSON objects with stable field names.
+
+    Base fields: ``ts``, ``level``, ``logger``, ``msg``, ``requestId``, ``pid``, ``line``.
+    Values passed via ``extra`` (``route``, ``status``, ``duration_ms``…) are added as-is.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: dict[str, Any] = {
+            "ts": datetime.fromtimestamp(record.created, tz=UTC).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "requestId": getattr(record, "request_id", None),
+            "pid": record.process,
+            "line": f"{record.module}:{record.lineno}",
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            data["stack"] = self.formatStack(record.stack_info)
+        return orjson.dumps(data, default=str).decode()
+
+
+__all__ = ["JsonFormatter"]
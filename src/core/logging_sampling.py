@@ -0,0 +1,148 @@
+"""Sampling and duplicate suppression filters for noisy loggers."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import threading
+import time
+import weakref
+from collections.abc import Callable
+from dataclasses import dataclass
+
+_SUMMARY_ATTR = "_suppression_summary"
+
+SuppressionKey = tuple[str, int, str]
+
+_filters: weakref.WeakSet[RateLimitFilter] = weakref.WeakSet()
+
+
+@dataclass(slots=True)
+class _Window:
+    started: float
+    pathname: str
+    lineno: int
+    passed: int = 1
+    suppressed: int = 0
+
+
+class RateLimitFilter(logging.Filter):
+    """Collapse repeated identical records into periodic "N suppressed" summaries.
+
+    Records are keyed by logger name, level and the *unformatted* message template,
+    so the key is computed without rendering the message.  Within ``window`` seconds
+    the first ``limit`` records of a key pass; the rest are counted and dropped.
+    The summary of a closed window is emitted before the next record of that key,
+    or by :meth:`flush` (see :func:`run_summary_flusher`) if the burst has stopped.
+    Records below WARNING are additionally sampled by ``sample_rate``.
+    """
+
+    def __init__(
+        self,
+        *,
+        limit: int | None = None,
+        window: float = 60.0,
+        sample_rate: float = 1.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__()
+        self._limit = limit
+        self._window = window
+        self._sample_rate = sample_rate
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state: dict[SuppressionKey, _Window] = {}
+        _filters.add(self)
+
+    @property
+    def limit(self) -> int | None:
+        return self._limit
+
+    @property
+    def window(self) -> float:
+        return self._window
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, _SUMMARY_ATTR, False):
+            return True
+        if self._sample_rate < 1.0 and record.levelno < logging.WARNING and random.random() >= self._sample_rate:
+            return False
+        if self._limit is None:
+            return True
+
+        key: SuppressionKey = (record.name, record.levelno, str(record.msg))
+        now = self._clock()
+        closed: _Window | None = None
+        with self._lock:
+            state = self._state.get(key)
+            if state is None or now - state.started >= self._window:
+                if state is not None and state.suppressed:
+                    closed = state
+                self._state[key] = _Window(now, record.pathname, record.lineno)
+                if len(self._state) > 4096:
+                    self._evict(now)
+                allowed = True
+            elif state.passed < self._limit:
+                state.passed += 1
+                allowed = True
+            else:
+                state.suppressed += 1
+                allowed = False
+
+        if closed is not None:
+            self._emit_summary(key, closed)
+        return allowed
+
+    def flush(self) -> int:
+        """Emit summaries of windows that closed with suppressed records; returns how many."""
+        now = self._clock()
+        with self._lock:
+            closed = [(k, v) for k, v in self._state.items() if now - v.started >= self._window and v.suppressed]
+            for key, _ in closed:
+                del self._state[key]
+        for key, state in closed:
+            self._emit_summary(key, state)
+        return len(closed)
+
+    def _evict(self, now: float) -> None:
+        """Drop keys whose window expired without suppressing anything."""
+        stale = [k for k, v in self._state.items() if now - v.started >= self._window and not v.suppressed]
+        for k in stale:
+            del self._state[k]
+
+    def _emit_summary(self, key: SuppressionKey, state: _Window) -> None:
+        name, level, msg = key
+        summary = logging.LogRecord(
+            name,
+            level,
+            state.pathname,
+            state.lineno,
+            "%d similar records suppressed in the last %.0fs: %s",
+            (state.suppressed, self._window, msg),
+            None,
+        )
+        setattr(summary, _SUMMARY_ATTR, True)
+        summary.suppressed = state.suppressed
+        logging.getLogger(name).handle(summary)
+
+
+def flush_suppressed() -> int:
+    """:meth:`RateLimitFilter.flush` of every live filter."""
+    return sum(log_filter.flush() for log_filter in list(_filters))
+
+
+async def run_summary_flusher(interval: float) -> None:
+    """Flush suppression summaries every ``interval`` seconds until cancelled."""
+    while True:
+        await asyncio.sleep(interval)
+        flush_suppressed()
+
+
+def summary_flush_interval() -> float | None:
+    """Shortest window of the live rate-limiting filters; ``None`` when there are none."""
+    windows = [log_filter.window for log_filter in list(_filters) if log_filter.limit is not None]
+    return min(windows) if windows else None
+
+
+__all__ = ["RateLimitFilter", "flush_suppressed", "run_summary_flusher", "summary_flush_interval"]
@@ -1,6 +1,7 @@
 """Logging setup for console and file handlers."""
 
 import asyncio
+import contextlib
 import gzip
 import logging
 import logging.handlers
@@ -13,14 +14,17 @@ from typing import Any, cast
 
 from config import settings
 from config.settings import BASE_DIR, LoggingConfig
+from core.logging_json import JsonFormatter
+from core.logging_sampling import RateLimitFilter
+from core.request_context import get_request_id
 
 
 class RequestIdFilter(logging.Filter):
     """Ensure request_id is present on log records."""
 
     def filter(self, record: logging.LogRecord) -> bool:
-        if not hasattr(record, "request_id"):
-            record.request_id = "-"
+        if not getattr(record, "request_id", None):
+            record.request_id = get_request_id() or "-"
         return True
 
 
@@ -29,7 +33,7 @@ def setup_logging() -> None:
     log_cfg = cast(LoggingConfig, settings.log)
     level = getattr(logging, log_cfg.level.upper(), logging.INFO)
 
-    fmt = "%(asctime)s | %(levelname)s | %(process)d | %(pathname)s:%(lineno)d | rid=%(request_id)s | %(message)s"
+    fmt = "%(asctime)s | %(levelname)s | %(process)d | %(name)s:%(lineno)d | rid=%(request_id)s | %(message)s"
     datefmt = "%Y-%m-%d %H:%M:%S"
 
     log_dir = Path(log_cfg.file).parent if log_cfg.file else (BASE_DIR / "var" / "log")
@@ -68,8 +72,13 @@ def setup_logging() -> None:
         handlers=[console, fileh],
         force=True,
     )
+    if log_cfg.format == "json":
+        json_formatter = JsonFormatter()
+        console.setFormatter(json_formatter)
+        fileh.setFormatter(json_formatter)
 
     logging.getLogger("sqlalchemy").setLevel(getattr(logging, log_cfg.sa_level.upper(), logging.WARNING))
+    _configure_loggers(log_cfg)
 
     for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
         lg = logging.getLogger(name)
@@ -80,6 +89,57 @@ def setup_logging() -> None:
     _install_asyncio_exception_logging()
 
 
+def use_worker_file_handlers() -> None:
+    """In a forked worker: append to the log files without rotating them.
+
+    The inherited ``TimedRotatingFileHandler`` would rotate ``app.log`` in every
+    worker on its own, losing records written meanwhile.  It is replaced by a
+    ``WatchedFileHandler`` on the same file, which reopens it once the
+    supervisor has rotated it (see :func:`rotate_log_files`).
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if not isinstance(handler, logging.handlers.TimedRotatingFileHandler):
+            continue
+        worker = logging.handlers.WatchedFileHandler(handler.baseFilename, encoding=handler.encoding)
+        worker.setLevel(handler.level)
+        worker.setFormatter(handler.formatter)
+        for log_filter in handler.filters:
+            worker.addFilter(log_filter)
+        root.removeHandler(handler)
+        handler.close()  # this process's copy of the descriptor only
+        root.addHandler(worker)
+
+
+def rotate_log_files() -> None:
+    """Rotate the log files when due, without waiting for the next record of this process.
+
+    Called periodically by the supervisor, which logs too rarely for the
+    handler's own check on emit.
+    """
+    probe = logging.makeLogRecord({})
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.handlers.TimedRotatingFileHandler) and handler.shouldRollover(probe):
+            with contextlib.suppress(OSError):
+                handler.acquire()
+                try:
+                    handler.doRollover()
+                finally:
+                    handler.release()
+
+
+def _configure_loggers(log_cfg: LoggingConfig) -> None:
+    """Apply per-logger level, sampling and rate limiting."""
+    for name, cfg in log_cfg.loggers.items():
+        lg = logging.getLogger(name)
+        for old in [f for f in lg.filters if isinstance(f, RateLimitFilter)]:
+            lg.removeFilter(old)
+        if cfg.level:
+            lg.setLevel(getattr(logging, cfg.level.upper(), logging.INFO))
+        if cfg.rate_limit is not None or cfg.sample_rate < 1.0:
+            lg.addFilter(RateLimitFilter(limit=cfg.rate_limit, window=cfg.rate_window_sec, sample_rate=cfg.sample_rate))
+
+
 def _install_global_exception_logging() -> None:
     def _hook(
         exc_type: type[BaseException],
@@ -0,0 +1,362 @@
+"""In-process metrics registry with Prometheus text exposition.
+
+Counters, gauges and fixed-bucket histograms are kept in per-thread shards:
+the event loop thread and every ``asyncio.to_thread`` worker write to their own
+dicts, so updates take no locks and never race.  Shards are merged only when a
+snapshot is taken (scrape or multiprocess flush).
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import os
+import threading
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any, Literal, TypeVar
+
+MetricType = Literal["counter", "gauge", "histogram"]
+# How gauges of several worker processes combine: ``pid`` keeps one sample per worker under an extra label.
+GaugeAggregation = Literal["sum", "max", "min", "pid"]
+LabelValues = tuple[str, ...]
+
+DEFAULT_LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+M = TypeVar("M", bound="_Metric")
+
+# Snapshot layout (also the multiprocess file format):
+# {name: {"type": ..., "help": ..., "labels": [...], "buckets": [...]?, "aggregate": ...?,
+#         "samples": [[labels, value], ...]}}
+# For histograms each sample value is [bucket_counts..., sum, count] (non-cumulative bucket counts).
+Snapshot = dict[str, dict[str, Any]]
+
+
+class _Metric:
+    """Base metric bound to a registry's thread shards."""
+
+    type: MetricType
+
+    def __init__(self, registry: MetricsRegistry, name: str, help_text: str, labelnames: Sequence[str]) -> None:
+        self._registry = registry
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+
+    def _shard(self) -> dict[LabelValues, Any]:
+        return self._registry._shard(self.name)
+
+    def _key(self, labels: Sequence[str]) -> LabelValues:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(labels)
+
+    def describe(self) -> dict[str, Any]:
+        return {"type": self.type, "help": self.help, "labels": list(self.labelnames)}
+
+
+class Counter(_Metric):
+    """Monotonic counter."""
+
+    type: MetricType = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        shard = self._shard()
+        key = self._key(labels)
+        shard[key] = shard.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Point-in-time value.
+
+    Gauges are either set explicitly (last writer wins across shards) or computed at
+    scrape time through ``set_function``.  ``aggregate`` tells how the values of
+    several workers combine: counts of in-flight work add up, while states,
+    latencies and up/down flags take the worst worker (``max``/``min``).
+    """
+
+    type: MetricType = "gauge"
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str],
+        aggregate: GaugeAggregation = "sum",
+    ) -> None:
+        super().__init__(registry, name, help_text, labelnames)
+        self.aggregate = aggregate
+        self._values: dict[LabelValues, float] = {}
+        self._function: Callable[[], Iterable[tuple[LabelValues, float]]] | None = None
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[self._key(labels)] = float(value)
+
+    def set_function(self, fn: Callable[[], Iterable[tuple[LabelValues, float]]]) -> None:
+        """Compute samples lazily on every snapshot instead of storing them."""
+        self._function = fn
+
+    def samples(self) -> list[tuple[LabelValues, float]]:
+        samples = list(self._function()) if self._function is not None else list(self._values.items())
+        if self.aggregate == "pid":
+            pid = str(os.getpid())
+            return [((*labels, pid), value) for labels, value in samples]
+        return samples
+
+    def describe(self) -> dict[str, Any]:
+        data = super().describe()
+        data["aggregate"] = self.aggregate
+        if self.aggregate == "pid":
+            data["labels"].append("pid")
+        return data
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram; buckets are upper bounds in ascending order."""
+
+    type: MetricType = "histogram"
+
+    def __init__(
+        self,
+        registry: MetricsRegistry,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str],
+        buckets: Sequence[float],
+    ) -> None:
+        super().__init__(registry, name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labels: str) -> None:
+        shard = self._shard()
+        key = self._key(labels)
+        state = shard.get(key)
+        if state is None:
+            # one slot per bucket, one for +Inf, then sum and count
+            state = [0.0] * (len(self.buckets) + 3)
+            shard[key] = state
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-2] += value
+        state[-1] += 1
+
+    def describe(self) -> dict[str, Any]:
+        data = super().describe()
+        data["buckets"] = list(self.buckets)
+        return data
+
+
+class MetricsRegistry:
+    """Registry of named metrics; registering an existing name returns the same metric."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._local = threading.local()
+        self._shards: list[dict[str, dict[LabelValues, Any]]] = []
+        self._shards_lock = threading.Lock()
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, help_text, labelnames)
+
+    def gauge(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        *,
+        aggregate: GaugeAggregation = "sum",
+    ) -> Gauge:
+        existing = self._metrics.get(name)
+        if existing is not None:
+            return self._check_type(existing, Gauge)
+        metric = Gauge(self, name, help_text, labelnames, aggregate)
+        self._metrics[name] = metric
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ) -> Histogram:
+        existing = self._metrics.get(name)
+        if existing is not None:
+            return self._check_type(existing, Histogram)
+        metric = Histogram(self, name, help_text, labelnames, buckets)
+        self._metrics[name] = metric
+        return metric
+
+    def _register(self, cls: type[M], name: str, help_text: str, labelnames: Sequence[str]) -> M:
+        existing = self._metrics.get(name)
+        if existing is not None:
+            return self._check_type(existing, cls)
+        metric = cls(self, name, help_text, labelnames)
+        self._metrics[name] = metric
+        return metric
+
+    @staticmethod
+    def _check_type(metric: _Metric, cls: type[M]) -> M:
+        if not isinstance(metric, cls):
+            raise ValueError(f"Metric {metric.name} is already registered as {metric.type}")
+        return metric
+
+    def _shard(self, name: str) -> dict[LabelValues, Any]:
+        shards: dict[str, dict[LabelValues, Any]] | None = getattr(self._local, "shards", None)
+        if shards is None:
+            shards = {}
+            self._local.shards = shards
+            with self._shards_lock:
+                self._shards.append(shards)
+        values = shards.get(name)
+        if values is None:
+            values = shards[name] = {}
+        return values
+
+    def snapshot(self) -> Snapshot:
+        """Merge all thread shards into a serializable snapshot."""
+        with self._shards_lock:
+            shards = list(self._shards)
+        result: Snapshot = {}
+        for name, metric in list(self._metrics.items()):
+            entry = metric.describe()
+            if isinstance(metric, Gauge):
+                merged: dict[LabelValues, Any] = dict(metric.samples())
+            else:
+                merged = {}
+                for shard in shards:
+                    for key, value in list(shard.get(name, {}).items()):
+                        merged[key] = _add(merged.get(key), value)
+            entry["samples"] = [[list(key), value] for key, value in merged.items()]
+            result[name] = entry
+        return result
+
+    def render(self) -> str:
+        return render_snapshot(self.snapshot())
+
+    def reset(self) -> None:
+        """Drop recorded values (metric definitions stay registered)."""
+        with self._shards_lock:
+            for shard in self._shards:
+                shard.clear()
+        for metric in self._metrics.values():
+            if isinstance(metric, Gauge):
+                metric._values.clear()
+
+
+def _add(current: Any, value: Any) -> Any:
+    if current is None:
+        return list(value) if isinstance(value, list) else value
+    if isinstance(value, list):
+        return [a + b for a, b in zip(current, value, strict=True)]
+    return current + value
+
+
+def _combine(aggregate: GaugeAggregation) -> Callable[[Any, Any], Any]:
+    if aggregate == "max":
+        return lambda current, value: value if current is None else max(current, value)
+    if aggregate == "min":
+        return lambda current, value: value if current is None else min(current, value)
+    return _add
+
+
+def merge_snapshots(snapshots: Iterable[Snapshot], *, gauges: bool = True) -> Snapshot:
+    """Sum counters and histograms of several snapshots; gauges (optional) follow their ``aggregate``."""
+    result: Snapshot = {}
+    for snap in snapshots:
+        for name, entry in snap.items():
+            target = result.get(name)
+            if target is None:
+                target = result[name] = {k: v for k, v in entry.items() if k != "samples"}
+                target["samples"] = []
+            if entry["type"] == "gauge" and not gauges:
+                continue
+            combine = _combine(entry.get("aggregate", "sum")) if entry["type"] == "gauge" else _add
+            index = {tuple(labels): i for i, (labels, _) in enumerate(target["samples"])}
+            for labels, value in entry["samples"]:
+                i = index.get(tuple(labels))
+                if i is None:
+                    target["samples"].append([list(labels), combine(None, value)])
+                else:
+                    target["samples"][i][1] = combine(target["samples"][i][1], value)
+    return result
+
+
+def render_snapshot(snapshot: Snapshot) -> str:
+    """Render a snapshot in Prometheus text exposition format 0.0.4."""
+    lines: list[str] = []
+    for name in sorted(snapshot):
+        entry = snapshot[name]
+        lines.append(f"# HELP {name} {_escape_help(entry['help'])}")
+        lines.append(f"# TYPE {name} {entry['type']}")
+        labelnames: list[str] = entry["labels"]
+        for labels, value in sorted(entry["samples"], key=lambda s: s[0]):
+            pairs = list(zip(labelnames, labels, strict=True))
+            if entry["type"] != "histogram":
+                lines.append(f"{name}{_labels(pairs)} {_num(value)}")
+                continue
+            cumulative = 0.0
+            bounds = [*entry["buckets"], math.inf]
+            for bound, count in zip(bounds, value[:-2], strict=True):
+                cumulative += count
+                le = "+Inf" if bound == math.inf else _num(bound)
+                lines.append(f"{name}_bucket{_labels([*pairs, ('le', le)])} {_num(cumulative)}")
+            lines.append(f"{name}_sum{_labels(pairs)} {_num(value[-2])}")
+            lines.append(f"{name}_count{_labels(pairs)} {_num(value[-1])}")
+    lines.append("")
+    return "\n".join(lines)
+
+
+def _labels(pairs: Sequence[tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    inner = ",".join(f'{k}="{_escape_label(str(v))}"' for k, v in pairs)
+    return "{" + inner + "}"
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _escape_help(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _num(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+metrics = MetricsRegistry()
+
+
+__all__ = [
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "GaugeAggregation",
+    "MetricsRegistry",
+    "LabelValues",
+    "Snapshot",
+    "DEFAULT_LATENCY_BUCKETS",
+    "merge_snapshots",
+    "render_snapshot",
+    "metrics",
+]
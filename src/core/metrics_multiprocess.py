@@ -0,0 +1,93 @@
+"""File-based aggregation of metrics across uvicorn worker processes.
+
+Every worker periodically writes its own snapshot to ``<dir>/metrics-<pid>.json``
+(write-to-temp + rename, so readers never see partial files).  The worker that
+serves a scrape merges its live registry with the files of all other workers.
+Counters and histograms of exited workers are kept so totals stay monotonic;
+their gauges are dropped because they no longer describe anything.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+import orjson
+
+from core.metrics import MetricsRegistry, Snapshot, merge_snapshots
+
+log = logging.getLogger(__name__)
+
+_FILE_PREFIX = "metrics-"
+
+
+def _snapshot_path(directory: Path, pid: int) -> Path:
+    return directory / f"{_FILE_PREFIX}{pid}.json"
+
+
+def write_snapshot(registry: MetricsRegistry, directory: str | Path) -> None:
+    """Persist the current process snapshot."""
+    path = Path(directory)
+    path.mkdir(parents=True, exist_ok=True)
+    target = _snapshot_path(path, os.getpid())
+    tmp = target.with_suffix(".tmp")
+    tmp.write_bytes(orjson.dumps(registry.snapshot()))
+    os.replace(tmp, target)
+
+
+async def run_flusher(registry: MetricsRegistry, directory: str | Path, interval: float) -> None:
+    """Write the snapshot every ``interval`` seconds until cancelled, then once more."""
+    try:
+        while True:
+            await asyncio.sleep(interval)
+            await asyncio.to_thread(write_snapshot, registry, directory)
+    finally:
+        write_snapshot(registry, directory)
+
+
+def collect(registry: MetricsRegistry, directory: str | Path) -> Snapshot:
+    """Merge the live registry with snapshots written by other workers."""
+    own_pid = os.getpid()
+    live: list[Snapshot] = [registry.snapshot()]
+    dead: list[Snapshot] = []
+    for file in Path(directory).glob(f"{_FILE_PREFIX}*.json"):
+        try:
+            pid = int(file.stem.removeprefix(_FILE_PREFIX))
+        except ValueError:
+            continue
+        if pid == own_pid:
+            continue
+        try:
+            snapshot: Snapshot = orjson.loads(file.read_bytes())
+        except (OSError, orjson.JSONDecodeError) as exc:
+            log.warning("Skipping unreadable metrics file %s: %s", file, exc)
+            continue
+        (live if _pid_alive(pid) else dead).append(snapshot)
+    merged = merge_snapshots(live)
+    if dead:
+        merged = merge_snapshots([merged, merge_snapshots(dead, gauges=False)])
+    return merged
+
+
+def clear_snapshots(directory: str | Path) -> int:
+    """Remove snapshots of a previous server run; call before workers start."""
+    removed = 0
+    for file in Path(directory).glob(f"{_FILE_PREFIX}*"):
+        file.unlink(missing_ok=True)
+        removed += 1
+    return removed
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+__all__ = ["write_snapshot", "run_flusher", "collect", "clear_snapshots"]
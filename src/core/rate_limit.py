@@ -0,0 +1,100 @@
+"""Token-bucket rate limiting keyed by an arbitrary string (client IP, login)."""
+
+from __future__ import annotations
+
+import threading
+import time
+import zlib
+from collections.abc import Callable
+from typing import Protocol
+
+
+class RateLimiter(Protocol):
+    """Take one token for ``key``; returns 0 when allowed, else seconds until a token is available."""
+
+    async def acquire(self, key: str) -> float: ...
+
+
+def refill(tokens: float, elapsed: float, *, rate: float, burst: float) -> float:
+    """Bucket level after ``elapsed`` seconds of refilling at ``rate`` tokens/s, capped at ``burst``."""
+    return min(burst, tokens + elapsed * rate)
+
+
+class _Shard:
+    __slots__ = ("lock", "buckets", "swept_at")
+
+    def __init__(self, now: float) -> None:
+        self.lock = threading.Lock()
+        # key -> [tokens, updated_at]
+        self.buckets: dict[str, list[float]] = {}
+        self.swept_at = now
+
+
+class TokenBuckets:
+    """In-memory token buckets split over ``shards`` independently locked maps.
+
+    Buckets are refilled lazily on access, so an idle key costs nothing.  A bucket
+    untouched for ``burst / rate`` seconds is full again and therefore identical to
+    a missing one; each shard drops such buckets at most every ``sweep_interval``
+    seconds, which bounds memory to the keys active within roughly that period.
+    """
+
+    def __init__(
+        self,
+        *,
+        rate: float,
+        burst: int,
+        shards: int = 16,
+        sweep_interval: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = float(burst)
+        self._clock = clock
+        self._sweep_interval = sweep_interval
+        self._full_after = self.burst / rate
+        now = clock()
+        self._shards = [_Shard(now) for _ in range(shards)]
+
+    def __len__(self) -> int:
+        return sum(len(shard.buckets) for shard in self._shards)
+
+    def take(self, key: str) -> float:
+        """Consume one token; returns 0 when allowed, else seconds to wait."""
+        shard = self._shards[zlib.crc32(key.encode()) % len(self._shards)]
+        now = self._clock()
+        with shard.lock:
+            bucket = shard.buckets.get(key)
+            if bucket is None:
+                if now - shard.swept_at >= self._sweep_interval:
+                    self._sweep(shard, now)
+                shard.buckets[key] = [self.burst - 1, now]
+                return 0.0
+            tokens = refill(bucket[0], now - bucket[1], rate=self.rate, burst=self.burst)
+            bucket[1] = now
+            if tokens >= 1:
+                bucket[0] = tokens - 1
+                return 0.0
+            bucket[0] = tokens
+            return (1 - tokens) / self.rate
+
+    def _sweep(self, shard: _Shard, now: float) -> None:
+        idle = [key for key, (_, updated) in shard.buckets.items() if now - updated >= self._full_after]
+        for key in idle:
+            del shard.buckets[key]
+        shard.swept_at = now
+
+
+class MemoryRateLimiter:
+    """Per-process :class:`RateLimiter` backed by :class:`TokenBuckets`."""
+
+    def __init__(self, buckets: TokenBuckets) -> None:
+        self.buckets = buckets
+
+    async def acquire(self, key: str) -> float:
+        return self.buckets.take(key)
+
+
+__all__ = ["MemoryRateLimiter", "RateLimiter", "TokenBuckets", "refill"]
@@ -0,0 +1,23 @@
+"""Per-request context shared with logging and instrumentation."""
+
+from __future__ import annotations
+
+from contextvars import ContextVar
+from typing import Any
+
+request_id_var: ContextVar[str | None] = ContextVar("request_id", default=None)
+
+
+def get_request_id() -> str | None:
+    """Return request id bound to the current context."""
+    return request_id_var.get()
+
+
+def route_template(scope: Any) -> str:
+    """Return matched route template (``/api/v1/auth/login``) of an ASGI scope or the raw path."""
+    route: Any = scope.get("route")
+    path = getattr(route, "path", None)
+    return path if isinstance(path, str) else scope.get("path", "")
+
+
+__all__ = ["request_id_var", "get_request_id", "route_template"]
@@ -1,21 +1,44 @@
 """Database engine helpers."""
 
 import logging
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Iterator
 from contextlib import asynccontextmanager
+from typing import Any
 
-from sqlalchemy import text
+from sqlalchemy import Connection, event, text
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.orm import Session, SessionTransaction
 
 from config import settings
+from core.deadline import DeadlineExceededError, remaining
+from core.metrics import LabelValues, metrics
 
 log = logging.getLogger(__name__)
 
+db_pool_connections = metrics.gauge(
+    "db_pool_connections", "Connection pool usage by state", ("state",), aggregate="pid"
+)
+
+
+class DeadlineSession(Session):
+    """Session whose transactions inherit the request deadline as ``statement_timeout``."""
+
+
+@event.listens_for(DeadlineSession, "after_begin")
+def _apply_deadline(_session: Session, _transaction: SessionTransaction, connection: Connection) -> None:
+    """``SET LOCAL`` ends with the transaction, so pooled connections keep the server default."""
+    left = remaining()
+    if left is None:
+        return
+    if left <= 0:
+        raise DeadlineExceededError()
+    connection.execute(text(f"SET LOCAL statement_timeout = {max(1, int(left * 1000))}"))
+
 
 class DatabaseHelper:
     """Async database helper with session and transaction contexts."""
@@ -25,6 +48,7 @@ class DatabaseHelper:
         url: str,
         *,
         echo: bool = False,
+        statement_deadline: bool = False,
     ) -> None:
         self.engine: AsyncEngine = create_async_engine(
             url=url,
@@ -35,8 +59,34 @@ class DatabaseHelper:
             autoflush=False,
             autocommit=False,
             expire_on_commit=False,
+            sync_session_class=DeadlineSession if statement_deadline else Session,
         )
 
+    def pool_status(self) -> dict[str, int]:
+        """Return pool counters; empty for pools without bookkeeping (NullPool)."""
+        pool: Any = self.engine.pool
+        status: dict[str, int] = {}
+        for state, attr in (
+            ("size", "size"),
+            ("checked_out", "checkedout"),
+            ("checked_in", "checkedin"),
+            ("overflow", "overflow"),
+        ):
+            fn = getattr(pool, attr, None)
+            if callable(fn):
+                status[state] = int(fn())
+        max_overflow = getattr(pool, "_max_overflow", None)
+        if isinstance(max_overflow, int):
+            status["max_overflow"] = max_overflow
+        return status
+
+    def pool_exhausted(self) -> bool:
+        """True when every pooled and overflow connection is checked out."""
+        status = self.pool_status()
+        if "size" not in status or "max_overflow" not in status or status["max_overflow"] < 0:
+            return False
+        return status.get("checked_out", 0) >= status["size"] + status["max_overflow"]
+
     async def dispose(self) -> None:
         await self.engine.dispose()
         log.info("Database engine disposed")
@@ -64,4 +114,13 @@ class DatabaseHelper:
 db = DatabaseHelper(
     url=str(settings.db.url),
     echo=settings.db.echo,
+    statement_deadline=settings.deadline.enabled and settings.deadline.db_statement_timeout,
 )
+
+
+def _pool_samples() -> Iterator[tuple[LabelValues, float]]:
+    for state, value in db.pool_status().items():
+        yield (state,), float(value)
+
+
+db_pool_connections.set_function(_pool_samples)
@@ -1,6 +1,19 @@
 """ORM models package."""
 
 from db.base import Base
+from db.models.auth.login_failure import LoginFailure
+from db.models.knowledge.dataset_generation import KbDatasetGeneration
+from db.models.org.closure import OrgClosure
+from db.models.segments.customer_segment import CustomerSegmentCache
+from db.models.system.rate_limit_bucket import RateLimitBucket
 from db.models.user.user import User
 
-__all__ = ["Base", "User"]
+__all__ = [
+    "Base",
+    "CustomerSegmentCache",
+    "KbDatasetGeneration",
+    "LoginFailure",
+    "OrgClosure",
+    "RateLimitBucket",
+    "User",
+]
@@ -0,0 +1,5 @@
+"""Auth models package."""
+
+from db.models.auth.login_failure import LoginFailure
+
+__all__ = ["LoginFailure"]
@@ -0,0 +1,23 @@
+"""Failed-login counter ORM model."""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, Integer, SmallInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import Base
+
+
+class LoginFailure(Base):
+    """Consecutive failed logins per account, shared by all workers."""
+
+    __tablename__ = "login_failures"
+
+    login: Mapped[str] = mapped_column(String(128), primary_key=True)
+    failures: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    lockouts: Mapped[int] = mapped_column(SmallInteger, nullable=False, default=0)
+    last_failure_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    locked_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+__all__ = ["LoginFailure"]
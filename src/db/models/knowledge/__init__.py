@@ -0,0 +1,5 @@
+"""Knowledge base models package."""
+
+from db.models.knowledge.dataset_generation import KbDatasetGeneration
+
+__all__ = ["KbDatasetGeneration"]
@@ -0,0 +1,21 @@
+"""Knowledge base dataset generation ORM model."""
+
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import Base
+
+
+class KbDatasetGeneration(Base):
+    """Counter bumped whenever documents of a Dify dataset change; part of every retrieval cache key."""
+
+    __tablename__ = "kb_dataset_generations"
+
+    dataset_id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    generation: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+__all__ = ["KbDatasetGeneration"]
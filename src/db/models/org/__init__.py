@@ -0,0 +1,5 @@
+"""Org structure models package."""
+
+from db.models.org.closure import OrgClosure
+
+__all__ = ["OrgClosure"]
@@ -0,0 +1,28 @@
+"""Reporting tree closure ORM model."""
+
+from sqlalchemy import CheckConstraint, ForeignKey, Index, SmallInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import Base
+
+
+class OrgClosure(Base):
+    """Every (manager, report) pair of the reporting tree at any depth; ``depth`` 1 is a direct report.
+
+    A user is not stored as its own ancestor: "X is Y or reports to Y" is
+    ``x == y`` or one primary key probe.
+    """
+
+    __tablename__ = "org_closure"
+    __table_args__ = (
+        CheckConstraint("depth > 0", name="depth_positive"),
+        Index("ix_org_closure_ancestor_id_depth", "ancestor_id", "depth", "descendant_id"),
+        Index("ix_org_closure_descendant_id_depth", "descendant_id", "depth", "ancestor_id"),
+    )
+
+    ancestor_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    depth: Mapped[int] = mapped_column(SmallInteger, nullable=False)
+
+
+__all__ = ["OrgClosure"]
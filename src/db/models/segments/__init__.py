@@ -0,0 +1,5 @@
+"""Customer segment models package."""
+
+from db.models.segments.customer_segment import CustomerSegmentCache
+
+__all__ = ["CustomerSegmentCache"]
@@ -0,0 +1,24 @@
+"""Cached customer segment classification ORM model."""
+
+from datetime import datetime
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import Base
+
+
+class CustomerSegmentCache(Base):
+    """Segment assigned by Dify to a normalized customer name, per model and prompt version."""
+
+    __tablename__ = "customer_segment_cache"
+
+    name_key: Mapped[str] = mapped_column(String(512), primary_key=True)
+    model: Mapped[str] = mapped_column(String(128), primary_key=True)
+    version: Mapped[str] = mapped_column(String(64), primary_key=True)
+    segment: Mapped[str] = mapped_column(String(256), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+
+__all__ = ["CustomerSegmentCache"]
@@ -0,0 +1,5 @@
+"""System models package."""
+
+from db.models.system.rate_limit_bucket import RateLimitBucket
+
+__all__ = ["RateLimitBucket"]
@@ -0,0 +1,22 @@
+"""Shared token bucket ORM model."""
+
+from datetime import datetime
+
+from sqlalchemy import Boolean, DateTime, Float, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from db.base import Base
+
+
+class RateLimitBucket(Base):
+    """Token bucket state shared by all workers; ``allowed`` is the outcome of the last take."""
+
+    __tablename__ = "rate_limit_buckets"
+
+    key: Mapped[str] = mapped_column(String(256), primary_key=True)
+    tokens: Mapped[float] = mapped_column(Float, nullable=False)
+    allowed: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+
+
+__all__ = ["RateLimitBucket"]
@@ -1,9 +1,10 @@
 """User ORM model."""
 
 from datetime import datetime
+from typing import Any, cast
 from uuid import UUID
 
-from sqlalchemy import ARRAY, Boolean, DateTime, Integer, String, text
+from sqlalchemy import ARRAY, Boolean, DateTime, Index, Integer, String, Table, collate, func, literal_column, text
 from sqlalchemy.dialects.postgresql import UUID as PGUUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -18,7 +19,8 @@ class User(Base, SurrogateIntPKMixin, TimestampMixin):
 
     ad_guid: Mapped[UUID] = mapped_column(PGUUID(as_uuid=True), nullable=False, unique=True)
     ad_login: Mapped[str] = mapped_column(String(128), nullable=False, unique=True)
-    full_name: Mapped[str | None] = mapped_column(String(256), nullable=True)
+    # Logins look the manager up by name: the AD "manager" attribute holds a CN.
+    full_name: Mapped[str | None] = mapped_column(String(256), nullable=True, index=True)
     email: Mapped[str | None] = mapped_column(String(256), nullable=True)
     department: Mapped[str | None] = mapped_column(String(256), nullable=True)
     title: Mapped[str | None] = mapped_column(String(256), nullable=True)
@@ -29,4 +31,53 @@ class User(Base, SurrogateIntPKMixin, TimestampMixin):
     role: Mapped[str] = mapped_column(String(64), nullable=True)
 
 
-__all__ = ["User"]
+# Sort keys of the user listing.  The "C" collation lets one btree serve both the
+# ORDER BY and prefix range filters; the listing queries must use these exact
+# expressions for the indexes below to apply.
+USER_NAME_SORT_KEY = collate(func.lower(func.coalesce(User.full_name, literal_column("''"))), "C")
+USER_LOGIN_SORT_KEY = collate(User.ad_login, "C")
+
+# Listing columns carried in the sort indexes, so a page is an index-only scan.
+USER_LISTING_INCLUDE = ["ad_login", "full_name", "email", "department", "title", "role", "is_active", "last_login_at"]
+
+Index("ix_users_name_sort", USER_NAME_SORT_KEY, User.id, postgresql_include=USER_LISTING_INCLUDE)
+Index(
+    "ix_users_login_sort",
+    USER_LOGIN_SORT_KEY,
+    postgresql_include=[column for column in USER_LISTING_INCLUDE if column != "ad_login"],
+)
+Index("ix_users_department_name_sort", User.department, USER_NAME_SORT_KEY, User.id)
+
+
+def _search_part(column: Any) -> Any:
+    return func.coalesce(column, literal_column("''"))
+
+
+# Text matched by the people search: name, login, e-mail and department, case-folded
+# with ``ё`` -> ``е``.  Only immutable operators (``||``, not ``concat_ws``) so it can
+# be indexed; the search queries must use this exact expression for the index to apply.
+USER_SEARCH_DOCUMENT = func.replace(
+    func.lower(
+        _search_part(User.full_name)
+        .op("||")(literal_column("' '"))
+        .op("||")(User.ad_login)
+        .op("||")(literal_column("' '"))
+        .op("||")(_search_part(User.email))
+        .op("||")(literal_column("' '"))
+        .op("||")(_search_part(User.department))
+    ),
+    literal_column("'ё'"),
+    literal_column("'е'"),
+)
+
+Index(
+    "ix_users_search_trgm",
+    USER_SEARCH_DOCUMENT.label("search_document"),
+    postgresql_using="gin",
+    postgresql_ops={"search_document": "gin_trgm_ops"},
+    # SQLAlchemy does not infer the table of this expression, so it is given explicitly.
+    _table=cast(Table, User.__table__),
+)
+
+
+__all__ = ["USER_LOGIN_SORT_KEY", "USER_NAME_SORT_KEY", "USER_SEARCH_DOCUMENT", "User"]
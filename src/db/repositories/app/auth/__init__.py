@@ -1,5 +1,13 @@
 """Auth-related repository exports."""
 
+from .login_failures import delete_login_failure, get_login_failure, lock_login_failure, purge_login_failures
 from .users import deactivate_user_by_guid, sync_user_from_directory
 
-__all__ = ["sync_user_from_directory", "deactivate_user_by_guid"]
+__all__ = [
+    "sync_user_from_directory",
+    "deactivate_user_by_guid",
+    "get_login_failure",
+    "lock_login_failure",
+    "delete_login_failure",
+    "purge_login_failures",
+]
@@ -0,0 +1,49 @@
+"""Failed-login counter repository functions."""
+
+from datetime import datetime
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models.auth import LoginFailure
+
+
+async def get_login_failure(session: AsyncSession, login: str) -> LoginFailure | None:
+    """Return the failure counter of a login, if any."""
+    return await session.get(LoginFailure, login)
+
+
+async def lock_login_failure(session: AsyncSession, login: str, *, now: datetime) -> LoginFailure:
+    """Return the counter row of a login locked FOR UPDATE, creating an empty one first."""
+    await session.execute(
+        insert(LoginFailure)
+        .values(login=login, failures=0, lockouts=0, last_failure_at=now, locked_until=None)
+        .on_conflict_do_nothing(index_elements=[LoginFailure.login])
+    )
+    result = await session.execute(
+        select(LoginFailure)
+        .where(LoginFailure.login == login)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
+async def delete_login_failure(session: AsyncSession, login: str) -> None:
+    """Forget failures of a login."""
+    await session.execute(delete(LoginFailure).where(LoginFailure.login == login))
+
+
+async def purge_login_failures(session: AsyncSession, *, idle_before: datetime, now: datetime) -> int:
+    """Delete counters idle since ``idle_before`` that are not locked; returns the number removed."""
+    result = await session.execute(
+        delete(LoginFailure).where(
+            LoginFailure.last_failure_at < idle_before,
+            or_(LoginFailure.locked_until.is_(None), LoginFailure.locked_until <= now),
+        )
+    )
+    return int(getattr(result, "rowcount", 0) or 0)
+
+
+__all__ = ["get_login_failure", "lock_login_failure", "delete_login_failure", "purge_login_failures"]
@@ -7,6 +7,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from db.models.user import User
+from db.repositories.app.org import sync_reporting_lines
 
 
 async def sync_user_from_directory(
@@ -22,11 +23,17 @@ async def sync_user_from_directory(
     supervisor: str,
     update_last_login: bool,
     role: str,
+    reporting_lines: bool = True,
 ) -> User:
-    """Create or update a user from directory data."""
+    """Create or update a user from directory data.
+
+    With ``reporting_lines`` the ``org_closure`` tree follows ``supervisor`` (a
+    manager CN, matched to a unique ``full_name``) and ``subordinates``.
+    """
     stmt = select(User).where(User.ad_guid == ad_guid)
     result = await session.execute(stmt)
     user = result.scalar_one_or_none()
+    is_new = user is None
     if not user:
         user = User(ad_guid=ad_guid, ad_login=ad_login)
         session.add(user)
@@ -44,9 +51,26 @@ async def sync_user_from_directory(
         user.last_login_at = datetime.now(tz=UTC)
 
     await session.flush()
+    if reporting_lines:
+        manager_id = await _find_manager_id(session, supervisor, user.id) if supervisor else None
+        await sync_reporting_lines(
+            session,
+            user.id,
+            manager_id=manager_id,
+            keep_manager=bool(supervisor) and manager_id is None,
+            report_ids=subordinates,
+            is_new=is_new,
+        )
     return user
 
 
+async def _find_manager_id(session: AsyncSession, name: str, user_id: int) -> int | None:
+    """Id of the one other user named ``name``; ``None`` if unknown or ambiguous."""
+    result = await session.execute(select(User.id).where(User.full_name == name))
+    ids = [found for found in result.scalars().all() if found != user_id]
+    return ids[0] if len(ids) == 1 else None
+
+
 async def deactivate_user_by_guid(session: AsyncSession, ad_guid: UUID) -> None:
     """Deactivate user by AD GUID."""
     stmt = select(User).where(User.ad_guid == ad_guid)
@@ -0,0 +1,5 @@
+"""Knowledge base repository exports."""
+
+from .generations import bump_dataset_generation, get_dataset_generation
+
+__all__ = ["get_dataset_generation", "bump_dataset_generation"]
@@ -0,0 +1,31 @@
+"""Knowledge base dataset generation repository functions."""
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models.knowledge import KbDatasetGeneration
+
+
+async def get_dataset_generation(session: AsyncSession, dataset_id: str) -> int:
+    """Current generation of ``dataset_id``; 0 until its documents first change."""
+    stmt = select(KbDatasetGeneration.generation).where(KbDatasetGeneration.dataset_id == dataset_id)
+    return int((await session.execute(stmt)).scalar_one_or_none() or 0)
+
+
+async def bump_dataset_generation(session: AsyncSession, dataset_id: str) -> int:
+    """Increment the generation of ``dataset_id`` in a single upsert and return the new value."""
+    row = KbDatasetGeneration.__table__.c
+    stmt = (
+        insert(KbDatasetGeneration)
+        .values(dataset_id=dataset_id, generation=1, updated_at=func.now())
+        .on_conflict_do_update(
+            index_elements=[row.dataset_id],
+            set_={"generation": row.generation + 1, "updated_at": func.now()},
+        )
+        .returning(row.generation)
+    )
+    return int((await session.execute(stmt)).scalar_one())
+
+
+__all__ = ["get_dataset_generation", "bump_dataset_generation"]
@@ -0,0 +1,25 @@
+"""Org structure repository exports."""
+
+from .closure import (
+    ORG_LOCK_KEY,
+    chain_query,
+    get_chain_depth,
+    get_manager_id,
+    get_report_ids,
+    lock_org,
+    move_subtree,
+    subtree_query,
+    sync_reporting_lines,
+)
+
+__all__ = [
+    "ORG_LOCK_KEY",
+    "chain_query",
+    "get_chain_depth",
+    "get_manager_id",
+    "get_report_ids",
+    "lock_org",
+    "move_subtree",
+    "subtree_query",
+    "sync_reporting_lines",
+]
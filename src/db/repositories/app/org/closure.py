@@ -0,0 +1,166 @@
+"""Reporting tree repository functions over the ``org_closure`` table.
+
+Reads are single indexed lookups.  A change of reporting line moves the
+user's whole subtree with two set-based statements: the pairs linking the
+subtree to its old ancestors are deleted, and the cross product of the new
+manager's ancestors with the subtree is inserted.  Moves take a transaction
+advisory lock, so concurrent logins cannot interleave two moves.
+"""
+
+import logging
+from collections.abc import Iterable
+from typing import Any
+
+from sqlalchemy import Select, delete, func, insert, literal, or_, select, true, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models.org import OrgClosure
+from db.models.user import User
+from db.repositories.app.users import LISTING_COLUMNS
+
+log = logging.getLogger(__name__)
+
+# pg_advisory_xact_lock key serializing reporting line changes ("org_clos").
+ORG_LOCK_KEY = 0x6F72675F636C6F73
+
+
+async def get_manager_id(session: AsyncSession, user_id: int) -> int | None:
+    """Direct manager of ``user_id``, if known."""
+    stmt = select(OrgClosure.ancestor_id).where(OrgClosure.descendant_id == user_id, OrgClosure.depth == 1)
+    return (await session.execute(stmt)).scalar_one_or_none()
+
+
+async def get_report_ids(session: AsyncSession, user_id: int) -> list[int]:
+    """Direct reports of ``user_id``."""
+    stmt = select(OrgClosure.descendant_id).where(OrgClosure.ancestor_id == user_id, OrgClosure.depth == 1)
+    return list((await session.execute(stmt)).scalars().all())
+
+
+async def get_chain_depth(session: AsyncSession, *, manager_id: int, user_id: int) -> int | None:
+    """Levels from ``manager_id`` down to ``user_id`` (0 for the same user); ``None`` if not in the chain."""
+    if manager_id == user_id:
+        return 0
+    stmt = select(OrgClosure.depth).where(OrgClosure.ancestor_id == manager_id, OrgClosure.descendant_id == user_id)
+    return (await session.execute(stmt)).scalar_one_or_none()
+
+
+def subtree_query(manager_id: int, *, max_depth: int | None, limit: int) -> Select[Any]:
+    """Users under ``manager_id``, nearest levels first; the level is returned as ``depth``."""
+    stmt = (
+        select(*LISTING_COLUMNS, OrgClosure.depth)
+        .join(User, User.id == OrgClosure.descendant_id)
+        .where(OrgClosure.ancestor_id == manager_id)
+    )
+    if max_depth is not None:
+        stmt = stmt.where(OrgClosure.depth <= max_depth)
+    return stmt.order_by(OrgClosure.depth, User.full_name, User.id).limit(limit)
+
+
+def chain_query(user_id: int) -> Select[Any]:
+    """Managers of ``user_id`` from the direct one up; the level is returned as ``depth``."""
+    return (
+        select(*LISTING_COLUMNS, OrgClosure.depth)
+        .join(User, User.id == OrgClosure.ancestor_id)
+        .where(OrgClosure.descendant_id == user_id)
+        .order_by(OrgClosure.depth)
+    )
+
+
+async def move_subtree(session: AsyncSession, user_id: int, manager_id: int | None) -> bool:
+    """Put ``user_id`` and its subtree under ``manager_id`` (``None``: make it a root).
+
+    The caller must hold :func:`lock_org`.  Returns ``False`` when nothing
+    changed, or when ``manager_id`` is inside the subtree, which would make a
+    cycle; the directory is then mid-reorganization and a later sync settles it.
+    """
+    if await get_manager_id(session, user_id) == manager_id:
+        return False
+    if manager_id is not None and await get_chain_depth(session, manager_id=user_id, user_id=manager_id) is not None:
+        log.warning("Reporting line %s -> %s would make a cycle; skipped", manager_id, user_id)
+        return False
+    subtree = select(OrgClosure.descendant_id).where(OrgClosure.ancestor_id == user_id)
+    await session.execute(
+        delete(OrgClosure).where(
+            OrgClosure.ancestor_id.in_(select(OrgClosure.ancestor_id).where(OrgClosure.descendant_id == user_id)),
+            or_(OrgClosure.descendant_id == user_id, OrgClosure.descendant_id.in_(subtree)),
+        )
+    )
+    if manager_id is None:
+        return True
+    above = union_all(
+        select(literal(manager_id).label("ancestor_id"), literal(0).label("depth")),
+        select(OrgClosure.ancestor_id, OrgClosure.depth).where(OrgClosure.descendant_id == manager_id),
+    ).subquery("above")
+    below = union_all(
+        select(literal(user_id).label("descendant_id"), literal(0).label("depth")),
+        select(OrgClosure.descendant_id, OrgClosure.depth).where(OrgClosure.ancestor_id == user_id),
+    ).subquery("below")
+    pairs = select(above.c.ancestor_id, below.c.descendant_id, above.c.depth + below.c.depth + 1).select_from(
+        above.join(below, true())
+    )
+    await session.execute(
+        insert(OrgClosure).from_select([OrgClosure.ancestor_id, OrgClosure.descendant_id, OrgClosure.depth], pairs)
+    )
+    return True
+
+
+async def lock_org(session: AsyncSession) -> None:
+    """Serialize reporting line changes until the transaction ends."""
+    await session.execute(select(func.pg_advisory_xact_lock(ORG_LOCK_KEY)))
+
+
+async def sync_reporting_lines(
+    session: AsyncSession,
+    user_id: int,
+    *,
+    manager_id: int | None,
+    keep_manager: bool,
+    report_ids: Iterable[int],
+    is_new: bool = False,
+) -> int:
+    """Make ``manager_id`` and ``report_ids`` the reporting lines of ``user_id``; returns the number of moves.
+
+    ``keep_manager`` leaves the current manager as is (the directory names one
+    that is not known here yet).  Reports no longer listed become roots until
+    their own sync attaches them to their new manager.  Unchanged lines, the
+    usual case on login, cost two indexed reads and no writes; a new user with
+    no lines costs nothing.  Otherwise the lines are read again under
+    :func:`lock_org`, so a report another login has just moved elsewhere is
+    not detached from its new manager.
+    """
+    reports = set(report_ids) - {user_id}
+    if is_new and not reports and (keep_manager or manager_id is None):
+        return 0
+    if not await _planned_moves(session, user_id, manager_id, keep_manager, reports):
+        return 0
+    await lock_org(session)
+    moved = 0
+    for node, manager in await _planned_moves(session, user_id, manager_id, keep_manager, reports):
+        moved += await move_subtree(session, node, manager)
+    return moved
+
+
+async def _planned_moves(
+    session: AsyncSession, user_id: int, manager_id: int | None, keep_manager: bool, reports: set[int]
+) -> list[tuple[int, int | None]]:
+    current_manager = await get_manager_id(session, user_id)
+    current_reports = set(await get_report_ids(session, user_id))
+    moves: list[tuple[int, int | None]] = []
+    if not keep_manager and manager_id != current_manager and manager_id != user_id:
+        moves.append((user_id, manager_id))
+    moves += [(report, user_id) for report in sorted(reports - current_reports)]
+    moves += [(report, None) for report in sorted(current_reports - reports)]
+    return moves
+
+
+__all__ = [
+    "ORG_LOCK_KEY",
+    "chain_query",
+    "get_chain_depth",
+    "get_manager_id",
+    "get_report_ids",
+    "lock_org",
+    "move_subtree",
+    "subtree_query",
+    "sync_reporting_lines",
+]
@@ -0,0 +1,5 @@
+"""Customer segment repository exports."""
+
+from .customer_segments import get_cached_segments, purge_expired_segments, store_segments
+
+__all__ = ["get_cached_segments", "purge_expired_segments", "store_segments"]
@@ -0,0 +1,60 @@
+"""Customer segment cache repository functions."""
+
+from collections.abc import Collection, Mapping
+from datetime import datetime
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models.segments import CustomerSegmentCache
+
+
+async def get_cached_segments(
+    session: AsyncSession, name_keys: Collection[str], *, model: str, version: str
+) -> dict[str, str]:
+    """Unexpired segments of ``name_keys`` in one query; missing keys are absent from the result."""
+    if not name_keys:
+        return {}
+    stmt = select(CustomerSegmentCache.name_key, CustomerSegmentCache.segment).where(
+        CustomerSegmentCache.name_key.in_(name_keys),
+        CustomerSegmentCache.model == model,
+        CustomerSegmentCache.version == version,
+        CustomerSegmentCache.expires_at > func.now(),
+    )
+    return {row.name_key: row.segment for row in await session.execute(stmt)}
+
+
+async def store_segments(
+    session: AsyncSession, segments: Mapping[str, str], *, model: str, version: str, expires_at: datetime
+) -> None:
+    """Insert or refresh segments keyed by normalized name."""
+    if not segments:
+        return
+    stmt = insert(CustomerSegmentCache).values(
+        [
+            {
+                "name_key": name_key,
+                "model": model,
+                "version": version,
+                "segment": segment,
+                "created_at": func.now(),
+                "expires_at": expires_at,
+            }
+            for name_key, segment in segments.items()
+        ]
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["name_key", "model", "version"],
+        set_={"segment": stmt.excluded.segment, "created_at": func.now(), "expires_at": stmt.excluded.expires_at},
+    )
+    await session.execute(stmt)
+
+
+async def purge_expired_segments(session: AsyncSession) -> int:
+    """Delete entries past their ``expires_at``."""
+    result = await session.execute(delete(CustomerSegmentCache).where(CustomerSegmentCache.expires_at <= func.now()))
+    return int(getattr(result, "rowcount", 0) or 0)
+
+
+__all__ = ["get_cached_segments", "purge_expired_segments", "store_segments"]
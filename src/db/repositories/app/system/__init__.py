@@ -0,0 +1,5 @@
+"""System repository exports."""
+
+from .rate_limit import purge_rate_limit_buckets, take_rate_limit_token
+
+__all__ = ["take_rate_limit_token", "purge_rate_limit_buckets"]
@@ -0,0 +1,39 @@
+"""Shared token bucket repository functions."""
+
+from datetime import datetime
+
+from sqlalchemy import case, delete, extract, func, literal
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models.system import RateLimitBucket
+
+
+async def take_rate_limit_token(session: AsyncSession, key: str, *, rate: float, burst: float) -> tuple[bool, float]:
+    """Refill and take one token in a single upsert; returns (allowed, tokens left)."""
+    bucket = RateLimitBucket.__table__.c
+    refilled = func.least(literal(burst), bucket.tokens + extract("epoch", func.now() - bucket.updated_at) * rate)
+    stmt = (
+        insert(RateLimitBucket)
+        .values(key=key, tokens=burst - 1, allowed=True, updated_at=func.now())
+        .on_conflict_do_update(
+            index_elements=[bucket.key],
+            set_={
+                "tokens": case((refilled >= 1, refilled - 1), else_=refilled),
+                "allowed": refilled >= 1,
+                "updated_at": func.now(),
+            },
+        )
+        .returning(bucket.allowed, bucket.tokens)
+    )
+    row = (await session.execute(stmt)).one()
+    return bool(row.allowed), float(row.tokens)
+
+
+async def purge_rate_limit_buckets(session: AsyncSession, *, idle_before: datetime) -> int:
+    """Delete buckets untouched since ``idle_before`` (they are full again)."""
+    result = await session.execute(delete(RateLimitBucket).where(RateLimitBucket.updated_at < idle_before))
+    return int(getattr(result, "rowcount", 0) or 0)
+
+
+__all__ = ["take_rate_limit_token", "purge_rate_limit_buckets"]
@@ -0,0 +1,15 @@
+"""User directory repository exports."""
+
+from .listing import LISTING_COLUMNS, USER_SORTS, UserSort, sort_keys, stream_users, user_page_query
+from .search import TRIGRAM_MIN_TERM, user_search_query
+
+__all__ = [
+    "LISTING_COLUMNS",
+    "TRIGRAM_MIN_TERM",
+    "USER_SORTS",
+    "UserSort",
+    "sort_keys",
+    "stream_users",
+    "user_page_query",
+    "user_search_query",
+]
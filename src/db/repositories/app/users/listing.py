@@ -0,0 +1,82 @@
+"""User listing queries with keyset pagination."""
+
+from collections.abc import AsyncGenerator, Sequence
+from typing import Any, Literal
+
+from sqlalchemy import ColumnElement, Row, Select, and_, or_, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models.user.user import USER_LOGIN_SORT_KEY, USER_NAME_SORT_KEY, User
+
+UserSort = Literal["name", "login", "id"]
+
+USER_SORTS: tuple[UserSort, ...] = ("name", "login", "id")
+
+LISTING_COLUMNS = (
+    User.id,
+    User.ad_login,
+    User.full_name,
+    User.email,
+    User.department,
+    User.title,
+    User.role,
+    User.is_active,
+    User.last_login_at,
+)
+
+# Greater than any character, so ``[prefix, prefix + _PREFIX_END)`` is every string starting with prefix in "C" order.
+_PREFIX_END = "\U0010ffff"
+
+
+def sort_keys(sort: UserSort) -> tuple[ColumnElement[Any], ...]:
+    """Keyset columns of ``sort``, unique together; they match the ``ix_users_*_sort`` indexes."""
+    user_id = User.id.expression
+    if sort == "name":
+        return (USER_NAME_SORT_KEY, user_id)
+    if sort == "login":
+        return (USER_LOGIN_SORT_KEY,)
+    return (user_id,)
+
+
+def _starts_with(key: ColumnElement[Any], prefix: str) -> ColumnElement[bool]:
+    """``key LIKE prefix%`` as a range, so a "C"-collated btree index and generic plans apply."""
+    return and_(key >= prefix, key < prefix + _PREFIX_END)
+
+
+def user_page_query(
+    *,
+    sort: UserSort,
+    after: Sequence[Any] | None,
+    limit: int,
+    department: str | None = None,
+    role: str | None = None,
+    is_active: bool | None = None,
+    prefix: str | None = None,
+) -> Select[Any]:
+    """Up to ``limit`` users past the keyset ``after``; key values are returned as ``sort_0``, ``sort_1``..."""
+    keys = sort_keys(sort)
+    stmt = select(*LISTING_COLUMNS, *(key.label(f"sort_{index}") for index, key in enumerate(keys)))
+    if after is not None:
+        if len(after) != len(keys):
+            raise ValueError("keyset does not match the sort")
+        stmt = stmt.where(tuple_(*keys) > tuple_(*after) if len(keys) > 1 else keys[0] > after[0])
+    if department is not None:
+        stmt = stmt.where(User.department == department)
+    if role is not None:
+        stmt = stmt.where(User.role == role)
+    if is_active is not None:
+        stmt = stmt.where(User.is_active.is_(is_active))
+    if prefix:
+        prefix = prefix.lower()
+        stmt = stmt.where(or_(_starts_with(USER_NAME_SORT_KEY, prefix), _starts_with(USER_LOGIN_SORT_KEY, prefix)))
+    return stmt.order_by(*keys).limit(limit)
+
+
+async def stream_users(session: AsyncSession, stmt: Select[Any]) -> AsyncGenerator[Row[Any]]:
+    """Rows of ``stmt`` from a server-side cursor, fetched in batches as they are consumed."""
+    result = await session.stream(stmt.execution_options(yield_per=100))
+    async for row in result:
+        yield row
+
+
+__all__ = ["LISTING_COLUMNS", "USER_SORTS", "UserSort", "sort_keys", "stream_users", "user_page_query"]
@@ -0,0 +1,57 @@
+"""People search queries over the ``ix_users_search_trgm`` trigram index."""
+
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import Select, and_, case, func, select
+
+from db.models.user.user import USER_NAME_SORT_KEY, USER_SEARCH_DOCUMENT, User
+
+from .listing import LISTING_COLUMNS
+
+# pg_trgm extracts no trigram from shorter terms, so they cannot narrow an index scan.
+TRIGRAM_MIN_TERM = 3
+
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def user_search_query(query: str, terms: Sequence[str], *, limit: int, include_inactive: bool = False) -> Select[Any]:
+    """Users whose name, login, e-mail or department contain every term, best match first.
+
+    ``query`` and ``terms`` must be normalized like :data:`USER_SEARCH_DOCUMENT`
+    (case-folded, ``ё`` -> ``е``), and at least one term must be
+    :data:`TRIGRAM_MIN_TERM` characters long.  Long terms are ``LIKE`` conditions
+    the GIN index answers; short ones are checked on the rows it returns.  Rows
+    are ranked by prefix match on the name, then on the login, then by
+    ``word_similarity``; the score is returned as ``score``.
+    """
+    if not any(len(term) >= TRIGRAM_MIN_TERM for term in terms):
+        raise ValueError(f"at least one term must be {TRIGRAM_MIN_TERM} characters long")
+    conditions = [
+        (
+            USER_SEARCH_DOCUMENT.like(f"%{_escape_like(term)}%")
+            if len(term) >= TRIGRAM_MIN_TERM
+            else func.strpos(USER_SEARCH_DOCUMENT, term) > 0
+        )
+        for term in terms
+    ]
+    if not include_inactive:
+        conditions.append(User.is_active.is_(True))
+    starts_with = f"{_escape_like(query)}%"
+    prefix_rank = case(
+        (USER_SEARCH_DOCUMENT.like(starts_with), 2),
+        (func.lower(User.ad_login).like(starts_with), 1),
+        else_=0,
+    )
+    score = func.word_similarity(query, USER_SEARCH_DOCUMENT)
+    return (
+        select(*LISTING_COLUMNS, score.label("score"))
+        .where(and_(*conditions))
+        .order_by(prefix_rank.desc(), score.desc(), USER_NAME_SORT_KEY, User.id)
+        .limit(limit)
+    )
+
+
+__all__ = ["TRIGRAM_MIN_TERM", "user_search_query"]
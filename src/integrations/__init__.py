@@ -0,0 +1 @@
+"""Clients of external HTTP services."""
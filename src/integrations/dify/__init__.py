@@ -0,0 +1,7 @@
+"""Dify API integration."""
+
+from .client import DifyClient, dify_client
+from .exceptions import DifyError, DifyUnavailableError
+from .sse import SseEvent, iter_sse
+
+__all__ = ["DifyClient", "DifyError", "DifyUnavailableError", "SseEvent", "dify_client", "iter_sse"]
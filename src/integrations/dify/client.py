@@ -0,0 +1,418 @@
+"""Shared async client of the Dify API.
+
+One ``httpx.AsyncClient`` per worker keeps a pool of keep-alive connections
+(HTTP/2 when ``h2`` is installed); it is created on first use, in the worker's
+event loop, and closed by the app lifespan.  Every endpoint has its own
+concurrency limit, so a burst of slow chat completions cannot take all the
+connections from knowledge-base queries.  429 and 5xx answers and failed
+connections are retried with jittered exponential backoff, within the request
+deadline.  httpx is imported lazily: most processes never call Dify.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import importlib
+import importlib.util
+import logging
+import random
+import time
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Any
+
+import orjson
+
+from config import settings
+from core.deadline import DeadlineExceededError, cap_timeout, deadline_expired, remaining
+from core.metrics import metrics
+
+from .exceptions import DifyError, DifyUnavailableError
+from .sse import SseEvent, iter_sse
+
+if TYPE_CHECKING:
+    import httpx
+
+log = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+dify_requests_total = metrics.counter("dify_requests_total", "Dify API calls by outcome", ("endpoint", "outcome"))
+dify_request_seconds = metrics.histogram(
+    "dify_request_seconds", "Time until Dify response headers, per attempt", ("endpoint",)
+)
+dify_retries_total = metrics.counter("dify_retries_total", "Retried Dify API calls", ("endpoint", "reason"))
+dify_in_flight = metrics.gauge("dify_in_flight", "Dify API calls holding a concurrency slot", ("endpoint",))
+
+
+class DifyClient:
+    """Pooled Dify API client; API keys are per Dify app, so every call passes its own."""
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        timeout: float,
+        connect_timeout: float,
+        max_connections: int,
+        max_keepalive_connections: int,
+        keepalive_expiry: float,
+        http2: bool = True,
+        max_concurrency: int = 16,
+        endpoint_concurrency: Mapping[str, int] | None = None,
+        max_retries: int = 2,
+        backoff: float = 0.2,
+        backoff_max: float = 5.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self.max_concurrency = max_concurrency
+        self.endpoint_concurrency = dict(endpoint_concurrency or {})
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._limits: dict[str, asyncio.Semaphore] = {}
+        self._in_flight: dict[str, int] = {}
+
+    @property
+    def in_flight(self) -> dict[str, int]:
+        return dict(self._in_flight)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = self._build_client()
+        return self._client
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            client, self._client = self._client, None
+            await client.aclose()
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        *,
+        api_key: str,
+        endpoint: str | None = None,
+        json: Any = None,
+        params: Mapping[str, str] | None = None,
+        files: Any = None,
+        data: Mapping[str, str] | None = None,
+        idempotent: bool = True,
+    ) -> httpx.Response:
+        """Send a request and read the whole response; raises :class:`DifyError` on 4xx/5xx.
+
+        A non-``idempotent`` request is retried only when Dify cannot have acted
+        on it: refused connections and 429.
+        """
+        name = endpoint or endpoint_name(path)
+        async with self._slot(name):
+            request = self._build_request(method, path, api_key, json=json, params=params, files=files, data=data)
+            return await self._send(name, request, stream=False, idempotent=idempotent)
+
+    async def request_json(self, method: str, path: str, *, api_key: str, **kwargs: Any) -> Any:
+        response = await self.request(method, path, api_key=api_key, **kwargs)
+        return orjson.loads(response.content) if response.content else None
+
+    @asynccontextmanager
+    async def stream(
+        self,
+        method: str,
+        path: str,
+        *,
+        api_key: str,
+        endpoint: str | None = None,
+        json: Any = None,
+        idempotent: bool = True,
+    ) -> AsyncIterator[httpx.Response]:
+        """The response with its body unread; retries happen only before the first byte."""
+        name = endpoint or endpoint_name(path)
+        async with self._slot(name):
+            request = self._build_request(method, path, api_key, json=json)
+            response = await self._send(name, request, stream=True, idempotent=idempotent)
+            try:
+                yield response
+            finally:
+                await response.aclose()
+
+    async def chat_messages(
+        self,
+        api_key: str,
+        *,
+        query: str,
+        user: str,
+        inputs: Mapping[str, Any] | None = None,
+        conversation_id: str | None = None,
+    ) -> dict[str, Any]:
+        """Blocking-mode chat completion: the whole answer in one JSON document.
+
+        Not retried after Dify may have run it: a retry would add the message
+        to the conversation again and spend the tokens twice.
+        """
+        body = _chat_body(query, user, inputs, conversation_id, mode="blocking")
+        result: dict[str, Any] = await self.request_json(
+            "POST", "/chat-messages", api_key=api_key, json=body, idempotent=False
+        )
+        return result
+
+    async def chat_messages_stream(
+        self,
+        api_key: str,
+        *,
+        query: str,
+        user: str,
+        inputs: Mapping[str, Any] | None = None,
+        conversation_id: str | None = None,
+    ) -> AsyncIterator[SseEvent]:
+        """Streaming-mode chat completion: events are yielded as they arrive, nothing is buffered."""
+        body = _chat_body(query, user, inputs, conversation_id, mode="streaming")
+        async with self.stream("POST", "/chat-messages", api_key=api_key, json=body, idempotent=False) as response:
+            async for event in iter_sse(response.aiter_lines()):
+                yield event
+
+    async def retrieve(
+        self,
+        api_key: str,
+        dataset_id: str,
+        *,
+        query: str,
+        top_k: int,
+        score_threshold: float | None = None,
+    ) -> dict[str, Any]:
+        """Knowledge base search: ``{"query": ..., "records": [{"segment": ..., "score": ...}]}``."""
+        retrieval_model: dict[str, Any] = {
+            "search_method": "semantic_search",
+            "reranking_enable": False,
+            "top_k": top_k,
+            "score_threshold_enabled": score_threshold is not None,
+        }
+        if score_threshold is not None:
+            retrieval_model["score_threshold"] = score_threshold
+        body = {"query": query, "retrieval_model": retrieval_model}
+        result: dict[str, Any] = await self.request_json(
+            "POST", f"/datasets/{dataset_id}/retrieve", api_key=api_key, endpoint="datasets-retrieve", json=body
+        )
+        return result
+
+    async def create_document_by_text(self, api_key: str, dataset_id: str, *, name: str, text: str) -> dict[str, Any]:
+        """Add a text document to a knowledge base; Dify indexes it asynchronously."""
+        body = {
+            "name": name,
+            "text": text,
+            "indexing_technique": "high_quality",
+            "process_rule": {"mode": "automatic"},
+        }
+        result: dict[str, Any] = await self.request_json(
+            "POST",
+            f"/datasets/{dataset_id}/document/create-by-text",
+            api_key=api_key,
+            endpoint="datasets-documents",
+            json=body,
+            idempotent=False,
+        )
+        return result
+
+    async def delete_document(self, api_key: str, dataset_id: str, document_id: str) -> None:
+        await self.request(
+            "DELETE", f"/datasets/{dataset_id}/documents/{document_id}", api_key=api_key, endpoint="datasets-documents"
+        )
+
+    def _build_client(self) -> httpx.AsyncClient:
+        import httpx
+
+        http2 = self.http2 and importlib.util.find_spec("h2") is not None
+        return httpx.AsyncClient(
+            base_url=self.base_url,
+            http2=http2,
+            transport=self._transport,
+            limits=httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive_connections,
+                keepalive_expiry=self.keepalive_expiry,
+            ),
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+        )
+
+    def _build_request(
+        self,
+        method: str,
+        path: str,
+        api_key: str,
+        *,
+        json: Any = None,
+        params: Mapping[str, str] | None = None,
+        files: Any = None,
+        data: Mapping[str, str] | None = None,
+    ) -> httpx.Request:
+        headers = {"Authorization": f"Bearer {api_key}"}
+        content: bytes | None = None
+        if json is not None:
+            content = orjson.dumps(json)
+            headers["Content-Type"] = "application/json"
+        return self.client.build_request(
+            method, path, content=content, params=params, files=files, data=data, headers=headers
+        )
+
+    async def _send(
+        self, name: str, request: httpx.Request, *, stream: bool, idempotent: bool = True
+    ) -> httpx.Response:
+        import httpx
+
+        retryable_errors: tuple[type[Exception], ...] = (httpx.ConnectError, httpx.ConnectTimeout)
+        if idempotent:
+            retryable_errors += (httpx.RemoteProtocolError,)
+        for attempt in range(self.max_retries + 1):
+            final = attempt == self.max_retries
+            try:
+                response = await self._attempt(name, request, stream=stream)
+            except retryable_errors as exc:
+                # Refused connections and keep-alive connections the server had already closed.
+                delay = None if final else self._retry_delay(attempt, None)
+                if delay is None:
+                    raise self._unavailable(name, exc) from exc
+                await self._backoff(name, type(exc).__name__, delay)
+                continue
+            except httpx.TimeoutException as exc:
+                raise self._unavailable(name, exc) from exc
+            if response.status_code in RETRY_STATUSES:
+                retry = not final and (idempotent or response.status_code == 429)
+                delay = self._retry_delay(attempt, _retry_after(response)) if retry else None
+                if delay is None:
+                    raise await _error_from_response(name, response, DifyUnavailableError)
+                await response.aclose()  # the connection goes back to the pool for the wait
+                await self._backoff(name, str(response.status_code), delay)
+                continue
+            if response.is_error:
+                raise await _error_from_response(name, response, DifyError)
+            return response
+        raise AssertionError("unreachable")
+
+    async def _attempt(self, name: str, request: httpx.Request, *, stream: bool) -> httpx.Response:
+        import httpx
+
+        # Recomputed per attempt: retries get what is left of the request deadline.
+        timeout = cap_timeout(self.timeout)
+        request.extensions["timeout"] = httpx.Timeout(timeout, connect=min(self.connect_timeout, timeout)).as_dict()
+        started = time.perf_counter()
+        try:
+            response = await self.client.send(request, stream=stream)
+        except httpx.TimeoutException:
+            dify_requests_total.inc(name, "timeout")
+            raise
+        except httpx.TransportError as exc:
+            dify_requests_total.inc(name, type(exc).__name__)
+            raise
+        finally:
+            dify_request_seconds.observe(time.perf_counter() - started, name)
+        dify_requests_total.inc(name, str(response.status_code))
+        return response
+
+    def _retry_delay(self, attempt: int, retry_after: float | None) -> float | None:
+        """Full-jitter exponential backoff, at least ``Retry-After``; ``None`` past the deadline."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff * 2**attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_max))
+        left = remaining()
+        if left is not None and left <= delay:
+            return None
+        return delay
+
+    async def _backoff(self, name: str, reason: str, delay: float) -> None:
+        dify_retries_total.inc(name, reason)
+        log.info("Dify %s: %s, retrying in %.2fs", name, reason, delay)
+        await asyncio.sleep(delay)
+
+    def _unavailable(self, name: str, exc: Exception) -> Exception:
+        if deadline_expired():
+            return DeadlineExceededError()
+        return DifyUnavailableError(f"Dify {name} is unavailable: {exc!r}")
+
+    @asynccontextmanager
+    async def _slot(self, name: str) -> AsyncIterator[None]:
+        limit = self._limits.get(name)
+        if limit is None:
+            limit = asyncio.Semaphore(self.endpoint_concurrency.get(name, self.max_concurrency))
+            self._limits[name] = limit
+        left = remaining()
+        try:
+            async with asyncio.timeout(left if left is None else max(left, 0)):
+                await limit.acquire()
+        except TimeoutError:
+            raise DeadlineExceededError() from None
+        self._in_flight[name] = self._in_flight.get(name, 0) + 1
+        try:
+            yield
+        finally:
+            self._in_flight[name] -= 1
+            limit.release()
+
+
+def endpoint_name(path: str) -> str:
+    """Default limit/metric key: the first path segment (``/chat-messages`` -> ``chat-messages``)."""
+    return path.strip("/").partition("/")[0] or "root"
+
+
+def _chat_body(
+    query: str, user: str, inputs: Mapping[str, Any] | None, conversation_id: str | None, *, mode: str
+) -> dict[str, Any]:
+    body: dict[str, Any] = {"query": query, "user": user, "inputs": dict(inputs or {}), "response_mode": mode}
+    if conversation_id:
+        body["conversation_id"] = conversation_id
+    return body
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    with contextlib.suppress(ValueError):
+        return max(0.0, float(response.headers.get("Retry-After", "")))
+    return None
+
+
+async def _error_from_response(name: str, response: httpx.Response, error: type[DifyError]) -> DifyError:
+    """Dify errors are ``{"code": ..., "message": ..., "status": ...}``."""
+    await response.aread()
+    await response.aclose()
+    code: str | None = None
+    message = response.text[:500] or response.reason_phrase
+    with contextlib.suppress(ValueError):
+        payload = orjson.loads(response.content)
+        if isinstance(payload, dict):
+            code = payload.get("code")
+            message = payload.get("message") or message
+    return error(f"Dify {name}: {message}", status=response.status_code, code=code)
+
+
+def preload() -> None:
+    """Import httpx now, e.g. in the parent process before forking workers."""
+    importlib.import_module("httpx")
+
+
+dify_client = DifyClient(
+    settings.dify.base_url,
+    timeout=settings.dify.timeout_sec,
+    connect_timeout=settings.dify.connect_timeout_sec,
+    max_connections=settings.dify.max_connections,
+    max_keepalive_connections=settings.dify.max_keepalive_connections,
+    keepalive_expiry=settings.dify.keepalive_expiry_sec,
+    http2=settings.dify.http2,
+    max_concurrency=settings.dify.max_concurrency,
+    endpoint_concurrency=settings.dify.endpoint_concurrency,
+    max_retries=settings.dify.max_retries,
+    backoff=settings.dify.retry_backoff_sec,
+    backoff_max=settings.dify.retry_backoff_max_sec,
+)
+
+dify_in_flight.set_function(lambda: [((name,), float(count)) for name, count in dify_client.in_flight.items()])
+
+
+__all__ = ["RETRY_STATUSES", "DifyClient", "dify_client", "endpoint_name", "preload"]
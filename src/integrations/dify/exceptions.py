@@ -0,0 +1,20 @@
+"""Dify client exceptions."""
+
+from __future__ import annotations
+
+
+class DifyError(Exception):
+    """Dify answered with an error, or could not be reached (``status`` is ``None``)."""
+
+    def __init__(self, message: str, *, status: int | None = None, code: str | None = None) -> None:
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.code = code
+
+
+class DifyUnavailableError(DifyError):
+    """Connection failed or timed out, or retries on 429/5xx were exhausted."""
+
+
+__all__ = ["DifyError", "DifyUnavailableError"]
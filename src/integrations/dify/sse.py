@@ -0,0 +1,60 @@
+"""Incremental parser of ``text/event-stream`` bodies (chat completions in streaming mode)."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterable, AsyncIterator
+from dataclasses import dataclass
+from typing import Any
+
+import orjson
+
+
+@dataclass(slots=True)
+class SseEvent:
+    """One server-sent event; Dify puts the event name inside the JSON ``data``."""
+
+    data: str
+    event: str | None = None
+    id: str | None = None
+
+    def json(self) -> Any:
+        return orjson.loads(self.data)
+
+    def encode(self) -> bytes:
+        """The event in wire format, for passing it on to our own clients unchanged."""
+        lines = []
+        if self.event is not None:
+            lines.append(f"event: {self.event}")
+        if self.id is not None:
+            lines.append(f"id: {self.id}")
+        lines.extend(f"data: {line}" for line in self.data.split("\n"))
+        return ("\n".join(lines) + "\n\n").encode()
+
+
+async def iter_sse(lines: AsyncIterable[str]) -> AsyncIterator[SseEvent]:
+    """Events as soon as their terminating blank line arrives; comments and retries are skipped."""
+    data: list[str] = []
+    event: str | None = None
+    event_id: str | None = None
+    async for raw in lines:
+        line = raw.rstrip("\r\n")
+        if not line:
+            if data:
+                yield SseEvent(data="\n".join(data), event=event, id=event_id)
+            data, event, event_id = [], None, None
+            continue
+        if line.startswith(":"):
+            continue
+        name, _, value = line.partition(":")
+        value = value.removeprefix(" ")
+        if name == "data":
+            data.append(value)
+        elif name == "event":
+            event = value
+        elif name == "id":
+            event_id = value
+    if data:
+        yield SseEvent(data="\n".join(data), event=event, id=event_id)
+
+
+__all__ = ["SseEvent", "iter_sse"]
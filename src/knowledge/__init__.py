@@ -0,0 +1,25 @@
+"""Dify knowledge base: cached retrieval and bulk document ingestion."""
+
+from .ingest import DocumentIngestion, IngestDocument, IngestProgress, IngestReport, documents_from_directory
+from .retrieval import (
+    KbRecord,
+    RetrievalResult,
+    RetrievalService,
+    invalidate_dataset,
+    knowledge_retrieval,
+    normalize_query,
+)
+
+__all__ = [
+    "DocumentIngestion",
+    "IngestDocument",
+    "IngestProgress",
+    "IngestReport",
+    "KbRecord",
+    "RetrievalResult",
+    "RetrievalService",
+    "documents_from_directory",
+    "invalidate_dataset",
+    "knowledge_retrieval",
+    "normalize_query",
+]
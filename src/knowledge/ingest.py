@@ -0,0 +1,196 @@
+"""Bulk upload of text documents to a Dify knowledge base.
+
+Documents are pulled lazily from an iterable into a queue of ``concurrency``
+slots, so reading never runs ahead of uploading, and ``concurrency`` workers
+upload them.  Dify's 429 answers slow the workers down through the client's
+backoff.  Every finished document is appended to a JSON lines progress file; a
+rerun with the same file skips documents already uploaded and retries failed ones.
+``on_uploaded`` runs after each upload; ``kb-ingest`` bumps the dataset's
+generation there, so API workers stop serving cached searches.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO
+
+import orjson
+
+from integrations.dify import DifyClient, DifyError
+
+log = logging.getLogger(__name__)
+
+# Retrying these cannot succeed: wrong API key or dataset.
+FATAL_STATUSES = frozenset({401, 403, 404})
+
+
+@dataclass(frozen=True, slots=True)
+class IngestDocument:
+    name: str  # unique within a dataset: the progress file is keyed by it
+    text: str
+
+
+@dataclass(slots=True)
+class IngestReport:
+    uploaded: int = 0
+    skipped: int = 0
+    failed: dict[str, str] = field(default_factory=dict)
+
+
+class IngestProgress:
+    """Append-only log of finished documents: ``{"name": ..., "documentId": ...}`` or ``{"name": ..., "error": ...}``."""
+
+    def __init__(self, path: Path | None) -> None:
+        self.path = path
+        self.done: dict[str, str] = {}
+        self._file: IO[bytes] | None = None
+        if path is not None and path.exists():
+            with path.open("rb") as file:
+                for line in file:
+                    self._replay(line)
+
+    def record(self, name: str, *, document_id: str | None = None, error: str | None = None) -> None:
+        if document_id is not None:
+            self.done[name] = document_id
+        if self.path is None:
+            return
+        if self._file is None:
+            self._file = self.path.open("ab")
+        entry = {"name": name, "documentId": document_id} if document_id is not None else {"name": name, "error": error}
+        self._file.write(orjson.dumps(entry) + b"\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _replay(self, line: bytes) -> None:
+        try:
+            entry = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            return  # a line cut short by an interrupted run
+        if entry.get("documentId"):
+            self.done[entry["name"]] = entry["documentId"]
+
+
+class DocumentIngestion:
+    """One run of uploads to ``dataset_id``; ``on_uploaded(dataset_id)`` runs after each upload."""
+
+    def __init__(
+        self,
+        client: DifyClient,
+        api_key: str,
+        dataset_id: str,
+        *,
+        concurrency: int,
+        progress: IngestProgress,
+        on_uploaded: Callable[[str], Awaitable[object]] | None = None,
+    ) -> None:
+        self.client = client
+        self.api_key = api_key
+        self.dataset_id = dataset_id
+        self.concurrency = concurrency
+        self.progress = progress
+        self.on_uploaded = on_uploaded
+        self.report = IngestReport()
+        self._fatal: DifyError | None = None
+
+    async def run(self, documents: Iterable[IngestDocument]) -> IngestReport:
+        """Upload ``documents`` not yet in the progress file.
+
+        Raises :class:`DifyError` for a wrong API key or dataset, once the uploads
+        already started have finished; other failures are recorded per document.
+        """
+        queue: asyncio.Queue[IngestDocument | None] = asyncio.Queue(maxsize=self.concurrency)
+        workers = [asyncio.create_task(self._worker(queue)) for _ in range(self.concurrency)]
+        try:
+            for document in documents:
+                if self._fatal is not None:
+                    break
+                if document.name in self.progress.done:
+                    self.report.skipped += 1
+                    continue
+                await _put(queue, document, workers)
+            for _ in workers:
+                await _put(queue, None, workers)
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers:
+                task.cancel()
+        if self._fatal is not None:
+            raise self._fatal
+        return self.report
+
+    async def _worker(self, queue: asyncio.Queue[IngestDocument | None]) -> None:
+        while (document := await queue.get()) is not None:
+            if self._fatal is None:  # otherwise drain, so the producer never blocks on a full queue
+                await self._upload(document)
+
+    async def _upload(self, document: IngestDocument) -> None:
+        try:
+            result = await self.client.create_document_by_text(
+                self.api_key, self.dataset_id, name=document.name, text=document.text
+            )
+            document_id = str(result["document"]["id"])
+        except DifyError as exc:
+            if exc.status in FATAL_STATUSES:
+                self._fatal = exc
+                return
+            log.warning("Uploading %s failed: %s", document.name, exc)
+            self._failed(document, str(exc))
+            return
+        except Exception as exc:  # e.g. an unexpected answer: this document fails, the run goes on
+            log.exception("Uploading %s failed", document.name)
+            self._failed(document, f"{type(exc).__name__}: {exc}")
+            return
+        self.progress.record(document.name, document_id=document_id)
+        self.report.uploaded += 1
+        if self.on_uploaded is not None:
+            try:
+                await self.on_uploaded(self.dataset_id)
+            except Exception:  # the document is uploaded; stale searches still expire with the cache TTL
+                log.exception("Invalidating cached searches of %s failed", self.dataset_id)
+
+    def _failed(self, document: IngestDocument, error: str) -> None:
+        self.report.failed[document.name] = error
+        self.progress.record(document.name, error=error)
+
+
+async def _put(
+    queue: asyncio.Queue[IngestDocument | None], item: IngestDocument | None, workers: list[asyncio.Task[None]]
+) -> None:
+    """``queue.put(item)`` that raises instead of waiting forever once the workers have died."""
+    put = asyncio.ensure_future(queue.put(item))
+    try:
+        while not put.done():
+            running = [task for task in workers if not task.done()]
+            if not running:
+                raise RuntimeError("all upload workers stopped")
+            await asyncio.wait([put, *running], return_when=asyncio.FIRST_COMPLETED)
+            for task in running:
+                if task.done() and not task.cancelled() and (error := task.exception()) is not None:
+                    raise error
+    finally:
+        put.cancel()
+
+
+def documents_from_directory(root: Path, patterns: Iterable[str] = ("*.md", "*.txt")) -> Iterator[IngestDocument]:
+    """Files under ``root`` matching ``patterns``, read one at a time, named by their relative path."""
+    paths = sorted({path for pattern in patterns for path in root.rglob(pattern) if path.is_file()})
+    for path in paths:
+        yield IngestDocument(path.relative_to(root).as_posix(), path.read_text(encoding="utf-8"))
+
+
+__all__ = [
+    "FATAL_STATUSES",
+    "DocumentIngestion",
+    "IngestDocument",
+    "IngestProgress",
+    "IngestReport",
+    "documents_from_directory",
+]
@@ -0,0 +1,171 @@
+"""Dify knowledge base search behind a per-worker cache keyed by normalized query.
+
+Entries are keyed by dataset, the dataset's generation, normalized query text
+and ``top_k``.  The generation lives in ``kb_dataset_generations`` and is bumped
+by whatever changes the documents (``kb-ingest``, ``kb-invalidate``); every
+worker rereads it at most every ``APP_CONFIG__KNOWLEDGE__GENERATION_TTL_SEC``,
+so after a change all workers miss within that interval, and a result loaded
+before the change is never served under the new generation.  If the table is
+unreachable the last known generation is used and entries still expire after
+``APP_CONFIG__KNOWLEDGE__CACHE_TTL_SEC``.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Literal, Protocol
+
+from config import settings
+from core.cache import Coalescer, TTLCache
+from core.metrics import metrics
+from db.engine import db
+from db.repositories.app.knowledge import bump_dataset_generation, get_dataset_generation
+from integrations.dify import DifyClient, dify_client
+
+log = logging.getLogger(__name__)
+
+RetrievalKey = tuple[str, int, str, int]
+
+kb_retrieve_seconds = metrics.histogram(
+    "kb_retrieve_seconds", "Knowledge base search latency by the layer that answered", ("source",)
+)
+
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.…]+$")
+
+
+@dataclass(frozen=True, slots=True)
+class KbRecord:
+    document_id: str
+    document_name: str
+    segment_id: str
+    content: str
+    score: float | None
+
+    @classmethod
+    def from_dify(cls, record: dict[str, Any]) -> KbRecord:
+        segment = record.get("segment") or {}
+        document = segment.get("document") or {}
+        return cls(
+            document_id=str(segment.get("document_id") or document.get("id") or ""),
+            document_name=str(document.get("name") or ""),
+            segment_id=str(segment.get("id") or ""),
+            content=str(segment.get("content") or ""),
+            score=record.get("score"),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class RetrievalResult:
+    records: tuple[KbRecord, ...]
+    source: Literal["cache", "dify"]
+
+
+def normalize_query(query: str) -> str:
+    """Case-folded query with single spaces, ``ё`` -> ``е`` and no trailing ``?``/``!``/``.``."""
+    text = unicodedata.normalize("NFKC", query).casefold().replace("ё", "е")
+    return _TRAILING_PUNCTUATION.sub("", " ".join(text.split()))
+
+
+class DatasetGenerations(Protocol):
+    async def get(self, dataset_id: str) -> int: ...
+
+
+class PostgresDatasetGenerations:
+    """Generations from ``kb_dataset_generations``, cached for ``ttl`` seconds per worker."""
+
+    def __init__(self, *, ttl: float) -> None:
+        self._cache: TTLCache[str, int] = TTLCache("kb_generations", max_size=1000, ttl=ttl)
+        self._coalescer: Coalescer[str, int] = Coalescer(self._cache.name)
+        self._last: dict[str, int] = {}
+
+    async def get(self, dataset_id: str) -> int:
+        generation = self._cache.get(dataset_id)
+        if generation is None:
+            generation = await self._coalescer.run(dataset_id, lambda: self._load(dataset_id))
+        return generation
+
+    async def _load(self, dataset_id: str) -> int:
+        try:
+            async with db.session() as session:
+                generation = await get_dataset_generation(session, dataset_id)
+        except Exception as exc:  # any database failure: keep serving under the last known generation
+            log.warning("Knowledge base generation unavailable, using the last known one: %s", exc)
+            generation = self._last.get(dataset_id, 0)
+        self._last[dataset_id] = generation
+        self._cache.set(dataset_id, generation)
+        return generation
+
+
+class RetrievalService:
+    """Cached, coalesced ``/datasets/{id}/retrieve`` calls with one knowledge base API key."""
+
+    def __init__(
+        self,
+        *,
+        client: DifyClient,
+        api_key: str,
+        cache: TTLCache[RetrievalKey, tuple[KbRecord, ...]],
+        generations: DatasetGenerations,
+    ) -> None:
+        self._client = client
+        self._api_key = api_key
+        self._cache = cache
+        self._generations = generations
+        self._coalescer: Coalescer[RetrievalKey, tuple[KbRecord, ...]] = Coalescer(cache.name)
+
+    async def retrieve(self, dataset_id: str, query: str, *, top_k: int) -> RetrievalResult:
+        started = time.perf_counter()
+        key = (dataset_id, await self._generations.get(dataset_id), normalize_query(query), top_k)
+        records = self._cache.get(key)
+        source: Literal["cache", "dify"] = "cache"
+        if records is None:
+            records = await self._coalescer.run(key, lambda: self._load(key, query.strip()))
+            source = "dify"
+        kb_retrieve_seconds.observe(time.perf_counter() - started, source)
+        return RetrievalResult(records, source)
+
+    async def _load(self, key: RetrievalKey, query: str) -> tuple[KbRecord, ...]:
+        dataset_id, _, _, top_k = key
+        result = await self._client.retrieve(self._api_key, dataset_id, query=query, top_k=top_k)
+        records = tuple(KbRecord.from_dify(record) for record in result.get("records") or ())
+        self._cache.set(key, records)
+        return records
+
+
+async def invalidate_dataset(dataset_id: str) -> int:
+    """Documents of ``dataset_id`` changed: bump its generation so every worker's cached searches miss."""
+    async with db.transaction() as session:
+        return await bump_dataset_generation(session, dataset_id)
+
+
+def create_retrieval_service() -> RetrievalService:
+    config = settings.knowledge
+    cache: TTLCache[RetrievalKey, tuple[KbRecord, ...]] = TTLCache(
+        "kb_retrieval", max_size=config.cache_max_entries, ttl=config.cache_ttl_sec
+    )
+    return RetrievalService(
+        client=dify_client,
+        api_key=settings.dify.kb_api_key,
+        cache=cache,
+        generations=PostgresDatasetGenerations(ttl=config.generation_ttl_sec),
+    )
+
+
+knowledge_retrieval = create_retrieval_service()
+
+
+__all__ = [
+    "DatasetGenerations",
+    "KbRecord",
+    "PostgresDatasetGenerations",
+    "RetrievalResult",
+    "RetrievalService",
+    "create_retrieval_service",
+    "invalidate_dataset",
+    "knowledge_retrieval",
+    "normalize_query",
+]
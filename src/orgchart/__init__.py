@@ -0,0 +1,5 @@
+"""Org structure: the reporting tree and checks along it."""
+
+from .chart import OrgChart, org_chart
+
+__all__ = ["OrgChart", "org_chart"]
@@ -0,0 +1,51 @@
+"""Reporting tree reads and chain checks over the ``org_closure`` table.
+
+Whether one user is above another is a single primary key probe, whatever
+the depth, so access checks along the chain stay cheap on every request.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.permissions import PermissionEngine, permission_engine, permission_mask
+from db.repositories.app.org import chain_query, get_chain_depth, subtree_query
+
+_ORG_READ = permission_mask(("org:read",))
+
+
+class OrgChart:
+    """Subtree and chain queries, and who may see them."""
+
+    def __init__(self, *, permissions: PermissionEngine = permission_engine) -> None:
+        self._permissions = permissions
+
+    async def depth_below(self, session: AsyncSession, *, manager_id: int, user_id: int) -> int | None:
+        """Levels between ``manager_id`` and ``user_id`` (0: same user); ``None`` if not in the chain."""
+        return await get_chain_depth(session, manager_id=manager_id, user_id=user_id)
+
+    async def can_view(self, session: AsyncSession, *, viewer_id: int, viewer_role: str, user_id: int) -> bool:
+        """``org:read`` sees every subtree; anyone else their own and those of people under them."""
+        if self._permissions.allows(viewer_role, permissions=_ORG_READ):
+            return True
+        return await self.depth_below(session, manager_id=viewer_id, user_id=user_id) is not None
+
+    async def subtree(
+        self, session: AsyncSession, manager_id: int, *, max_depth: int | None, limit: int
+    ) -> list[Row[Any]]:
+        """Up to ``limit`` users under ``manager_id``, nearest levels first, with their ``depth``."""
+        result = await session.execute(subtree_query(manager_id, max_depth=max_depth, limit=limit))
+        return list(result.all())
+
+    async def chain(self, session: AsyncSession, user_id: int) -> list[Row[Any]]:
+        """Managers of ``user_id`` from the direct one up, with their ``depth``."""
+        return list((await session.execute(chain_query(user_id))).all())
+
+
+org_chart = OrgChart()
+
+
+__all__ = ["OrgChart", "org_chart"]
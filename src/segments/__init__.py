@@ -0,0 +1,6 @@
+"""Customer segment classification."""
+
+from .normalize import normalize_customer_name
+from .service import SegmentResult, SegmentService, segment_service
+
+__all__ = ["SegmentResult", "SegmentService", "normalize_customer_name", "segment_service"]
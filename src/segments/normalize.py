@@ -0,0 +1,34 @@
+"""Customer name normalization: one cache key for spellings of the same company."""
+
+from __future__ import annotations
+
+import re
+import unicodedata
+
+# Longest first: "публичное акционерное общество" must win over "акционерное общество".
+_LEGAL_FORMS = (
+    ("общество с ограниченной ответственностью", "ооо"),
+    ("публичное акционерное общество", "пао"),
+    ("закрытое акционерное общество", "зао"),
+    ("открытое акционерное общество", "оао"),
+    ("непубличное акционерное общество", "ао"),
+    ("акционерное общество", "ао"),
+    ("индивидуальный предприниматель", "ип"),
+)
+_LEGAL_FORM_RE = re.compile("|".join(rf"\b{re.escape(full)}\b" for full, _ in _LEGAL_FORMS))
+_LEGAL_FORM_SHORT = dict(_LEGAL_FORMS)
+_QUOTES = str.maketrans({char: " " for char in "\"'«»„“”‘’`"})
+
+
+def normalize_customer_name(name: str) -> str:
+    """Case-folded name with ``ё`` -> ``е``, no quotes, single spaces and abbreviated legal forms.
+
+    ``ООО «Ромашка»``, ``общество с ограниченной ответственностью "Ромашка"`` and
+    ``ооо ромашка`` all normalize to ``ооо ромашка``.
+    """
+    text = unicodedata.normalize("NFKC", name).casefold().replace("ё", "е").translate(_QUOTES)
+    text = " ".join(text.split())
+    return _LEGAL_FORM_RE.sub(lambda match: _LEGAL_FORM_SHORT[match.group(0)], text)
+
+
+__all__ = ["normalize_customer_name"]
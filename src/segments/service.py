@@ -0,0 +1,227 @@
+"""Customer segment classification with in-memory, Postgres and coalesced Dify layers.
+
+A lookup normalizes the name, then tries the worker's LRU, then the
+``customer_segment_cache`` table (keyed by model and prompt version), and only
+on a miss asks Dify.  Concurrent misses for the same name share one Dify call.
+Database errors fail open: the lookup falls through to Dify.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable, Iterable, Mapping
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Literal, Protocol
+
+from config import settings
+from core.cache import Coalescer, TTLCache
+from core.metrics import metrics
+from db.engine import db
+from db.repositories.app.segments import get_cached_segments, purge_expired_segments, store_segments
+from integrations.dify import DifyError, dify_client
+
+from .normalize import normalize_customer_name
+
+log = logging.getLogger(__name__)
+
+SegmentSource = Literal["memory", "database", "dify", "error"]
+Classifier = Callable[[str], Awaitable[str]]
+
+SEGMENT_MAX_LENGTH = 256
+
+segment_lookups_total = metrics.counter(
+    "segment_lookups_total", "Customer segment lookups by the layer that answered", ("source",)
+)
+segment_lookup_seconds = metrics.histogram(
+    "segment_lookup_seconds", "Customer segment lookup latency by the layer that answered", ("source",)
+)
+
+
+@dataclass(slots=True)
+class SegmentResult:
+    name: str
+    segment: str | None
+    source: SegmentSource
+    error: str | None = None
+
+
+class SegmentStore(Protocol):
+    async def get_many(self, keys: Iterable[str]) -> dict[str, str]: ...
+
+    async def put_many(self, segments: Mapping[str, str]) -> None: ...
+
+
+class PostgresSegmentStore:
+    """Entries in ``customer_segment_cache`` for one model and prompt version.
+
+    Expired rows are purged at most every ``purge_interval`` seconds, in the
+    transaction of a write.
+    """
+
+    def __init__(self, *, model: str, version: str, ttl: timedelta, purge_interval: float) -> None:
+        self.model = model
+        self.version = version
+        self.ttl = ttl
+        self.purge_interval = purge_interval
+        self._purged_at = time.monotonic()
+
+    async def get_many(self, keys: Iterable[str]) -> dict[str, str]:
+        async with db.session() as session:
+            return await get_cached_segments(session, list(keys), model=self.model, version=self.version)
+
+    async def put_many(self, segments: Mapping[str, str]) -> None:
+        expires_at = datetime.now(tz=UTC) + self.ttl
+        async with db.transaction() as session:
+            await store_segments(session, segments, model=self.model, version=self.version, expires_at=expires_at)
+            if time.monotonic() - self._purged_at >= self.purge_interval:
+                self._purged_at = time.monotonic()
+                purged = await purge_expired_segments(session)
+                log.debug("Purged %d expired customer segment rows", purged)
+
+
+class SegmentService:
+    """Classifies customer names; see the module docstring for the lookup order."""
+
+    def __init__(
+        self,
+        *,
+        classifier: Classifier,
+        store: SegmentStore,
+        memory: TTLCache[str, str],
+        batch_concurrency: int,
+    ) -> None:
+        self._classifier = classifier
+        self._store = store
+        self._memory = memory
+        self._coalescer: Coalescer[str, str] = Coalescer(memory.name)
+        self.batch_concurrency = batch_concurrency
+
+    async def classify(self, name: str) -> SegmentResult:
+        """Segment of one name; :class:`DifyError` propagates when Dify has to be asked and fails."""
+        started = time.perf_counter()
+        key = normalize_customer_name(name)
+        segment = self._memory.get(key)
+        if segment is not None:
+            return _result(name, segment, "memory", started)
+        stored = await self._load([key])
+        if key in stored:
+            return _result(name, stored[key], "database", started)
+        segment = await self._coalescer.run(key, lambda: self._ask(key, name))
+        return _result(name, segment, "dify", started)
+
+    async def classify_many(self, names: list[str]) -> list[SegmentResult]:
+        """Segments in input order; one database query for the batch, then at most
+        ``batch_concurrency`` Dify calls at a time.  A failed name gets an ``error``
+        result instead of failing the batch.
+        """
+        started = time.perf_counter()
+        keys = {name: normalize_customer_name(name) for name in names}
+        found: dict[str, tuple[str, SegmentSource]] = {}
+        for key in set(keys.values()):
+            segment = self._memory.get(key)
+            if segment is not None:
+                found[key] = (segment, "memory")
+        stored = await self._load(key for key in set(keys.values()) if key not in found)
+        found.update((key, (segment, "database")) for key, segment in stored.items())
+
+        missing: dict[str, str] = {}
+        for name, key in keys.items():
+            if key not in found:
+                missing.setdefault(key, name)  # the first spelling is the one sent to Dify
+        errors: dict[str, str] = {}
+        limit = asyncio.Semaphore(self.batch_concurrency)
+
+        async def ask(key: str, name: str) -> None:
+            async with limit:
+                try:
+                    found[key] = (await self._coalescer.run(key, lambda: self._ask(key, name)), "dify")
+                except DifyError as exc:
+                    errors[key] = str(exc)
+
+        await asyncio.gather(*(ask(key, name) for key, name in missing.items()))
+        results = []
+        for name in names:
+            key = keys[name]
+            if key in found:
+                results.append(_result(name, *found[key], started))
+            else:
+                segment_lookups_total.inc("error")
+                results.append(SegmentResult(name, None, "error", errors[key]))
+        return results
+
+    def invalidate(self, name: str) -> None:
+        """Forget the worker's in-memory entry; the database row is kept until it expires."""
+        self._memory.invalidate(normalize_customer_name(name))
+
+    async def _load(self, keys: Iterable[str]) -> dict[str, str]:
+        keys = list(keys)
+        if not keys:
+            return {}
+        try:
+            stored = await self._store.get_many(keys)
+        except Exception as exc:  # any store failure: fail open to Dify
+            log.warning("Customer segment cache unavailable, asking Dify: %s", exc)
+            return {}
+        for key, segment in stored.items():
+            self._memory.set(key, segment)
+        return stored
+
+    async def _ask(self, key: str, name: str) -> str:
+        answer = (await self._classifier(name)).strip()
+        segment = answer.splitlines()[0].strip()[:SEGMENT_MAX_LENGTH] if answer else ""
+        if not segment:
+            raise DifyError("Dify returned an empty customer segment")
+        self._memory.set(key, segment)
+        try:
+            await self._store.put_many({key: segment})
+        except Exception as exc:  # any store failure: the answer is still good
+            log.warning("Could not persist customer segment: %s", exc)
+        return segment
+
+
+def _result(name: str, segment: str, source: SegmentSource, started: float) -> SegmentResult:
+    segment_lookups_total.inc(source)
+    segment_lookup_seconds.observe(time.perf_counter() - started, source)
+    return SegmentResult(name, segment, source)
+
+
+async def classify_with_dify(name: str) -> str:
+    """Ask the customer segment chat app; its answer is the segment."""
+    result = await dify_client.chat_messages(
+        settings.dify.customer_segment_api_key, query=name, user="customer-segment-classifier"
+    )
+    return str(result.get("answer") or "")
+
+
+def create_segment_service() -> SegmentService:
+    config = settings.segments
+    store = PostgresSegmentStore(
+        model=config.model,
+        version=config.version,
+        ttl=timedelta(days=config.ttl_days),
+        purge_interval=config.purge_interval_sec,
+    )
+    memory: TTLCache[str, str] = TTLCache(
+        "customer_segments", max_size=config.memory_max_entries, ttl=config.memory_ttl_sec
+    )
+    return SegmentService(
+        classifier=classify_with_dify, store=store, memory=memory, batch_concurrency=config.batch_concurrency
+    )
+
+
+segment_service = create_segment_service()
+
+
+__all__ = [
+    "PostgresSegmentStore",
+    "SegmentResult",
+    "SegmentService",
+    "SegmentSource",
+    "SegmentStore",
+    "classify_with_dify",
+    "create_segment_service",
+    "segment_service",
+]
@@ -0,0 +1 @@
+"""Local stand-ins of external services for tests and benchmarks."""
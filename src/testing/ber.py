@@ -0,0 +1,105 @@
+"""Minimal BER codec for the LDAP messages the stand-in server handles."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+# Universal tags
+INTEGER = 0x02
+OCTET_STRING = 0x04
+ENUMERATED = 0x0A
+BOOLEAN = 0x01
+SEQUENCE = 0x30
+SET = 0x31
+
+
+@dataclass(slots=True)
+class Tlv:
+    """Decoded tag-length-value node; constructed nodes carry children."""
+
+    tag: int
+    value: bytes
+    children: list[Tlv] = field(default_factory=list)
+
+    @property
+    def constructed(self) -> bool:
+        return bool(self.tag & 0x20)
+
+    def as_int(self) -> int:
+        return int.from_bytes(self.value, "big", signed=True) if self.value else 0
+
+    def as_str(self) -> str:
+        return self.value.decode("utf-8", errors="replace")
+
+
+def decode(data: bytes, pos: int = 0) -> tuple[Tlv, int]:
+    """Decode one TLV starting at ``pos``; returns the node and the next offset."""
+    tag = data[pos]
+    length, pos = _read_length(data, pos + 1)
+    value = data[pos : pos + length]
+    node = Tlv(tag=tag, value=value)
+    if node.constructed:
+        offset = 0
+        while offset < length:
+            child, offset = decode(value, offset)
+            node.children.append(child)
+    return node, pos + length
+
+
+def message_length(header: bytes) -> int | None:
+    """Total size of the message whose first bytes are ``header`` (None if incomplete)."""
+    if len(header) < 2:
+        return None
+    first = header[1]
+    if first < 0x80:
+        return 2 + first
+    num = first & 0x7F
+    if len(header) < 2 + num:
+        return None
+    return 2 + num + int.from_bytes(header[2 : 2 + num], "big")
+
+
+def _read_length(data: bytes, pos: int) -> tuple[int, int]:
+    first = data[pos]
+    if first < 0x80:
+        return first, pos + 1
+    num = first & 0x7F
+    return int.from_bytes(data[pos + 1 : pos + 1 + num], "big"), pos + 1 + num
+
+
+def encode(tag: int, value: bytes) -> bytes:
+    length = len(value)
+    if length < 0x80:
+        return bytes((tag, length)) + value
+    raw = length.to_bytes((length.bit_length() + 7) // 8, "big")
+    return bytes((tag, 0x80 | len(raw))) + raw + value
+
+
+def encode_int(value: int, tag: int = INTEGER) -> bytes:
+    size = max(1, (value.bit_length() + 8) // 8)
+    return encode(tag, value.to_bytes(size, "big", signed=True))
+
+
+def encode_str(value: str | bytes, tag: int = OCTET_STRING) -> bytes:
+    return encode(tag, value.encode("utf-8") if isinstance(value, str) else value)
+
+
+def encode_seq(*items: bytes, tag: int = SEQUENCE) -> bytes:
+    return encode(tag, b"".join(items))
+
+
+__all__ = [
+    "Tlv",
+    "decode",
+    "encode",
+    "encode_int",
+    "encode_str",
+    "encode_seq",
+    "message_length",
+    "INTEGER",
+    "OCTET_STRING",
+    "ENUMERATED",
+    "BOOLEAN",
+    "SEQUENCE",
+    "SET",
+]
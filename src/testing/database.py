@@ -0,0 +1,140 @@
+"""In-memory stand-in for the PostgreSQL session used by the auth flow.
+
+:class:`MemoryDatabase` keeps ORM objects in per-model lists and answers
+``select(Model)`` / ``select(Model.column)`` statements whose ``WHERE`` is a
+conjunction of ``column == value`` comparisons, which is all the login and
+refresh paths issue.  Anything else raises :class:`NotImplementedError` rather
+than returning a wrong answer.  ``latency`` is slept per statement to model
+the round-trip to a real server.
+
+Swap it in for a FastAPI app with ``app.dependency_overrides[get_transaction] =
+database.transaction``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import itertools
+from collections.abc import AsyncIterator, Iterable
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy.sql import Select, operators
+from sqlalchemy.sql.elements import BinaryExpression, BindParameter, BooleanClauseList, ColumnElement
+
+
+class MemoryResult:
+    def __init__(self, rows: list[Any]) -> None:
+        self._rows = rows
+
+    def scalar_one_or_none(self) -> Any:
+        if len(self._rows) > 1:
+            raise ValueError("multiple rows found")
+        return self._rows[0] if self._rows else None
+
+    def scalar(self) -> Any:
+        return self._rows[0] if self._rows else None
+
+    def scalars(self) -> MemoryResult:
+        return self
+
+    def all(self) -> list[Any]:
+        return list(self._rows)
+
+
+class MemorySession:
+    """The subset of ``AsyncSession`` the auth flow uses."""
+
+    def __init__(self, database: MemoryDatabase) -> None:
+        self._database = database
+        self._pending: list[Any] = []
+
+    async def execute(self, statement: Any) -> MemoryResult:
+        await self._database.round_trip()
+        if not isinstance(statement, Select):
+            raise NotImplementedError(f"unsupported statement: {statement}")
+        description = statement.column_descriptions[0]
+        model = description["entity"]
+        rows = [row for row in self._rows(model) if _matches(row, statement.whereclause)]
+        if description["expr"] is not model:
+            rows = [getattr(row, description["name"]) for row in rows]
+        return MemoryResult(rows)
+
+    def add(self, obj: Any) -> None:
+        self._pending.append(obj)
+
+    async def flush(self) -> None:
+        await self._database.round_trip()
+        self._database.insert(self._pending)
+        self._pending.clear()
+
+    async def commit(self) -> None:
+        await self.flush()
+
+    async def rollback(self) -> None:
+        self._pending.clear()
+
+    async def close(self) -> None:
+        self._pending.clear()
+
+    def _rows(self, model: type) -> list[Any]:
+        return self._database.tables.get(model, []) + [obj for obj in self._pending if isinstance(obj, model)]
+
+
+class MemoryDatabase:
+    """Tables of ORM objects shared by every session; ids are assigned on flush."""
+
+    def __init__(self, *, latency: float = 0.0) -> None:
+        self.latency = latency
+        self.tables: dict[type, list[Any]] = {}
+        self.statements = 0
+        self._ids = itertools.count(1)
+
+    async def round_trip(self) -> None:
+        self.statements += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+    def insert(self, objects: Iterable[Any]) -> None:
+        now = datetime.now(tz=UTC)
+        for obj in objects:
+            table = self.tables.setdefault(type(obj), [])
+            if obj in table:
+                continue
+            if getattr(obj, "id", 0) is None:
+                obj.id = next(self._ids)
+            for column in ("created_at", "updated_at"):
+                if hasattr(obj, column) and getattr(obj, column) is None:
+                    setattr(obj, column, now)
+            table.append(obj)
+
+    def session(self) -> MemorySession:
+        return MemorySession(self)
+
+    async def transaction(self) -> AsyncIterator[MemorySession]:
+        """Drop-in for ``api.deps.database.get_transaction``."""
+        session = self.session()
+        try:
+            yield session
+            await session.commit()
+        except BaseException:
+            await session.rollback()
+            raise
+
+
+def _matches(row: Any, clause: ColumnElement[Any] | None) -> bool:
+    if clause is None:
+        return True
+    if isinstance(clause, BooleanClauseList) and clause.operator is operators.and_:
+        return all(_matches(row, child) for child in clause.clauses)
+    if (
+        isinstance(clause, BinaryExpression)
+        and clause.operator is operators.eq
+        and isinstance(clause.right, BindParameter)
+        and clause.left.key
+    ):
+        return bool(getattr(row, clause.left.key) == clause.right.value)
+    raise NotImplementedError(f"unsupported condition: {clause}")
+
+
+__all__ = ["MemoryDatabase", "MemoryResult", "MemorySession"]
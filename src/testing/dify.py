@@ -0,0 +1,192 @@
+"""Fake Dify API: an ASGI app answering the chat endpoint in blocking and streaming mode
+and keeping in-memory knowledge bases for the dataset endpoints.
+
+Routes live under ``/v1`` like the real API.  Plug it into
+:class:`integrations.dify.DifyClient` with ``httpx.ASGITransport``, or serve
+``FakeDify.app`` with uvicorn and point ``APP_CONFIG__DIFY__BASE_URL`` at it.
+Failures are injected per request with :meth:`FakeDify.fail_next` or at
+``failure_rate``; ``latency``/``jitter`` delay every answer and
+``stream_delay`` paces streamed chunks like a model generating tokens.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import uuid
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+
+import orjson
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+
+
+@dataclass(slots=True)
+class FakeDifyStats:
+    requests: int = 0
+    streamed: int = 0
+    failed: int = 0
+    queries: list[str] = field(default_factory=list)
+    retrievals: list[tuple[str, str]] = field(default_factory=list)
+    documents_created: int = 0
+
+
+@dataclass(slots=True)
+class FakeDocument:
+    id: str
+    name: str
+    text: str
+
+
+class FakeDify:
+    """Answers ``POST /chat-messages`` with ``answer(query)``; only ``api_keys`` are accepted.
+
+    ``datasets`` maps dataset id to its documents by id.  Retrieval scores a
+    document by the share of query words it contains.
+    """
+
+    def __init__(
+        self,
+        *,
+        api_keys: set[str],
+        answer: Callable[[str], str] | None = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        stream_delay: float = 0.0,
+        failure_rate: float = 0.0,
+        failure_status: int = 503,
+        seed: int | None = None,
+    ) -> None:
+        self.api_keys = api_keys
+        self.answer = answer or (lambda query: f"echo: {query}")
+        self.latency = latency
+        self.jitter = jitter
+        self.stream_delay = stream_delay
+        self.failure_rate = failure_rate
+        self.failure_status = failure_status
+        self._random = random.Random(seed)
+        self.stats = FakeDifyStats()
+        self.datasets: dict[str, dict[str, FakeDocument]] = {}
+        self._failures: deque[tuple[int, dict[str, str]]] = deque()
+        self.app = Starlette(
+            routes=[
+                Route("/v1/chat-messages", self._chat, methods=["POST"]),
+                Route("/v1/datasets/{dataset_id}/retrieve", self._retrieve, methods=["POST"]),
+                Route("/v1/datasets/{dataset_id}/document/create-by-text", self._create_document, methods=["POST"]),
+                Route("/v1/datasets/{dataset_id}/documents/{document_id}", self._delete_document, methods=["DELETE"]),
+            ]
+        )
+
+    def fail_next(self, status: int, count: int = 1, *, headers: dict[str, str] | None = None) -> None:
+        """Answer the next ``count`` requests with ``status``."""
+        self._failures.extend([(status, headers or {})] * count)
+
+    async def _chat(self, request: Request) -> Response:
+        error = await self._begin(request)
+        if error is not None:
+            return error
+        body = orjson.loads(await request.body())
+        query = body["query"]
+        self.stats.queries.append(query)
+        message = {
+            "message_id": str(uuid.uuid4()),
+            "conversation_id": body.get("conversation_id") or str(uuid.uuid4()),
+        }
+        answer = self.answer(query)
+        if body.get("response_mode") == "streaming":
+            self.stats.streamed += 1
+            return StreamingResponse(self._events(message, answer), media_type="text/event-stream")
+        payload: dict[str, object] = {"event": "message", **message, "mode": "chat", "answer": answer, "metadata": {}}
+        return Response(orjson.dumps(payload), media_type="application/json")
+
+    async def _retrieve(self, request: Request) -> Response:
+        error = await self._begin(request)
+        if error is not None:
+            return error
+        dataset_id = request.path_params["dataset_id"]
+        body = orjson.loads(await request.body())
+        query = body["query"]
+        top_k = body.get("retrieval_model", {}).get("top_k", 4)
+        self.stats.retrievals.append((dataset_id, query))
+        words = set(query.casefold().split())
+        scored = []
+        for document in self.datasets.get(dataset_id, {}).values():
+            score = len(words & set(document.text.casefold().split())) / max(len(words), 1)
+            if score > 0:
+                scored.append((score, document))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        records = [
+            {
+                "segment": {
+                    "id": f"{document.id}-0",
+                    "position": 1,
+                    "document_id": document.id,
+                    "content": document.text,
+                    "document": {"id": document.id, "name": document.name},
+                },
+                "score": score,
+            }
+            for score, document in scored[:top_k]
+        ]
+        return Response(orjson.dumps({"query": {"content": query}, "records": records}), media_type="application/json")
+
+    async def _create_document(self, request: Request) -> Response:
+        error = await self._begin(request)
+        if error is not None:
+            return error
+        body = orjson.loads(await request.body())
+        document = FakeDocument(str(uuid.uuid4()), body["name"], body["text"])
+        self.datasets.setdefault(request.path_params["dataset_id"], {})[document.id] = document
+        self.stats.documents_created += 1
+        payload = {"document": {"id": document.id, "name": document.name, "indexing_status": "waiting"}, "batch": "0"}
+        return Response(orjson.dumps(payload), media_type="application/json")
+
+    async def _delete_document(self, request: Request) -> Response:
+        error = await self._begin(request)
+        if error is not None:
+            return error
+        documents = self.datasets.get(request.path_params["dataset_id"], {})
+        if documents.pop(request.path_params["document_id"], None) is None:
+            return _error(404, "document_not_found", "Document not found")
+        return Response(status_code=204)
+
+    async def _begin(self, request: Request) -> Response | None:
+        """Count the request, wait the configured latency and pick an injected failure, if any."""
+        self.stats.requests += 1
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        failure: tuple[int, dict[str, str]] | None = None
+        if self._failures:
+            failure = self._failures.popleft()
+        elif self.failure_rate and self._random.random() < self.failure_rate:
+            failure = (self.failure_status, {})
+        if failure is not None:
+            self.stats.failed += 1
+            return _error(failure[0], "injected", "Injected failure", failure[1])
+        if request.headers.get("authorization") not in {f"Bearer {key}" for key in self.api_keys}:
+            return _error(401, "unauthorized", "Access token is invalid")
+        return None
+
+    async def _events(self, message: dict[str, str], answer: str) -> AsyncIterator[bytes]:
+        for word in answer.split(" "):
+            if self.stream_delay:
+                await asyncio.sleep(self.stream_delay)
+            yield _sse({"event": "message", **message, "answer": word + " "})
+        yield _sse({"event": "message_end", **message, "metadata": {}})
+
+
+def _sse(payload: dict[str, object]) -> bytes:
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+
+def _error(status: int, code: str, message: str, headers: dict[str, str] | None = None) -> Response:
+    body = orjson.dumps({"code": code, "message": message, "status": status})
+    return Response(body, status_code=status, media_type="application/json", headers=headers)
+
+
+__all__ = ["FakeDify", "FakeDifyStats", "FakeDocument"]
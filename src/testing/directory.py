@@ -0,0 +1,92 @@
+"""Synthetic Active Directory content for the LDAP stand-in: users, groups and a reporting tree."""
+
+from __future__ import annotations
+
+import random
+import uuid
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+from testing.ldap_server import LdapStandIn
+
+_FIRST_NAMES = ("Иван", "Пётр", "Анна", "Мария", "Олег", "Елена", "Сергей", "Ольга", "Дмитрий", "Наталья")
+_LAST_NAMES = ("Иванов", "Петров", "Сидоров", "Смирнов", "Кузнецов", "Попов", "Соколов", "Лебедев", "Козлов")
+_DEPARTMENTS = ("Продажи", "Закупки", "ИТ", "Логистика", "Финансы", "Производство", "Юридический отдел")
+_TITLES = ("Инженер", "Менеджер", "Специалист", "Аналитик", "Ведущий специалист")
+
+
+@dataclass(slots=True)
+class SeededDirectory:
+    """What :func:`seed_directory` created; every user has ``password``."""
+
+    password: str
+    logins: list[str] = field(default_factory=list)
+    groups: list[str] = field(default_factory=list)
+    managers: list[str] = field(default_factory=list)
+
+
+def seed_directory(
+    server: LdapStandIn,
+    *,
+    users: int = 5000,
+    groups: int = 200,
+    groups_per_user: tuple[int, int] = (3, 15),
+    reports_per_manager: int = 8,
+    password: str = "Passw0rd!",
+    role_groups: Mapping[str, str | None] | None = None,
+    seed: int = 0,
+) -> SeededDirectory:
+    """Add ``users`` people named ``user00000``... to ``server``.
+
+    Users form a tree in which each manager has ``reports_per_manager`` direct
+    reports (``manager``/``directReports`` are filled in both directions), and
+    belong to a random sample of ``groups`` groups.  ``role_groups`` (role ->
+    group DN, e.g. ``settings.ldap.groups``) are handed out as well: ``admin`` to
+    every 100th user, ``editor`` to every 10th, ``viewer`` to the rest.
+    """
+    rng = random.Random(seed)
+    result = SeededDirectory(password=password)
+    result.groups = [f"CN=GRP_{index:04d},OU=Groups,{server.base_dn}" for index in range(groups)]
+    names = [_full_name(rng, index) for index in range(users)]
+    dns = [f"CN={name},OU=Users,{server.base_dn}" for name in names]
+    roles = dict(role_groups or {})
+    for index in range(users):
+        login = f"user{index:05d}"
+        first_report = index * reports_per_manager + 1
+        reports = dns[first_report : first_report + reports_per_manager]
+        member_of = rng.sample(result.groups, min(len(result.groups), rng.randint(*groups_per_user)))
+        role_group = _role_group(roles, index)
+        if role_group:
+            member_of.append(role_group)
+        server.add_user(
+            login,
+            password,
+            full_name=names[index],
+            email=f"{login}@example.loc",
+            department=rng.choice(_DEPARTMENTS),
+            title=rng.choice(_TITLES),
+            groups=member_of,
+            manager=dns[(index - 1) // reports_per_manager] if index else None,
+            direct_reports=reports,
+            guid=uuid.UUID(int=rng.getrandbits(128)),
+        )
+        result.logins.append(login)
+        if reports:
+            result.managers.append(login)
+    return result
+
+
+def _full_name(rng: random.Random, index: int) -> str:
+    # The index keeps CNs unique.
+    return f"{rng.choice(_LAST_NAMES)} {rng.choice(_FIRST_NAMES)} {index:05d}"
+
+
+def _role_group(roles: Mapping[str, str | None], index: int) -> str | None:
+    if index % 100 == 0:
+        return roles.get("admin")
+    if index % 10 == 0:
+        return roles.get("editor")
+    return roles.get("viewer")
+
+
+__all__ = ["SeededDirectory", "seed_directory"]
@@ -0,0 +1,515 @@
+"""In-process LDAP server stand-in speaking enough of RFC 4511 for ``ldap3``.
+
+Supports simple bind, base/one/subtree search with the usual filter
+operators, StartTLS, LDAPS and unbind.  Every accepted connection is served on
+its own thread, so the stand-in can be driven by the real ``auth.ldap_client``
+code through ``asyncio.to_thread`` exactly like a domain controller.
+
+:class:`LdapFaults` adds latency, error results and dropped connections to
+binds and searches; ``sAMAccountName`` lookups are indexed, so a directory
+seeded with :func:`testing.directory.seed_directory` stays fast.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import random
+import socket
+import socketserver
+import ssl
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal
+
+from testing.ber import (
+    ENUMERATED,
+    SET,
+    Tlv,
+    decode,
+    encode,
+    encode_int,
+    encode_seq,
+    encode_str,
+    message_length,
+)
+
+TlsMode = Literal["none", "ldaps", "starttls"]
+
+START_TLS_OID = "1.3.6.1.4.1.1466.20037"
+
+# LDAP result codes used by the stand-in
+SUCCESS = 0
+PROTOCOL_ERROR = 2
+INVALID_CREDENTIALS = 49
+BUSY = 51
+UNAVAILABLE = 52
+
+# Application tags (request -> response)
+_BIND_REQUEST = 0x60
+_UNBIND_REQUEST = 0x42
+_SEARCH_REQUEST = 0x63
+_ABANDON_REQUEST = 0x50
+_EXTENDED_REQUEST = 0x77
+_BIND_RESPONSE = 0x61
+_SEARCH_ENTRY = 0x64
+_SEARCH_DONE = 0x65
+_EXTENDED_RESPONSE = 0x78
+
+
+def normalize_dn(dn: str) -> str:
+    return ",".join(part.strip() for part in dn.split(",")).casefold()
+
+
+@dataclass(slots=True)
+class DirectoryEntry:
+    """A directory object; attribute names are matched case-insensitively."""
+
+    dn: str
+    attributes: dict[str, tuple[str, list[bytes]]] = field(default_factory=dict)
+
+    def set(self, name: str, *values: str | bytes) -> None:
+        encoded = [v.encode("utf-8") if isinstance(v, str) else v for v in values if v is not None]
+        self.attributes[name.casefold()] = (name, encoded)
+
+    def get(self, name: str) -> list[bytes]:
+        item = self.attributes.get(name.casefold())
+        return item[1] if item else []
+
+
+@dataclass(slots=True)
+class StandInStats:
+    """Counters observed on the server side."""
+
+    connections: int = 0
+    tls_handshakes: int = 0
+    tls_resumed: int = 0
+    binds: int = 0
+    failed_binds: int = 0
+    searches: int = 0
+    injected_failures: int = 0
+    dropped_connections: int = 0
+
+    def reset(self) -> None:
+        for name in self.__slots__:  # type: ignore[attr-defined]
+            setattr(self, name, 0)
+
+
+@dataclass(slots=True)
+class LdapFaults:
+    """Injected into binds and searches; rates are probabilities per operation."""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    failure_rate: float = 0.0
+    failure_code: int = BUSY
+    disconnect_rate: float = 0.0
+    seed: int | None = None
+    _random: random.Random = field(init=False, repr=False)
+    _pending: list[int] = field(init=False, default_factory=list)
+
+    def __post_init__(self) -> None:
+        self._random = random.Random(self.seed)
+
+    def fail_next(self, count: int = 1, *, code: int = UNAVAILABLE) -> None:
+        """Answer the next ``count`` binds or searches with result ``code``."""
+        self._pending.extend([code] * count)
+
+    def delay(self) -> float:
+        return self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def outcome(self) -> int | None:
+        """A result code to fail with, -1 to drop the connection, or None to answer normally."""
+        if self._pending:
+            return self._pending.pop(0)
+        if self.disconnect_rate and self._random.random() < self.disconnect_rate:
+            return -1
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            return self.failure_code
+        return None
+
+
+class LdapStandIn:
+    """Threaded LDAP server bound to localhost.
+
+    >>> with LdapStandIn(base_dn="DC=example,DC=loc", domain="EXAMPLE") as server:
+    ...     server.add_user("jdoe", "secret", full_name="John Doe")
+    ...     server.uri  # ldap://127.0.0.1:<port>
+    """
+
+    def __init__(
+        self,
+        *,
+        base_dn: str = "DC=example,DC=loc",
+        domain: str = "EXAMPLE",
+        host: str = "127.0.0.1",
+        port: int = 0,
+        tls: TlsMode = "none",
+        certfile: Path | None = None,
+        keyfile: Path | None = None,
+        faults: LdapFaults | None = None,
+    ) -> None:
+        if tls != "none" and not (certfile and keyfile):
+            raise ValueError("certfile and keyfile are required for TLS")
+        self.base_dn = base_dn
+        self.domain = domain
+        self.tls = tls
+        self.faults = faults or LdapFaults()
+        self.stats = StandInStats()
+        self.entries: dict[str, DirectoryEntry] = {}
+        self.passwords: dict[str, str] = {}
+        self._by_login: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._ssl_context: ssl.SSLContext | None = None
+        if certfile and keyfile:
+            self._ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+            self._ssl_context.load_cert_chain(certfile, keyfile)
+        self._server = _ThreadingServer((host, port), _Handler)
+        self._server.stand_in = self
+        self._thread: threading.Thread | None = None
+
+    @property
+    def address(self) -> tuple[str, int]:
+        host, port = self._server.server_address[:2]
+        return str(host), int(port)
+
+    @property
+    def uri(self) -> str:
+        host, port = self.address
+        scheme = "ldaps" if self.tls == "ldaps" else "ldap"
+        return f"{scheme}://{host}:{port}"
+
+    def start(self) -> LdapStandIn:
+        self._thread = threading.Thread(target=self._server.serve_forever, name="ldap-stand-in", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> LdapStandIn:
+        return self.start()
+
+    def __exit__(self, *_: object) -> None:
+        self.stop()
+
+    # -- directory -------------------------------------------------------
+
+    def add_entry(self, entry: DirectoryEntry) -> DirectoryEntry:
+        dn_norm = normalize_dn(entry.dn)
+        with self._lock:
+            self.entries[dn_norm] = entry
+            for login in entry.get("sAMAccountName"):
+                self._by_login[login.decode("utf-8").casefold()] = dn_norm
+        return entry
+
+    def add_user(
+        self,
+        login: str,
+        password: str,
+        *,
+        full_name: str | None = None,
+        ou: str = "OU=Users",
+        email: str | None = None,
+        department: str | None = None,
+        title: str | None = None,
+        groups: list[str] | None = None,
+        manager: str | None = None,
+        direct_reports: list[str] | None = None,
+        guid: uuid.UUID | None = None,
+    ) -> DirectoryEntry:
+        """Add a person with AD-style attributes and register its bind credentials."""
+        name = full_name or login
+        entry = DirectoryEntry(dn=f"CN={name},{ou},{self.base_dn}")
+        entry.set("objectClass", "top", "person", "organizationalPerson", "user")
+        entry.set("sAMAccountName", login)
+        entry.set("displayName", name)
+        entry.set("objectGUID", (guid or uuid.uuid4()).bytes_le)
+        for attr, value in (("mail", email), ("department", department), ("title", title), ("manager", manager)):
+            if value:
+                entry.set(attr, value)
+        if groups:
+            entry.set("memberOf", *groups)
+        if direct_reports:
+            entry.set("directReports", *direct_reports)
+        self.add_entry(entry)
+        self.set_password(login, password, dn=entry.dn)
+        return entry
+
+    def set_password(self, login: str, password: str, *, dn: str | None = None) -> None:
+        with self._lock:
+            self.passwords[f"{self.domain}\\{login}".casefold()] = password
+            self.passwords[login.casefold()] = password
+            if dn:
+                self.passwords[normalize_dn(dn)] = password
+
+    # -- protocol --------------------------------------------------------
+
+    def check_bind(self, name: str, password: str) -> bool:
+        if not name and not password:
+            return True  # anonymous bind
+        expected = self.passwords.get(name.casefold()) or self.passwords.get(normalize_dn(name))
+        return expected is not None and expected == password
+
+    def search(self, base: str, scope: int, flt: Tlv, size_limit: int) -> list[DirectoryEntry]:
+        if base == "" and scope == 0:
+            return [self._root_dse()]
+        base_norm = normalize_dn(base)
+        found: list[DirectoryEntry] = []
+        with self._lock:
+            login = _login_filter(flt)
+            if login is None:
+                entries = list(self.entries.items())
+            else:
+                dn_norm = self._by_login.get(login.casefold())
+                entries = [(dn_norm, self.entries[dn_norm])] if dn_norm else []
+        for dn_norm, entry in entries:
+            if not _in_scope(dn_norm, base_norm, scope) or not _match(entry, flt):
+                continue
+            found.append(entry)
+            if size_limit and len(found) >= size_limit:
+                break
+        return found
+
+    def _root_dse(self) -> DirectoryEntry:
+        dse = DirectoryEntry(dn="")
+        dse.set("objectClass", "top")
+        dse.set("namingContexts", self.base_dn)
+        dse.set("defaultNamingContext", self.base_dn)
+        dse.set("supportedLDAPVersion", "3")
+        dse.set("supportedExtension", START_TLS_OID)
+        dse.set("vendorName", "tender-backend LDAP stand-in")
+        return dse
+
+    def wrap_tls(self, sock: socket.socket) -> ssl.SSLSocket:
+        assert self._ssl_context is not None
+        tls_sock = self._ssl_context.wrap_socket(sock, server_side=True)
+        with self._lock:
+            self.stats.tls_handshakes += 1
+            if tls_sock.session_reused:
+                self.stats.tls_resumed += 1
+        return tls_sock
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 128
+    stand_in: LdapStandIn
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    server: _ThreadingServer
+
+    def handle(self) -> None:
+        stand_in = self.server.stand_in
+        sock: socket.socket = self.request
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with stand_in._lock:
+            stand_in.stats.connections += 1
+        try:
+            if stand_in.tls == "ldaps":
+                sock = stand_in.wrap_tls(sock)
+            while (data := _read_message(sock)) is not None:
+                message, _ = decode(data)
+                next_sock = self._dispatch(sock, message.children[0].as_int(), message.children[1])
+                if next_sock is None:
+                    return
+                sock = next_sock
+        except (OSError, ssl.SSLError):
+            return
+        finally:
+            with contextlib.suppress(OSError):
+                sock.close()
+
+    def _dispatch(self, sock: socket.socket, message_id: int, op: Tlv) -> socket.socket | None:
+        """Answer one request; returns the socket to continue on, or None to hang up."""
+        if op.tag == _UNBIND_REQUEST:
+            return None
+        if op.tag in (_BIND_REQUEST, _SEARCH_REQUEST):
+            outcome = self._inject(op.tag)
+            if outcome == -1:
+                return None
+            if outcome is not None:
+                response = _BIND_RESPONSE if op.tag == _BIND_REQUEST else _SEARCH_DONE
+                _send(sock, message_id, encode(response, _result(outcome, "injected failure")))
+                return sock
+        if op.tag == _BIND_REQUEST:
+            self._bind(sock, message_id, op)
+        elif op.tag == _SEARCH_REQUEST:
+            self._search(sock, message_id, op)
+        elif op.tag == _EXTENDED_REQUEST:
+            return self._extended(sock, message_id, op)
+        elif op.tag != _ABANDON_REQUEST:
+            _send(sock, message_id, encode(_EXTENDED_RESPONSE, _result(PROTOCOL_ERROR, "unsupported")))
+        return sock
+
+    def _inject(self, tag: int) -> int | None:
+        stand_in = self.server.stand_in
+        with stand_in._lock:
+            delay = stand_in.faults.delay()
+            outcome = stand_in.faults.outcome()
+            if outcome == -1:
+                stand_in.stats.dropped_connections += 1
+            elif outcome is not None:
+                stand_in.stats.injected_failures += 1
+                if tag == _BIND_REQUEST:
+                    stand_in.stats.binds += 1
+        if delay:
+            time.sleep(delay)
+        return outcome
+
+    def _bind(self, sock: socket.socket, message_id: int, op: Tlv) -> None:
+        stand_in = self.server.stand_in
+        name = op.children[1].as_str()
+        password = op.children[2].as_str()
+        ok = stand_in.check_bind(name, password)
+        with stand_in._lock:
+            stand_in.stats.binds += 1
+            if not ok:
+                stand_in.stats.failed_binds += 1
+        code = SUCCESS if ok else INVALID_CREDENTIALS
+        diagnostic = "" if ok else "80090308: LdapErr: DSID-0C09042A, comment: AcceptSecurityContext error, data 52e"
+        _send(sock, message_id, encode(_BIND_RESPONSE, _result(code, diagnostic)))
+
+    def _search(self, sock: socket.socket, message_id: int, op: Tlv) -> None:
+        stand_in = self.server.stand_in
+        base = op.children[0].as_str()
+        scope = op.children[1].as_int()
+        size_limit = op.children[3].as_int()
+        flt = op.children[6]
+        requested = {child.as_str().casefold() for child in op.children[7].children}
+        if base:  # root DSE reads are not directory searches
+            with stand_in._lock:
+                stand_in.stats.searches += 1
+        chunks = [
+            _frame(message_id, encode(_SEARCH_ENTRY, _entry_payload(entry, requested)))
+            for entry in stand_in.search(base, scope, flt, size_limit)
+        ]
+        chunks.append(_frame(message_id, encode(_SEARCH_DONE, _result(SUCCESS))))
+        sock.sendall(b"".join(chunks))
+
+    def _extended(self, sock: socket.socket, message_id: int, op: Tlv) -> socket.socket:
+        stand_in = self.server.stand_in
+        oid = op.children[0].as_str()
+        if oid != START_TLS_OID or stand_in.tls != "starttls" or isinstance(sock, ssl.SSLSocket):
+            _send(sock, message_id, encode(_EXTENDED_RESPONSE, _result(PROTOCOL_ERROR, "unsupported extension")))
+            return sock
+        _send(sock, message_id, encode(_EXTENDED_RESPONSE, _result(SUCCESS) + encode_str(oid, tag=0x8A)))
+        return stand_in.wrap_tls(sock)
+
+
+def _read_message(sock: socket.socket) -> bytes | None:
+    buf = b""
+    total: int | None = None
+    while total is None or len(buf) < total:
+        chunk = sock.recv(65536 if total is None else total - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+        if total is None:
+            total = message_length(buf)
+    return buf
+
+
+def _result(code: int, diagnostic: str = "", matched: str = "") -> bytes:
+    return encode_int(code, ENUMERATED) + encode_str(matched) + encode_str(diagnostic)
+
+
+def _frame(message_id: int, op: bytes) -> bytes:
+    return encode_seq(encode_int(message_id), op)
+
+
+def _send(sock: socket.socket, message_id: int, op: bytes) -> None:
+    sock.sendall(_frame(message_id, op))
+
+
+def _entry_payload(entry: DirectoryEntry, requested: set[str]) -> bytes:
+    everything = not requested or "*" in requested
+    attributes = [
+        encode_seq(encode_str(name), encode(SET, b"".join(encode_str(v) for v in values)))
+        for key, (name, values) in entry.attributes.items()
+        if everything or key in requested
+    ]
+    return encode_str(entry.dn) + encode_seq(*attributes)
+
+
+def _login_filter(flt: Tlv) -> str | None:
+    """The login of ``(sAMAccountName=x)``, alone or inside an AND, for the index lookup."""
+    children = flt.children if flt.tag == 0xA0 else [flt]
+    for child in children:
+        if child.tag == 0xA3 and child.children[0].as_str().casefold() == "samaccountname":
+            return child.children[1].as_str()
+    return None
+
+
+def _in_scope(dn: str, base: str, scope: int) -> bool:
+    if scope == 0:
+        return dn == base
+    if not base:
+        return scope == 2 or "," not in dn
+    if not dn.endswith("," + base):
+        return False
+    return scope == 2 or "," not in dn[: -len(base) - 1]
+
+
+def _match(entry: DirectoryEntry, flt: Tlv) -> bool:
+    tag = flt.tag
+    if tag == 0xA0:
+        return all(_match(entry, child) for child in flt.children)
+    if tag == 0xA1:
+        return any(_match(entry, child) for child in flt.children)
+    if tag == 0xA2:
+        return not _match(entry, flt.children[0])
+    if tag == 0x87:
+        name = flt.as_str()
+        return name.casefold() == "objectclass" or bool(entry.get(name))
+    if tag in (0xA3, 0xA8):
+        attr, value = flt.children[0].as_str(), flt.children[1].value.lower()
+        return any(v.lower() == value for v in entry.get(attr))
+    if tag == 0xA4:
+        attr = flt.children[0].as_str()
+        return any(_match_substrings(v.lower(), flt.children[1].children) for v in entry.get(attr))
+    if tag in (0xA5, 0xA6):
+        attr, value = flt.children[0].as_str(), flt.children[1].value.lower()
+        values = [v.lower() for v in entry.get(attr)]
+        return any(v >= value for v in values) if tag == 0xA5 else any(v <= value for v in values)
+    return False
+
+
+def _match_substrings(value: bytes, parts: list[Tlv]) -> bool:
+    pos = 0
+    for part in parts:
+        needle = part.value.lower()
+        if part.tag == 0x80:
+            if not value.startswith(needle):
+                return False
+            pos = len(needle)
+        elif part.tag == 0x81:
+            idx = value.find(needle, pos)
+            if idx < 0:
+                return False
+            pos = idx + len(needle)
+        elif part.tag == 0x82 and (not value.endswith(needle) or len(value) - len(needle) < pos):
+            return False
+    return True
+
+
+__all__ = [
+    "BUSY",
+    "DirectoryEntry",
+    "INVALID_CREDENTIALS",
+    "LdapFaults",
+    "LdapStandIn",
+    "StandInStats",
+    "TlsMode",
+    "normalize_dn",
+    "START_TLS_OID",
+    "SUCCESS",
+    "UNAVAILABLE",
+]
@@ -0,0 +1,129 @@
+"""Synthetic ``users`` rows for the people search: seeding a database and sampling queries.
+
+The names are drawn from a few dozen common Russian surnames and given names,
+so, as in a real directory, popular surnames match thousands of rows and
+rare combinations match a handful.
+"""
+
+from __future__ import annotations
+
+import random
+import uuid
+from collections.abc import Iterator
+from typing import Any
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from db.models.user.user import User
+
+_LAST_NAMES = tuple(
+    "Иванов Смирнов Кузнецов Попов Васильев Петров Соколов Михайлов Новиков Фёдоров Морозов Волков Алексеев "
+    "Лебедев Семёнов Егоров Павлов Козлов Степанов Николаев Орлов Андреев Макаров Никитин Захаров Зайцев Соловьёв "
+    "Борисов Яковлев Григорьев Романов Воробьёв Сергеев Кузьмин Фролов Александров Дмитриев Королёв Гусев Киселёв".split()
+)
+# (male, female) pairs.
+_FIRST_NAMES = tuple(
+    tuple(pair.split("/"))
+    for pair in (
+        "Александр/Александра Дмитрий/Дарья Максим/Мария Сергей/Светлана Андрей/Анна Алексей/Алёна Артём/Анастасия "
+        "Илья/Ирина Кирилл/Ксения Михаил/Марина Никита/Наталья Матвей/Екатерина Роман/Юлия Егор/Елена Иван/Ольга "
+        "Павел/Полина Олег/Татьяна Пётр/Вера Виктор/Галина"
+    ).split()
+)
+_DEPARTMENTS = (
+    "Отдел продаж",
+    "Отдел закупок",
+    "Департамент ИТ",
+    "Служба логистики",
+    "Финансовый отдел",
+    "Бухгалтерия",
+    "Производство",
+    "Юридический отдел",
+    "Отдел кадров",
+    "Тендерный отдел",
+    "Служба безопасности",
+    "Склад",
+)
+_TITLES = ("Инженер", "Менеджер", "Специалист", "Аналитик", "Ведущий специалист", "Руководитель группы")
+
+_TRANSLIT = dict(
+    zip(
+        "абвгдеёжзийклмнопрстуфхцчшщъыьэюя",
+        "a b v g d e e zh z i y k l m n o p r s t u f kh ts ch sh shch _ y _ e yu ya".split(),
+        strict=True,
+    )
+)
+
+
+def _translit(text: str) -> str:
+    return "".join(_TRANSLIT.get(char, char) for char in text.lower()).replace("_", "")
+
+
+def synthetic_users(count: int, *, seed: int = 0) -> Iterator[dict[str, Any]]:
+    """``users`` rows with logins ``ivanov.a.000042``; the same ``seed`` gives the same rows."""
+    rng = random.Random(seed)
+    for index in range(count):
+        last_name = rng.choice(_LAST_NAMES)
+        female = rng.random() < 0.5
+        first_name = rng.choice(_FIRST_NAMES)[female]
+        if female:
+            last_name += "а"
+        login = f"{_translit(last_name)}.{_translit(first_name[0])}.{index:06d}"
+        yield {
+            "ad_guid": uuid.UUID(int=rng.getrandbits(128)),
+            "ad_login": login,
+            "full_name": f"{last_name} {first_name}",
+            "email": f"{login}@example.loc",
+            "department": rng.choice(_DEPARTMENTS),
+            "title": rng.choice(_TITLES),
+            "is_active": rng.random() > 0.05,
+        }
+
+
+async def seed_users(session: AsyncSession, count: int, *, batch: int = 2000, seed: int = 0) -> int:
+    """Insert ``count`` synthetic users in batches; rows whose login exists are skipped.  Returns rows inserted."""
+    inserted = 0
+    rows: list[dict[str, Any]] = []
+    for row in synthetic_users(count, seed=seed):
+        rows.append(row)
+        if len(rows) == batch:
+            inserted += await _insert(session, rows)
+            rows = []
+    if rows:
+        inserted += await _insert(session, rows)
+    return inserted
+
+
+async def _insert(session: AsyncSession, rows: list[dict[str, Any]]) -> int:
+    stmt = insert(User).values(rows).on_conflict_do_nothing(index_elements=[User.ad_login])
+    result: Any = await session.execute(stmt)
+    return int(result.rowcount or 0)
+
+
+def sample_queries(count: int, *, seed: int = 0) -> list[str]:
+    """Typeahead queries as users type them: surname prefixes, surname and initial, logins and departments.
+
+    Surnames are drawn with Zipf-like weights, so some prefixes are popular
+    and repeat, as they do in real traffic.
+    """
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, len(_LAST_NAMES) + 1)]
+    queries: list[str] = []
+    for _ in range(count):
+        last_name = rng.choices(_LAST_NAMES, weights)[0]
+        first_name = rng.choice(_FIRST_NAMES)[0]
+        kind = rng.random()
+        if kind < 0.5:
+            query = last_name[: rng.randint(3, len(last_name))]
+        elif kind < 0.7:
+            query = f"{last_name} {first_name[: rng.randint(1, 3)]}"
+        elif kind < 0.9:
+            query = f"{_translit(last_name)}.{_translit(first_name[0])}"[: rng.randint(3, 8)]
+        else:
+            query = max(rng.choice(_DEPARTMENTS).split(), key=len)[: rng.randint(3, 8)]
+        queries.append(query)
+    return queries
+
+
+__all__ = ["sample_queries", "seed_users", "synthetic_users"]
@@ -0,0 +1,111 @@
+"""Run the LDAP and Dify stand-ins as real servers for load tests on a machine without network.
+
+``python -m cli stand-ins`` seeds the directory from the current settings (base
+DN, domain, service account, role groups, Dify API keys), starts both servers
+and prints the ``APP_CONFIG__*`` overrides that point the API at them; the API
+itself runs unchanged.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+
+from config import settings
+from testing.dify import FakeDify
+from testing.directory import SeededDirectory, seed_directory
+from testing.ldap_server import LdapFaults, LdapStandIn
+
+
+@dataclass(slots=True)
+class StandInOptions:
+    host: str = "127.0.0.1"
+    ldap_port: int = 3389
+    dify_port: int = 5001
+    users: int = 5000
+    groups: int = 200
+    reports_per_manager: int = 8
+    password: str = "Passw0rd!"
+    ldap_latency: float = 0.0
+    ldap_jitter: float = 0.0
+    ldap_failure_rate: float = 0.0
+    ldap_disconnect_rate: float = 0.0
+    dify_latency: float = 0.0
+    dify_jitter: float = 0.0
+    dify_stream_delay: float = 0.0
+    dify_failure_rate: float = 0.0
+    seed: int = 0
+
+
+def build_ldap(options: StandInOptions) -> tuple[LdapStandIn, SeededDirectory]:
+    """A seeded directory that accepts the configured service account."""
+    faults = LdapFaults(
+        latency=options.ldap_latency,
+        jitter=options.ldap_jitter,
+        failure_rate=options.ldap_failure_rate,
+        disconnect_rate=options.ldap_disconnect_rate,
+        seed=options.seed,
+    )
+    server = LdapStandIn(
+        base_dn=settings.ldap.base_dn,
+        domain=settings.ldap.domain,
+        host=options.host,
+        port=options.ldap_port,
+        faults=faults,
+    )
+    directory = seed_directory(
+        server,
+        users=options.users,
+        groups=options.groups,
+        reports_per_manager=options.reports_per_manager,
+        password=options.password,
+        role_groups=settings.ldap.groups.model_dump(),
+        seed=options.seed,
+    )
+    server.set_password(settings.ldap.service_user.split("\\")[-1], settings.ldap.service_pass.get_secret_value())
+    return server, directory
+
+
+def build_dify(options: StandInOptions) -> FakeDify:
+    """A fake Dify accepting the configured API keys."""
+    keys = {settings.dify.kb_api_key, settings.dify.customer_segment_api_key} - {""}
+    return FakeDify(
+        api_keys=keys,
+        latency=options.dify_latency,
+        jitter=options.dify_jitter,
+        stream_delay=options.dify_stream_delay,
+        failure_rate=options.dify_failure_rate,
+        seed=options.seed,
+    )
+
+
+def environment(ldap_uri: str, dify_url: str) -> dict[str, str]:
+    """Overrides that point the API at the stand-ins."""
+    return {
+        "APP_CONFIG__LDAP__SERVER_URI": ldap_uri,
+        "APP_CONFIG__LDAP__SERVERS": json.dumps([ldap_uri]),
+        "APP_CONFIG__LDAP__TLS_MODE": "none",
+        "APP_CONFIG__DIFY__BASE_URL": dify_url,
+    }
+
+
+def run(options: StandInOptions) -> int:
+    """Serve both stand-ins until interrupted."""
+    import typer
+    import uvicorn
+
+    server, directory = build_ldap(options)
+    dify = build_dify(options)
+    with server:
+        dify_url = f"http://{options.host}:{options.dify_port}/v1"
+        for name, value in environment(server.uri, dify_url).items():
+            typer.echo(f"{name}={value}")
+        typer.echo(
+            f"# {len(directory.logins)} users ({directory.logins[0]}..{directory.logins[-1]}), "
+            f"password {directory.password!r}, {len(directory.managers)} managers"
+        )
+        uvicorn.run(dify.app, host=options.host, port=options.dify_port, log_level="warning")
+    return 0
+
+
+__all__ = ["StandInOptions", "build_dify", "build_ldap", "environment", "run"]
@@ -0,0 +1,14 @@
+"""Directory users: paged listing and people search."""
+
+from .listing import UserFilters, UserListing, user_listing
+from .search import PeopleSearch, SearchResult, normalize_search, people_search
+
+__all__ = [
+    "PeopleSearch",
+    "SearchResult",
+    "UserFilters",
+    "UserListing",
+    "normalize_search",
+    "people_search",
+    "user_listing",
+]
@@ -0,0 +1,94 @@
+"""Paged listing of directory users with signed keyset cursors.
+
+A page is ``WHERE (sort keys) > (last keys) ORDER BY sort keys LIMIT n`` over
+the covering ``ix_users_*_sort`` indexes, so its cost does not grow with the
+page number or the table size.  The cursor carries the last row's keys, the
+sort and a fingerprint of the filters; it is signed, so it cannot be edited or
+replayed against a different query.  Rows are streamed from a server-side
+cursor as the response is written.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from collections.abc import AsyncGenerator, Callable, Sequence
+from contextlib import AbstractAsyncContextManager
+from dataclasses import astuple, dataclass
+from typing import Any
+
+import orjson
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from core.cursors import CursorCodec, InvalidCursorError, derive_key
+from db.engine import db
+from db.repositories.app.users import UserSort, sort_keys, stream_users, user_page_query
+
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+_CURSOR_KEY_PURPOSE = b"user-listing-cursor"
+
+
+@dataclass(frozen=True, slots=True)
+class UserFilters:
+    department: str | None = None
+    role: str | None = None
+    is_active: bool | None = None
+    prefix: str | None = None
+
+    def fingerprint(self) -> str:
+        return hashlib.sha256(orjson.dumps(astuple(self))).hexdigest()[:16]
+
+
+class UserListing:
+    """Builds page queries, streams their rows and issues cursors for the next page."""
+
+    def __init__(self, codec: CursorCodec, *, session_factory: SessionFactory = db.session) -> None:
+        self._codec = codec
+        self._session_factory = session_factory
+
+    def cursor_for(self, sort: UserSort, filters: UserFilters, row: Row[Any]) -> str:
+        """Cursor of the page that follows ``row``."""
+        keys = [getattr(row, f"sort_{index}") for index in range(len(sort_keys(sort)))]
+        return self._codec.encode({"s": sort, "f": filters.fingerprint(), "k": keys})
+
+    def keyset(self, cursor: str, sort: UserSort, filters: UserFilters) -> list[Any]:
+        """Keys stored in ``cursor``; :class:`InvalidCursorError` unless it was issued for this sort and filters."""
+        payload = self._codec.decode(cursor)
+        keys = payload.get("k")
+        if payload.get("s") != sort or payload.get("f") != filters.fingerprint():
+            raise InvalidCursorError("cursor was issued for another query")
+        if not isinstance(keys, list) or len(keys) != len(sort_keys(sort)):
+            raise InvalidCursorError("cursor keys do not match the sort")
+        return keys
+
+    async def rows(
+        self, *, sort: UserSort, filters: UserFilters, after: Sequence[Any] | None, limit: int
+    ) -> AsyncGenerator[Row[Any]]:
+        """Up to ``limit`` rows past ``after``; the session lives as long as the iteration."""
+        stmt = user_page_query(
+            sort=sort,
+            after=after,
+            limit=limit,
+            department=filters.department,
+            role=filters.role,
+            is_active=filters.is_active,
+            prefix=filters.prefix,
+        )
+        async with self._session_factory() as session:
+            async for row in stream_users(session, stmt):
+                yield row
+
+
+def create_user_listing() -> UserListing:
+    if settings.api.cursor_secret is not None:
+        return UserListing(CursorCodec(settings.api.cursor_secret.get_secret_value()))
+    # Not the JWT signing key itself: one key is never used for two protocols.
+    return UserListing(CursorCodec(derive_key(settings.jwt.secret.get_secret_value(), _CURSOR_KEY_PURPOSE)))
+
+
+user_listing = create_user_listing()
+
+
+__all__ = ["UserFilters", "UserListing", "create_user_listing", "user_listing"]
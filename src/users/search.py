@@ -0,0 +1,97 @@
+"""Typeahead people search over name, login, e-mail and department.
+
+Queries are normalized like the indexed search document (case-folded, ``ё`` ->
+``е``, single spaces), so the per-worker cache is keyed by what the database
+would see: "Иванов " and "иванов" share an entry.  Queries shorter than
+``APP_CONFIG__USER_SEARCH__MIN_LENGTH`` are answered empty without a query, and
+concurrent identical misses share one, so a client may search on every
+keystroke with only a light debounce.  Directory changes are picked up when
+entries expire (``APP_CONFIG__USER_SEARCH__CACHE_TTL_SEC``).
+"""
+
+from __future__ import annotations
+
+import time
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Literal
+
+from sqlalchemy import Row
+
+from config import settings
+from core.cache import Coalescer, TTLCache
+from core.metrics import metrics
+from db.engine import db
+from db.repositories.app.users import TRIGRAM_MIN_TERM, user_search_query
+
+from .listing import SessionFactory
+
+SearchKey = tuple[str, int, bool]
+
+user_search_seconds = metrics.histogram(
+    "user_search_seconds", "People search latency by the layer that answered", ("source",)
+)
+
+
+def normalize_search(query: str) -> str:
+    """Lower-cased query with single spaces and ``ё`` -> ``е``, as in ``USER_SEARCH_DOCUMENT``."""
+    return " ".join(unicodedata.normalize("NFKC", query).lower().replace("ё", "е").split())
+
+
+@dataclass(frozen=True, slots=True)
+class SearchResult:
+    rows: tuple[Row[Any], ...]
+    source: Literal["cache", "database", "skipped"]
+
+
+class PeopleSearch:
+    """Cached, coalesced trigram searches of the ``users`` table."""
+
+    def __init__(
+        self,
+        *,
+        cache: TTLCache[SearchKey, tuple[Row[Any], ...]],
+        min_length: int,
+        session_factory: SessionFactory = db.session,
+    ) -> None:
+        self._cache = cache
+        self._coalescer: Coalescer[SearchKey, tuple[Row[Any], ...]] = Coalescer(cache.name)
+        self._min_length = max(min_length, TRIGRAM_MIN_TERM)
+        self._session_factory = session_factory
+
+    async def search(self, query: str, *, limit: int, include_inactive: bool = False) -> SearchResult:
+        started = time.perf_counter()
+        text = normalize_search(query)
+        terms = text.split()
+        if len(text) < self._min_length or not any(len(term) >= TRIGRAM_MIN_TERM for term in terms):
+            return SearchResult((), "skipped")
+        key = (text, limit, include_inactive)
+        rows = self._cache.get(key)
+        source: Literal["cache", "database"] = "cache"
+        if rows is None:
+            rows = await self._coalescer.run(key, lambda: self._load(key))
+            source = "database"
+        user_search_seconds.observe(time.perf_counter() - started, source)
+        return SearchResult(rows, source)
+
+    async def _load(self, key: SearchKey) -> tuple[Row[Any], ...]:
+        text, limit, include_inactive = key
+        stmt = user_search_query(text, text.split(), limit=limit, include_inactive=include_inactive)
+        async with self._session_factory() as session:
+            rows = tuple((await session.execute(stmt)).all())
+        self._cache.set(key, rows)
+        return rows
+
+
+def create_people_search() -> PeopleSearch:
+    config = settings.user_search
+    cache: TTLCache[SearchKey, tuple[Row[Any], ...]] = TTLCache(
+        "user_search", max_size=config.cache_max_entries, ttl=config.cache_ttl_sec
+    )
+    return PeopleSearch(cache=cache, min_length=config.min_length)
+
+
+people_search = create_people_search()
+
+
+__all__ = ["PeopleSearch", "SearchResult", "create_people_search", "normalize_search", "people_search"]
@@ -2,10 +2,14 @@
 
 from __future__ import annotations
 
+import asyncio
+
 import pytest
 
 pytest.importorskip("fastapi")
 
+from fastapi.testclient import TestClient
+
 from api.app import create_app
 from config import settings
 
@@ -21,3 +25,88 @@ def test_docs_and_openapi_paths() -> None:
     app = create_app()
     assert app.docs_url == f"{settings.api.prefix}/docs"
     assert app.openapi_url == f"{settings.api.prefix}/openapi.json"
+
+
+def test_request_id_is_echoed() -> None:
+    client = TestClient(create_app())
+    response = client.get(f"{settings.api.prefix}/example/of/protected/route", headers={"X-Request-ID": "rid-42"})
+    assert response.status_code == 401
+    assert response.headers["X-Request-ID"] == "rid-42"
+    assert response.json()["error"]["requestId"] == "rid-42"
+
+
+def test_metrics_endpoint_exposes_route_latency() -> None:
+    client = TestClient(create_app())
+    client.get(f"{settings.api.prefix}/example/of/protected/route")
+    response = client.get(f"{settings.api.prefix}{settings.metrics.path}")
+    assert response.status_code == 200
+    assert f'route="{settings.api.prefix}/example/of/protected/route",status="401"' in response.text
+    assert "http_error_responses_total" in response.text
+
+
+def test_health_endpoints() -> None:
+    client = TestClient(create_app())
+    assert client.get(f"{settings.api.prefix}/health/live").json() == {"status": "ok"}
+    ready = client.get(f"{settings.api.prefix}/health/ready")
+    assert ready.status_code == 503
+    assert ready.json()["status"] == "not_ready"
+
+
+@pytest.mark.asyncio
+async def test_admission_sheds_with_503() -> None:
+    httpx = pytest.importorskip("httpx")
+    from starlette.applications import Starlette
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+
+    from api.middleware import AdmissionMiddleware
+    from core.admission import AdmissionLimiter
+
+    release = asyncio.Event()
+
+    async def slow(_request: object) -> PlainTextResponse:
+        await release.wait()
+        return PlainTextResponse("ok")
+
+    limiter = AdmissionLimiter("test-shed", max_in_flight=1, queue_size=0, queue_timeout=1.0)
+    app = AdmissionMiddleware(
+        Starlette(routes=[Route("/slow", slow)]), rules=[("/health/*", None), ("/*", limiter)], retry_after=2
+    )
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        first = asyncio.create_task(client.get("/slow"))
+        while limiter.in_flight == 0:
+            await asyncio.sleep(0)
+        shed = await client.get("/slow")
+        release.set()
+        assert (await first).status_code == 200
+    assert shed.status_code == 503
+    assert shed.headers["Retry-After"] == "2"
+    assert shed.json()["error"]["code"] == "OVERLOADED"
+
+
+def test_rate_limit_runs_before_admission_and_cors_is_outermost(monkeypatch: pytest.MonkeyPatch) -> None:
+    import api.app as app_module
+
+    class Deny:
+        async def acquire(self, key: str) -> float:
+            return 5.0
+
+    class Spy:
+        acquired = 0
+
+        async def acquire(self) -> float:
+            Spy.acquired += 1
+            return 0.0
+
+        def release(self) -> None:
+            pass
+
+    monkeypatch.setattr(app_module, "create_rate_limit_rules", lambda: [("/*", Deny())])
+    monkeypatch.setattr(app_module, "create_admission_rules", lambda: [("/*", Spy())])
+    monkeypatch.setattr(settings.cors, "enabled", True)
+    monkeypatch.setattr(settings.cors, "origins", ["http://ui.test"])
+    client = TestClient(create_app())
+    response = client.get(f"{settings.api.prefix}/health/live", headers={"Origin": "http://ui.test"})
+    assert response.status_code == 429
+    assert response.headers["access-control-allow-origin"] == "http://ui.test"
+    assert Spy.acquired == 0
@@ -14,7 +14,8 @@ from fastapi.testclient import TestClient
 from api.app import create_app
 from api.routers.v1.auth import routes as auth_routes
 from auth.domain import LoginResult, UserProfile
-from auth.exceptions import AuthError
+from auth.exceptions import AccountLockedError, AuthError
+from config import settings
 
 
 class DummyService:
@@ -71,3 +72,39 @@ def test_login_failure_maps_error() -> None:
     response = client.post("/api/v1/auth/login", json={"login": "user", "password": "bad"})
     assert response.status_code == 401
     assert response.json()["error"]["code"] == "invalid_credentials"
+
+
+def test_login_longer_than_login_column_is_rejected() -> None:
+    client = _override_service(DummyService())
+    response = client.post("/api/v1/auth/login", json={"login": "x" * 129, "password": "pass"})
+    assert response.status_code == 422
+
+
+class LockedService:
+    async def login(self, *_: Any, **__: Any) -> LoginResult:
+        raise AccountLockedError(12.3)
+
+
+def test_login_locked_returns_423_with_retry_after() -> None:
+    client = _override_service(LockedService())
+    response = client.post("/api/v1/auth/login", json={"login": "user", "password": "bad"})
+    assert response.status_code == 423
+    assert response.headers["Retry-After"] == "13"
+    body = response.json()["error"]
+    assert body["code"] == "account_locked"
+    assert body["details"] == {"retryAfter": 13}
+
+
+def test_login_rate_limited_per_client() -> None:
+    client = _override_service(FailingService())
+    burst = next(rule.burst for rule in settings.rate_limit.rules if rule.path == "/auth/login")
+    statuses = [
+        client.post("/api/v1/auth/login", json={"login": "user", "password": "bad"}).status_code for _ in range(burst)
+    ]
+    assert statuses == [401] * burst
+    response = client.post("/api/v1/auth/login", json={"login": "user", "password": "bad"})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    body = response.json()["error"]
+    assert body["code"] == "TOO_MANY_REQUESTS"
+    assert body["requestId"] == response.headers["X-Request-ID"]
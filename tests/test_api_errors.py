@@ -9,15 +9,19 @@ import pytest
 pytest.importorskip("starlette")
 pytest.importorskip("sqlalchemy")
 
+import orjson
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import IntegrityError
 from starlette.requests import Request
 
+import api.errors.handlers as handlers_module
 from api.errors.exceptions import AppError
 from api.errors.handlers import (
     _code_by_status,
+    _encode_error,
     _make_error_response,
     app_error_handler,
+    error_response,
     integrity_error_handler,
     validation_exception_handler,
 )
@@ -44,6 +48,55 @@ def test_make_error_response() -> None:
     assert "rid" in payload
 
 
+def test_error_response_defaults_the_code_by_status() -> None:
+    response = error_response(429, "Slow down.", request_id="rid", headers={"Retry-After": "3"})
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "3"
+    assert orjson.loads(response.body)["error"] == {
+        "code": "TOO_MANY_REQUESTS",
+        "message": "Slow down.",
+        "requestId": "rid",
+    }
+    assert orjson.loads(error_response(503, "Busy.", code="OVERLOADED").body)["error"]["code"] == "OVERLOADED"
+
+
+def test_static_error_body_is_cached_with_request_id_spliced() -> None:
+    first = _encode_error("UNAUTHORIZED", "Missing Authorization header", 'rid-"1"', None)
+    second = _encode_error("UNAUTHORIZED", "Missing Authorization header", None, None)
+    assert ("UNAUTHORIZED", "Missing Authorization header") in handlers_module._static_bodies
+    assert orjson.loads(first) == {
+        "error": {"code": "UNAUTHORIZED", "message": "Missing Authorization header", "requestId": 'rid-"1"'}
+    }
+    assert orjson.loads(second)["error"]["requestId"] is None
+
+
+def test_error_body_with_details_is_not_cached() -> None:
+    body = _encode_error("LOCKED", "Locked for details", "rid", {"retryAfter": 3})
+    assert orjson.loads(body)["error"]["details"] == {"retryAfter": 3}
+    assert ("LOCKED", "Locked for details") not in handlers_module._static_bodies
+
+
+def test_static_error_cache_is_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(handlers_module, "_static_bodies", {})
+    monkeypatch.setattr(handlers_module, "_STATIC_BODIES_MAX", 2)
+    for index in range(5):
+        assert (
+            orjson.loads(_encode_error("X", f"message {index}", "rid", None))["error"]["message"] == f"message {index}"
+        )
+    assert len(handlers_module._static_bodies) == 2
+
+
+@pytest.mark.asyncio
+async def test_dropped_log_records_skip_structured_fields(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fail(*_: Any) -> dict[str, Any]:
+        raise AssertionError("log fields must not be built")
+
+    monkeypatch.setattr(handlers_module, "_log_extra", fail)
+    monkeypatch.setattr(handlers_module.log, "isEnabledFor", lambda _level: False)
+    response = await app_error_handler(_make_request(), AppError("UNAUTHORIZED", "Token expired", status=401))
+    assert response.status_code == 401
+
+
 def test_error_responses() -> None:
     responses = error_responses(400, 401)
     assert 400 in responses
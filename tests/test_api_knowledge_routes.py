@@ -0,0 +1,82 @@
+"""Integration tests for knowledge base routes."""
+
+from __future__ import annotations
+
+from typing import Any
+from uuid import uuid4
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi.testclient import TestClient
+
+from api.app import create_app
+from api.deps.auth import TokenUser, get_current_user
+from api.routers.v1.knowledge import routes as knowledge_routes
+from integrations.dify import DifyError, DifyUnavailableError
+from knowledge import KbRecord, RetrievalResult
+
+URL = "/api/v1/knowledge/retrieve"
+
+
+class DummyService:
+    def __init__(self, error: DifyError | None = None) -> None:
+        self.error = error
+        self.calls: list[tuple[str, str, int]] = []
+
+    async def retrieve(self, dataset_id: str, query: str, *, top_k: int) -> RetrievalResult:
+        self.calls.append((dataset_id, query, top_k))
+        if self.error is not None:
+            raise self.error
+        return RetrievalResult((KbRecord("d1", "cable.md", "s1", "поставка кабеля", 0.9),), "cache")
+
+
+def _viewer() -> TokenUser:
+    return TokenUser(1, uuid4(), "user", "viewer", None, None, None, None)
+
+
+def _client(service: Any) -> TestClient:
+    app = create_app()
+    app.dependency_overrides[knowledge_routes.get_retrieval_service] = lambda: service
+    app.dependency_overrides[get_current_user] = _viewer
+    return TestClient(app)
+
+
+def test_retrieve() -> None:
+    service = DummyService()
+    response = _client(service).post(URL, json={"query": "кабель", "datasetId": "ds1", "topK": 2})
+    assert response.status_code == 200
+    assert response.json() == {
+        "records": [
+            {
+                "documentId": "d1",
+                "documentName": "cable.md",
+                "segmentId": "s1",
+                "content": "поставка кабеля",
+                "score": 0.9,
+            }
+        ],
+        "source": "cache",
+    }
+    assert service.calls == [("ds1", "кабель", 2)]
+
+
+def test_dataset_is_required_without_default() -> None:
+    response = _client(DummyService()).post(URL, json={"query": "кабель"})
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "DATASET_REQUIRED"
+
+
+@pytest.mark.parametrize(
+    ("error", "status", "code"),
+    [
+        (DifyUnavailableError("down", status=503), 503, "KNOWLEDGE_UNAVAILABLE"),
+        (DifyError("missing", status=404), 404, "DATASET_NOT_FOUND"),
+        (DifyError("bad", status=400), 502, "KNOWLEDGE_FAILED"),
+    ],
+)
+def test_dify_errors(error: DifyError, status: int, code: str) -> None:
+    response = _client(DummyService(error)).post(URL, json={"query": "кабель", "datasetId": "ds1"})
+    assert response.status_code == status
+    assert response.json()["error"]["code"] == code
@@ -0,0 +1,119 @@
+"""Tests for the prebuilt OpenAPI schema endpoint."""
+
+from __future__ import annotations
+
+import gzip
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+import orjson
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.app import create_app
+from api.openapi import (
+    OpenApiDocument,
+    accepts_gzip,
+    etag_matches,
+    install_openapi,
+    load_artifact,
+    write_artifact,
+)
+from config import settings
+
+OPENAPI_URL = f"{settings.api.prefix}/openapi.json"
+
+
+def test_schema_served_with_etag_and_304() -> None:
+    client = TestClient(create_app())
+    response = client.get(OPENAPI_URL, headers={"Accept-Encoding": "identity"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert f"{settings.api.prefix}/auth/login" in response.json()["paths"]
+    etag = response.headers["etag"]
+
+    cached = client.get(OPENAPI_URL, headers={"If-None-Match": etag, "Accept-Encoding": "identity"})
+    assert cached.status_code == 304
+    assert cached.content == b""
+
+
+def test_schema_gzip_variant() -> None:
+    client = TestClient(create_app())
+    response = client.get(OPENAPI_URL, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"].endswith('-gzip"')
+    assert "paths" in response.json()  # decoded by the client
+
+
+def test_docs_page_points_at_schema() -> None:
+    client = TestClient(create_app())
+    response = client.get(f"{settings.api.prefix}/docs")
+    assert response.status_code == 200
+    assert OPENAPI_URL in response.text
+
+
+def test_artifact_is_served_without_generating(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    path = tmp_path / "openapi.json"
+    document = write_artifact(create_app(), path)
+    assert gzip.decompress(path.with_name("openapi.json.gz").read_bytes()) == path.read_bytes()
+
+    app = FastAPI(openapi_url="/openapi.json")
+
+    def fail() -> dict[str, object]:
+        raise AssertionError("schema must not be generated")
+
+    monkeypatch.setattr(app, "openapi", fail)
+    install_openapi(app, path)
+    response = TestClient(app).get("/openapi.json", headers={"Accept-Encoding": "identity"})
+    assert response.content == document.body
+    assert response.headers["etag"] == document.etag
+
+
+def test_missing_artifact_falls_back_to_generation(tmp_path: Path) -> None:
+    assert load_artifact(tmp_path / "absent.json") is None
+    app = FastAPI(openapi_url="/openapi.json", title="Fallback")
+    install_openapi(app, tmp_path / "absent.json")
+    assert TestClient(app).get("/openapi.json").json()["info"]["title"] == "Fallback"
+    assert app.openapi_schema is None
+
+
+def test_document_etag_is_stable() -> None:
+    body = orjson.dumps({"openapi": "3.1.0"})
+    first, second = OpenApiDocument.from_bytes(body), OpenApiDocument.from_bytes(body)
+    assert first.etag == second.etag
+    assert first.gzipped == second.gzipped
+    assert first.etag != OpenApiDocument.from_bytes(body + b" ").etag
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [("gzip, deflate, br", True), ("br;q=1.0, gzip;q=0.5", True), ("gzip;q=0", False), ("*", True), ("", False)],
+)
+def test_accepts_gzip(header: str, expected: bool) -> None:
+    assert accepts_gzip(header) is expected
+
+
+def test_etag_matches() -> None:
+    assert etag_matches('"a", "b"', ('"b"',))
+    assert etag_matches('W/"b"', ('"b"',))
+    assert etag_matches("*", ('"b"',))
+    assert not etag_matches(None, ('"b"',))
+    assert not etag_matches('"c"', ('"b"',))
+
+
+def test_cli_builds_artifact(tmp_path: Path) -> None:
+    pytest.importorskip("typer")
+    from typer.testing import CliRunner
+
+    from cli import app as cli_app
+
+    path = tmp_path / "build" / "openapi.json"
+    result = CliRunner().invoke(cli_app, ["openapi", "--output", str(path)])
+    assert result.exit_code == 0, result.output
+    document = load_artifact(path)
+    assert document is not None
+    assert document.etag in result.output
@@ -0,0 +1,109 @@
+"""Integration tests for the reporting tree routes."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+from uuid import uuid4
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi.testclient import TestClient
+
+from api.app import create_app
+from api.deps.auth import TokenUser, get_current_user
+from api.deps.database import get_session
+from api.routers.v1.org import routes as org_routes
+from orgchart import OrgChart
+
+PREFIX = "/api/v1/org"
+
+# 1 -> 2 -> 3 -> 4
+MANAGERS = {2: 1, 3: 2, 4: 3}
+
+
+def _depth(manager_id: int, user_id: int) -> int | None:
+    depth, current = 0, user_id
+    while current != manager_id:
+        if current not in MANAGERS:
+            return None
+        current, depth = MANAGERS[current], depth + 1
+    return depth
+
+
+def _row(user_id: int, depth: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=user_id,
+        ad_login=f"user{user_id}",
+        full_name=None,
+        email=None,
+        department=None,
+        title=None,
+        role="viewer",
+        is_active=True,
+        last_login_at=None,
+        depth=depth,
+    )
+
+
+class FakeChart(OrgChart):
+    async def depth_below(self, session: Any, *, manager_id: int, user_id: int) -> int | None:
+        return _depth(manager_id, user_id)
+
+    async def subtree(self, session: Any, manager_id: int, *, max_depth: int | None, limit: int) -> list[Any]:
+        found = [(user, _depth(manager_id, user)) for user in sorted(MANAGERS)]
+        rows = [_row(user, depth) for user, depth in found if depth and (max_depth is None or depth <= max_depth)]
+        return rows[:limit]
+
+    async def chain(self, session: Any, user_id: int) -> list[Any]:
+        return [_row(manager, _depth(manager, user_id) or 0) for manager in (3, 2, 1) if _depth(manager, user_id)]
+
+
+def _client(user_id: int = 2, role: str = "viewer") -> TestClient:
+    app = create_app()
+    app.dependency_overrides[org_routes.get_org_chart] = lambda: FakeChart()
+    app.dependency_overrides[get_session] = lambda: None
+    app.dependency_overrides[get_current_user] = lambda: TokenUser(
+        user_id, uuid4(), "user", role, None, None, None, None
+    )
+    return TestClient(app)
+
+
+def test_manager_sees_subtree() -> None:
+    response = _client().get(f"{PREFIX}/2/subtree")
+    assert response.status_code == 200
+    assert [(item["id"], item["depth"]) for item in response.json()["items"]] == [(3, 1), (4, 2)]
+    assert response.json()["truncated"] is False
+
+
+def test_subtree_depth_and_limit() -> None:
+    body = _client(user_id=1).get(f"{PREFIX}/1/subtree", params={"maxDepth": 2, "limit": 1}).json()
+    assert [item["id"] for item in body["items"]] == [2]
+    assert body["truncated"] is True
+
+
+def test_subtree_outside_the_chain_is_forbidden() -> None:
+    response = _client(user_id=3).get(f"{PREFIX}/2/subtree")
+    assert response.status_code == 403
+    assert response.json()["error"]["code"] == "FORBIDDEN"
+
+
+def test_org_read_sees_any_subtree() -> None:
+    assert _client(user_id=4, role="editor").get(f"{PREFIX}/1/subtree").status_code == 200
+
+
+def test_chain_lists_managers_upwards() -> None:
+    body = _client(user_id=4).get(f"{PREFIX}/4/chain").json()
+    assert [(item["id"], item["depth"]) for item in body["items"]] == [(3, 1), (2, 2), (1, 3)]
+
+
+def test_relation_is_a_chain_probe() -> None:
+    client = _client(user_id=1)
+    assert client.get(f"{PREFIX}/1/reports/4").json() == {"managerId": 1, "userId": 4, "depth": 3}
+    assert client.get(f"{PREFIX}/3/reports/2").json()["depth"] is None
+
+
+def test_requires_auth() -> None:
+    assert TestClient(create_app()).get(f"{PREFIX}/1/chain").status_code == 401
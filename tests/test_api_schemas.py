@@ -30,3 +30,29 @@ def test_api_input_model_forbids_extra() -> None:
 
     with pytest.raises(ValidationError):
         Example.model_validate({"fooBar": 1, "extra": "nope"})
+
+
+def test_login_response_from_profile_matches_validated_model() -> None:
+    from dataclasses import asdict
+    from datetime import UTC, datetime
+    from uuid import UUID
+
+    import orjson
+
+    from api.schemas.auth import AuthUser, LoginResponse
+    from auth.domain import LoginResult, UserProfile
+
+    profile = UserProfile(
+        id=7,
+        ad_login="jdoe",
+        ad_guid=UUID(int=7),
+        full_name="John Doe",
+        email=None,
+        department="IT",
+        title=None,
+        role="admin",
+        last_login_at=datetime(2024, 5, 1, 8, 30, tzinfo=UTC),
+    )
+    built = LoginResponse.from_result(LoginResult(access_token="a", refresh_token="r", user=profile))
+    validated = LoginResponse(access_token="a", user=AuthUser.model_validate(asdict(profile)))
+    assert orjson.loads(built.model_dump_json(by_alias=True)) == validated.model_dump(mode="json", by_alias=True)
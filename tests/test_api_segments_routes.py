@@ -0,0 +1,81 @@
+"""Integration tests for customer segment routes."""
+
+from __future__ import annotations
+
+from typing import Any
+from uuid import uuid4
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi.testclient import TestClient
+
+from api.app import create_app
+from api.deps.auth import TokenUser, get_current_user
+from api.routers.v1.segments import routes as segment_routes
+from integrations.dify import DifyError, DifyUnavailableError
+from segments import SegmentResult
+
+PREFIX = "/api/v1/customer-segments"
+
+
+class DummyService:
+    def __init__(self, error: DifyError | None = None) -> None:
+        self.error = error
+
+    async def classify(self, name: str) -> SegmentResult:
+        if self.error is not None:
+            raise self.error
+        return SegmentResult(name, "Энергетика", "memory")
+
+    async def classify_many(self, names: list[str]) -> list[SegmentResult]:
+        return [SegmentResult(names[0], "Энергетика", "dify"), SegmentResult(names[1], None, "error", "boom")]
+
+
+def _viewer() -> TokenUser:
+    return TokenUser(1, uuid4(), "user", "viewer", None, None, None, None)
+
+
+def _client(service: Any) -> TestClient:
+    app = create_app()
+    app.dependency_overrides[segment_routes.get_segment_service] = lambda: service
+    app.dependency_overrides[get_current_user] = _viewer
+    return TestClient(app)
+
+
+def test_classify() -> None:
+    response = _client(DummyService()).post(f"{PREFIX}/classify", json={"name": "ООО Ромашка"})
+    assert response.status_code == 200
+    assert response.json() == {"name": "ООО Ромашка", "segment": "Энергетика", "source": "memory", "error": None}
+
+
+@pytest.mark.parametrize(
+    ("error", "status", "code"),
+    [
+        (DifyUnavailableError("down", status=503), 503, "SEGMENT_UNAVAILABLE"),
+        (DifyError("bad request", status=400), 502, "SEGMENT_FAILED"),
+    ],
+)
+def test_classify_maps_dify_errors(error: DifyError, status: int, code: str) -> None:
+    response = _client(DummyService(error)).post(f"{PREFIX}/classify", json={"name": "ООО Ромашка"})
+    assert response.status_code == status
+    assert response.json()["error"]["code"] == code
+
+
+def test_classify_batch_reports_errors_per_item() -> None:
+    response = _client(DummyService()).post(f"{PREFIX}/classify/batch", json={"names": ["a", "b"]})
+    assert response.status_code == 200
+    assert [item["source"] for item in response.json()["items"]] == ["dify", "error"]
+
+
+def test_classify_requires_auth() -> None:
+    app = create_app()
+    response = TestClient(app).post(f"{PREFIX}/classify", json={"name": "ООО Ромашка"})
+    assert response.status_code == 401
+
+
+@pytest.mark.parametrize("names", [[], ["ООО Ромашка", ""], ["x" * 513]])
+def test_batch_is_validated(names: list[str]) -> None:
+    response = _client(DummyService()).post(f"{PREFIX}/classify/batch", json={"names": names})
+    assert response.status_code == 422
@@ -0,0 +1,152 @@
+"""Integration tests for the users listing route."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncGenerator, Sequence
+from types import SimpleNamespace
+from typing import Any
+from uuid import uuid4
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi.testclient import TestClient
+
+from api.app import create_app
+from api.deps.auth import TokenUser, get_current_user
+from api.routers.v1.users import routes as user_routes
+from core.cursors import CursorCodec
+from users import PeopleSearch, SearchResult, UserFilters, UserListing
+
+PREFIX = "/api/v1/users"
+
+
+def _row(user_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=user_id,
+        ad_login=f"user{user_id:03d}",
+        full_name=f"Пользователь {user_id:03d}",
+        email=None,
+        department="ОТиЗ",
+        title=None,
+        role="viewer",
+        is_active=True,
+        last_login_at=None,
+        sort_0=user_id,
+    )
+
+
+class FakeListing(UserListing):
+    """Serves ``total`` users ordered by id instead of querying the database."""
+
+    def __init__(self, total: int) -> None:
+        super().__init__(CursorCodec("secret"))
+        self.total = total
+        self.limits: list[int] = []
+
+    async def rows(  # type: ignore[override]
+        self, *, sort: Any, filters: UserFilters, after: Sequence[Any] | None, limit: int
+    ) -> AsyncGenerator[Any]:
+        self.limits.append(limit)
+        start = after[0] if after else 0
+        for user_id in range(start + 1, min(start + limit, self.total) + 1):
+            yield _row(user_id)
+
+
+class FakeSearch(PeopleSearch):
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, int, bool]] = []
+
+    async def search(self, query: str, *, limit: int, include_inactive: bool = False) -> SearchResult:
+        self.calls.append((query, limit, include_inactive))
+        if len(query) < 3:
+            return SearchResult((), "skipped")
+        return SearchResult(tuple(SimpleNamespace(**vars(_row(i)), score=0.5) for i in (1, 2)), "database")
+
+
+def _client(listing: UserListing, role: str = "viewer", search: PeopleSearch | None = None) -> TestClient:
+    app = create_app()
+    app.dependency_overrides[user_routes.get_user_listing] = lambda: listing
+    app.dependency_overrides[user_routes.get_people_search] = lambda: search or FakeSearch()
+    app.dependency_overrides[get_current_user] = lambda: TokenUser(1, uuid4(), "user", role, None, None, None, None)
+    return TestClient(app)
+
+
+def test_pages_follow_next_cursor_to_the_end() -> None:
+    listing = FakeListing(5)
+    client = _client(listing)
+    seen: list[int] = []
+    cursor: str | None = None
+    for _ in range(5):
+        params: dict[str, Any] = {"sort": "id", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get(PREFIX, params=params)
+        assert response.status_code == 200
+        body = response.json()
+        seen += [item["id"] for item in body["items"]]
+        cursor = body["nextCursor"]
+        if cursor is None:
+            break
+    assert seen == [1, 2, 3, 4, 5]
+    assert listing.limits == [3, 3, 3]
+    assert body["items"][0]["adLogin"] == "user005"
+
+
+def test_exact_last_page_has_no_next_cursor() -> None:
+    response = _client(FakeListing(2)).get(PREFIX, params={"sort": "id", "limit": 2})
+    assert response.json()["nextCursor"] is None
+    assert len(response.json()["items"]) == 2
+
+
+def test_empty_page() -> None:
+    response = _client(FakeListing(0)).get(PREFIX, params={"sort": "id"})
+    assert response.json() == {"items": [], "nextCursor": None}
+
+
+def test_cursor_from_other_filters_is_rejected() -> None:
+    client = _client(FakeListing(5))
+    cursor = client.get(PREFIX, params={"sort": "id", "limit": 1}).json()["nextCursor"]
+    response = client.get(PREFIX, params={"sort": "id", "limit": 1, "cursor": cursor, "department": "ОТиЗ"})
+    assert response.status_code == 400
+    assert response.json()["error"]["code"] == "INVALID_CURSOR"
+
+
+def test_forged_cursor_is_rejected() -> None:
+    response = _client(FakeListing(5)).get(PREFIX, params={"sort": "id", "cursor": "eyJrIjpbMV19.AAAA"})
+    assert response.status_code == 400
+
+
+def test_role_without_permission_is_forbidden() -> None:
+    response = _client(FakeListing(5), role="nobody").get(PREFIX)
+    assert response.status_code == 403
+
+
+def test_requires_auth() -> None:
+    response = TestClient(create_app()).get(PREFIX)
+    assert response.status_code == 401
+
+
+def test_search_returns_ranked_items_and_cache_header() -> None:
+    search = FakeSearch()
+    response = _client(FakeListing(0), search=search).get(
+        f"{PREFIX}/search", params={"q": "иванов", "limit": 5, "includeInactive": "true"}
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["source"] == "database"
+    assert [item["id"] for item in body["items"]] == [1, 2]
+    assert body["items"][0]["score"] == 0.5
+    assert response.headers["cache-control"].startswith("private, max-age=")
+    assert search.calls == [("иванов", 5, True)]
+
+
+def test_short_search_is_empty() -> None:
+    response = _client(FakeListing(0)).get(f"{PREFIX}/search", params={"q": "ив"})
+    assert response.json() == {"items": [], "source": "skipped"}
+
+
+def test_search_validates_limit() -> None:
+    response = _client(FakeListing(0)).get(f"{PREFIX}/search", params={"q": "иванов", "limit": 10_000})
+    assert response.status_code == 422
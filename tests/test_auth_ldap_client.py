@@ -10,6 +10,8 @@ pytest.importorskip("pydantic")
 pytest.importorskip("ldap3")
 
 from auth import ldap_client
+from auth.exceptions import DirectoryUnavailableError
+from core.circuit_breaker import CircuitOpenError
 
 
 def test_ldap_authenticate_empty_password() -> None:
@@ -40,3 +42,69 @@ def test_extract_supplier() -> None:
     extracted = ldap_client._extract_suplier(users)
     assert "Alice" in extracted
     assert "Bob" in extracted
+
+
+def test_open_circuit_fails_fast(monkeypatch: Any) -> None:
+    class OpenBreaker:
+        def attempt(self) -> Any:
+            raise CircuitOpenError("ldap", 5.0)
+
+    def no_connection(*_: Any, **__: Any) -> Any:
+        raise AssertionError("LDAP must not be contacted while the circuit is open")
+
+    monkeypatch.setattr(ldap_client, "ldap_breaker", OpenBreaker())
+    monkeypatch.setattr("ldap3.Connection", no_connection)
+    with pytest.raises(DirectoryUnavailableError) as info:
+        ldap_client.ldap_authenticate("user", "pass")
+    assert info.value.status == 503
+
+
+def test_expired_deadline_skips_connect(monkeypatch: Any) -> None:
+    from core.deadline import DeadlineExceededError, bind_deadline
+
+    def no_connection(*_: Any, **__: Any) -> Any:
+        raise AssertionError("LDAP must not be contacted after the deadline")
+
+    monkeypatch.setattr("ldap3.Connection", no_connection)
+    with bind_deadline(0), pytest.raises(DeadlineExceededError):
+        ldap_client.ldap_authenticate("user", "pass")
+
+
+def test_timeout_past_deadline_keeps_dc_in_rotation(monkeypatch: Any) -> None:
+    import time
+
+    from ldap3.core.exceptions import LDAPSocketReceiveError
+
+    from core.deadline import DeadlineExceededError, bind_deadline
+
+    marked: list[Any] = []
+
+    def slow_server(*_: Any, **__: Any) -> Any:
+        time.sleep(0.02)
+        raise LDAPSocketReceiveError("timed out")
+
+    monkeypatch.setattr(ldap_client, "_query_server", slow_server)
+    monkeypatch.setattr(ldap_client.ldap_pool, "mark_failed", lambda slot, exc: marked.append(slot))
+    with bind_deadline(0.01), pytest.raises(DeadlineExceededError):
+        ldap_client.ldap_authenticate("user", "pass")
+    assert marked == []
+
+
+def test_connect_timeout_is_capped_by_deadline(monkeypatch: Any) -> None:
+    from core.deadline import bind_deadline
+
+    class StopError(Exception):
+        pass
+
+    timeouts: list[float] = []
+
+    def capture(server: Any, **_: Any) -> Any:
+        timeouts.append(server.connect_timeout)
+        raise StopError()
+
+    monkeypatch.setattr("ldap3.Connection", capture)
+    slot = ldap_client.ldap_pool.candidates()[0]
+    with bind_deadline(0.5), pytest.raises(StopError):
+        ldap_client._connect(slot, "user", "pass")
+    assert 0 < timeouts[0] <= 0.5
+    assert slot.server.connect_timeout == ldap_client.settings.ldap.connect_timeout
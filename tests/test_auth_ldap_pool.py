@@ -0,0 +1,114 @@
+"""Tests for LDAP server pool."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("pydantic")
+pytest.importorskip("ldap3")
+
+import asyncio
+from typing import Any
+
+from ldap3.core.exceptions import LDAPSocketOpenError
+
+from auth import ldap_client
+from auth.ldap_pool import IdleConnections, LdapServerPool, ServerSlot, server_address
+
+
+def _pool(*uris: str) -> LdapServerPool:
+    return LdapServerPool(list(uris), server_factory=lambda uri: uri, alpha=0.5)
+
+
+def test_server_address_defaults() -> None:
+    assert server_address("ldap://dc01") == ("dc01", 389)
+    assert server_address("ldaps://dc01") == ("dc01", 636)
+    assert server_address("dc02:3268") == ("dc02", 3268)
+
+
+def test_candidates_prefer_fastest_healthy() -> None:
+    pool = _pool("ldap://slow", "ldap://fast", "ldap://down")
+    slow, fast, down = pool.slots
+    pool.record(slow, "bind", 0.2)
+    pool.record(fast, "bind", 0.01)
+    pool.record(fast, "bind", 0.03)
+    pool.mark_failed(down, OSError("refused"))
+    assert [s.uri for s in pool.candidates()] == ["ldap://fast", "ldap://slow"]
+    assert fast.latency["bind"] == pytest.approx(0.02)
+    stats = {item["uri"]: item for item in pool.stats()}
+    assert stats["ldap://down"]["healthy"] is False
+    assert stats["ldap://fast"]["bind_ewma_ms"] == pytest.approx(20.0)
+
+
+def test_all_unhealthy_still_returns_candidates() -> None:
+    pool = _pool("ldap://a", "ldap://b")
+    for slot in pool.slots:
+        pool.mark_failed(slot, OSError("down"))
+    assert len(pool.candidates()) == 2
+
+
+def test_query_fails_over_to_next_server(monkeypatch: Any) -> None:
+    pool = _pool("ldap://a", "ldap://b")
+    tried: list[str] = []
+
+    def fake_query_server(slot: ServerSlot, *_: Any, **__: Any) -> str:
+        tried.append(slot.uri)
+        if slot.uri == "ldap://a":
+            raise LDAPSocketOpenError("unreachable")
+        return "info"
+
+    monkeypatch.setattr(ldap_client, "ldap_pool", pool)
+    monkeypatch.setattr(ldap_client, "_query_server", fake_query_server)
+    assert ldap_client._query_pool("EMK\\user", "pass", sam_login="user") == "info"
+    assert tried == ["ldap://a", "ldap://b"]
+    assert [s.uri for s in pool.candidates()] == ["ldap://b"]
+
+
+@pytest.mark.asyncio
+async def test_probe_readmits_recovered_server() -> None:
+    server = await asyncio.start_server(lambda _r, w: w.close(), "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    pool = _pool(f"ldap://127.0.0.1:{port}")
+    pool.mark_failed(pool.slots[0], OSError("down"))
+    async with server:
+        await pool.probe(timeout=1.0)
+    assert pool.slots[0].healthy is True
+
+
+@pytest.mark.asyncio
+async def test_probe_takes_out_idle_dead_server() -> None:
+    server = await asyncio.start_server(lambda _r, w: w.close(), "127.0.0.1", 0)
+    live_port = server.sockets[0].getsockname()[1]
+    dead = await asyncio.start_server(lambda _r, w: w.close(), "127.0.0.1", 0)
+    dead_port = dead.sockets[0].getsockname()[1]
+    dead.close()
+    await dead.wait_closed()
+    pool = _pool(f"ldap://127.0.0.1:{live_port}", f"ldap://127.0.0.1:{dead_port}")
+    async with server:
+        await pool.probe(timeout=1.0)
+    assert [slot.healthy for slot in pool.slots] == [True, False]
+    assert [s.uri for s in pool.candidates()] == [f"ldap://127.0.0.1:{live_port}"]
+
+
+def test_idle_connections_lifo_and_overflow() -> None:
+    closed: list[str] = []
+    idle: IdleConnections[str] = IdleConnections(max_size=2, idle_timeout=60, close=closed.append)
+    for conn in ("c1", "c2", "c3"):
+        idle.release("dc", conn)
+    assert closed == ["c3"]
+    assert idle.acquire("dc") == "c2"
+    assert idle.acquire("dc") == "c1"
+    assert idle.acquire("dc") is None
+
+
+def test_idle_connections_expire() -> None:
+    now = [0.0]
+    closed: list[str] = []
+    idle: IdleConnections[str] = IdleConnections(max_size=4, idle_timeout=10, close=closed.append, clock=lambda: now[0])
+    idle.release("dc", "old")
+    now[0] = 5.0
+    idle.release("dc", "new")
+    now[0] = 20.0
+    assert idle.acquire("dc") is None
+    assert sorted(closed) == ["new", "old"]
+    assert idle.size("dc") == 0
@@ -0,0 +1,93 @@
+"""Tests for LDAP over TLS against the local stand-in server."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("pydantic")
+pytest.importorskip("ldap3")
+pytest.importorskip("cryptography")
+
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from auth import ldap_client
+from auth.ldap_pool import IdleConnections, LdapServerPool
+from config import settings
+from testing.ldap_server import LdapStandIn, TlsMode
+from testing.tls import generate_self_signed_cert
+
+
+@pytest.fixture(scope="module")
+def certificate(tmp_path_factory: pytest.TempPathFactory) -> tuple[Path, Path]:
+    return generate_self_signed_cert(tmp_path_factory.mktemp("tls"))
+
+
+def _directory(monkeypatch: Any, certificate: tuple[Path, Path], tls: TlsMode) -> Iterator[LdapStandIn]:
+    cert, key = certificate
+    server = LdapStandIn(
+        base_dn=settings.ldap.base_dn, domain=settings.ldap.domain, tls=tls, certfile=cert, keyfile=key
+    )
+    server.add_user("jdoe", "secret", full_name="John Doe", groups=["CN=Staff,DC=example,DC=loc"])
+    service_login = settings.ldap.service_user.split("\\")[-1]
+    server.set_password(service_login, settings.ldap.service_pass.get_secret_value())
+    monkeypatch.setattr(settings.ldap, "tls_mode", tls)
+    monkeypatch.setattr(settings.ldap, "tls_ca_file", cert)
+    monkeypatch.setattr(settings.ldap, "tls_validate", "required")
+    with server:
+        pool = LdapServerPool([server.uri], server_factory=ldap_client._build_server)
+        idle: IdleConnections[Any] = IdleConnections(max_size=2, idle_timeout=60, close=ldap_client._close)
+        monkeypatch.setattr(ldap_client, "ldap_pool", pool)
+        monkeypatch.setattr(ldap_client, "service_connections", idle)
+        yield server
+        idle.clear()
+
+
+@pytest.fixture
+def ldaps_server(monkeypatch: Any, certificate: tuple[Path, Path]) -> Iterator[LdapStandIn]:
+    yield from _directory(monkeypatch, certificate, "ldaps")
+
+
+@pytest.fixture
+def starttls_server(monkeypatch: Any, certificate: tuple[Path, Path]) -> Iterator[LdapStandIn]:
+    yield from _directory(monkeypatch, certificate, "starttls")
+
+
+def test_ldaps_login_resumes_tls_session(ldaps_server: LdapStandIn) -> None:
+    first = ldap_client.ldap_authenticate("jdoe", "secret")
+    second = ldap_client.ldap_authenticate("jdoe", "secret")
+    assert first is not None and second is not None
+    assert first.ad_login == "jdoe"
+    assert first.groups == ["CN=Staff,DC=example,DC=loc"]
+    assert ldaps_server.stats.tls_handshakes == 2
+    assert ldaps_server.stats.tls_resumed == 1
+
+
+def test_ldaps_rejects_wrong_password(ldaps_server: LdapStandIn) -> None:
+    assert ldap_client.ldap_authenticate("jdoe", "wrong") is None
+    assert ldaps_server.stats.failed_binds == 1
+
+
+def test_starttls_login(starttls_server: LdapStandIn) -> None:
+    assert ldap_client.ldap_authenticate("jdoe", "secret") is not None
+    assert starttls_server.stats.tls_handshakes == 1
+
+
+def test_service_connection_is_reused(ldaps_server: LdapStandIn) -> None:
+    for _ in range(3):
+        assert ldap_client.ldap_fetch_user_by_login("jdoe") is not None
+    assert ldaps_server.stats.connections == 1
+    assert ldaps_server.stats.binds == 1
+    assert ldaps_server.stats.searches == 3
+
+
+def test_stale_service_connection_is_replaced(ldaps_server: LdapStandIn) -> None:
+    assert ldap_client.ldap_fetch_user_by_login("jdoe") is not None
+    uri = ldap_client.ldap_pool.slots[0].uri
+    conn = ldap_client.service_connections.acquire(uri)
+    conn.socket.close()
+    ldap_client.service_connections.release(uri, conn)
+    assert ldap_client.ldap_fetch_user_by_login("jdoe") is not None
+    assert ldaps_server.stats.connections == 2
+    assert ldap_client.ldap_pool.slots[0].healthy is True
@@ -0,0 +1,67 @@
+"""Tests for failed-login lockout."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("pydantic")
+
+from auth.lockout import FailureState, LockoutPolicy, LoginLockout, MemoryLockoutStore
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _lockout(clock: Clock, *, max_entries: int = 100) -> tuple[LoginLockout, MemoryLockoutStore]:
+    policy = LockoutPolicy(threshold=3, window=60, lockout=10, max_lockout=25)
+    store = MemoryLockoutStore(policy, max_entries=max_entries, clock=clock)
+    return LoginLockout(policy, store, clock=clock), store
+
+
+def test_policy_backoff_doubles_and_caps() -> None:
+    policy = LockoutPolicy(threshold=2, window=60, lockout=10, max_lockout=25)
+    state = policy.on_failure(None, 0.0)
+    assert state == FailureState(1, 0, 0.0, 0.0)
+    state = policy.on_failure(state, 1.0)
+    assert state.locked_until == 11.0
+    state = policy.on_failure(state, 12.0)
+    assert state.locked_until == 32.0
+    state = policy.on_failure(state, 33.0)
+    assert state.locked_until == 58.0
+    assert policy.on_failure(state, 200.0) == FailureState(1, 0, 200.0, 0.0)
+
+
+@pytest.mark.asyncio
+async def test_lock_and_reset() -> None:
+    clock = Clock()
+    lockout, store = _lockout(clock)
+    for _ in range(3):
+        state = await lockout.register_failure("Alice")
+    assert lockout.retry_after(await lockout.status("alice")) == 10.0
+    clock.now += 10
+    assert lockout.retry_after(await lockout.status("alice")) == 0.0
+    await lockout.reset(" ALICE ")
+    assert await lockout.status("alice") is None
+    assert len(store) == 0
+    assert state.lockouts == 1
+
+
+@pytest.mark.asyncio
+async def test_states_expire_and_are_evicted() -> None:
+    clock = Clock()
+    lockout, store = _lockout(clock, max_entries=2)
+    await lockout.register_failure("a")
+    clock.now += 61
+    assert await lockout.status("a") is None
+    for login in ("b", "c", "d"):
+        await lockout.register_failure(login)
+        clock.now += 1
+    assert len(store) == 2
+    assert await lockout.status("b") is None
+    assert await lockout.status("d") is not None
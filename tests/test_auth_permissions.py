@@ -0,0 +1,127 @@
+"""Tests for the compiled role and permission engine."""
+
+from __future__ import annotations
+
+from typing import Annotated, Any
+from uuid import uuid4
+
+import pytest
+
+pytest.importorskip("fastapi")
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+import auth.permissions as permissions_module
+from api.deps.auth import TokenUser, get_current_user, require_access
+from api.errors.exceptions import AppError
+from api.errors.handlers import app_error_handler
+from auth.permissions import PermissionEngine, create_permission_engine, group_keys, normalize_dn, permission_mask
+from config import settings
+
+BASE = "OU=APP_TENDER,OU=SERVERS,DC=emk,DC=loc"
+ADMIN = f"CN=APP_TENDER_ADMIN,{BASE}"
+EDITOR = f"CN=APP_TENDER_EDIT,{BASE}"
+VIEWER = f"CN=APP_TENDER_VIEW,{BASE}"
+
+
+def _engine(**kwargs: Any) -> PermissionEngine:
+    rules = [("admin", [ADMIN], 30), ("editor", [EDITOR, "APP_TENDER_WRITERS"], 20), ("viewer", [VIEWER], 10)]
+    return PermissionEngine(rules, **kwargs)  # type: ignore[arg-type]
+
+
+def test_normalize_dn_ignores_case_and_spaces() -> None:
+    assert normalize_dn("CN=App Tender , OU=Servers,DC=EMK") == "cn=app tender,ou=servers,dc=emk"
+    assert normalize_dn(" App_Tender ") == "cn=app_tender"
+    assert group_keys(r"CN=Smith\, John,OU=Users,DC=emk") == (r"cn=smith\, john,ou=users,dc=emk", r"cn=smith\, john")
+    assert group_keys("CN=Solo") == ("cn=solo",)
+
+
+def test_highest_priority_role_wins() -> None:
+    engine = _engine()
+    assert engine.resolve([f"CN=Other,{BASE}", VIEWER]) == "viewer"
+    assert engine.resolve([VIEWER, ADMIN.lower(), EDITOR]) == "admin"
+    assert engine.resolve([]) is None
+
+
+def test_matching_is_exact_not_substring() -> None:
+    engine = _engine()
+    assert engine.resolve([f"CN=APP_TENDER_VIEWERS,{BASE}"]) is None
+    assert engine.resolve([f"CN=APP_TENDER_VIEW,OU=Other,{BASE}"]) is None
+
+
+def test_bare_cn_rule_matches_any_ou() -> None:
+    assert _engine().resolve(["CN=App_Tender_Writers,OU=Groups,DC=emk,DC=loc"]) == "editor"
+
+
+def test_deny_group_overrides_roles() -> None:
+    engine = _engine(deny_groups=["APP_TENDER_BLOCKED"])
+    assert engine.resolve([ADMIN, f"CN=APP_TENDER_BLOCKED,{BASE}"]) is None
+    assert engine.resolve([ADMIN]) == "admin"
+
+
+def test_verdict_cache_is_bounded(monkeypatch: Any) -> None:
+    monkeypatch.setattr(permissions_module, "VERDICT_CACHE_MAX", 3)
+    engine = _engine()
+    groups = [f"CN=G{index},{BASE}" for index in range(10)] + [EDITOR]
+    assert engine.resolve(groups) == "editor"
+    assert engine.resolve(groups) == "editor"
+    assert len(engine._verdicts) <= 3
+
+
+def test_permissions_and_roles_checks() -> None:
+    engine = _engine(role_permissions={"admin": ["*"], "viewer": ["knowledge:read"]})
+    read = permission_mask(["knowledge:read"])
+    both = permission_mask(["knowledge:read", "segments:classify"])
+    assert engine.allows("admin", permissions=both)
+    assert engine.allows("viewer", permissions=read)
+    assert not engine.allows("viewer", permissions=both)
+    assert not engine.allows("editor", permissions=read)
+    assert engine.allows("viewer", roles=permissions_module.role_mask(["viewer", "editor"]))
+    assert not engine.allows("viewer", roles=permissions_module.role_mask(["admin"]))
+
+
+def test_unknown_names_are_rejected() -> None:
+    with pytest.raises(ValueError, match="unknown permission"):
+        permission_mask(["users:delete"])
+    with pytest.raises(ValueError, match="unknown role"):
+        PermissionEngine([("owner", ["CN=X"], 1)])  # type: ignore[list-item]
+
+
+def test_engine_from_settings_keeps_ldap_groups(monkeypatch: Any) -> None:
+    monkeypatch.setattr(settings.ldap.groups, "admin", ADMIN)
+    monkeypatch.setattr(settings.ldap.groups, "viewer", VIEWER)
+    monkeypatch.setattr(settings.permissions, "rules", [])
+    engine = create_permission_engine(settings)
+    assert engine.resolve([VIEWER, ADMIN]) == "admin"
+    assert engine.allows("viewer", permissions=permission_mask(["segments:classify"]))
+
+
+def _client(role: str, monkeypatch: Any) -> TestClient:
+    engine = _engine(role_permissions={"admin": ["*"], "viewer": ["knowledge:read"]})
+    monkeypatch.setattr("api.deps.auth.permission_engine", engine)
+    app = FastAPI()
+    app.add_exception_handler(AppError, app_error_handler)
+
+    @app.get("/segments")
+    async def segments(user: Annotated[TokenUser, Depends(require_access("segments:classify"))]) -> str:
+        return user.ad_login
+
+    @app.get("/admins")
+    async def admins(user: Annotated[TokenUser, Depends(require_access(roles=["admin"]))]) -> str:
+        return user.ad_login
+
+    app.dependency_overrides[get_current_user] = lambda: TokenUser(1, uuid4(), "user", role, None, None, None, None)
+    return TestClient(app)
+
+
+def test_require_access_dependency(monkeypatch: Any) -> None:
+    viewer = _client("viewer", monkeypatch)
+    response = viewer.get("/segments")
+    assert response.status_code == 403
+    assert response.json()["error"]["code"] == "FORBIDDEN"
+    assert viewer.get("/admins").status_code == 403
+
+    admin = _client("admin", monkeypatch)
+    assert admin.get("/segments").json() == "user"
+    assert admin.get("/admins").json() == "user"
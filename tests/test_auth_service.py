@@ -16,8 +16,9 @@ from uuid import UUID, uuid4
 import pytest
 
 from auth.domain import LdapUserInfo
-from auth.exceptions import AuthError
+from auth.exceptions import AccountLockedError, AuthError
 from auth.jwt_utils import create_refresh_token
+from auth.lockout import LockoutPolicy, LoginLockout, MemoryLockoutStore
 from auth.service import AuthService
 from config import settings
 from db.models.user.user import User
@@ -94,3 +95,25 @@ async def test_refresh_success(monkeypatch: Any) -> None:
     token = create_refresh_token({"sub": str(user.ad_guid), "user_id": user.id, "ad_login": "user", "role": "admin"})
     result = await service.refresh(DummySession(), refresh_token=token)
     assert result.user.ad_login == "user"
+
+
+@pytest.mark.asyncio
+async def test_login_locked_after_failures_skips_ldap(monkeypatch: Any) -> None:
+    policy = LockoutPolicy(threshold=2, window=60, lockout=30, max_lockout=300)
+    service = AuthService(lockout=LoginLockout(policy, MemoryLockoutStore(policy, max_entries=10)))
+    calls: list[str] = []
+
+    def fake_authenticate(login: str, _password: str) -> None:
+        calls.append(login)
+        return None
+
+    monkeypatch.setattr("auth.service.ldap_authenticate", fake_authenticate)
+    for _ in range(2):
+        with pytest.raises(AuthError) as failed:
+            await service.login(DummySession(), login="User", password="bad")
+        assert failed.value.status == 401
+    with pytest.raises(AccountLockedError) as locked:
+        await service.login(DummySession(), login=" user ", password="bad")
+    assert locked.value.status == 423
+    assert 0 < locked.value.retry_after <= 30
+    assert calls == ["User", "User"]
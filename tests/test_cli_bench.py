@@ -0,0 +1,151 @@
+"""Tests for the end-to-end benchmark command and its database stand-in."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("ldap3")
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("httpx")
+pytest.importorskip("typer")
+
+from sqlalchemy import select
+
+from cli.bench import SRC_ROOT, Regression, compare, percentile, render, summarize
+from db.models.user.user import User
+from db.repositories.app.auth import sync_user_from_directory
+from testing.database import MemoryDatabase
+
+
+def _report(**metrics: float) -> dict[str, Any]:
+    result: dict[str, Any] = {
+        "name": "login",
+        "requests": 100,
+        "errors": 0,
+        "throughput": 100.0,
+        "p95_ms": 10.0,
+        "p99_ms": 20.0,
+    }
+    result.update(metrics)
+    return {"results": [result]}
+
+
+def test_percentile_is_nearest_rank() -> None:
+    values = [float(value) for value in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([], 50) == 0.0
+
+
+def test_summarize_counts_non_2xx_as_errors() -> None:
+    result = summarize("refresh", [0.002, 0.001, 0.003, 0.004], Counter({"200": 3, "401": 1}), 0.5)
+    assert result.requests == 4
+    assert result.errors == 1
+    assert result.throughput == 8.0
+    assert result.p50_ms == 2.0
+    assert result.p99_ms == 4.0
+    assert result.statuses == {"200": 3, "401": 1}
+
+
+def test_compare_flags_only_changes_beyond_threshold() -> None:
+    baseline = _report()
+    assert compare(_report(throughput=95.0, p95_ms=10.5), baseline, 0.1) == []
+
+    regressions = compare(_report(throughput=80.0, p99_ms=30.0, errors=2), baseline, 0.1)
+    assert [(item.metric, item.current) for item in regressions] == [
+        ("throughput", 80.0),
+        ("p99_ms", 30.0),
+        ("errors", 2.0),
+    ]
+    assert regressions[0].change == pytest.approx(0.2)
+    assert regressions[1].change == pytest.approx(0.5)
+
+
+def test_compare_ignores_scenarios_missing_from_baseline() -> None:
+    assert compare(_report(throughput=1.0), {"results": []}, 0.1) == []
+
+
+def test_render_lists_results_and_regressions() -> None:
+    report = _report()
+    report["results"][0].update(p50_ms=5.0)
+    text = render(report["results"], [Regression("login", "p95_ms", 10.0, 15.0)])
+    assert text.splitlines()[1].split()[:3] == ["login", "100", "0"]
+    assert "REGRESSION login p95_ms: 10 -> 15 (50.0% worse)" in text
+
+
+@pytest.mark.asyncio
+async def test_memory_database_creates_and_updates_users() -> None:
+    database = MemoryDatabase()
+    guid = uuid.uuid4()
+    fields = {
+        "ad_guid": guid,
+        "ad_login": "user1",
+        "full_name": "User One",
+        "email": None,
+        "department": None,
+        "title": None,
+        "subordinates": [],
+        "supervisor": "",
+        "role": "viewer",
+    }
+
+    created = await sync_user_from_directory(database.session(), update_last_login=True, **fields)
+    assert created.id == 1
+    assert created.created_at is not None
+
+    session = database.session()
+    updated = await sync_user_from_directory(session, update_last_login=False, **{**fields, "title": "Engineer"})
+    assert updated is created
+    assert updated.title == "Engineer"
+    assert database.tables[User] == [created]
+    result = await session.execute(select(User.id).where(User.full_name == "User One", User.ad_login == "user1"))
+    assert result.scalar_one_or_none() == 1
+
+
+@pytest.mark.asyncio
+async def test_memory_database_refuses_unsupported_conditions() -> None:
+    session = MemoryDatabase().session()
+    session.add(User(ad_guid=uuid.uuid4(), ad_login="user1"))
+    await session.flush()
+    with pytest.raises(NotImplementedError):
+        await session.execute(select(User).where(User.ad_login.like("user%")))
+
+
+def test_bench_command_writes_report_and_fails_on_regression(tmp_path: Path) -> None:
+    output = tmp_path / "bench.json"
+    command = [sys.executable, "-m", "cli", "bench", "--requests", "20", "--warmup", "0", "--users", "10"]
+    env = {**os.environ, "PYTHONPATH": str(SRC_ROOT)}
+    completed = subprocess.run(
+        [*command, "--output", str(output)], cwd=SRC_ROOT, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert completed.returncode == 0, completed.stderr[-2000:]
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert [result["name"] for result in report["results"]] == ["login", "refresh", "protected"]
+    assert all(result["errors"] == 0 and result["requests"] == 20 for result in report["results"])
+    assert report["meta"]["options"]["mode"] == "inprocess"
+
+    for result in report["results"]:
+        result["throughput"] *= 100
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(report), encoding="utf-8")
+    completed = subprocess.run(
+        [*command, "--scenario", "protected", "--baseline", str(baseline)],
+        cwd=SRC_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert completed.returncode == 1
+    assert "REGRESSION protected throughput" in completed.stdout
@@ -0,0 +1,122 @@
+"""Tests for the auth microbenchmark suite."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("ldap3")
+pytest.importorskip("typer")
+
+from typer.testing import CliRunner
+
+from cli import app
+from cli.bench import read_report
+from cli.microbench import (
+    MicroOptions,
+    build_cases,
+    compare_micro,
+    measure,
+    render_micro,
+    resolve_baseline,
+    result_path,
+    run_microbench,
+    save_results,
+)
+
+
+def _report(commit: str, **ns: float) -> dict[str, Any]:
+    return {
+        "meta": {"commit": commit},
+        "results": [{"name": name, "loops": 1, "ns_per_op": value, "median_ns": value} for name, value in ns.items()],
+    }
+
+
+def test_cases_exercise_the_real_functions() -> None:
+    cases = build_cases(MicroOptions(groups=200, reports=100))
+    assert cases["resolve_role"]() == "viewer"
+    info = cases["entry_to_user_info"]()
+    assert info.ad_login == "ivanov"  # type: ignore[attr-defined]
+    assert len(info.groups) == 200  # type: ignore[attr-defined]
+    assert len(info.subordinates) == 96  # type: ignore[attr-defined]  # every 25th report is disabled
+    assert cases["get_current_user"]().role == "viewer"  # type: ignore[attr-defined]
+    assert cases["decode_token"]()["ad_login"] == "ivanov"  # type: ignore[index]
+    assert cases["make_error_response"]().status_code == 401  # type: ignore[attr-defined]
+
+
+def test_measure_reports_time_per_call() -> None:
+    result = measure("noop", lambda: None, repeat=2, min_time=0.01)
+    assert result.loops >= 1
+    assert 0 < result.ns_per_op <= result.median_ns
+
+
+def test_run_microbench_rejects_unknown_cases() -> None:
+    with pytest.raises(ValueError, match="unknown cases: nope"):
+        run_microbench(MicroOptions(cases=("nope",)))
+
+
+def test_compare_flags_slower_cases_only() -> None:
+    baseline = _report("a", decode_token=1000.0, resolve_role=500.0)
+    current = _report("b", decode_token=1300.0, resolve_role=400.0, extract_suplier=10.0)
+    (regression,) = compare_micro(current, baseline, 0.2)
+    assert (regression.scenario, regression.metric) == ("decode_token", "ns_per_op")
+    assert regression.change == pytest.approx(0.3)
+    assert "REGRESSION decode_token: 1000 -> 1300 ns (30.0% worse)" in render_micro(current["results"], [regression])
+
+
+def test_save_results_keeps_cases_not_rerun(tmp_path: Path) -> None:
+    save_results(_report("abc", decode_token=1000.0, resolve_role=500.0), tmp_path)
+    path = save_results(_report("abc", decode_token=900.0), tmp_path)
+    assert path == result_path(tmp_path, "abc")
+    stored = {result["name"]: result["ns_per_op"] for result in read_report(path)["results"]}
+    assert stored == {"decode_token": 900.0, "resolve_role": 500.0}
+
+
+def test_baseline_resolves_git_refs_in_results_dir(tmp_path: Path) -> None:
+    head = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=False).stdout.strip()
+    if not head:
+        pytest.skip("not a git checkout")
+    assert resolve_baseline("HEAD", tmp_path) == tmp_path / f"{head}.json"
+    report = tmp_path / "report.json"
+    report.write_text("{}", encoding="utf-8")
+    assert resolve_baseline(str(report), tmp_path) == report
+    assert resolve_baseline("no-such-ref", None) == Path("no-such-ref")
+
+
+def test_microbench_command_saves_and_fails_on_regression(tmp_path: Path) -> None:
+    runner = CliRunner()
+    args = ["microbench", "--case", "make_error_response", "--repeat", "1", "--min-time", "0.01"]
+    result = runner.invoke(app, [*args, "--results-dir", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    (saved,) = tmp_path.glob("*.json")
+    assert "saved" in result.output
+
+    report = read_report(saved)
+    report["results"][0]["ns_per_op"] /= 100
+    baseline = tmp_path / "fast.json"
+    baseline.write_text(json.dumps(report), encoding="utf-8")
+    result = runner.invoke(app, [*args, "--baseline", str(baseline)])
+    assert result.exit_code == 1
+    assert "REGRESSION make_error_response" in result.output
+
+
+def test_microbench_command_reports_missing_baseline(tmp_path: Path) -> None:
+    result = CliRunner().invoke(
+        app,
+        [
+            "microbench",
+            "--case",
+            "make_error_response",
+            "--repeat",
+            "1",
+            "--min-time",
+            "0.01",
+            "--baseline",
+            str(tmp_path / "missing.json"),
+        ],
+    )
+    assert result.exit_code == 2
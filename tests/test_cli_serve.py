@@ -0,0 +1,61 @@
+"""Tests for the production launcher."""
+
+from __future__ import annotations
+
+import os
+from typing import Any
+
+import pytest
+
+pytest.importorskip("typer")
+pytest.importorskip("uvicorn")
+
+from typer.testing import CliRunner
+
+import cli.serve as serve_module
+from cli import app
+from cli.serve import ServeOptions, WorkerMemory, bind_socket, process_memory
+
+
+def test_process_memory_of_current_process() -> None:
+    memory = process_memory(os.getpid(), fallback_rss_kib=1)
+    assert memory.rss_kib > 0
+    assert "RSS" in memory.describe()
+
+
+def test_memory_falls_back_without_proc() -> None:
+    assert process_memory(-1, fallback_rss_kib=2048) == WorkerMemory(rss_kib=2048)
+    assert WorkerMemory(rss_kib=2048).describe() == "RSS 2.0 MiB"
+
+
+def test_bind_socket_is_inheritable() -> None:
+    sock = bind_socket("127.0.0.1", 0, 16)
+    try:
+        assert sock.get_inheritable()
+        assert sock.getsockname()[1] > 0
+    finally:
+        sock.close()
+
+
+def test_serve_command_resolves_options(monkeypatch: Any) -> None:
+    captured: list[ServeOptions] = []
+
+    def fake_serve(options: ServeOptions) -> int:
+        captured.append(options)
+        return 0
+
+    monkeypatch.setattr(serve_module, "serve", fake_serve)
+    monkeypatch.setattr(serve_module, "available_cpus", lambda: 3)
+    result = CliRunner().invoke(app, ["serve", "--port", "9001", "--workers", "0", "--no-gc-freeze"])
+    assert result.exit_code == 0, result.output
+    (options,) = captured
+    assert options.port == 9001
+    assert options.workers == 3
+    assert options.gc_freeze is False
+    assert options.loop == "uvloop"
+    assert options.http == "httptools"
+
+
+def test_serve_command_rejects_unknown_loop() -> None:
+    result = CliRunner().invoke(app, ["serve", "--loop", "tokio"])
+    assert result.exit_code != 0
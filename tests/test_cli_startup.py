@@ -0,0 +1,52 @@
+"""Startup-time regression tests: import budget and lazily loaded modules."""
+
+from __future__ import annotations
+
+import os
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("ldap3")
+
+from cli.startup import ImportProfile, parse_importtime, profile_imports
+
+# Generous for CI machines; locally the app imports in well under a second.
+STARTUP_BUDGET_SEC = float(os.environ.get("STARTUP_BUDGET_SEC", "3.0"))
+
+SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:       300 |        420 | config
+import time:        50 |         50 |     ldap3.core
+import time:       200 |        250 |   ldap3
+import time:      1000 |       1670 | api.app
+"""
+
+
+def test_parse_importtime() -> None:
+    records = parse_importtime(SAMPLE)
+    assert [r.module for r in records] == ["_io", "config", "ldap3.core", "ldap3", "api.app"]
+    assert [r.depth for r in records] == [1, 0, 2, 1, 0]
+    assert records[-1].cumulative_us == 1670
+    assert records[2].package == "ldap3"
+
+
+@pytest.fixture(scope="module")
+def app_profile() -> ImportProfile:
+    return profile_imports("api.app")
+
+
+def test_app_import_within_budget(app_profile: ImportProfile) -> None:
+    assert app_profile.total_sec < STARTUP_BUDGET_SEC
+
+
+def test_heavy_modules_are_not_imported_by_app(app_profile: ImportProfile) -> None:
+    packages = {module.partition(".")[0] for module in app_profile.modules}
+    assert packages.isdisjoint({"ldap3", "httpx", "alembic", "streamlit", "typer", "tldextract"})
+
+
+def test_cli_does_not_import_app() -> None:
+    profile = profile_imports("cli")
+    assert "api.app" not in profile.modules
+    assert "sqlalchemy" not in profile.modules
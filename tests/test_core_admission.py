@@ -0,0 +1,63 @@
+"""Tests for admission control."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from core.admission import AdmissionLimiter, AdmissionRejectedError
+
+
+def _limiter(**kwargs: float) -> AdmissionLimiter:
+    params = {"max_in_flight": 1, "queue_size": 1, "queue_timeout": 1.0, **kwargs}
+    return AdmissionLimiter("test", **params)  # type: ignore[arg-type]
+
+
+@pytest.mark.asyncio
+async def test_queued_request_gets_released_slot() -> None:
+    limiter = _limiter()
+    assert await limiter.acquire() == 0.0
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    assert limiter.queued == 1
+    limiter.release()
+    assert await waiter >= 0.0
+    assert limiter.in_flight == 1
+    limiter.release()
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_immediately() -> None:
+    limiter = _limiter(queue_size=0)
+    await limiter.acquire()
+    with pytest.raises(AdmissionRejectedError) as info:
+        await limiter.acquire()
+    assert info.value.reason == "queue_full"
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_rejects() -> None:
+    limiter = _limiter(queue_timeout=0.01)
+    await limiter.acquire()
+    with pytest.raises(AdmissionRejectedError) as info:
+        await limiter.acquire()
+    assert info.value.reason == "queue_timeout"
+    assert limiter.queued == 0
+    limiter.release()
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_does_not_leak_slot() -> None:
+    limiter = _limiter()
+    await limiter.acquire()
+    waiter = asyncio.create_task(limiter.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    limiter.release()
+    assert limiter.in_flight == 0
+    assert limiter.queued == 0
@@ -0,0 +1,111 @@
+"""Tests for the in-process TTL cache and load coalescer."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from core.cache import Coalescer, TTLCache
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_entries_expire() -> None:
+    clock = Clock()
+    cache: TTLCache[str, int] = TTLCache("test_expire", max_size=10, ttl=5.0, clock=clock)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=1.0)
+    clock.now = 2.0
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert "b" not in cache
+    clock.now = 5.0
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_least_recently_used_is_evicted() -> None:
+    cache: TTLCache[str, int] = TTLCache("test_lru", max_size=2, ttl=60.0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.peek("b") is None
+    assert cache.peek("a") == 1
+    assert cache.peek("c") == 3
+
+
+def test_invalidate_where() -> None:
+    cache: TTLCache[tuple[str, str], int] = TTLCache("test_invalidate", max_size=10, ttl=60.0)
+    cache.set(("ds1", "q1"), 1)
+    cache.set(("ds1", "q2"), 2)
+    cache.set(("ds2", "q1"), 3)
+    assert cache.invalidate_where(lambda key: key[0] == "ds1") == 2
+    assert len(cache) == 1
+    cache.invalidate(("ds2", "q1"))
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_concurrent_loads_are_coalesced() -> None:
+    coalescer: Coalescer[str, int] = Coalescer("test_coalesce")
+    calls = 0
+    release = asyncio.Event()
+
+    async def load() -> int:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return 42
+
+    waiters = [asyncio.create_task(coalescer.run("k", load)) for _ in range(5)]
+    await asyncio.sleep(0)
+    assert len(coalescer) == 1
+    release.set()
+    assert await asyncio.gather(*waiters) == [42] * 5
+    assert calls == 1
+    assert len(coalescer) == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_the_load() -> None:
+    coalescer: Coalescer[str, int] = Coalescer("test_cancel")
+    release = asyncio.Event()
+
+    async def load() -> int:
+        await release.wait()
+        return 7
+
+    first = asyncio.create_task(coalescer.run("k", load))
+    second = asyncio.create_task(coalescer.run("k", load))
+    await asyncio.sleep(0)
+    first.cancel()
+    release.set()
+    assert await second == 7
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_not_cached() -> None:
+    coalescer: Coalescer[str, int] = Coalescer("test_errors")
+    attempts = 0
+
+    async def load() -> int:
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(0)
+        raise RuntimeError("boom")
+
+    results = await asyncio.gather(coalescer.run("k", load), coalescer.run("k", load), return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    with pytest.raises(RuntimeError):
+        await coalescer.run("k", load)
+    assert attempts == 2
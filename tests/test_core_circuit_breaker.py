@@ -0,0 +1,97 @@
+"""Tests for circuit breaker."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+from core.circuit_breaker import CircuitBreaker, CircuitOpenError
+from core.deadline import DeadlineExceededError
+
+
+class BoomError(Exception):
+    pass
+
+
+def _breaker(now: list[float]) -> CircuitBreaker:
+    return CircuitBreaker(
+        "test", failure_threshold=2, reset_timeout=10.0, failure_types=(BoomError,), clock=lambda: now[0]
+    )
+
+
+def _fail(breaker: CircuitBreaker) -> None:
+    with pytest.raises(BoomError), breaker.attempt():
+        raise BoomError()
+
+
+def test_opens_after_consecutive_failures_and_fails_fast() -> None:
+    now = [0.0]
+    breaker = _breaker(now)
+    _fail(breaker)
+    assert breaker.state == "closed"
+    _fail(breaker)
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError) as info, breaker.attempt():
+        raise AssertionError("must not be called")
+    assert info.value.retry_after == pytest.approx(10.0)
+
+
+def test_half_open_probe_closes_or_reopens() -> None:
+    now = [0.0]
+    breaker = _breaker(now)
+    _fail(breaker)
+    _fail(breaker)
+    now[0] = 11.0
+    assert breaker.state == "half_open"
+    _fail(breaker)
+    assert breaker.state == "open"
+
+    now[0] = 22.0
+    with breaker.attempt():
+        pass
+    assert breaker.state == "closed"
+
+
+def test_non_failure_errors_count_as_success() -> None:
+    now = [0.0]
+    breaker = _breaker(now)
+    _fail(breaker)
+    with pytest.raises(ValueError), breaker.attempt():
+        raise ValueError("bad credentials")
+    _fail(breaker)
+    assert breaker.state == "closed"
+
+
+def test_half_open_limits_concurrent_probes() -> None:
+    now = [0.0]
+    breaker = _breaker(now)
+    _fail(breaker)
+    _fail(breaker)
+    now[0] = 11.0
+    with breaker.attempt(), pytest.raises(CircuitOpenError), breaker.attempt():
+        pass
+
+
+def test_deadline_during_half_open_probe_changes_nothing() -> None:
+    now = [0.0]
+    breaker = _breaker(now)
+    _fail(breaker)
+    _fail(breaker)
+    now[0] = 11.0
+    with pytest.raises(DeadlineExceededError), breaker.attempt():
+        raise DeadlineExceededError()
+    assert breaker.state == "half_open"
+    # The probe slot was released, and a real failure still re-opens the circuit.
+    _fail(breaker)
+    assert breaker.state == "open"
+
+
+def test_deadline_does_not_reset_failure_count() -> None:
+    now = [0.0]
+    breaker = _breaker(now)
+    _fail(breaker)
+    with pytest.raises(DeadlineExceededError), breaker.attempt():
+        raise DeadlineExceededError()
+    _fail(breaker)
+    assert breaker.state == "open"
@@ -0,0 +1,42 @@
+"""Tests for signed pagination cursors."""
+
+from __future__ import annotations
+
+import pytest
+
+from core.cursors import CursorCodec, InvalidCursorError, derive_key
+
+
+def test_round_trip() -> None:
+    codec = CursorCodec("secret")
+    payload = {"s": "name", "k": ["иванов", 7]}
+    assert codec.decode(codec.encode(payload)) == payload
+
+
+def test_tampered_body_is_rejected() -> None:
+    codec = CursorCodec("secret")
+    body, signature = codec.encode({"k": [1]}).split(".")
+    forged = CursorCodec("secret").encode({"k": [1000]}).split(".")[0]
+    with pytest.raises(InvalidCursorError, match="signature"):
+        codec.decode(f"{forged}.{signature}")
+    with pytest.raises(InvalidCursorError, match="signature"):
+        CursorCodec("other").decode(f"{body}.{signature}")
+
+
+@pytest.mark.parametrize("cursor", ["", "!!!.###", "abc"])
+def test_garbage_is_rejected(cursor: str) -> None:
+    with pytest.raises(InvalidCursorError):
+        CursorCodec("secret").decode(cursor)
+
+
+def test_empty_secret_is_refused() -> None:
+    with pytest.raises(ValueError):
+        CursorCodec("")
+
+
+def test_derived_key_differs_from_secret() -> None:
+    key = derive_key("secret", b"user-listing-cursor")
+    assert key not in (b"secret", derive_key("secret", b"other"))
+    cursor = CursorCodec(key).encode({"k": [1]})
+    with pytest.raises(InvalidCursorError):
+        CursorCodec("secret").decode(cursor)
@@ -0,0 +1,134 @@
+"""Tests for request deadlines."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+import pytest
+
+from core.deadline import DeadlineExceededError, bind_deadline, cap_timeout, deadline_expired, remaining
+
+
+def test_cap_timeout_without_deadline() -> None:
+    assert remaining() is None
+    assert cap_timeout(5.0) == 5.0
+
+
+def test_cap_timeout_cuts_to_remaining_budget() -> None:
+    with bind_deadline(0.5):
+        assert 0 < cap_timeout(5.0) <= 0.5
+        assert cap_timeout(0.1) == 0.1
+    assert remaining() is None
+
+
+def test_nested_deadline_never_extends_outer() -> None:
+    with bind_deadline(0.2) as outer, bind_deadline(10) as inner:
+        assert inner == outer
+
+
+def test_spent_budget_raises() -> None:
+    with bind_deadline(0):
+        assert deadline_expired()
+        with pytest.raises(DeadlineExceededError):
+            cap_timeout(1.0)
+
+
+@pytest.mark.asyncio
+async def test_deadline_reaches_worker_threads() -> None:
+    with bind_deadline(1.0):
+        left = await asyncio.to_thread(remaining)
+    assert left is not None and 0 < left <= 1.0
+
+
+def test_statement_timeout_follows_deadline() -> None:
+    pytest.importorskip("sqlalchemy")
+    from db.engine import _apply_deadline
+
+    executed: list[str] = []
+
+    class Recorder:
+        def execute(self, statement: Any) -> None:
+            executed.append(str(statement))
+
+    _apply_deadline(Any, Any, Recorder())  # type: ignore[arg-type]
+    assert executed == []
+    with bind_deadline(2.0):
+        _apply_deadline(Any, Any, Recorder())  # type: ignore[arg-type]
+    assert len(executed) == 1
+    assert executed[0].startswith("SET LOCAL statement_timeout = ")
+    assert 1000 < int(executed[0].rsplit(" ", 1)[1]) <= 2000
+
+
+def _app(handler_delay: float, seen: dict[str, Any]) -> Any:
+    pytest.importorskip("starlette")
+    from starlette.applications import Starlette
+    from starlette.responses import PlainTextResponse
+    from starlette.routing import Route
+
+    async def slow(_request: object) -> PlainTextResponse:
+        seen["remaining"] = remaining()
+        try:
+            await asyncio.sleep(handler_delay)
+        except asyncio.CancelledError:
+            seen["cancelled"] = True
+            raise
+        return PlainTextResponse("ok")
+
+    return Starlette(routes=[Route("/slow", slow)])
+
+
+@pytest.mark.asyncio
+async def test_deadline_middleware_answers_504() -> None:
+    httpx = pytest.importorskip("httpx")
+    from api.middleware import DeadlineMiddleware
+
+    seen: dict[str, Any] = {}
+    app = DeadlineMiddleware(_app(5, seen), default_timeout=10, max_timeout=0.05)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/slow", headers={"X-Request-Timeout": "30"})
+    assert response.status_code == 504
+    assert response.json()["error"]["code"] == "DEADLINE_EXCEEDED"
+    assert seen["remaining"] <= 0.05
+    assert seen["cancelled"] is True
+
+
+@pytest.mark.asyncio
+async def test_deadline_middleware_passes_fast_requests() -> None:
+    httpx = pytest.importorskip("httpx")
+    from api.middleware import DeadlineMiddleware
+
+    seen: dict[str, Any] = {}
+    app = DeadlineMiddleware(_app(0, seen), default_timeout=1, max_timeout=2)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        response = await client.get("/slow", headers={"X-Request-Timeout": "bogus"})
+    assert response.status_code == 200
+    assert 0.5 < seen["remaining"] <= 1
+
+
+@pytest.mark.asyncio
+async def test_client_disconnect_cancels_handler() -> None:
+    pytest.importorskip("starlette")
+    from api.middleware import DeadlineMiddleware
+
+    seen: dict[str, Any] = {}
+    app = DeadlineMiddleware(_app(5, seen), default_timeout=10, max_timeout=10)
+    inbox = [{"type": "http.request", "body": b"", "more_body": False}]
+    sent: list[Any] = []
+
+    async def receive() -> Any:
+        if inbox:
+            return inbox.pop()
+        await asyncio.sleep(0.02)
+        return {"type": "http.disconnect"}
+
+    async def send(message: Any) -> None:
+        sent.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/slow", "headers": [], "query_string": b""}
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    assert time.perf_counter() - started < 1
+    assert seen["cancelled"] is True
+    assert sent == []
@@ -0,0 +1,77 @@
+"""Tests for background health monitor."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("pydantic")
+
+import asyncio
+
+from core.health import HealthMonitor
+
+
+@pytest.mark.asyncio
+async def test_probe_results_are_cached() -> None:
+    calls = {"n": 0}
+
+    async def probe() -> None:
+        calls["n"] += 1
+
+    monitor = HealthMonitor(interval=60, timeout=1)
+    monitor.add_probe("db", probe)
+    ready, results = monitor.is_ready()
+    assert ready is False
+    assert results[0].error == "pending"
+
+    await monitor.run_once()
+    for _ in range(3):
+        ready, _ = monitor.is_ready()
+        assert ready is True
+    assert calls["n"] == 1
+
+
+@pytest.mark.asyncio
+async def test_probe_timeout_and_gate() -> None:
+    async def slow() -> None:
+        await asyncio.sleep(1)
+
+    gate_state: dict[str, str | None] = {"error": None}
+    monitor = HealthMonitor(interval=60, timeout=0.01)
+    monitor.add_probe("ldap", slow)
+    monitor.add_gate("pool", lambda: gate_state["error"])
+    await monitor.run_once()
+    ready, results = monitor.is_ready()
+    assert ready is False
+    assert "timed out" in (results[0].error or "")
+
+    gate_state["error"] = "exhausted"
+    assert [r.ok for r in monitor.results() if r.name == "pool"] == [False]
+
+
+@pytest.mark.asyncio
+async def test_start_and_stop() -> None:
+    async def probe() -> None:
+        return None
+
+    monitor = HealthMonitor(interval=0.01, timeout=1)
+    monitor.add_probe("db", probe)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+    assert monitor.is_ready()[0] is True
+
+
+@pytest.mark.asyncio
+async def test_background_probe_runs_but_is_not_reported() -> None:
+    calls = {"n": 0}
+
+    async def upkeep() -> None:
+        calls["n"] += 1
+        raise ConnectionError("down")
+
+    monitor = HealthMonitor(interval=60, timeout=1)
+    monitor.add_probe("ldap", upkeep, readiness=False)
+    await monitor.run_once()
+    assert calls["n"] == 1
+    assert monitor.is_ready() == (True, [])
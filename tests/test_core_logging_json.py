@@ -0,0 +1,84 @@
+"""Tests for JSON log formatter and rate limit filter."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("orjson")
+
+import logging
+
+import orjson
+
+from core.logging_json import JsonFormatter
+from core.logging_sampling import RateLimitFilter
+
+
+def _record(msg: str = "AppError %s", level: int = logging.WARNING) -> logging.LogRecord:
+    return logging.LogRecord("api.errors.handlers", level, "file", 1, msg, ("x",), None)
+
+
+def test_json_formatter_includes_extra_fields() -> None:
+    record = _record()
+    record.request_id = "rid-1"
+    record.route = "/api/v1/auth/login"
+    record.status = 401
+    data = orjson.loads(JsonFormatter().format(record))
+    assert data["msg"] == "AppError x"
+    assert data["requestId"] == "rid-1"
+    assert data["route"] == "/api/v1/auth/login"
+    assert data["status"] == 401
+    assert "pathname" not in data
+
+
+def test_rate_limit_filter_suppresses_and_summarizes() -> None:
+    now = [0.0]
+    filt = RateLimitFilter(limit=2, window=10.0, clock=lambda: now[0])
+    logger = logging.getLogger("api.errors.handlers")
+    summaries: list[logging.LogRecord] = []
+
+    class Capture(logging.Handler):
+        def emit(self, record: logging.LogRecord) -> None:
+            summaries.append(record)
+
+    handler = Capture()
+    logger.addHandler(handler)
+    try:
+        assert [filt.filter(_record()) for _ in range(5)] == [True, True, False, False, False]
+        now[0] = 11.0
+        assert filt.filter(_record()) is True
+    finally:
+        logger.removeHandler(handler)
+    assert len(summaries) == 1
+    assert summaries[0].suppressed == 3
+    assert "3 similar records suppressed" in summaries[0].getMessage()
+
+
+def test_rate_limit_filter_flushes_summary_after_burst_stops() -> None:
+    now = [0.0]
+    filt = RateLimitFilter(limit=1, window=10.0, clock=lambda: now[0])
+    logger = logging.getLogger("api.errors.handlers")
+    summaries: list[logging.LogRecord] = []
+
+    class Capture(logging.Handler):
+        def emit(self, record: logging.LogRecord) -> None:
+            summaries.append(record)
+
+    handler = Capture()
+    logger.addHandler(handler)
+    try:
+        assert [filt.filter(_record()) for _ in range(3)] == [True, False, False]
+        assert filt.flush() == 0  # the window is still open
+        now[0] = 10.0
+        assert filt.flush() == 1
+        assert filt.flush() == 0
+    finally:
+        logger.removeHandler(handler)
+    assert [record.suppressed for record in summaries] == [2]
+    assert summaries[0].lineno == _record().lineno
+
+
+def test_sampling_keeps_warnings() -> None:
+    filt = RateLimitFilter(sample_rate=0.0)
+    assert filt.filter(_record(level=logging.INFO)) is False
+    assert filt.filter(_record(level=logging.WARNING)) is True
@@ -7,9 +7,12 @@ import pytest
 pytest.importorskip("pydantic")
 
 import logging
+import logging.handlers
 import sys
+import time
+from pathlib import Path
 
-from core.logging_setup import RequestIdFilter, setup_logging
+from core.logging_setup import RequestIdFilter, rotate_log_files, setup_logging, use_worker_file_handlers
 
 
 def test_request_id_filter_sets_default() -> None:
@@ -26,3 +29,31 @@ def test_setup_logging_installs_excepthook() -> None:
         assert sys.excepthook is not original
     finally:
         sys.excepthook = original
+
+
+def test_worker_appends_and_follows_parent_rotation(tmp_path: Path) -> None:
+    root = logging.getLogger()
+    saved = root.handlers[:]
+    path = tmp_path / "app.log"
+    parent = logging.handlers.TimedRotatingFileHandler(str(path), when="midnight", encoding="utf-8")
+    parent.addFilter(RequestIdFilter())
+    root.handlers = [parent]
+    try:
+        use_worker_file_handlers()
+        [worker] = root.handlers
+        assert type(worker) is logging.handlers.WatchedFileHandler
+        assert worker.filters and worker.baseFilename == str(path)
+
+        parent.rolloverAt = int(time.time()) - 1  # as the parent's handler, rotation is due
+        root.handlers = [parent]
+        rotate_log_files()
+        assert len(list(tmp_path.iterdir())) == 2
+
+        root.handlers = [worker]
+        logging.getLogger("test.worker").warning("after rotation")
+        assert "after rotation" in path.read_text(encoding="utf-8")
+    finally:
+        for handler in root.handlers:
+            handler.close()
+        parent.close()
+        root.handlers = saved
@@ -0,0 +1,98 @@
+"""Tests for metrics registry and multiprocess aggregation."""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("orjson")
+
+import os
+import threading
+from pathlib import Path
+
+import orjson
+
+from core.metrics import MetricsRegistry, merge_snapshots, render_snapshot
+from core.metrics_multiprocess import clear_snapshots, collect, write_snapshot
+
+
+def test_counter_merges_thread_shards() -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("hits_total", "Hits", ("route",))
+
+    def work() -> None:
+        for _ in range(1000):
+            counter.inc("/a")
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    counter.inc("/a")
+    assert 'hits_total{route="/a"} 4001' in registry.render()
+
+
+def test_histogram_render_is_cumulative() -> None:
+    registry = MetricsRegistry()
+    hist = registry.histogram("lat_seconds", "Latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        hist.observe(value)
+    text = registry.render()
+    assert 'lat_seconds_bucket{le="0.1"} 1' in text
+    assert 'lat_seconds_bucket{le="1"} 2' in text
+    assert 'lat_seconds_bucket{le="+Inf"} 3' in text
+    assert "lat_seconds_count 3" in text
+
+
+def test_register_same_name_returns_same_metric() -> None:
+    registry = MetricsRegistry()
+    assert registry.counter("x_total", "X") is registry.counter("x_total", "X")
+    with pytest.raises(ValueError):
+        registry.gauge("x_total", "X")
+
+
+def test_gauge_function_and_merge_without_gauges() -> None:
+    registry = MetricsRegistry()
+    registry.gauge("pool", "Pool", ("state",)).set_function(lambda: [(("checked_out",), 3.0)])
+    snap = registry.snapshot()
+    assert 'pool{state="checked_out"} 6' in render_snapshot(merge_snapshots([snap, snap]))
+    assert merge_snapshots([snap], gauges=False)["pool"]["samples"] == []
+
+
+def test_state_gauges_keep_the_worst_worker() -> None:
+    def worker(state: float, up: float) -> dict:
+        registry = MetricsRegistry()
+        registry.gauge("breaker_state", "State", ("name",), aggregate="max").set(state, "dify")
+        registry.gauge("dc_up", "Up", ("server",), aggregate="min").set(up, "dc1")
+        registry.gauge("in_flight", "In flight").set(2)
+        return registry.snapshot()
+
+    text = render_snapshot(merge_snapshots([worker(0, 1), worker(2, 0), worker(1, 1)]))
+    assert 'breaker_state{name="dify"} 2' in text
+    assert 'dc_up{server="dc1"} 0' in text
+    assert "in_flight 6" in text
+
+
+def test_per_worker_gauge_gets_pid_label() -> None:
+    registry = MetricsRegistry()
+    registry.gauge("pool", "Pool", ("state",), aggregate="pid").set(3, "checked_out")
+    assert f'pool{{state="checked_out",pid="{os.getpid()}"}} 3' in registry.render()
+
+
+def test_collect_merges_worker_files(tmp_path: Path) -> None:
+    registry = MetricsRegistry()
+    counter = registry.counter("req_total", "Requests")
+    counter.inc(amount=2)
+    write_snapshot(registry, tmp_path)
+    assert (tmp_path / f"metrics-{os.getpid()}.json").exists()
+
+    other = MetricsRegistry()
+    other.counter("req_total", "Requests").inc(amount=5)
+    # pid 1 is always alive; the file stands for another worker
+    (tmp_path / "metrics-1.json").write_bytes(orjson.dumps(other.snapshot()))
+
+    assert "req_total 7" in render_snapshot(collect(registry, tmp_path))
+
+    assert clear_snapshots(tmp_path) == 2
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,67 @@
+"""Tests for token-bucket rate limiting."""
+
+from __future__ import annotations
+
+import pytest
+
+from api.middleware.rate_limit import client_ip
+from core.rate_limit import MemoryRateLimiter, TokenBuckets
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_burst_then_refill() -> None:
+    clock = Clock()
+    buckets = TokenBuckets(rate=2.0, burst=3, clock=clock)
+    assert [buckets.take("ip") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert buckets.take("ip") == pytest.approx(0.5)
+    clock.now = 0.5
+    assert buckets.take("ip") == 0.0
+    assert buckets.take("other") == 0.0
+
+
+def test_rejected_requests_do_not_consume_tokens() -> None:
+    clock = Clock()
+    buckets = TokenBuckets(rate=1.0, burst=1, clock=clock)
+    assert buckets.take("ip") == 0.0
+    clock.now = 0.6
+    assert buckets.take("ip") == pytest.approx(0.4)
+    clock.now = 1.0
+    assert buckets.take("ip") == 0.0
+
+
+def test_idle_buckets_are_swept() -> None:
+    clock = Clock()
+    buckets = TokenBuckets(rate=1.0, burst=2, shards=1, sweep_interval=10, clock=clock)
+    for key in ("a", "b", "c"):
+        buckets.take(key)
+    clock.now = 11.0
+    buckets.take("d")
+    assert len(buckets) == 1
+
+
+@pytest.mark.asyncio
+async def test_memory_limiter() -> None:
+    limiter = MemoryRateLimiter(TokenBuckets(rate=1.0, burst=1))
+    assert await limiter.acquire("ip") == 0.0
+    assert await limiter.acquire("ip") > 0
+
+
+def test_forwarded_for_uses_trusted_hops_from_the_right() -> None:
+    def scope(forwarded: bytes) -> dict:
+        return {"client": ("10.0.0.2", 443), "headers": [(b"x-forwarded-for", forwarded)]}
+
+    honest = scope(b"203.0.113.7")
+    spoofed = scope(b"198.51.100.1, 203.0.113.7")
+    assert client_ip(honest, trust_forwarded_for=True) == "203.0.113.7"
+    assert client_ip(spoofed, trust_forwarded_for=True) == "203.0.113.7"
+    assert client_ip(scope(b"198.51.100.1, 203.0.113.7, 10.0.0.1"), trust_forwarded_for=True, trusted_hops=2) == (
+        "203.0.113.7"
+    )
+    assert client_ip(spoofed) == "10.0.0.2"
@@ -56,6 +56,7 @@ async def test_sync_user_from_directory_creates_user() -> None:
         supervisor="Boss",
         update_last_login=True,
         role="admin",
+        reporting_lines=False,
     )
     assert user.ad_login == "user"
     assert session.added
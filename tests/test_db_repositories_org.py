@@ -0,0 +1,126 @@
+"""Tests for the org_closure reporting tree repository."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+import db.repositories.app.org.closure as closure
+from db.models.org import OrgClosure
+from db.repositories.app.org import get_chain_depth, get_manager_id, get_report_ids, sync_reporting_lines
+
+
+class SqliteSession:
+    """Async facade over a synchronous SQLite session: the closure SQL is portable, the lock is not."""
+
+    def __init__(self, session: Session) -> None:
+        self._session = session
+        self.locks = 0
+
+    async def execute(self, statement: Any) -> Any:
+        return self._session.execute(statement)
+
+    def pairs(self) -> set[tuple[int, int, int]]:
+        rows = self._session.execute(select(OrgClosure.ancestor_id, OrgClosure.descendant_id, OrgClosure.depth))
+        return {(row[0], row[1], row[2]) for row in rows}
+
+
+@pytest.fixture
+def session(monkeypatch: pytest.MonkeyPatch) -> Iterator[SqliteSession]:
+    engine = create_engine("sqlite://")
+    OrgClosure.__table__.create(engine)
+    with Session(engine) as sync_session:
+        wrapper = SqliteSession(sync_session)
+
+        async def lock_org(_: Any) -> None:
+            wrapper.locks += 1
+
+        monkeypatch.setattr(closure, "lock_org", lock_org)
+        yield wrapper
+
+
+async def _report(session: Any, user_id: int, manager_id: int | None, *, keep_manager: bool = False) -> int:
+    return await sync_reporting_lines(
+        session,
+        user_id,
+        manager_id=manager_id,
+        keep_manager=keep_manager,
+        report_ids=await get_report_ids(session, user_id),
+    )
+
+
+@pytest.mark.asyncio
+async def test_tree_is_built_from_managers_and_reports(session: SqliteSession) -> None:
+    # 1 -> 2 -> 3, 2 -> 4: 2 names its manager, 2 lists its reports.
+    await sync_reporting_lines(session, 2, manager_id=1, keep_manager=False, report_ids=[3, 4])
+    assert session.pairs() == {(1, 2, 1), (2, 3, 1), (2, 4, 1), (1, 3, 2), (1, 4, 2)}
+    assert await get_chain_depth(session, manager_id=1, user_id=4) == 2
+    assert await get_chain_depth(session, manager_id=3, user_id=1) is None
+    assert await get_chain_depth(session, manager_id=5, user_id=5) == 0
+
+
+@pytest.mark.asyncio
+async def test_moving_a_manager_moves_the_subtree(session: SqliteSession) -> None:
+    await sync_reporting_lines(session, 2, manager_id=1, keep_manager=False, report_ids=[3])
+    await sync_reporting_lines(session, 3, manager_id=2, keep_manager=False, report_ids=[4])
+    assert await _report(session, 2, 5) == 1
+
+    assert await get_manager_id(session, 2) == 5
+    assert await get_chain_depth(session, manager_id=5, user_id=4) == 3
+    assert await get_chain_depth(session, manager_id=1, user_id=4) is None
+    assert {pair for pair in session.pairs() if pair[0] == 1} == set()
+
+
+@pytest.mark.asyncio
+async def test_unchanged_lines_do_not_lock_or_write(session: SqliteSession) -> None:
+    await sync_reporting_lines(session, 2, manager_id=1, keep_manager=False, report_ids=[3])
+    locks, before = session.locks, session.pairs()
+    assert await sync_reporting_lines(session, 2, manager_id=1, keep_manager=False, report_ids=[3]) == 0
+    assert await sync_reporting_lines(session, 7, manager_id=None, keep_manager=False, report_ids=[], is_new=True) == 0
+    assert (session.locks, session.pairs()) == (locks, before)
+
+
+@pytest.mark.asyncio
+async def test_unknown_manager_keeps_the_current_one(session: SqliteSession) -> None:
+    await sync_reporting_lines(session, 2, manager_id=1, keep_manager=False, report_ids=[])
+    await _report(session, 2, None, keep_manager=True)
+    assert await get_manager_id(session, 2) == 1
+    await _report(session, 2, None)
+    assert session.pairs() == set()
+
+
+@pytest.mark.asyncio
+async def test_dropped_reports_are_detached(session: SqliteSession) -> None:
+    await sync_reporting_lines(session, 1, manager_id=None, keep_manager=False, report_ids=[2, 3])
+    await sync_reporting_lines(session, 1, manager_id=None, keep_manager=False, report_ids=[3])
+    assert session.pairs() == {(1, 3, 1)}
+
+
+@pytest.mark.asyncio
+async def test_cycles_are_refused(session: SqliteSession) -> None:
+    await sync_reporting_lines(session, 2, manager_id=1, keep_manager=False, report_ids=[3])
+    before = session.pairs()
+    assert await _report(session, 1, 3) == 0
+    assert session.pairs() == before
+
+
+@pytest.mark.asyncio
+async def test_report_moved_before_the_lock_is_not_detached(
+    session: SqliteSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    await sync_reporting_lines(session, 1, manager_id=None, keep_manager=False, report_ids=[3])
+
+    async def lock_org(_: Any) -> None:
+        # another login moves 3 under 5 while this sync waits for the lock
+        await closure.move_subtree(session, 3, 5)
+
+    monkeypatch.setattr(closure, "lock_org", lock_org)
+    assert await sync_reporting_lines(session, 1, manager_id=None, keep_manager=False, report_ids=[]) == 0
+    assert await get_manager_id(session, 3) == 5
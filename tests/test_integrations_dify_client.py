@@ -0,0 +1,180 @@
+"""Tests for the Dify API client against the fake Dify app."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("starlette")
+
+from core.deadline import DeadlineExceededError, bind_deadline
+from integrations.dify import DifyClient, DifyError, DifyUnavailableError, iter_sse
+from integrations.dify.client import endpoint_name
+from testing.dify import FakeDify
+
+API_KEY = "app-test"
+
+
+def _client(transport: httpx.AsyncBaseTransport, **overrides: object) -> DifyClient:
+    options: dict[str, object] = {
+        "timeout": 5.0,
+        "connect_timeout": 1.0,
+        "max_connections": 10,
+        "max_keepalive_connections": 5,
+        "keepalive_expiry": 5.0,
+        "max_retries": 2,
+        "backoff": 0.001,
+        "backoff_max": 0.01,
+    }
+    options.update(overrides)
+    return DifyClient("http://dify.test/v1", transport=transport, **options)  # type: ignore[arg-type]
+
+
+@pytest.fixture
+def fake() -> FakeDify:
+    return FakeDify(api_keys={API_KEY})
+
+
+@pytest.fixture
+def client(fake: FakeDify) -> DifyClient:
+    return _client(httpx.ASGITransport(app=fake.app))
+
+
+@pytest.mark.asyncio
+async def test_blocking_chat(client: DifyClient, fake: FakeDify) -> None:
+    result = await client.chat_messages(API_KEY, query="ООО Ромашка", user="u1")
+    assert result["answer"] == "echo: ООО Ромашка"
+    assert fake.stats.queries == ["ООО Ромашка"]
+
+
+@pytest.mark.asyncio
+async def test_streaming_chat_yields_events(client: DifyClient, fake: FakeDify) -> None:
+    events = [event.json() async for event in client.chat_messages_stream(API_KEY, query="a b c", user="u1")]
+    assert "".join(event.get("answer", "") for event in events) == "echo: a b c "
+    assert events[-1]["event"] == "message_end"
+    assert fake.stats.streamed == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_on_5xx_and_429(client: DifyClient, fake: FakeDify) -> None:
+    fake.fail_next(503)
+    fake.fail_next(429, headers={"Retry-After": "0"})
+    result = await client.retrieve(API_KEY, "ds1", query="q", top_k=3)
+    assert result["records"] == []
+    assert fake.stats.requests == 3
+
+
+@pytest.mark.asyncio
+async def test_retries_exhausted(client: DifyClient, fake: FakeDify) -> None:
+    fake.fail_next(502, count=3)
+    with pytest.raises(DifyUnavailableError) as exc_info:
+        await client.retrieve(API_KEY, "ds1", query="q", top_k=3)
+    assert exc_info.value.status == 502
+    assert fake.stats.requests == 3
+
+
+@pytest.mark.asyncio
+async def test_chat_is_not_retried_on_5xx(client: DifyClient, fake: FakeDify) -> None:
+    fake.fail_next(502)
+    with pytest.raises(DifyUnavailableError):
+        await client.chat_messages(API_KEY, query="q", user="u1")
+    fake.fail_next(503)
+    with pytest.raises(DifyUnavailableError):
+        async for _ in client.chat_messages_stream(API_KEY, query="q", user="u1"):
+            pass
+    fake.fail_next(429, headers={"Retry-After": "0"})
+    assert (await client.chat_messages(API_KEY, query="q", user="u1"))["answer"] == "echo: q"
+    assert fake.stats.requests == 4
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried(client: DifyClient, fake: FakeDify) -> None:
+    with pytest.raises(DifyError) as exc_info:
+        await client.chat_messages("wrong-key", query="q", user="u1")
+    assert exc_info.value.status == 401
+    assert exc_info.value.code == "unauthorized"
+    assert fake.stats.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_connection_errors_are_retried(fake: FakeDify) -> None:
+    app_transport = httpx.ASGITransport(app=fake.app)
+    failures = [httpx.ConnectError("refused")]
+
+    class Flaky(httpx.AsyncBaseTransport):
+        async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+            if failures:
+                raise failures.pop()
+            return await app_transport.handle_async_request(request)
+
+    dify = _client(Flaky())
+    result = await dify.chat_messages(API_KEY, query="q", user="u1")
+    assert result["answer"] == "echo: q"
+    await dify.aclose()
+
+
+@pytest.mark.asyncio
+async def test_endpoint_concurrency_limit(fake: FakeDify) -> None:
+    dify = _client(httpx.ASGITransport(app=fake.app), endpoint_concurrency={"chat-messages": 1})
+    async with dify._slot("chat-messages"):
+        assert dify.in_flight == {"chat-messages": 1}
+        waiter = asyncio.create_task(dify.chat_messages(API_KEY, query="q", user="u1"))
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        async with dify._slot("datasets"):  # other endpoints are not blocked
+            pass
+    assert (await waiter)["answer"] == "echo: q"
+    assert dify.in_flight == {"chat-messages": 0, "datasets": 0}
+
+
+@pytest.mark.asyncio
+async def test_waiting_for_a_slot_respects_the_deadline(client: DifyClient) -> None:
+    client.endpoint_concurrency["chat-messages"] = 1
+    async with client._slot("chat-messages"):
+        with bind_deadline(0.02), pytest.raises(DeadlineExceededError):
+            await client.chat_messages(API_KEY, query="q", user="u1")
+
+
+@pytest.mark.asyncio
+async def test_iter_sse() -> None:
+    async def lines() -> AsyncIterator[str]:
+        for line in [": keep-alive", "event: ping", "id: 7", "data: a", "data: b", "", "data: {\"x\": 1}", ""]:
+            yield line
+
+    events = [event async for event in iter_sse(lines())]
+    assert [(event.event, event.id, event.data) for event in events] == [
+        ("ping", "7", "a\nb"),
+        (None, None, '{"x": 1}'),
+    ]
+    assert events[0].encode() == b"event: ping\nid: 7\ndata: a\ndata: b\n\n"
+    assert events[1].json() == {"x": 1}
+
+
+def test_endpoint_name() -> None:
+    assert endpoint_name("/chat-messages") == "chat-messages"
+    assert endpoint_name("/datasets/abc/retrieve") == "datasets"
+
+
+@pytest.mark.asyncio
+async def test_knowledge_base_endpoints(client: DifyClient, fake: FakeDify) -> None:
+    created = await client.create_document_by_text(API_KEY, "ds1", name="a.md", text="поставка кабеля")
+    document_id = created["document"]["id"]
+    result = await client.retrieve(API_KEY, "ds1", query="кабель поставка", top_k=3)
+    assert [record["segment"]["document_id"] for record in result["records"]] == [document_id]
+    await client.delete_document(API_KEY, "ds1", document_id)
+    assert fake.datasets["ds1"] == {}
+    assert set(client.in_flight) == {"datasets-retrieve", "datasets-documents"}
+
+
+@pytest.mark.asyncio
+async def test_document_upload_is_not_retried_on_5xx(client: DifyClient, fake: FakeDify) -> None:
+    fake.fail_next(502)
+    with pytest.raises(DifyUnavailableError):
+        await client.create_document_by_text(API_KEY, "ds1", name="a.md", text="x")
+    fake.fail_next(429, headers={"Retry-After": "0"})
+    await client.create_document_by_text(API_KEY, "ds1", name="a.md", text="x")
+    assert fake.stats.requests == 3
+    assert fake.stats.documents_created == 1
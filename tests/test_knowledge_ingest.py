@@ -0,0 +1,144 @@
+"""Tests for bulk document ingestion into a Dify knowledge base."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("starlette")
+
+from integrations.dify import DifyClient, DifyError
+from knowledge import DocumentIngestion, IngestDocument, IngestProgress, documents_from_directory
+from testing.dify import FakeDify
+
+API_KEY = "kb-test"
+
+
+def _client(fake: FakeDify) -> DifyClient:
+    return DifyClient(
+        "http://dify.test/v1",
+        timeout=5.0,
+        connect_timeout=1.0,
+        max_connections=10,
+        max_keepalive_connections=5,
+        keepalive_expiry=5.0,
+        max_retries=1,
+        backoff=0.001,
+        transport=httpx.ASGITransport(app=fake.app),
+    )
+
+
+def _documents(count: int) -> list[IngestDocument]:
+    return [IngestDocument(f"doc-{index}.md", f"text {index}") for index in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_uploads_concurrently_and_invalidates(tmp_path: Path) -> None:
+    fake = FakeDify(api_keys={API_KEY})
+    invalidated: list[str] = []
+
+    async def on_uploaded(dataset_id: str) -> None:
+        invalidated.append(dataset_id)
+
+    ingestion = DocumentIngestion(
+        _client(fake),
+        API_KEY,
+        "ds1",
+        concurrency=4,
+        progress=IngestProgress(tmp_path / "progress.jsonl"),
+        on_uploaded=on_uploaded,
+    )
+    report = await ingestion.run(_documents(20))
+    assert (report.uploaded, report.skipped, report.failed) == (20, 0, {})
+    assert len(fake.datasets["ds1"]) == 20
+    assert invalidated == ["ds1"] * 20
+
+
+@pytest.mark.asyncio
+async def test_rerun_skips_uploaded_and_retries_failed(tmp_path: Path) -> None:
+    fake = FakeDify(api_keys={API_KEY})
+    path = tmp_path / "progress.jsonl"
+    fake.fail_next(500)
+    progress = IngestProgress(path)
+    first = await DocumentIngestion(_client(fake), API_KEY, "ds1", concurrency=1, progress=progress).run(_documents(5))
+    progress.close()
+    assert (first.uploaded, list(first.failed)) == (4, ["doc-0.md"])
+
+    with path.open("ab") as file:
+        file.write(b'{"name": "doc-')  # a line cut short by an interrupted run
+    second = await DocumentIngestion(_client(fake), API_KEY, "ds1", concurrency=2, progress=IngestProgress(path)).run(
+        _documents(5)
+    )
+    assert (second.uploaded, second.skipped, second.failed) == (1, 4, {})
+    assert len(fake.datasets["ds1"]) == 5
+
+
+@pytest.mark.asyncio
+async def test_reading_is_bounded_by_uploads(tmp_path: Path) -> None:
+    fake = FakeDify(api_keys={API_KEY})
+    client = _client(fake)
+    client.endpoint_concurrency["datasets-documents"] = 1
+    produced = 0
+
+    def documents() -> Any:
+        nonlocal produced
+        for document in _documents(50):
+            produced += 1
+            yield document
+
+    async with client._slot("datasets-documents"):  # uploads are stuck
+        task = asyncio.create_task(
+            DocumentIngestion(client, API_KEY, "ds1", concurrency=2, progress=IngestProgress(None)).run(documents())
+        )
+        await asyncio.sleep(0.05)
+        assert produced <= 2 + 2 + 1  # in workers + queued + the one waiting to be queued
+    report = await task
+    assert report.uploaded == 50
+
+
+@pytest.mark.asyncio
+async def test_wrong_dataset_stops_the_run() -> None:
+    fake = FakeDify(api_keys={API_KEY})
+    ingestion = DocumentIngestion(_client(fake), "wrong-key", "ds1", concurrency=2, progress=IngestProgress(None))
+    with pytest.raises(DifyError) as exc_info:
+        await ingestion.run(_documents(100))
+    assert exc_info.value.status == 401
+    assert fake.stats.requests < 10
+
+
+@pytest.mark.asyncio
+async def test_unexpected_errors_fail_the_document_not_the_run() -> None:
+    class Broken:
+        async def create_document_by_text(self, *_: Any, **__: Any) -> Any:
+            raise RuntimeError("unexpected answer")
+
+    ingestion = DocumentIngestion(Broken(), API_KEY, "ds1", concurrency=1, progress=IngestProgress(None))  # type: ignore[arg-type]
+    report = await asyncio.wait_for(ingestion.run(_documents(5)), timeout=5)
+    assert report.uploaded == 0
+    assert report.failed["doc-0.md"] == "RuntimeError: unexpected answer"
+    assert len(report.failed) == 5
+
+
+@pytest.mark.asyncio
+async def test_producer_stops_when_workers_die() -> None:
+    fake = FakeDify(api_keys={API_KEY})
+    ingestion = DocumentIngestion(_client(fake), API_KEY, "ds1", concurrency=1, progress=IngestProgress(None))
+
+    async def crash(_document: IngestDocument) -> None:
+        raise RuntimeError("worker crashed")
+
+    ingestion._upload = crash  # type: ignore[method-assign]
+    with pytest.raises(RuntimeError, match="worker crashed"):
+        await asyncio.wait_for(ingestion.run(_documents(10)), timeout=5)
+
+
+def test_documents_from_directory(tmp_path: Path) -> None:
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.md").write_text("A", encoding="utf-8")
+    (tmp_path / "sub" / "b.txt").write_text("B", encoding="utf-8")
+    (tmp_path / "c.pdf").write_bytes(b"%PDF")
+    assert [(doc.name, doc.text) for doc in documents_from_directory(tmp_path)] == [("a.md", "A"), ("sub/b.txt", "B")]
@@ -0,0 +1,132 @@
+"""Tests for the cached knowledge base retrieval."""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("starlette")
+
+from core.cache import TTLCache
+from integrations.dify import DifyClient
+from knowledge import KbRecord, RetrievalService, normalize_query
+from knowledge.retrieval import RetrievalKey
+from testing.dify import FakeDify, FakeDocument
+
+API_KEY = "kb-test"
+
+
+@pytest.fixture
+def fake() -> FakeDify:
+    fake = FakeDify(api_keys={API_KEY})
+    fake.datasets["ds1"] = {"d1": FakeDocument("d1", "cable.md", "поставка кабеля ввгнг")}
+    return fake
+
+
+class Generations:
+    """Stands in for ``kb_dataset_generations``."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, int] = {}
+
+    async def get(self, dataset_id: str) -> int:
+        return self.values.get(dataset_id, 0)
+
+    def bump(self, dataset_id: str) -> None:
+        self.values[dataset_id] = self.values.get(dataset_id, 0) + 1
+
+
+@pytest.fixture
+def generations() -> Generations:
+    return Generations()
+
+
+@pytest.fixture
+def service(fake: FakeDify, generations: Generations) -> RetrievalService:
+    client = DifyClient(
+        "http://dify.test/v1",
+        timeout=5.0,
+        connect_timeout=1.0,
+        max_connections=10,
+        max_keepalive_connections=5,
+        keepalive_expiry=5.0,
+        transport=httpx.ASGITransport(app=fake.app),
+    )
+    cache: TTLCache[RetrievalKey, tuple[KbRecord, ...]] = TTLCache("test_kb_retrieval", max_size=100, ttl=60.0)
+    return RetrievalService(client=client, api_key=API_KEY, cache=cache, generations=generations)
+
+
+def test_normalize_query() -> None:
+    assert normalize_query("  Поставка   КАБЕЛЯ? ") == "поставка кабеля"
+    assert normalize_query("Ёмкость!") == "емкость"
+
+
+@pytest.mark.asyncio
+async def test_equivalent_queries_hit_the_cache(service: RetrievalService, fake: FakeDify) -> None:
+    first = await service.retrieve("ds1", "Поставка кабеля?", top_k=4)
+    second = await service.retrieve("ds1", "поставка  кабеля", top_k=4)
+    assert (first.source, second.source) == ("dify", "cache")
+    assert [record.document_name for record in second.records] == ["cable.md"]
+    assert len(fake.stats.retrievals) == 1
+
+    await service.retrieve("ds1", "поставка кабеля", top_k=2)
+    await service.retrieve("ds2", "поставка кабеля", top_k=4)
+    assert len(fake.stats.retrievals) == 3
+
+
+@pytest.mark.asyncio
+async def test_concurrent_queries_are_coalesced(service: RetrievalService, fake: FakeDify) -> None:
+    results = await asyncio.gather(*(service.retrieve("ds1", "кабель", top_k=4) for _ in range(10)))
+    assert len({result.records for result in results}) == 1
+    assert len(fake.stats.retrievals) == 1
+
+
+@pytest.mark.asyncio
+async def test_document_changes_invalidate_the_dataset(
+    service: RetrievalService, fake: FakeDify, generations: Generations
+) -> None:
+    await service.retrieve("ds1", "кабеля", top_k=4)
+    await service.retrieve("ds2", "кабеля", top_k=4)
+    fake.datasets["ds1"]["d2"] = FakeDocument("d2", "more.md", "ещё кабеля")
+    generations.bump("ds1")
+
+    refreshed = await service.retrieve("ds1", "кабеля", top_k=4)
+    assert refreshed.source == "dify"
+    assert len(refreshed.records) == 2
+    assert (await service.retrieve("ds2", "кабеля", top_k=4)).source == "cache"
+
+
+@pytest.mark.asyncio
+async def test_result_loaded_before_invalidation_is_not_served_after(
+    service: RetrievalService, generations: Generations
+) -> None:
+    pending = asyncio.create_task(service.retrieve("ds1", "кабеля", top_k=4))
+    await asyncio.sleep(0)
+    generations.bump("ds1")
+    await pending
+    assert (await service.retrieve("ds1", "кабеля", top_k=4)).source == "dify"
+
+
+@pytest.mark.asyncio
+async def test_postgres_generations_are_cached_and_survive_outages(monkeypatch: pytest.MonkeyPatch) -> None:
+    from knowledge import retrieval
+
+    stored = {"ds1": 3}
+    reads: list[str] = []
+
+    async def get_dataset_generation(_session: object, dataset_id: str) -> int:
+        reads.append(dataset_id)
+        if stored is None:
+            raise OSError("connection refused")
+        return stored[dataset_id]
+
+    monkeypatch.setattr(retrieval, "get_dataset_generation", get_dataset_generation)
+    generations = retrieval.PostgresDatasetGenerations(ttl=60.0)
+    assert [await generations.get("ds1") for _ in range(3)] == [3, 3, 3]
+    assert reads == ["ds1"]
+
+    stored = None
+    generations._cache.invalidate("ds1")
+    assert await generations.get("ds1") == 3
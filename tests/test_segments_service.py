@@ -0,0 +1,134 @@
+"""Tests for customer segment normalization and the layered classification service."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable, Mapping
+
+import pytest
+
+from core.cache import TTLCache
+from integrations.dify import DifyError
+from segments import SegmentService, normalize_customer_name
+
+
+class DictStore:
+    def __init__(self) -> None:
+        self.rows: dict[str, str] = {}
+        self.queries = 0
+        self.broken = False
+
+    async def get_many(self, keys: Iterable[str]) -> dict[str, str]:
+        if self.broken:
+            raise ConnectionError("database is down")
+        self.queries += 1
+        return {key: self.rows[key] for key in keys if key in self.rows}
+
+    async def put_many(self, segments: Mapping[str, str]) -> None:
+        if self.broken:
+            raise ConnectionError("database is down")
+        self.rows.update(segments)
+
+
+class Classifier:
+    def __init__(self, answer: str = "Энергетика\n") -> None:
+        self.answer = answer
+        self.calls: list[str] = []
+        self.failing: set[str] = set()
+        self.delay = 0.0
+
+    async def __call__(self, name: str) -> str:
+        self.calls.append(name)
+        await asyncio.sleep(self.delay)
+        if name in self.failing:
+            raise DifyError("Dify chat-messages: boom", status=400)
+        return self.answer
+
+
+@pytest.fixture
+def store() -> DictStore:
+    return DictStore()
+
+
+@pytest.fixture
+def classifier() -> Classifier:
+    return Classifier()
+
+
+@pytest.fixture
+def service(store: DictStore, classifier: Classifier) -> SegmentService:
+    memory: TTLCache[str, str] = TTLCache("test_segments", max_size=100, ttl=60.0)
+    return SegmentService(classifier=classifier, store=store, memory=memory, batch_concurrency=2)
+
+
+@pytest.mark.parametrize(
+    "name",
+    [
+        'ООО «Ромашка»',
+        'общество с ограниченной ответственностью "Ромашка"',
+        "  ооо   РОМАШКА ",
+    ],
+)
+def test_normalize_customer_name(name: str) -> None:
+    assert normalize_customer_name(name) == "ооо ромашка"
+
+
+def test_normalize_legal_forms_and_yo() -> None:
+    assert normalize_customer_name("Публичное акционерное общество «Полёт»") == "пао полет"
+    assert normalize_customer_name("Акционерное общество Альфа") == "ао альфа"
+    assert normalize_customer_name("Индивидуальный предприниматель Иванов") == "ип иванов"
+
+
+@pytest.mark.asyncio
+async def test_lookup_order(service: SegmentService, store: DictStore, classifier: Classifier) -> None:
+    first = await service.classify("ООО «Ромашка»")
+    assert (first.segment, first.source) == ("Энергетика", "dify")
+    assert store.rows == {"ооо ромашка": "Энергетика"}
+
+    second = await service.classify("ооо ромашка")
+    assert second.source == "memory"
+
+    service.invalidate("ООО Ромашка")
+    third = await service.classify("ООО Ромашка")
+    assert third.source == "database"
+    assert classifier.calls == ["ООО «Ромашка»"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_call(service: SegmentService, classifier: Classifier) -> None:
+    classifier.delay = 0.01
+    results = await asyncio.gather(*(service.classify(name) for name in ["ООО Ромашка", 'ООО "Ромашка"'] * 5))
+    assert {result.segment for result in results} == {"Энергетика"}
+    assert len(classifier.calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_database_errors_fail_open(service: SegmentService, store: DictStore) -> None:
+    store.broken = True
+    result = await service.classify("ООО Ромашка")
+    assert (result.segment, result.source) == ("Энергетика", "dify")
+
+
+@pytest.mark.asyncio
+async def test_empty_answer_is_an_error(service: SegmentService, classifier: Classifier, store: DictStore) -> None:
+    classifier.answer = "  "
+    with pytest.raises(DifyError):
+        await service.classify("ООО Ромашка")
+    assert store.rows == {}
+
+
+@pytest.mark.asyncio
+async def test_batch(service: SegmentService, store: DictStore, classifier: Classifier) -> None:
+    store.rows["ао альфа"] = "Финансы"
+    await service.classify("ИП Иванов")
+    classifier.failing.add("ЗАО Бета")
+    queries = store.queries
+    names = ["Акционерное общество Альфа", "ИП Иванов", "ООО Ромашка", "ооо ромашка", "ЗАО Бета"]
+
+    results = await service.classify_many(names)
+
+    assert [result.name for result in results] == names
+    assert [result.source for result in results] == ["database", "memory", "dify", "dify", "error"]
+    assert results[4].segment is None and results[4].error
+    assert classifier.calls == ["ИП Иванов", "ООО Ромашка", "ЗАО Бета"]
+    assert store.queries == queries + 1
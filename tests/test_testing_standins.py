@@ -0,0 +1,104 @@
+"""Tests for the seeded LDAP and Dify stand-ins used for offline load tests."""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Iterator
+from typing import Any
+
+import pytest
+
+pytest.importorskip("ldap3")
+httpx = pytest.importorskip("httpx")
+pytest.importorskip("starlette")
+
+from auth import ldap_client
+from auth.exceptions import DirectoryUnavailableError
+from auth.ldap_pool import IdleConnections, LdapServerPool
+from config import settings
+from integrations.dify import DifyClient, DifyUnavailableError
+from testing.dify import FakeDify
+from testing.ldap_server import UNAVAILABLE, LdapStandIn
+from testing.standins import StandInOptions, build_dify, build_ldap, environment
+
+OPTIONS = StandInOptions(ldap_port=0, users=300, groups=50, reports_per_manager=4)
+
+
+@pytest.fixture
+def directory(monkeypatch: Any) -> Iterator[LdapStandIn]:
+    server, _ = build_ldap(OPTIONS)
+    with server:
+        pool = LdapServerPool([server.uri], server_factory=ldap_client._build_server)
+        idle: IdleConnections[Any] = IdleConnections(max_size=2, idle_timeout=60, close=ldap_client._close)
+        monkeypatch.setattr(settings.ldap, "tls_mode", "none")
+        monkeypatch.setattr(ldap_client, "ldap_pool", pool)
+        monkeypatch.setattr(ldap_client, "service_connections", idle)
+        yield server
+        idle.clear()
+
+
+def test_seeded_users_log_in_with_roles_and_reports(directory: LdapStandIn) -> None:
+    admin = ldap_client.ldap_authenticate("user00000", OPTIONS.password)
+    assert admin is not None
+    assert settings.ldap.groups.admin in admin.groups
+    assert len(admin.subordinates) == OPTIONS.reports_per_manager
+
+    report = ldap_client.ldap_fetch_user_by_login("user00003")
+    assert report is not None
+    assert report.supervisor is not None and "00000" in report.supervisor
+    assert ldap_client.ldap_authenticate("user00003", "wrong") is None
+
+
+def test_injected_failures(directory: LdapStandIn) -> None:
+    directory.faults.fail_next(code=UNAVAILABLE)
+    assert ldap_client.ldap_authenticate("user00001", OPTIONS.password) is None
+    assert directory.stats.injected_failures == 1
+
+    directory.faults.disconnect_rate = 1.0
+    with pytest.raises(DirectoryUnavailableError):
+        ldap_client.ldap_authenticate("user00001", OPTIONS.password)
+    assert directory.stats.dropped_connections >= 1
+
+
+def test_injected_latency(directory: LdapStandIn) -> None:
+    directory.faults.latency = 0.05
+    started = time.perf_counter()
+    assert ldap_client.ldap_fetch_user_by_login("user00002") is not None
+    assert time.perf_counter() - started >= 0.1  # bind and search
+
+
+def _client(fake: FakeDify) -> DifyClient:
+    return DifyClient(
+        "http://dify.test/v1",
+        timeout=5.0,
+        connect_timeout=1.0,
+        max_connections=10,
+        max_keepalive_connections=5,
+        keepalive_expiry=5.0,
+        max_retries=1,
+        backoff=0.001,
+        transport=httpx.ASGITransport(app=fake.app),
+    )
+
+
+@pytest.mark.asyncio
+async def test_dify_latency_streaming_and_failures(monkeypatch: Any) -> None:
+    key = "app-kb"
+    monkeypatch.setattr(settings.dify, "kb_api_key", key)
+    fake = build_dify(StandInOptions(dify_latency=0.02, dify_stream_delay=0.01))
+    client = _client(fake)
+    started = time.perf_counter()
+    events = [event async for event in client.chat_messages_stream(key, query="a b c", user="u")]
+    assert len(events) == 5  # "echo:", "a", "b", "c", message_end
+    assert time.perf_counter() - started >= 0.02 + 4 * 0.01
+
+    fake.failure_rate = 1.0
+    with pytest.raises(DifyUnavailableError):
+        await client.retrieve(key, "ds1", query="q", top_k=1)
+    assert fake.stats.failed == 2  # retried once
+
+
+def test_environment_points_settings_at_the_stand_ins() -> None:
+    env = environment("ldap://127.0.0.1:3389", "http://127.0.0.1:5001/v1")
+    assert env["APP_CONFIG__LDAP__SERVERS"] == '["ldap://127.0.0.1:3389"]'
+    assert env["APP_CONFIG__DIFY__BASE_URL"] == "http://127.0.0.1:5001/v1"
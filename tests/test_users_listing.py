@@ -0,0 +1,59 @@
+"""Tests for the keyset user listing."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy.dialects import postgresql
+
+from core.cursors import CursorCodec, InvalidCursorError
+from db.repositories.app.users import user_page_query
+from users import UserFilters, UserListing
+
+
+def _sql(**kwargs: Any) -> str:
+    stmt = user_page_query(**kwargs)
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+def test_name_sort_uses_row_comparison_over_collated_key() -> None:
+    sql = _sql(sort="name", after=["петров", 12], limit=51)
+    assert "(lower(coalesce(users.full_name, '')) COLLATE \"C\", users.id) > ('петров', 12)" in sql
+    assert sql.endswith("LIMIT 51")
+    assert "ORDER BY lower(coalesce(users.full_name, '')) COLLATE \"C\", users.id" in sql
+
+
+def test_first_page_has_no_keyset_and_filters_are_applied() -> None:
+    sql = _sql(sort="id", after=None, limit=10, department="ОТиЗ", role="viewer", is_active=True)
+    assert "users.id >" not in sql
+    assert "users.department = 'ОТиЗ'" in sql
+    assert "users.role = 'viewer'" in sql
+    assert "users.is_active IS true" in sql
+
+
+def test_prefix_is_an_index_range() -> None:
+    sql = _sql(sort="login", after=None, limit=10, prefix="IvA")
+    assert "(users.ad_login COLLATE \"C\") >= 'iva'" in sql
+    assert "LIKE" not in sql
+
+
+def test_keyset_length_must_match_sort() -> None:
+    with pytest.raises(ValueError):
+        user_page_query(sort="name", after=[1], limit=10)
+
+
+def test_cursor_is_bound_to_sort_and_filters() -> None:
+    listing = UserListing(CursorCodec("secret"))
+    filters = UserFilters(department="ОТиЗ")
+    cursor = listing.cursor_for("name", filters, SimpleNamespace(sort_0="петров", sort_1=12))  # type: ignore[arg-type]
+
+    assert listing.keyset(cursor, "name", filters) == ["петров", 12]
+    with pytest.raises(InvalidCursorError):
+        listing.keyset(cursor, "login", filters)
+    with pytest.raises(InvalidCursorError):
+        listing.keyset(cursor, "name", UserFilters(department="Бухгалтерия"))
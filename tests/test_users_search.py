@@ -0,0 +1,121 @@
+"""Tests for the trigram people search and its synthetic data."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy.dialects import postgresql
+
+from cli.search_bench import SearchBenchOptions, run_search_bench
+from core.cache import TTLCache
+from db.repositories.app.users import user_search_query
+from testing.people import sample_queries, synthetic_users
+from users import PeopleSearch, normalize_search
+
+
+def _sql(query: str, **kwargs: Any) -> str:
+    stmt = user_search_query(query, query.split(), limit=10, **kwargs)
+    return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+
+
+class FakeSessions:
+    """Session factory whose ``execute`` answers every search with one row after ``delay``."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.statements: list[Any] = []
+
+    @asynccontextmanager
+    async def __call__(self) -> AsyncIterator[FakeSessions]:
+        yield self
+
+    async def execute(self, stmt: Any) -> SimpleNamespace:
+        self.statements.append(stmt)
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(all=lambda: [SimpleNamespace(id=1, score=1.0)])
+
+
+def _search(sessions: FakeSessions, ttl: float = 60.0) -> PeopleSearch:
+    cache: TTLCache[Any, Any] = TTLCache("test_user_search", max_size=100, ttl=ttl)
+    return PeopleSearch(cache=cache, min_length=3, session_factory=sessions)  # type: ignore[arg-type]
+
+
+def test_normalize_search_matches_document_normalization() -> None:
+    assert normalize_search("  Фёдоров   ПЁТР ") == "федоров петр"
+
+
+def test_long_terms_use_the_index_and_short_ones_filter() -> None:
+    sql = _sql("иванов п")
+    assert "ё', 'е') LIKE '%%иванов%%'" in sql
+    assert "strpos(" in sql and "'п') > 0" in sql
+    assert "users.is_active IS true" in sql
+    assert "word_similarity('иванов п'" in sql
+    assert "is_active" not in _sql("иванов", include_inactive=True).split("WHERE")[1]
+
+
+def test_like_wildcards_are_escaped() -> None:
+    assert "LIKE '%%50\\\\%%%%'" in _sql("50%")
+
+
+def test_query_needs_a_trigram_term() -> None:
+    with pytest.raises(ValueError):
+        user_search_query("ив ан", ["ив", "ан"], limit=10)
+
+
+@pytest.mark.asyncio
+async def test_short_queries_skip_the_database() -> None:
+    sessions = FakeSessions()
+    search = _search(sessions)
+    for query in ("", "ив", "ив ан ов"):
+        assert (await search.search(query, limit=10)).source == "skipped"
+    assert sessions.statements == []
+
+
+@pytest.mark.asyncio
+async def test_normalized_queries_share_the_cache() -> None:
+    sessions = FakeSessions()
+    search = _search(sessions)
+    first = await search.search("Иванов", limit=10)
+    second = await search.search(" иванов ", limit=10)
+    other_limit = await search.search("иванов", limit=5)
+    assert (first.source, second.source, other_limit.source) == ("database", "cache", "database")
+    assert second.rows == first.rows
+    assert len(sessions.statements) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_misses_share_one_query() -> None:
+    sessions = FakeSessions(delay=0.01)
+    search = _search(sessions, ttl=0.0)
+    await asyncio.gather(*(search.search("петров", limit=10) for _ in range(5)))
+    assert len(sessions.statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_search_bench_reports_both_scenarios() -> None:
+    options = SearchBenchOptions(requests=200, concurrency=4, warmup=5)
+    results = await run_search_bench(options, FakeSessions())  # type: ignore[arg-type]
+    assert [result.name for result in results] == ["search", "search-cached"]
+    assert all(result.requests == 200 and result.errors == 0 for result in results)
+    assert "200 cache" not in results[0].statuses
+    assert results[1].statuses.get("200 cache", 0) > 0
+
+
+def test_synthetic_users_are_deterministic_and_unique() -> None:
+    rows = list(synthetic_users(500, seed=3))
+    assert rows == list(synthetic_users(500, seed=3))
+    assert len({row["ad_login"] for row in rows}) == 500
+    assert all(row["ad_login"].isascii() for row in rows)
+
+
+def test_sample_queries_are_searchable() -> None:
+    for query in sample_queries(200):
+        assert any(len(term) >= 3 for term in normalize_search(query).split())